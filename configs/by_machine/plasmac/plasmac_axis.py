@@ -597,6 +597,12 @@ def user_button_released(button,commands):
             hal.set_p('plasmac.probe-test','0')
             probeButton = ''
 
+# the pins user_live_update reads, looked up once
+livePins = [hal.ref(pin) for pin in ('halui.program.is-idle',
+        'halui.machine.is-on', 'halui.program.is-paused',
+        'plasmac.arc-ok-out', 'plasmac.paused-motion-speed',
+        'plasmac.thc-enabled')]
+
 # this is run from axis every cycle
 # original in axis.py line 3000
 def user_live_update():
@@ -631,8 +637,9 @@ def user_live_update():
     # set machine state
     isIdleHomed = True
     isIdleOn = True
-    if hal.get_value('halui.program.is-idle') and hal.get_value('halui.machine.is-on'):
-        if hal.get_value('plasmac.arc-ok-out'):
+    isIdle, isOn, isPaused, arcOk, pausedSpeed, thcEnabled = hal.get_values(livePins)
+    if isIdle and isOn:
+        if arcOk:
             isIdleOn = False
         for joint in range(0,int(inifile.find('KINS','JOINTS'))):
                 if not stat.homed[joint]:
@@ -644,7 +651,7 @@ def user_live_update():
     # set buttons state
     for n in range(1,6):
         if iniButtonCode[n] in ['ohmic-test']:
-            if isIdleOn or hal.get_value('halui.program.is-paused'):
+            if isIdleOn or isPaused:
                 w(fbuttons + '.button' + str(n),'configure','-state','normal')
             else:
                 w(fbuttons + '.button' + str(n),'configure','-state','disabled')
@@ -653,17 +660,17 @@ def user_live_update():
                 w(fbuttons + '.button' + str(n),'configure','-state','normal')
             else:
                 w(fbuttons + '.button' + str(n),'configure','-state','disabled')
-    if hal.get_value('halui.machine.is-on') and (hal.get_value('halui.program.is-idle') or hal.get_value('halui.program.is-paused')):
+    if isOn and (isIdle or isPaused):
         w(ftorch + '.torch-button','configure','-state','normal')
     else:
         w(ftorch + '.torch-button','configure','-state','disabled')
-    if hal.get_value('halui.program.is-paused') or hal.get_value('plasmac.paused-motion-speed'):
+    if isPaused or pausedSpeed:
         w(fpausedmotion + '.reverse','configure','-state','normal')
         w(fpausedmotion + '.forward','configure','-state','normal')
     else:
         w(fpausedmotion + '.reverse','configure','-state','disabled')
         w(fpausedmotion + '.forward','configure','-state','disabled')
-    if hal.get_value('halui.machine.is-on'):
+    if isOn:
         w(foverride + '.raise','configure','-state','normal')
         w(foverride + '.lower','configure','-state','normal')
         w(foverride + '.reset','configure','-state','normal')
@@ -672,7 +679,7 @@ def user_live_update():
         w(foverride + '.lower','configure','-state','disabled')
         w(foverride + '.reset','configure','-state','disabled')
     # set thc state indicator
-    if hal.get_value('plasmac.thc-enabled'):
+    if thcEnabled:
         hal.set_p('axisui.led-thc-enabled','1')
     else:
         hal.set_p('axisui.led-thc-enabled','0')
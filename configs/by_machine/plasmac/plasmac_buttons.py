@@ -124,8 +124,9 @@ class HandlerClass:
         self.s.poll()
         isIdleHomed = True
         isIdleOn = True
-        if hal.get_value('halui.program.is-idle') and hal.get_value('halui.machine.is-on'):
-            if hal.get_value('plasmac.arc-ok-out'):
+        isIdle, isOn, isPaused, arcOk = hal.get_values(self.periodicPins)
+        if isIdle and isOn:
+            if arcOk:
                 isIdleOn = False
             for joint in range(0,int(self.i.find('KINS','JOINTS'))):
                     if not self.s.homed[joint]:
@@ -136,7 +137,7 @@ class HandlerClass:
             isIdleOn = False 
         for n in range(1,5):
             if 'ohmic-test' in self.iniButtonCode[n]:
-                if isIdleOn or hal.get_value('halui.program.is-paused'):
+                if isIdleOn or isPaused:
                     self.builder.get_object('button' + str(n)).set_sensitive(True)
                 else:
                     self.builder.get_object('button' + str(n)).set_sensitive(False)
@@ -158,6 +159,9 @@ class HandlerClass:
         self.i = linuxcnc.ini(os.environ['INI_FILE_NAME'])
         self.s = linuxcnc.stat();
         self.c = linuxcnc.command()
+        self.periodicPins = [hal.ref(pin) for pin in ('halui.program.is-idle',
+                'halui.machine.is-on', 'halui.program.is-paused',
+                'plasmac.arc-ok-out')]
         self.prefFile = self.i.find('EMC', 'MACHINE') + '.pref'
         self.iniButtonName = ['Names']
         self.iniButtonCode = ['Codes']
@@ -41,21 +41,21 @@ class HandlerClass:
         if self.rapid_override != self.s.rapidrate:
             self.builder.get_object('rapid-override').set_active(int(self.s.rapidrate * 100))
             self.feed_override = int(self.s.rapidrate * 100)
-        if hal.get_value('halui.machine.is-on') and not hal.get_value('halui.program.is-running'):
+        isOn, isRunning, isPaused, pausedSpeed, mode = hal.get_values(self.periodicPins)
+        if isOn and not isRunning:
             self.builder.get_object('torch-pulse-start').set_sensitive(True)
         else:
             self.builder.get_object('torch-pulse-start').set_sensitive(False)
-        if hal.get_value('halui.program.is-paused') or hal.get_value('plasmac.paused-motion-speed'):
+        if isPaused or pausedSpeed:
             self.builder.get_object('forward').set_sensitive(True)
             self.builder.get_object('reverse').set_sensitive(True)
         else:
             self.builder.get_object('forward').set_sensitive(False)
             self.builder.get_object('reverse').set_sensitive(False)
-        if hal.get_value('halui.machine.is-on'):
+        if isOn:
             self.builder.get_object('height-frame').set_sensitive(True)
         else:
             self.builder.get_object('height-frame').set_sensitive(False)
-        mode = hal.get_value('plasmac.mode')
         if mode != self.oldMode:
             if mode == 0:
                 self.builder.get_object('height-frame').show()
@@ -150,6 +150,9 @@ class HandlerClass:
         self.i = linuxcnc.ini(os.environ['INI_FILE_NAME'])
         self.s = linuxcnc.stat();
         self.c = linuxcnc.command()
+        self.periodicPins = [hal.ref(pin) for pin in ('halui.machine.is-on',
+                'halui.program.is-running', 'halui.program.is-paused',
+                'plasmac.paused-motion-speed', 'plasmac.mode')]
         self.prefFile = self.i.find('EMC', 'MACHINE') + '.pref'
         self.set_theme()
         self.maxFeed = int(float(self.i.find("DISPLAY", "MAX_FEED_OVERRIDE") or '1') * 100)
@@ -29,7 +29,7 @@ import hal
 class HandlerClass:
 
     def periodic(self):
-        mode = hal.get_value('plasmac.mode')
+        mode = self.modePin.get()
         if mode != self.oldMode:
             if mode == 0:
                 self.builder.get_object('arc-voltage').show()
@@ -69,6 +69,7 @@ class HandlerClass:
         self.i = linuxcnc.ini(os.environ['INI_FILE_NAME'])
         self.prefFile = self.i.find('EMC', 'MACHINE') + '.pref'
         self.oldMode = 9
+        self.modePin = hal.ref('plasmac.mode')
         self.set_theme()
         gobject.timeout_add(100, self.periodic)
 
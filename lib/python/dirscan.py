@@ -0,0 +1,204 @@
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Directory listings for file selection widgets
+
+scan() lists a directory in one pass: with the scandir module (the
+backport of python 3's os.scandir) the kind of each entry comes with the
+listing, otherwise each entry costs one stat().  Whether a subdirectory
+can be entered is checked with access(), not by listing it.
+
+Listings keeps the listings of the most recently seen directories until a
+FileWatcher reports a change in them, and Scanner runs scans in a
+background thread, so a directory on a slow network file system does not
+hold up the GUI.
+"""
+
+import os
+import stat
+import time
+import threading
+import collections
+import filewatch
+
+try:
+    from scandir import scandir
+except ImportError:
+    scandir = None
+
+# how much of a file preview() reads
+PREVIEW_BYTES = 512
+PREVIEW_LINES = 3
+# directories Listings keeps and watches
+MAX_LISTINGS = 16
+
+def scan(path, details=False):
+    """The entries of directory path as a list of (name, is_dir, info),
+    without hidden entries and directories that cannot be entered.  info
+    is None, or with details (size, mtime, preview) for files."""
+    result = []
+    if scandir is not None:
+        for entry in scandir(path):
+            name = entry.name
+            if name[0] == '.': continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            result.append(_entry(path, name, is_dir, details and entry))
+    else:
+        for name in os.listdir(path):
+            if name[0] == '.': continue
+            try:
+                st = os.stat(os.path.join(path, name))
+            except OSError:
+                # e.g. a dangling link
+                st = None
+            is_dir = st is not None and stat.S_ISDIR(st.st_mode)
+            result.append(_entry(path, name, is_dir, details and st))
+    return [e for e in result if e is not None]
+
+def _entry(path, name, is_dir, details):
+    full = os.path.join(path, name)
+    if is_dir:
+        if not os.access(full, os.R_OK | os.X_OK):
+            return None
+        return name, True, None
+    info = None
+    if details:
+        try:
+            st = details
+            if hasattr(st, 'stat'): st = st.stat()
+            info = st.st_size, st.st_mtime, preview(full)
+        except OSError:
+            pass
+    return name, False, info
+
+def preview(path):
+    """The first few non-empty lines of a text file, '' for other files"""
+    try:
+        f = open(path, 'rb')
+        try:
+            data = f.read(PREVIEW_BYTES)
+        finally:
+            f.close()
+    except IOError:
+        return ''
+    if '\0' in data:
+        return ''
+    lines = [l.strip() for l in data.splitlines()[:PREVIEW_LINES * 2]]
+    return '\n'.join([l for l in lines if l][:PREVIEW_LINES])
+
+def describe(info):
+    """Text for the info of a file as returned by scan(details=True)"""
+    if info is None:
+        return ''
+    size, mtime, text = info
+    head = "%s, %s" % (_size(size),
+        time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime)))
+    if text:
+        return head + '\n' + text
+    return head
+
+def _size(size):
+    for unit in ('bytes', 'kB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            if unit == 'bytes': return "%d %s" % (size, unit)
+            return "%.1f %s" % (size, unit)
+        size /= 1024.
+
+class Listings:
+    """The listings of directories, kept until the directory changes.  Only
+    the 'size' most recently used directories are kept and watched."""
+    def __init__(self, watcher=None, size=MAX_LISTINGS):
+        self.watcher = watcher or filewatch.shared()
+        self.size = size
+        self.listings = {}  # path -> (generation, details, entries)
+        self.recent = collections.OrderedDict() # watched paths, oldest first
+
+    def generation(self, path):
+        """Start watching path; pass the result to put() with a listing
+        made after this call"""
+        self.touch(path)
+        return self.watcher.watch_directory(path)
+
+    def get(self, path, details=False):
+        """The listing of path if it is still current, else None"""
+        path = os.path.abspath(path)
+        cached = self.listings.get(path)
+        if cached is None:
+            return None
+        self.touch(path)
+        self.watcher.check()
+        generation, has_details, entries = cached
+        if generation != self.watcher.generation(path) \
+                or (details and not has_details):
+            del self.listings[path]
+            return None
+        return entries
+
+    def put(self, path, generation, details, entries):
+        path = os.path.abspath(path)
+        if path not in self.recent:
+            # forgotten while it was scanned
+            return
+        self.listings[path] = (generation, details, entries)
+
+    def forget(self, path):
+        self.listings.pop(os.path.abspath(path), None)
+
+    def touch(self, path):
+        path = os.path.abspath(path)
+        self.recent.pop(path, None)
+        self.recent[path] = True
+        while len(self.recent) > self.size:
+            old, _ = self.recent.popitem(last=False)
+            self.listings.pop(old, None)
+            self.watcher.unwatch(old)
+
+class Scanner:
+    """Scans directories in a thread, one at a time.  A request that has
+    not started when a newer one comes in is dropped, so every widget
+    needs a Scanner of its own."""
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = None
+        self.thread = None
+
+    def scan(self, path, details, done):
+        """Call done(path, entries) from the scanning thread; entries is
+        None if the directory could not be read"""
+        with self.cond:
+            self.pending = path, details, done
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run,
+                    name="directory scanner")
+                self.thread.daemon = True
+                self.thread.start()
+            self.cond.notify()
+
+    def _run(self):
+        while 1:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                path, details, done = self.pending
+                self.pending = None
+            try:
+                entries = scan(path, details)
+            except OSError:
+                entries = None
+            done(path, entries)
+
+# vim:ts=8:sts=4:sw=4:et:
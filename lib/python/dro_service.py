@@ -0,0 +1,187 @@
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Axis positions for DRO displays, computed once for all of them
+
+positions() turns a status snapshot into the absolute, relative and
+distance to go positions of all nine axes in one numpy pass, for the
+actual and the commanded position at once.
+
+A DroService polls the status on one timer for every DRO of the process,
+computes the positions once per poll and formats each kind of readout
+(units, template, diameter) once, however many widgets show it.  Widgets
+subscribe() a callback that picks its strings from texts().
+
+use_hal() adds a faster update between status polls that takes the
+positions from HAL pins, for a smoother readout while the machine moves;
+the offsets and the distance to go still come from the status.
+"""
+
+import math
+import numpy
+import gobject
+import statusbroker
+
+AXES = 9
+INCH = 0
+MM = 1
+# X Y Z U V W; A B C are angles and never converted
+LINEAR = numpy.array([0, 1, 2, 6, 7, 8])
+
+ABS = 0
+REL = 1
+DTG = 2
+
+def positions(stat, p=None):
+    """(abs, rel, dtg) of the 9 axes in machine units.  abs and rel have
+    two rows, the actual and the commanded position; p, if given, is used
+    for both."""
+    if p is None:
+        p = (stat.actual_position[:AXES], stat.position[:AXES])
+    else:
+        p = (p[:AXES], p[:AXES])
+    pos = numpy.array(p, float)
+    rel = pos - numpy.array(stat.g5x_offset[:AXES], float) \
+        - numpy.array(stat.tool_offset[:AXES], float)
+    if stat.rotation_xy != 0:
+        t = math.radians(-stat.rotation_xy)
+        x = rel[:, 0].copy()
+        y = rel[:, 1].copy()
+        rel[:, 0] = x * math.cos(t) - y * math.sin(t)
+        rel[:, 1] = x * math.sin(t) + y * math.cos(t)
+    rel -= numpy.array(stat.g92_offset[:AXES], float)
+    dtg = numpy.array(stat.dtg[:AXES], float)
+    return pos, rel, dtg
+
+def convert(values, metric, machine_units):
+    """values (9 axes, or rows of them) in the display units"""
+    if metric and machine_units == INCH:
+        values = values.copy()
+        values[..., LINEAR] *= 25.4
+    elif not metric and machine_units == MM:
+        values = values.copy()
+        values[..., LINEAR] /= 25.4
+    return values
+
+class DroService:
+    def __init__(self, status=None, interval=100):
+        self.status = status or statusbroker.status()
+        self.interval = interval
+        self.clients = []       # (callback, interval)
+        self.timer = None
+        self.valid = False
+        self.pos = self.rel = self.dtg = None
+        self._texts = {}
+        self.hal_pins = None
+        self.hal_timer = None
+
+    def subscribe(self, callback, interval=None):
+        """Call callback(service) after every update.  The status is polled
+        every 'interval' ms, the shortest asked for by any client."""
+        self.clients.append((callback, interval or self.interval))
+        self._restart()
+
+    def unsubscribe(self, callback):
+        self.clients = [c for c in self.clients if c[0] != callback]
+        self._restart()
+
+    def _restart(self):
+        if self.timer is not None:
+            gobject.source_remove(self.timer)
+            self.timer = None
+        if self.clients:
+            interval = min([c[1] for c in self.clients])
+            self.timer = gobject.timeout_add(interval, self._periodic)
+
+    def _periodic(self):
+        # we do not want to throw errors if linuxcnc has been killed
+        # from external command
+        try:
+            self.status.poll()
+        except:
+            pass
+        if self.hal_pins is not None:
+            self.update(self.hal_read())
+        else:
+            self.update()
+        return True
+
+    def update(self, p=None):
+        """Compute the positions from the status (and p, the positions
+        from HAL) and tell the clients"""
+        try:
+            self.pos, self.rel, self.dtg = positions(self.status, p)
+            self.valid = True
+        except:
+            # e.g. in the glade editor, without linuxcnc
+            self.valid = False
+        self._texts = {}
+        for callback, interval in self.clients[:]:
+            callback(self)
+
+    def values(self, actual=True, metric=True, machine_units=MM):
+        """(abs, rel, dtg) arrays of the 9 axes in display units"""
+        row = not actual and 1 or 0
+        return (convert(self.pos[row], metric, machine_units),
+                convert(self.rel[row], metric, machine_units),
+                convert(self.dtg, metric, machine_units))
+
+    def texts(self, template, actual=True, metric=True, machine_units=MM,
+            diameter=False):
+        """The formatted abs, rel and dtg of the 9 axes as three lists,
+        made once per update for every set of arguments"""
+        key = template, actual, metric, machine_units, diameter
+        texts = self._texts.get(key)
+        if texts is None:
+            texts = []
+            for values in self.values(actual, metric, machine_units):
+                if diameter:
+                    values = values * 2.0
+                texts.append([template % v for v in values.tolist()])
+            self._texts[key] = texts
+        return texts
+
+    def use_hal(self, name="dro", interval=20):
+        """Between status polls, update every 'interval' ms with the
+        positions of the HAL pins <name>.position-0 .. -8 (float in), which
+        would be connected to the axis feedback positions"""
+        import hal
+        comp = hal.component(name)
+        pins = [comp.newpin("position-%d" % i, hal.HAL_FLOAT, hal.HAL_IN)
+            for i in range(AXES)]
+        comp.ready()
+        self.hal_comp = comp
+        self.hal_pins = pins
+        if hasattr(hal, 'read_items'):
+            items = [pin._item for pin in pins]
+            self.hal_read = lambda: hal.read_items(items)
+        else:
+            self.hal_read = lambda: [pin.get() for pin in pins]
+        if self.hal_timer is not None:
+            gobject.source_remove(self.hal_timer)
+        self.hal_timer = gobject.timeout_add(interval, self._hal_periodic)
+
+    def _hal_periodic(self):
+        self.update(self.hal_read())
+        return True
+
+_shared = None
+def shared():
+    """The DroService shared by every DRO widget in this process"""
+    global _shared
+    if _shared is None:
+        _shared = DroService()
+    return _shared
+
+# vim:ts=8:sts=4:sw=4:et:
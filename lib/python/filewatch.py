@@ -0,0 +1,277 @@
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Notice changes to files such as the tool table or the parameter file
+without re-reading them
+
+A FileWatcher keeps a change counter (the 'generation') for every watched
+file.  On Linux it is driven by inotify, so check() costs one non-blocking
+read when nothing happened; elsewhere, or when inotify cannot be set up,
+check() compares the size, mtime and inode of each file instead.  The
+directory of a file is watched rather than the file itself, so a file
+that is replaced by a rename (as most editors and the tool table writer
+do) keeps being followed.
+
+watch_directory() follows the entries of a directory instead: its
+generation changes whenever a file is added to, removed from or written
+in it.
+
+ParsedFile keeps the result of parsing one file and only parses it again
+after the file changed.
+"""
+
+import os
+import errno
+import struct
+import ctypes
+import ctypes.util
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_NONBLOCK = 0x800
+IN_CLOEXEC = 0x80000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE \
+    | IN_DELETE | IN_ATTRIB
+EVENT = struct.Struct("iIII")
+
+_libc = None
+def _inotify():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                use_errno=True)
+            _libc.inotify_init1
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc
+
+def signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime, st.st_ino
+
+class FileWatcher:
+    def __init__(self, use_inotify=True):
+        self.generations = {}
+        self.callbacks = {}
+        self.signatures = {}
+        self.dirs = {}      # directory -> watch descriptor
+        self.names = {}     # watch descriptor -> {name: path}
+        self.contents = {}  # watch descriptor -> directory watched itself
+        self.polled = set() # paths checked with stat()
+        self.fd = None
+        libc = use_inotify and _inotify()
+        if libc:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self.fd = fd
+                self.libc = libc
+
+    def uses_inotify(self):
+        return self.fd is not None
+
+    def fileno(self):
+        """The inotify descriptor, for adding to a main loop; it becomes
+        readable when check() has something to report.  None without
+        inotify."""
+        return self.fd
+
+    def watch(self, path, callback=None):
+        """Start following path (if not already) and return its current
+        generation.  callback(path) is called from check() after every
+        change."""
+        path = os.path.abspath(path)
+        if callback is not None:
+            cbs = self.callbacks.setdefault(path, [])
+            if callback not in cbs: cbs.append(callback)
+        if path in self.generations:
+            return self.generations[path]
+        self.generations[path] = 0
+        self.signatures[path] = signature(path)
+        wd = None
+        if self.fd is not None:
+            directory, name = os.path.split(path)
+            wd = self.dirs.get(directory)
+            if wd is None:
+                wd = self.libc.inotify_add_watch(self.fd, directory, WATCH_MASK)
+                if wd < 0:
+                    # e.g. the directory does not exist (yet)
+                    wd = None
+                else:
+                    self.dirs[directory] = wd
+            if wd is not None:
+                self.names.setdefault(wd, {})[name] = path
+        if wd is None:
+            self.polled.add(path)
+        return 0
+
+    def watch_directory(self, path, callback=None):
+        """Like watch(), but the generation of path changes with the
+        entries of the directory path"""
+        path = os.path.abspath(path)
+        if callback is not None:
+            cbs = self.callbacks.setdefault(path, [])
+            if callback not in cbs: cbs.append(callback)
+        if path in self.generations:
+            return self.generations[path]
+        self.generations[path] = 0
+        # without inotify, the mtime of the directory changes when an
+        # entry is added or removed
+        self.signatures[path] = signature(path)
+        wd = None
+        if self.fd is not None:
+            wd = self.dirs.get(path)
+            if wd is None:
+                wd = self.libc.inotify_add_watch(self.fd, path, WATCH_MASK)
+                if wd < 0:
+                    wd = None
+                else:
+                    self.dirs[path] = wd
+            if wd is not None:
+                self.contents[wd] = path
+        if wd is None:
+            self.polled.add(path)
+        return 0
+
+    def unwatch(self, path, callback=None):
+        path = os.path.abspath(path)
+        if callback is not None:
+            cbs = self.callbacks.get(path, [])
+            if callback in cbs: cbs.remove(callback)
+            return
+        self.callbacks.pop(path, None)
+        self.generations.pop(path, None)
+        self.signatures.pop(path, None)
+        self.polled.discard(path)
+        for wd, names in self.names.items():
+            for name, p in names.items():
+                if p == path: del names[name]
+        for wd, p in self.contents.items():
+            if p == path: del self.contents[wd]
+        if self.fd is not None:
+            # stop watching directories nothing is followed in any more
+            for directory, wd in self.dirs.items():
+                if not self.names.get(wd) and wd not in self.contents:
+                    self.libc.inotify_rm_watch(self.fd, wd)
+                    self.names.pop(wd, None)
+                    del self.dirs[directory]
+
+    def generation(self, path):
+        """Number of changes seen so far; compare with an earlier value to
+        find out whether the file changed in between"""
+        return self.generations.get(os.path.abspath(path), 0)
+
+    def read_events(self):
+        changed = set()
+        while 1:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError, detail:
+                if detail.errno == errno.EINTR: continue
+                if detail.errno != errno.EAGAIN: raise
+                break
+            if not data: break
+            i = 0
+            while i < len(data):
+                wd, mask, cookie, length = EVENT.unpack_from(data, i)
+                i += EVENT.size
+                name = data[i:i+length].rstrip("\0")
+                i += length
+                if mask & IN_Q_OVERFLOW:
+                    # events were lost, assume everything changed
+                    changed.update(set(self.generations) - self.polled)
+                    continue
+                if mask & IN_IGNORED:
+                    # the directory went away; stat() its files from now on
+                    for p in self.names.pop(wd, {}).values():
+                        self.polled.add(p)
+                    p = self.contents.pop(wd, None)
+                    if p is not None:
+                        self.polled.add(p)
+                    for d, w in self.dirs.items():
+                        if w == wd: del self.dirs[d]
+                    continue
+                path = self.names.get(wd, {}).get(name)
+                if path is not None:
+                    changed.add(path)
+                path = self.contents.get(wd)
+                if path is not None:
+                    changed.add(path)
+        return changed
+
+    def check(self):
+        """Look for changes, bump the generation and call the callbacks of
+        every changed file.  Returns the changed paths."""
+        changed = set()
+        if self.fd is not None:
+            changed = self.read_events()
+        for path in self.polled:
+            sig = signature(path)
+            if sig != self.signatures[path]:
+                changed.add(path)
+        for path in changed:
+            if path not in self.generations: continue
+            self.signatures[path] = signature(path)
+            self.generations[path] += 1
+        for path in changed:
+            for cb in self.callbacks.get(path, [])[:]:
+                cb(path)
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+_shared = None
+def shared():
+    """The FileWatcher shared by everything in this process"""
+    global _shared
+    if _shared is None:
+        _shared = FileWatcher()
+    return _shared
+
+class ParsedFile:
+    """parse(path) of a watched file, computed again only when the file
+    changed since the last get()"""
+    def __init__(self, path, parse, watcher=None):
+        self.path = path
+        self.parse = parse
+        self.watcher = watcher or shared()
+        self.watcher.watch(path)
+        self.parsed = None
+        self.value = None
+
+    def get(self):
+        self.watcher.check()
+        gen = self.watcher.generation(self.path)
+        if gen != self.parsed:
+            self.value = self.parse(self.path)
+            self.parsed = gen
+        return self.value
+
+    def invalidate(self):
+        self.parsed = None
+
+# vim:ts=8:sts=4:sw=4:et:
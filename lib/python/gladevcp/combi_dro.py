@@ -22,8 +22,8 @@ import gobject
 import os
 import sys
 import pango
-import math
 import linuxcnc
+import dro_service
 from hal_glib import GStat
 
 # constants
@@ -101,7 +101,9 @@ class Combi_DRO(gtk.VBox):
         # get the necessary connections to linuxcnc
         self.joint_number = self.joint = joint_number
         self.linuxcnc = linuxcnc
-        self.status = linuxcnc.stat()
+        # one status poll and one position computation for all DRO's
+        self.dro = dro_service.shared()
+        self.status = self.dro.status
         self.gstat = GStat()
 
         # set some default values'
@@ -122,6 +124,7 @@ class Combi_DRO(gtk.VBox):
         self._auto_units = True
         self.toggle_readout = True
         self.cycle_time = 150
+        self._shown = None
 
         # Make the GUI and connect signals
         self.eventbox = gtk.EventBox()
@@ -192,8 +195,12 @@ class Combi_DRO(gtk.VBox):
         else:
             self.machine_units = _INCH
 
-        # add the timer at a period of 100 ms
-        gobject.timeout_add(self.cycle_time, self._periodic)
+        # get updated with the other DRO's, at least every cycle_time ms
+        self.dro.subscribe(self._periodic, self.cycle_time)
+        self.connect("destroy", self._on_destroy)
+
+    def _on_destroy(self, widget):
+        self.dro.unsubscribe(self._periodic)
 
     # make an pango attribute to be used with several labels
     def _set_attributes(self, bgcolor, fgcolor, size, weight):
@@ -263,6 +270,8 @@ class Combi_DRO(gtk.VBox):
                     self.toggle_readout = value
                 if name == "cycle_time":
                     self.cycle_time = value
+                    self.dro.unsubscribe(self._periodic)
+                    self.dro.subscribe(self._periodic, self.cycle_time)
                 if name in ('metric_units', 'actual', 'diameter'):
                     setattr(self, name, value)
                     self.queue_draw()
@@ -338,23 +347,13 @@ class Combi_DRO(gtk.VBox):
         b = temp[8:]
         return (int(r, 16), int(g, 16), int(b, 16))
 
-    # periodic call to update the positions, every 100 ms
-    def _periodic(self):
-        # we do not want to throw errors if linuxcnc has been killed
-        # from external command
-        try:
-            self.status.poll()
-        except:
-            pass
-
+    # called by the DRO service after each status poll
+    def _periodic(self, dro):
         if self.status.kinematics_type != linuxcnc.KINEMATICS_IDENTITY and not self.homed:
-            self.main_dro.set_text("----.---")
-            self.dro_left.set_text("----.---")
-            self.dro_right.set_text("----.---")
-            return True
+            self._show("----.---", "----.---", "----.---")
+            return
 
         try:
-            main, left, right = self._position()
             if self.system != self._get_current_system():
                 self._set_labels()
                 self.emit("system_changed", self._get_current_system())
@@ -362,64 +361,43 @@ class Combi_DRO(gtk.VBox):
                 if self._auto_units:
                     self.metric_units = not self.metric_units
                 self.emit("units_changed", self.metric_units)
+            if self.metric_units:
+                template = self.mm_text_template
+            else:
+                template = self.imperial_text_template
+            # the strings are shared with every DRO showing the same
+            texts = dro.texts(template, self.actual, self.metric_units,
+                              self.machine_units, self.diameter)
+            main, left, right = self._in_order(texts)
         except:
-            sys = 0
-            main = 9999.999
-            left = 10.123
-            right = 0.000
-
-        if self.metric_units:
-            tmpl = lambda s: self.mm_text_template % s
-        else:
-            tmpl = lambda s: self.imperial_text_template % s
-
-        if self.diameter:
-            scale = 2.0
-        else:
-            scale = 1.0
-        main_dro = tmpl(main * scale)
-        left_dro = tmpl(left * scale)
-        right_dro = tmpl(right * scale)
-        self.main_dro.set_text(main_dro)
-        self.dro_left.set_text(left_dro)
-        self.dro_right.set_text(right_dro)
-        return True
-
-    # calculate the positions to display
-    def _position(self):
-        if self.actual:
-            p = self.status.actual_position
-        else:
-            p = self.status.position
-        dtg = self.status.dtg[self.joint_number]
-
-        abs_pos = p[self.joint_number]
-
-        rel_pos = p[self.joint_number] - self.status.g5x_offset[self.joint_number] - self.status.tool_offset[self.joint_number]
-
-        if self.status.rotation_xy != 0:
-            t = math.radians(-self.status.rotation_xy)
-            x = p[0] - self.status.g5x_offset[0] - self.status.tool_offset[0]
-            y = p[1] - self.status.g5x_offset[1] - self.status.tool_offset[1]
-            if self.joint_number == 0:
-                rel_pos = x * math.cos(t) - y * math.sin(t)
-            if self.joint_number == 1:
-                rel_pos = x * math.sin(t) + y * math.cos(t)
-
-        rel_pos -= self.status.g92_offset[self.joint_number]
-
-        if self.metric_units and self.machine_units == _INCH:
-            if self.joint_number not in (3, 4, 5):
-                abs_pos = abs_pos * 25.4
-                rel_pos = rel_pos * 25.4
-                dtg = dtg * 25.4
+            if self.metric_units:
+                template = self.mm_text_template
+            else:
+                template = self.imperial_text_template
+            if self.diameter:
+                scale = 2.0
+            else:
+                scale = 1.0
+            main = template % (9999.999 * scale)
+            left = template % (10.123 * scale)
+            right = template % (0.000 * scale)
 
-        if not self.metric_units and self.machine_units == _MM:
-            if self.joint_number not in (3, 4, 5):
-                abs_pos = abs_pos / 25.4
-                rel_pos = rel_pos / 25.4
-                dtg = dtg / 25.4
+        self._show(main, left, right)
 
+    def _show(self, main, left, right):
+        if (main, left, right) == self._shown:
+            return
+        self._shown = main, left, right
+        self.main_dro.set_text(main)
+        self.dro_left.set_text(left)
+        self.dro_right.set_text(right)
+
+    # the values of our joint from the abs, rel and dtg lists, in display
+    # order
+    def _in_order(self, values):
+        abs_pos = values[dro_service.ABS][self.joint_number]
+        rel_pos = values[dro_service.REL][self.joint_number]
+        dtg = values[dro_service.DTG][self.joint_number]
         if self._ORDER == ["Rel", "Abs", "DTG"]:
             return rel_pos, abs_pos, dtg
         if self._ORDER == ["DTG", "Rel", "Abs"]:
@@ -427,6 +405,13 @@ class Combi_DRO(gtk.VBox):
         if self._ORDER == ["Abs", "DTG", "Rel"]:
             return abs_pos, dtg, rel_pos
 
+    # calculate the positions to display
+    def _position(self):
+        if not self.dro.valid:
+            self.dro.update()
+        return self._in_order(self.dro.values(self.actual, self.metric_units,
+                                              self.machine_units))
+
     def _not_all_homed(self, widget, data = None):
         if self.status.kinematics_type == linuxcnc.KINEMATICS_IDENTITY:
             self.status.poll()
@@ -19,11 +19,15 @@ import cairo
 import math
 import gtk.glade
 import time
-from collections import deque
+from array import array
 
 from hal_widgets import _HalWidgetBase, hal
 
 MAX_INT = 0x7fffffff
+MAX_TRACES = 8
+NAN = float('nan')
+# redraw at most this often (seconds), however fast the pins are sampled
+REDRAW_PERIOD = 0.1
 
 def gdk_color_tuple(c):
     if not c:
@@ -40,6 +44,59 @@ def mround(v, m):
     if v < 0: return v - vm + m
     return 0
 
+class SampleRing:
+    """The last 'size' samples of one or more traces, in preallocated
+    arrays: one of sample times and one of values per trace"""
+    def __init__(self, size, traces=1):
+        self.size = size
+        self.times = array('d', [0.]) * size
+        self.values = [array('d', [NAN]) * size for i in range(traces)]
+        self.start = 0  # index of the oldest sample
+        self.count = 0
+
+    def append(self, t, values):
+        i = self.start + self.count
+        if i >= self.size: i -= self.size
+        self.times[i] = t
+        for trace, v in zip(self.values, values):
+            trace[i] = v
+        if self.count < self.size:
+            self.count += 1
+        else:
+            self.start += 1
+            if self.start == self.size: self.start = 0
+
+    def order(self):
+        "Indexes of the samples, oldest first"
+        end = self.start + self.count
+        if end <= self.size:
+            return xrange(self.start, end)
+        return range(self.start, self.size) + range(end - self.size)
+
+    def last_time(self):
+        if not self.count: return None
+        i = self.start + self.count - 1
+        if i >= self.size: i -= self.size
+        return self.times[i]
+
+    def limits(self, trace):
+        "Smallest and largest value of a trace, None if there are none"
+        if not self.count: return None
+        if self.count < self.size:
+            v = self.values[trace][:self.count]
+        else:
+            v = self.values[trace]
+        v = [x for x in v if x == x]
+        if not v: return None
+        return min(v), max(v)
+
+    def resized(self, size, traces):
+        "A new ring with the newest samples of this one"
+        ring = SampleRing(size, traces)
+        for i in list(self.order())[-size:]:
+            ring.append(self.times[i], [trace[i] for trace in self.values])
+        return ring
+
 class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
     __gtype_name__ = 'HAL_Graph'
     __gproperties__ = {
@@ -52,7 +109,13 @@ class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
         'period'  : ( gobject.TYPE_FLOAT, 'Period', 'TIme period to display',
                     -MAX_INT, MAX_INT, 60, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
         'tick'  : ( gobject.TYPE_INT, 'Tick period', 'Data acquarison pariod in ms',
-                    100, 10000, 500, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
+                    10, 10000, 500, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
+        'traces' : ( gobject.TYPE_INT, 'Traces', 'Number of pins to plot',
+                    1, MAX_TRACES, 1, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
+        'trace_colors' : ( gobject.TYPE_STRING, 'Trace colors',
+                'Comma separated colors of the second and further traces',
+                "blue,darkgreen,orange,magenta,cyan,brown,black",
+                gobject.PARAM_READWRITE|gobject.PARAM_CONSTRUCT),
         'zero' : ( gobject.TYPE_FLOAT, 'Zero', 'Zero value',
                     -MAX_INT, MAX_INT, 0, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
         'value' : ( gobject.TYPE_FLOAT, 'Value', 'Current meter value (for glade testing)',
@@ -88,8 +151,9 @@ class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
         self.fg_color = gtk.gdk.Color('red')
 
         self.force_radius = None
-        self.ticks = deque()
-        self.ticks_saved = []
+        self.ring = None
+        self.ring_saved = None
+        self.drawn = 0
         self.time_strings = {}
         self.tick_period = 0.1
 
@@ -100,33 +164,47 @@ class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
         self.tick = 500
         self.tick_idx = 0
         self.hal_pin = 0
+        self.hal_pins = []
 
         gobject.timeout_add(self.tick, self.tick_poll, self.tick_idx)
 
     def _hal_init(self):
         _HalWidgetBase._hal_init(self)
         self.hal_pin = self.hal.newpin(self.hal_name, hal.HAL_FLOAT, hal.HAL_IN)
+        self.hal_pins = [self.hal_pin]
+        for i in range(1, self.traces):
+            self.hal_pins.append(self.hal.newpin("%s.%d" % (self.hal_name, i),
+                hal.HAL_FLOAT, hal.HAL_IN))
 
     def tick_poll(self, idx):
         if self.tick_idx != idx:
             return False
-        v = self.hal_pin and self.hal_pin.get()
+        if self.hal_pins:
+            values = hal.read_items(self.hal_pins)
+        else:
+            values = [0] * self.traces
         now = time.time()
-        for (t,_) in list(self.ticks):
-            if t >= now - self.period:
-                break
-            self.ticks.popleft()
-        self.ticks.append((now, v))
-        self.queue_draw()
+        # enough samples for one period, reallocated only when the period,
+        # tick or number of traces change
+        size = int(self.period * 1000 / self.tick) + 2
+        ring = self.ring
+        if ring is None:
+            ring = self.ring = SampleRing(size, self.traces)
+        elif ring.size != size or len(ring.values) != self.traces:
+            ring = self.ring = ring.resized(size, self.traces)
+        ring.append(now, values)
+        if now - self.drawn >= REDRAW_PERIOD:
+            self.queue_draw()
         return True
 
     def snapshot(self, widget, event):
         if event.button != 1:
             return
-        if self.ticks_saved:
-            self.ticks_saved = []
+        if self.ring_saved or self.ring is None:
+            self.ring_saved = None
         else:
-            self.ticks_saved = list(self.ticks)
+            self.ring_saved = self.ring.resized(self.ring.size,
+                len(self.ring.values))
 
     def expose(self, widget, event):
         w = self.allocation.width
@@ -166,9 +244,9 @@ class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
         cr.fill()
 
         #tw = self.tick_period * w / self.period
-        tnow = now = time.time()
-        if self.ticks_saved:
-            now = max(map(lambda x: x[0], self.ticks_saved))
+        tnow = now = self.drawn = time.time()
+        if self.ring_saved:
+            now = self.ring_saved.last_time()
 
         cr.set_source_rgb(0, 0, 0)
 
@@ -185,7 +263,11 @@ class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
         ymin, ymax = self.min, self.max
         yticks = self.yticks
         if self.autoscale:
-            tv = map(lambda x: x[1], self.ticks_saved + list(self.ticks))
+            tv = []
+            for ring in self.ring, self.ring_saved:
+                if ring is None: continue
+                for trace in range(len(ring.values)):
+                    tv.extend(ring.limits(trace) or ())
             if tv:
                 ymin, ymax = min(tv), max(tv)
                 ymin -= abs(ymin) * 0.1
@@ -211,13 +293,23 @@ class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
         cr.set_font_size(font_small)
         self.text_at(cr, self.sublabel, w/2, 2.5 * font_large, yalign='top')
 
-        cr.set_source_color(self.fg_color)
-
-        if self.ticks_saved:
-            self.draw_graph(cr, w, h, ymin, ymax, self.ticks_saved, t2x)
-            cr.set_source_rgba(*(gdk_color_tuple(self.fg_color) + (0.3,)))
-
-        self.draw_graph(cr, w, h, ymin, ymax, self.ticks, lambda t: t2x(t, tnow))
+        colors = [gdk_color_tuple(self.fg_color)]
+        for name in self.trace_colors.split(","):
+            try:
+                colors.append(gdk_color_tuple(gtk.gdk.color_parse(name.strip())))
+            except ValueError:
+                colors.append(colors[0])
+
+        for trace in range(self.traces):
+            color = colors[min(trace, len(colors) - 1)]
+            alpha = 1
+            if self.ring_saved and trace < len(self.ring_saved.values):
+                cr.set_source_rgb(*color)
+                self.draw_graph(cr, w, h, ymin, ymax, self.ring_saved, trace, now)
+                alpha = 0.3
+            if self.ring and trace < len(self.ring.values):
+                cr.set_source_rgba(*(color + (alpha,)))
+                self.draw_graph(cr, w, h, ymin, ymax, self.ring, trace, tnow)
 
         if not (self.flags() & gtk.PARENT_SENSITIVE):
             cr.set_source_rgba(0, 0, 0, 0.3)
@@ -242,22 +334,52 @@ class HAL_Graph(gtk.DrawingArea, _HalWidgetBase):
         cr.move_to(x, y)
         cr.show_text(text)
 
-    def draw_graph(self, cr, w, h, ymin, ymax, ticks, t2x):
+    def draw_graph(self, cr, w, h, ymin, ymax, ring, trace, now):
+        # samples that fall on the same pixel column are drawn as one
+        # stroke from their first value through their minimum and maximum
+        # to their last, so the path has at most 4 points per column
+        # however fast the pin is sampled
+        times = ring.times
+        values = ring.values[trace]
+        start = now - self.period
+        xscale = w / self.period
+        yscale = h / (ymax - ymin)
+        def y(v):
+            return h - (min(max(v, ymin), ymax) - ymin) * yscale
+        def draw_column(x, first, lo, hi, last, n, move):
+            if move:
+                cr.move_to(x, y(first))
+            cr.line_to(x, y(first))
+            if n > 1:
+                cr.line_to(x, y(lo))
+                cr.line_to(x, y(hi))
+                cr.line_to(x, y(last))
+
+        column = None
         move = True
-        for (t, v) in ticks:
-            if v is None:
+        for i in ring.order():
+            v = values[i]
+            x = (times[i] - start) * xscale
+            if v != v or x < 0 or x > w:
+                # gap or outside the graph
+                if column is not None:
+                    draw_column(cx, first, lo, hi, last, n, move)
+                    column = None
                 move = True
                 continue
-            v = min(max(v, ymin), ymax)
-            x = t2x(t)
-            if x is None:
-                move = True
+            c = int(x)
+            if c == column:
+                if v < lo: lo = v
+                elif v > hi: hi = v
+                last = v
+                n += 1
                 continue
-            y = h * (1 - (v - ymin)/(ymax - ymin))
-            if move:
-                cr.move_to(x, y)
+            if column is not None:
+                draw_column(cx, first, lo, hi, last, n, move)
                 move = False
-            cr.line_to(x, y)
+            column, cx, first, lo, hi, last, n = c, x, v, v, v, v, 1
+        if column is not None:
+            draw_column(cx, first, lo, hi, last, n, move)
         cr.stroke()
 
     def draw_xticks(self, cr, w, h, xticks, now, t2x):
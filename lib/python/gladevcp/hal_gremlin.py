@@ -93,6 +93,9 @@ class HAL_Gremlin(gremlin.Gremlin, _EMC_ActionBase):
                     False, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
         'use_default_controls' : ( gobject.TYPE_BOOLEAN, 'Use Default Mouse Controls', 'Use Default Mouse Controls',
                     True, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
+        'background_load' : ( gobject.TYPE_BOOLEAN, 'Load in background',
+                    'Interpret the program preview in a background thread, showing it as it loads',
+                    False, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
         'mouse_btn_mode' : ( gobject.TYPE_INT, 'Mouse Button Mode',
                                                ('Mousebutton assignment, l means left, m middle, r right \n'
                                                 '0 = default: l-rotate, m-move, r-zoom \n'
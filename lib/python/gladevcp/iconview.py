@@ -33,6 +33,10 @@ import gobject
 import os
 import mimetypes
 import gio
+import dirscan
+
+# the directory listings are made in a thread
+gobject.threads_init()
 
 # constants
 _ASCENDING = 0
@@ -42,6 +46,12 @@ _FILEFIRST = 3
 COL_PATH = 0
 COL_PIXBUF = 1
 COL_IS_DIRECTORY = 2
+COL_TOOLTIP = 3
+# rows added to the store per idle call while a directory is shown
+FILL_BATCH = 200
+
+# listings of the directories seen last, shared by all IconFileSelections
+_listings = dirscan.Listings()
 
 # prepared for localization
 import gettext
@@ -71,6 +81,8 @@ class IconFileSelection(gtk.HBox):
                         "ngc,py", gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
            'sortorder' : (gobject.TYPE_INT, 'sorting order', '0 = ASCENDING, 1 = DESCENDING", 2 = FOLDERFIRST, 3 = FILEFIRST',
                         0, 3, 2, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
+           'preview' : (gobject.TYPE_BOOLEAN, 'file preview', 'Show size, date and the first lines of a file as its tooltip',
+                        False, gobject.PARAM_READWRITE | gobject.PARAM_CONSTRUCT),
                       }
     __gproperties = __gproperties__
 
@@ -91,6 +103,13 @@ class IconFileSelection(gtk.HBox):
         self.jump_to_dir = os.path.expanduser('/tmp')
         self.filetypes = ("ngc,py")
         self.sortorder = _FOLDERFIRST
+        self.preview = False
+        # icons by file extension
+        self._icons = {}
+        # counts the directories shown, to drop the results of old scans
+        self._serial = 0
+        # a scanner keeps only its newest request, so each widget has one
+        self._scanner = dirscan.Scanner()
         # This will hold the path we will return
         self.path = ""
         self.button_state = {}
@@ -193,6 +212,8 @@ class IconFileSelection(gtk.HBox):
 
         self.iconView.set_text_column(COL_PATH)
         self.iconView.set_pixbuf_column(COL_PIXBUF)
+        if self.preview:
+            self.iconView.set_tooltip_column(COL_TOOLTIP)
 
         sw.add(self.iconView)
         self.iconView.grab_focus()
@@ -248,6 +269,17 @@ class IconFileSelection(gtk.HBox):
         self.btn_select.emit("clicked")
 
     def _get_icon(self, name):
+        # guessing the type and loading the icon is slow, and the same for
+        # every file with the same extension
+        if name != "folder":
+            ext = os.path.splitext(name)[1]
+            icon = self._icons.get(ext)
+            if icon is None:
+                icon = self._icons[ext] = self._load_icon(name)
+            return icon
+        return self._load_icon(name)
+
+    def _load_icon(self, name):
         theme = gtk.icon_theme_get_default()
         if name == "folder":
             name = gtk.STOCK_DIRECTORY
@@ -265,77 +297,97 @@ class IconFileSelection(gtk.HBox):
         return theme.load_icon(name, self.icon_size, 0)
 
     def _create_store(self):
-        store = gtk.ListStore(str, gtk.gdk.Pixbuf, bool)
+        store = gtk.ListStore(str, gtk.gdk.Pixbuf, bool, str)
         return store
 
-    def _fill_store(self):
+    # The listing of a directory comes from the cache or from a scan in the
+    # scanner thread; the store is then filled a batch of rows at a time
+    # from the main loop, so a large directory does not freeze the GUI.
+    def _fill_store(self, rescan=False):
         if self.cur_dir == None:
             return
-        
+
+        self._serial += 1
+        serial = self._serial
+        path = self.cur_dir
+        if rescan:
+            _listings.forget(path)
         try:
-            self.store.clear()
-            number = 0
-            dirs = []
-            files = []
-            for fl in os.listdir(self.cur_dir):
-                # we don't want to add hidden files
-                if fl[0] == '.':
-                    continue
-                if os.path.isdir(os.path.join(self.cur_dir, fl)):
-                    try:
-                        os.listdir(os.path.join(self.cur_dir, fl))
-                        dirs.append(fl)
-                        number += 1
-                    except OSError:
-                        #print ("no rights for ", os.path.join(self.cur_dir, fl), " skip that dir")
-                        continue
-                else:
-                    try:
-                        name, ext = fl.rsplit(".", 1)
-                        if "*" in self.filetypes:
-                            files.append(fl)
-                            number += 1
-                        elif ext in self.filetypes:
-                            files.append(fl)
-                            number += 1
-                    except:
-                        pass
-    
-            if self.sortorder not in [_ASCENDING, _DESCENDING, _FOLDERFIRST, _FILEFIRST]:
-                self.sortorder = _FOLDERFIRST
-    
-            if self.sortorder == _ASCENDING or self.sortorder == _DESCENDING:
-                allobjects = dirs
-                allobjects.extend(files)
-                allobjects.sort(cmp = None, key = None, reverse = not self.sortorder == _ASCENDING)
-    
-                for obj in allobjects:
-                    if os.path.isdir(os.path.join(self.cur_dir, obj)):
-                        self.store.append([obj, self.dirIcon, True])
-                    else:
-                        icon = self._get_icon(obj)
-                        self.store.append([obj, icon, False])
-    
-            dirs.sort(cmp = None, key = None, reverse = False)
-            files.sort(cmp = None, key = None, reverse = False)
+            entries = _listings.get(path, self.preview)
+            if entries is not None:
+                self._show(serial, entries)
+                return
+            generation = _listings.generation(path)
+        except:
+            generation = None
+        self.store.clear()
+        self.check_button_state()
+        def done(path, entries):
+            gobject.idle_add(self._scanned, serial, path, generation, entries)
+        self._scanner.scan(path, self.preview, done)
+
+    def _scanned(self, serial, path, generation, entries):
+        if entries is not None:
+            _listings.put(path, generation, self.preview, entries)
+        if serial == self._serial:
+            self._show(serial, entries or [])
+        return False
+
+    def _show(self, serial, entries):
+        dirs = []
+        files = []
+        for fl, is_dir, info in entries:
+            if is_dir:
+                dirs.append((fl, True, info))
+            else:
+                try:
+                    name, ext = fl.rsplit(".", 1)
+                    if "*" in self.filetypes:
+                        files.append((fl, False, info))
+                    elif ext in self.filetypes:
+                        files.append((fl, False, info))
+                except:
+                    pass
+
+        if self.sortorder not in [_ASCENDING, _DESCENDING, _FOLDERFIRST, _FILEFIRST]:
+            self.sortorder = _FOLDERFIRST
+
+        if self.sortorder == _ASCENDING or self.sortorder == _DESCENDING:
+            rows = dirs + files
+            rows.sort(reverse = not self.sortorder == _ASCENDING)
+        else:
+            dirs.sort()
+            files.sort()
             if self.sortorder == _FOLDERFIRST:
-                for dir in dirs:
-                    self.store.append([dir, self.dirIcon, True])
-                for file in files:
-                    icon = self._get_icon(file)
-                    self.store.append([file, icon, False])
-            elif self.sortorder == _FILEFIRST:
-                for file in files:
-                    icon = self._get_icon(file)
-                    self.store.append([file, icon, False])
-                for dir in dirs:
-                    self.store.append([dir, self.dirIcon, True])
+                rows = dirs + files
+            else:
+                rows = files + dirs
+
+        self.store.clear()
+        self._fill_batch(serial, rows, 0)
+        if len(rows) > FILL_BATCH:
+            gobject.idle_add(self._fill_batch, serial, rows, FILL_BATCH)
+
+    def _fill_batch(self, serial, rows, start):
+        # another directory was chosen meanwhile
+        if serial != self._serial:
+            return False
+        try:
+            for name, is_dir, info in rows[start:start + FILL_BATCH]:
+                if is_dir:
+                    self.store.append([name, self.dirIcon, True, None])
+                else:
+                    self.store.append([name, self._get_icon(name), False,
+                        self.preview and dirscan.describe(info) or None])
         except:
             pass
-        finally:
-            # check the stat of the button and set them as they should be
-            self.check_button_state()
-        
+        start += FILL_BATCH
+        if start < len(rows):
+            return True
+        # check the stat of the button and set them as they should be
+        self.check_button_state()
+        return False
+
     def check_button_state(self):
         if self.model.get_iter_first() == None:
             state = False
@@ -471,6 +523,7 @@ class IconFileSelection(gtk.HBox):
     def set_icon_size(self, iconsize):
         try:
             self.icon_size = iconsize
+            self._icons = {}
             self.dirIcon = self._get_icon("folder")
             self._fill_store()
         except:
@@ -485,7 +538,7 @@ class IconFileSelection(gtk.HBox):
         self._fill_store()
 
     def refresh_filelist(self):
-        self._fill_store()
+        self._fill_store(rescan=True)
 
     def get_selected(self):
         return self.on_btn_select_clicked(self)
@@ -553,6 +606,9 @@ class IconFileSelection(gtk.HBox):
                     self.on_btn_jump_to()
                 if name == 'filetypes':
                     self.set_filetypes(value)
+                if name == 'preview':
+                    self.iconView.set_tooltip_column(value and COL_TOOLTIP or -1)
+                    self._fill_store()
                 if name == 'sortorder':
                     if value not in [_ASCENDING, _DESCENDING, _FOLDERFIRST, _FILEFIRST]:
                         raise AttributeError('unknown property of sortorder %s' % value)
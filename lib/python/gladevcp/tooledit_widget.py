@@ -15,6 +15,9 @@
 # GNU General Public License for more details.
 
 import sys, os, pango, linuxcnc, hashlib, glib
+import statusbroker
+import filewatch
+from rs274 import tooltable
 datadir = os.path.abspath(os.path.dirname(__file__))
 KEYWORDS = ['S','T', 'P', 'X', 'Y', 'Z', 'A', 'B', 'C', 'U', 'V', 'W', 'D', 'I', 'J', 'Q', ';']
 try:
@@ -50,8 +53,11 @@ class ToolEdit(gtk.VBox):
 
     def __init__(self,toolfile=None, *a, **kw):
         super(ToolEdit, self).__init__()
-        self.emcstat = linuxcnc.stat()
+        self.emcstat = statusbroker.status()
         self.hash_check = None 
+        self.watcher = filewatch.shared()
+        self.toolfile_generation = None
+        self.table = None
         self.lathe_display_type = True
         self.toolfile = toolfile
         self.num_of_col = 1
@@ -234,54 +240,34 @@ class ToolEdit(gtk.VBox):
 
         # Reload the tool file into display
     def reload(self,widget):
-        self.hash_code = self.md5sum(self.toolfile)
         # clear the current liststore, search the tool file, and add each tool
         if self.toolfile == None:return
+        # remember which version of the file is displayed
+        self.watcher.watch(self.toolfile)
+        self.watcher.check()
+        self.toolfile_generation = self.watcher.generation(self.toolfile)
         self.model.clear()
         #print "toolfile:",self.toolfile
         if not os.path.exists(self.toolfile):
             print _("Toolfile does not exist")
             return
-        logfile = open(self.toolfile, "r").readlines()
+        self.table = tooltable.load(self.toolfile)
+        for row, word in self.table.errors:
+            print _("Tooledit widget: bad word %s in tool file line %d") % (word, row+1)
         self.toolinfo = []
-        for rawline in logfile:
-            # strip the comments from line and add directly to array
-            # if index = -1 the delimiter ; is missing - clear comments
-            index = rawline.find(";")
-            comment =''
-            if not index == -1:
-                comment = (rawline[index+1:])
-                comment = comment.rstrip("\n")
-                line = rawline.rstrip(comment)
-            else:
-                line = rawline
-            array = [0,0,0,'0','0','0','0','0','0','0','0','0','0','0','0','0',comment]
-            toolinfo_flag = False
-            # search beginning of each word for keyword letters
-            # offset 0 is the checkbutton so ignore it
-            # if i = ';' that is the comment and we have already added it
+        toolinfo_row = self.table.tool(self.toolinfo_num)
+        for row in range(len(self.table)):
+            values = self.table.values(row)
+            # offset 0 is the checkbutton
             # offset 1 and 2 are integers the rest floats
-            # we strip leading and following spaces from the comments
-            for offset,i in enumerate(KEYWORDS):
-                if offset == 0 or i == ';': continue
-                for word in line.split():
-                    if word.startswith(';'): break
-                    if word.startswith(i):
-                        if offset == 1:
-                            if int(word.lstrip(i)) == self.toolinfo_num:
-                                toolinfo_flag = True
-                        if offset in(1,2):
-                            try:
-                                array[offset]= int(word.lstrip(i))
-                            except:
-                                print _("Tooledit widget int error")
-                        else:
-                            try:
-                                array[offset]= locale.format("%10.4f", float(word.lstrip(i)))
-                            except:
-                                print _("Tooledit_widget float error")
-                        break
-            if toolinfo_flag:
+            array = [0, values[0], values[1]]
+            for v in values[2:]:
+                if v is None:
+                    array.append('0')
+                else:
+                    array.append(locale.format("%10.4f", v))
+            array.append(self.table.comment(row))
+            if row == toolinfo_row:
                 self.toolinfo = array
             # add array line to liststore
             self.add(None,array)
@@ -289,29 +275,15 @@ class ToolEdit(gtk.VBox):
         # Note we have to save the float info with a decimal even if the locale uses a comma
     def save(self,widget):
         if self.toolfile == None:return
-        file = open(self.toolfile, "w")
-        #print self.toolfile
-        liststore = self.model
-        for row in liststore:
-            values = [ value for value in row ]
-            #print values
-            line = ""
-            for num,i in enumerate(values):
-                if num == 0: continue
-                elif num in (1,2): # tool# pocket#
-                    line = line + "%s%d "%(KEYWORDS[num], i)
-                elif num == 16: # comments
-                    test = i.strip()
-                    line = line + "%s%s "%(KEYWORDS[num],test)
-                else:
-                    test = i.lstrip() # localized floats
-                    line = line + "%s%s "%(KEYWORDS[num], locale.atof(test))
-
-            print >>file,line
-        # Theses lines are required to make sure the OS doesn't cache the data
-        # That would make linuxcnc and the widget to be out of synch leading to odd errors
-        file.flush()
-        os.fsync(file.fileno())
+        rows = []
+        for row in self.model:
+            values = [row[1], row[2]] + [locale.atof(v.lstrip()) for v in row[3:16]]
+            rows.append((values, row[16]))
+        # rows that were not edited keep their line in the file
+        if self.table is None:
+            self.table = tooltable.ToolTable()
+        self.table.replace(rows, tolerance=0.00005)
+        self.table.write(self.toolfile)
         # tell linuxcnc we changed the tool table entries
         try:
             linuxcnc.command().load_tool_table()
@@ -466,12 +438,12 @@ class ToolEdit(gtk.VBox):
         else:
             return hashlib.md5(f.read()).hexdigest()
 
-        # check the hash code on the toolfile against
-        # the saved hash code when last reloaded.
+        # check whether the toolfile changed since it was last reloaded.
+        # this is cheap: the shared file watcher gets told about changes
     def file_current_check(self):
-        m = self.hash_code
-        m1 = self.md5sum(self.toolfile)
-        if m1 and m != m1:
+        self.watcher.check()
+        if self.watcher.generation(self.toolfile) != self.toolfile_generation \
+                and os.path.exists(self.toolfile):
             self.toolfile_stale()
 
         # you could overload this to do something else.
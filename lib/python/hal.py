@@ -69,3 +69,63 @@ class component(_hal.component):
 
     def getpin(self, *a, **kw): return Pin(_hal.component.getpin(self, *a, **kw))
     def getparam(self, *a, **kw): return Param(_hal.component.getparam(self, *a, **kw))
+
+class PinWatch(object):
+    """\
+A group of pins (or params) that are read together by one call to
+read_items().  changed() returns the (pin, value) pairs whose value
+differs from the previous call, in the order the pins were added.
+
+Anything with an '_item' attribute (Pin, Param and their subclasses)
+can be watched."""
+    def __init__(self):
+        self.pins = []
+        self.items = []
+        self.values = ()
+
+    def __len__(self):
+        return len(self.pins)
+
+    def __contains__(self, pin):
+        return pin in self.pins
+
+    def add(self, pin, value=None):
+        """Watch pin; value is what the first changed() compares against"""
+        if pin in self.pins: return
+        self.pins.append(pin)
+        self.items.append(pin._item)
+        self.values = self.values + (value,)
+
+    def remove(self, pin):
+        if pin not in self.pins: return
+        i = self.pins.index(pin)
+        del self.pins[i]
+        del self.items[i]
+        self.values = self.values[:i] + self.values[i+1:]
+
+    def changed(self):
+        values = _hal.read_items(self.items)
+        old = self.values
+        if values == old:
+            return []
+        self.values = values
+        return [(p, v) for p, v, o in zip(self.pins, values, old) if v != o]
+
+_stream_formats = {'b': '?', 'f': 'f8', 's': 'i4', 'u': 'u4'}
+
+def stream_dtype(stream):
+    """The numpy dtype of the records of stream.read_many(), read_into()
+and write_many(): the elements as fields f0, f1, ... and the sample
+number as field 'sampleno'.
+
+    data = numpy.zeros(100, hal.stream_dtype(s))
+    n = s.read_into(data)
+    positions = data['f0'][:n]
+"""
+    import numpy
+    types = stream.element_types
+    names = ['f%d' % i for i in range(len(types))] + ['sampleno']
+    formats = [_stream_formats[t] for t in types] + ['u4']
+    return numpy.dtype({'names': names, 'formats': formats,
+        'offsets': [i * 8 for i in range(len(names))],
+        'itemsize': stream.record_size})
@@ -3,14 +3,22 @@
 
 import _hal, hal, gobject
 import linuxcnc
+import statusbroker
 import os
 import math
 
 # constants
 JOGJOINT  = 1
 JOGTELEOP = 0
+# GStat poll interval in ms, and the one used after IDLE_POLLS polls
+# without any change while the machine is idle
+POLL_INTERVAL = 100
+IDLE_POLL_INTERVAL = 100
+IDLE_POLLS = 10
 try:
     inifile = linuxcnc.ini(os.environ['INI_FILE_NAME'])
+    POLL_INTERVAL = int(inifile.find("DISPLAY", "STATUS_POLL_INTERVAL") or POLL_INTERVAL)
+    IDLE_POLL_INTERVAL = int(inifile.find("DISPLAY", "STATUS_IDLE_POLL_INTERVAL") or POLL_INTERVAL)
     trajcoordinates = inifile.find("TRAJ", "COORDINATES").lower().replace(" ","")
     jointcount = int(inifile.find("KINS","JOINTS"))
 except:
@@ -22,12 +30,20 @@ class GPin(gobject.GObject, hal.Pin):
 
     REGISTRY = []
     UPDATE = False
+    # Pins are polled in rate groups: poll interval in ms -> hal.PinWatch
+    # of the pins with a 'value-changed' handler that use that interval.
+    # Each group is read with one _hal.read_items() call on its own timer.
+    DEFAULT_RATE = 100
+    WATCHES = {}
+    TIMERS = set()
 
     def __init__(self, *a, **kw):
         gobject.GObject.__init__(self)
         hal.Pin.__init__(self, *a, **kw)
         self._item_wrap(self._item)
         self._prev = None
+        self._rate = self.DEFAULT_RATE
+        self._handlers = set()
         self.REGISTRY.append(self)
         self.update_start()
 
@@ -37,19 +53,96 @@ class GPin(gobject.GObject, hal.Pin):
             self.emit('value-changed')
         self._prev = tmp
 
+    # Only pins somebody listens to are polled
+    def _count(self, signal, handler_id):
+        if signal.split('::')[0].replace('_', '-') == 'value-changed':
+            self._handlers.add(handler_id)
+            self._watch()
+        return handler_id
+
+    def connect(self, signal, *args):
+        return self._count(signal, gobject.GObject.connect(self, signal, *args))
+
+    def connect_after(self, signal, *args):
+        return self._count(signal,
+            gobject.GObject.connect_after(self, signal, *args))
+
+    def connect_object(self, signal, *args):
+        return self._count(signal,
+            gobject.GObject.connect_object(self, signal, *args))
+
+    def disconnect(self, handler_id):
+        if handler_id in self._handlers:
+            self._handlers.discard(handler_id)
+            if not self._handlers:
+                self._unwatch()
+        return gobject.GObject.disconnect(self, handler_id)
+    handler_disconnect = disconnect
+
+    def _watch(self):
+        watch = self.WATCHES.get(self._rate)
+        if watch is None:
+            watch = self.WATCHES[self._rate] = hal.PinWatch()
+        if self in watch: return
+        # a pin that was watched before only reports changes made since
+        # it is watched again
+        if self._prev is not None:
+            self._prev = self.get()
+        watch.add(self, self._prev)
+        self._start_timer(self._rate)
+
+    def _unwatch(self):
+        watch = self.WATCHES.get(self._rate)
+        if watch is not None:
+            watch.remove(self)
+
+    def set_rate(self, rate):
+        """Poll this pin every 'rate' ms, e.g. 20 for a jog button or
+        1000 for a temperature"""
+        watched = bool(self._handlers)
+        if watched: self._unwatch()
+        self._rate = rate
+        if watched: self._watch()
+
+    def get_rate(self):
+        return self._rate
+
+    @classmethod
+    def _start_timer(self, rate):
+        if not GPin.UPDATE or rate in GPin.TIMERS:
+            return
+        GPin.TIMERS.add(rate)
+        gobject.timeout_add(rate, self.update_group, rate)
+
+    @classmethod
+    def update_group(self, rate):
+        watch = self.WATCHES.get(rate)
+        if not self.UPDATE or not watch:
+            GPin.TIMERS.discard(rate)
+            return False
+        try:
+            changed = watch.changed()
+        except:
+            changed = []
+            for p in watch.pins[:]:
+                try:
+                    p.get()
+                except:
+                    print "Error updating pin %s; Removing" % p
+                    watch.remove(p)
+                    if p in self.REGISTRY:
+                        self.REGISTRY.remove(p)
+        for p, value in changed:
+            p._prev = value
+            p.emit('value-changed')
+        return True
+
     @classmethod
     def update_all(self):
         if not self.UPDATE:
             return
-        kill = []
-        for p in self.REGISTRY:
-            try:
-                p.update()
-            except:
-                kill.append(p)
-                print "Error updating pin %s; Removing" % p
-        for p in kill:
-            self.REGISTRY.remove(p)
+        for rate in self.WATCHES.keys():
+            self.update_group(rate)
         return self.UPDATE
 
     @classmethod
@@ -57,7 +150,8 @@ class GPin(gobject.GObject, hal.Pin):
         if GPin.UPDATE:
             return
         GPin.UPDATE = True
-        gobject.timeout_add(timeout, self.update_all)
+        for rate in GPin.WATCHES:
+            self._start_timer(rate)
 
     @classmethod
     def update_stop(self, timeout=100):
@@ -197,15 +291,83 @@ class _GStat(gobject.GObject):
              , linuxcnc.INTERP_IDLE: 'interp-idle'
              }
 
+    # (key in self.old, signal, scale) for the fields that are emitted
+    # with their new value whenever it changes, in the order they are
+    # checked after the state, mode, interpreter, file and line
+    SIMPLE = (
+        ('paused', 'program-pause-changed', None),
+        ('block-delete', 'block-delete-changed', None),
+        ('optional-stop', 'optional-stop-changed', None),
+    )
+    SIMPLE_TOOL = (
+        ('tool-in-spindle', 'tool-in-spindle-changed', None),
+        ('tool-prep-number', 'tool-prep-changed', None),
+        ('motion-mode', 'motion-mode-changed', None),
+    )
+    SIMPLE_LIMITS = (
+        ('override-limits', 'override-limits-changed', None),
+        ('hard-limits-tripped', 'hard-limits-tripped', None),
+    )
+    SIMPLE_SPINDLE = (
+        ('spindle-speed', 'requested-spindle-speed-changed', None),
+        ('actual-spindle-speed', 'actual-spindle-speed-changed', None),
+        ('spindle-or', 'spindle-override-changed', 100),
+        ('feed-or', 'feed-override-changed', 100),
+        ('rapid-or', 'rapid-override-changed', 100),
+        ('max-velocity-or', 'max-velocity-override-changed', 60),
+        ('feed-hold', 'feed-hold-enabled-changed', None),
+        ('mist', 'mist-changed', None),
+        ('flood', 'flood-changed', None),
+        ('current-z-rotation', 'current-z-rotation', None),
+        ('current-tool-offset', 'current-tool-offset', None),
+    )
+    SIMPLE_GCODE = (
+        ('g-code', 'g-code-changed', None),
+        ('metric', 'metric-mode-changed', None),
+        ('g5x-index', 'user-system-changed', None),
+        ('itime', 'itime-mode', None),
+        ('fpm', 'fpm-mode', None),
+        ('fpr', 'fpr-mode', None),
+        ('css', 'css-mode', None),
+        ('rpm', 'rpm-mode', None),
+        ('radius', 'radius-mode', None),
+        ('diameter', 'diameter-mode', None),
+        ('m-code', 'm-code-changed', None),
+        ('tool-info', 'tool-info-changed', None),
+    )
+
+    # G code modes reported as flags, by stat.gcodes value
+    GCODE_FLAGS = { 930: 'itime', 940: 'fpm', 950: 'fpr', 960: 'css',
+                    970: 'rpm', 210: 'metric', 70: 'diameter', 80: 'radius' }
+
     def __init__(self, stat = None):
         gobject.GObject.__init__(self)
-        self.stat = stat or linuxcnc.stat()
+        self._status = stat or statusbroker.status()
+        # the periodic update reads _status, which can be the shared
+        # snapshot of the status broker; self.stat.poll() always asks
+        # linuxcnc, as a command is often followed by a poll that has to
+        # see its effect
+        if isinstance(self._status, linuxcnc.stat):
+            self.stat = self._status
+        else:
+            self.stat = statusbroker.CommandStat(self._status)
         self.cmd = linuxcnc.command()
         self.old = {}
         self.old['tool-prep-number'] = 0
+        # GStat() re-runs __init__ on the shared instance; keep the counts
+        # of the handlers that are already connected
+        if not hasattr(self, '_listeners'):
+            self._listeners = {}
+            self._handlers = {}
+        self._gcodes = self._mcodes = None
+        self._idle_polls = 0
+        # looked up once, not on every poll
+        self._tool_prep_pins = (hal.ref('iocontrol.0.tool-prepare'),
+                                hal.ref('iocontrol.0.tool-prep-number'))
+        self._spindle_speed_pin = hal.ref('spindle.0.speed-in')
         try:
-            self.stat.poll()
-            self.merge()
+            self._status.poll()
+            self.merge(True)
         except:
             pass
 
@@ -217,130 +379,199 @@ class _GStat(gobject.GObject):
         self.current_jog_distance_angular_text =''
         self.selected_joint = -1
         self._is_all_homed = False
-        self.set_timer()
+        if not getattr(self, '_polling', False):
+            self._polling = True
+            self.poll_interval = POLL_INTERVAL
+            self.idle_poll_interval = IDLE_POLL_INTERVAL
+            self._interval = self.poll_interval
+            self.set_timer()
 
     # we put this in a function so qtvcp
     # can overide it to fix a seg fault
     def set_timer(self):
-        gobject.timeout_add(100, self.update)
-
-    def merge(self):
-        self.old['state'] = self.stat.task_state
-        self.old['mode']  = self.stat.task_mode
-        self.old['interp']= self.stat.interp_state
+        gobject.timeout_add(self._interval, self.update)
+
+    def set_poll_interval(self, ms, idle_ms=None):
+        '''Poll linuxcnc status every 'ms' milliseconds.  If 'idle_ms' is
+        larger, poll at that rate instead while the machine is idle'''
+        self.poll_interval = ms
+        self.idle_poll_interval = idle_ms or ms
+
+    # ********** Subscriber counts ********************
+    # Values that take some work to get (HAL pins, the tool table, joint
+    # limits, formatted G and M codes, positions) are only fetched for
+    # signals somebody is connected to.
+    def _signal_key(self, signal):
+        return signal.split('::')[0].replace('_', '-')
+
+    def _count(self, signal, handler_id):
+        key = self._signal_key(signal)
+        self._listeners[key] = self._listeners.get(key, 0) + 1
+        self._handlers[handler_id] = key
+        return handler_id
+
+    def connect(self, signal, *args):
+        return self._count(signal, gobject.GObject.connect(self, signal, *args))
+
+    def connect_after(self, signal, *args):
+        return self._count(signal,
+            gobject.GObject.connect_after(self, signal, *args))
+
+    def connect_object(self, signal, *args):
+        return self._count(signal,
+            gobject.GObject.connect_object(self, signal, *args))
+
+    def disconnect(self, handler_id):
+        key = self._handlers.pop(handler_id, None)
+        if key is not None:
+            self._listeners[key] -= 1
+        return gobject.GObject.disconnect(self, handler_id)
+    handler_disconnect = disconnect
+
+    def has_listeners(self, *signals):
+        for s in signals:
+            if self._listeners.get(s):
+                return True
+        return False
+
+    def merge(self, forced=False):
+        stat = self._status
+        old = self.old
+        wants = self.has_listeners
+        old['state'] = stat.task_state
+        old['mode']  = stat.task_mode
+        old['interp']= stat.interp_state
         # Only update file if call level is 0, which
         # means we are not executing a subroutine/remap
         # This avoids emiting signals for bogus file names below
-        if self.stat.call_level == 0:
-            self.old['file']  = self.stat.file
-        self.old['paused']= self.stat.paused
-        self.old['line']  = self.stat.motion_line
-        self.old['homed'] = self.stat.homed
-        self.old['tool-in-spindle'] = self.stat.tool_in_spindle
-        try:
-            if hal.get_value('iocontrol.0.tool-prepare'):
-                self.old['tool-prep-number'] = hal.get_value('iocontrol.0.tool-prep-number')
-        except RuntimeError:
-             self.old['tool-prep-number'] = -1
-        self.old['motion-mode'] = self.stat.motion_mode
-        self.old['spindle-or'] = self.stat.spindle[0]['override']
-        self.old['feed-or'] = self.stat.feedrate
-        self.old['rapid-or'] = self.stat.rapidrate
-        self.old['max-velocity-or'] = self.stat.max_velocity
-        self.old['feed-hold']  = self.stat.feed_hold_enabled
-        self.old['g5x-index']  = self.stat.g5x_index
-        self.old['spindle-enabled']  = self.stat.spindle[0]['enabled']
-        self.old['spindle-direction']  = self.stat.spindle[0]['direction']
-        self.old['block-delete']= self.stat.block_delete
-        self.old['optional-stop']= self.stat.optional_stop
-        self.old['spindle-speed']= self.stat.spindle[0]['speed']
-        try:
-            self.old['actual-spindle-speed'] = hal.get_value('spindle.0.speed-in') * 60
-        except RuntimeError:
-             self.old['actual-spindle-speed'] = 0
-        self.old['flood']= self.stat.flood
-        self.old['mist']= self.stat.mist
-        self.old['current-z-rotation'] = self.stat.rotation_xy
-        self.old['current-tool-offset'] = self.stat.tool_offset
+        if stat.call_level == 0:
+            old['file']  = stat.file
+        old['paused']= stat.paused
+        old['line']  = stat.motion_line
+        old['homed'] = stat.homed
+        old['tool-in-spindle'] = stat.tool_in_spindle
+        if forced or wants('tool-prep-changed'):
+            try:
+                prepare, number = hal.get_values(self._tool_prep_pins)
+                if prepare:
+                    old['tool-prep-number'] = number
+            except RuntimeError:
+                 old['tool-prep-number'] = -1
+        old['motion-mode'] = stat.motion_mode
+        spindle = stat.spindle[0]
+        old['spindle-or'] = spindle['override']
+        old['feed-or'] = stat.feedrate
+        old['rapid-or'] = stat.rapidrate
+        old['max-velocity-or'] = stat.max_velocity
+        old['feed-hold']  = stat.feed_hold_enabled
+        old['g5x-index']  = stat.g5x_index
+        old['spindle-enabled']  = spindle['enabled']
+        old['spindle-direction']  = spindle['direction']
+        old['block-delete']= stat.block_delete
+        old['optional-stop']= stat.optional_stop
+        old['spindle-speed']= spindle['speed']
+        if forced or wants('actual-spindle-speed-changed'):
+            try:
+                old['actual-spindle-speed'] = self._spindle_speed_pin.get() * 60
+            except RuntimeError:
+                 old['actual-spindle-speed'] = 0
+        old['flood']= stat.flood
+        old['mist']= stat.mist
+        old['current-z-rotation'] = stat.rotation_xy
+        old['current-tool-offset'] = stat.tool_offset
 
         # override limits / hard limits
-        or_limit_list=[]
-        hard_limit = False
-        for j in range(0, self.stat.joints):
-            or_limit_list.append( self.stat.joint[j]['override_limits'])
-            min_hard_limit = self.stat.joint[j]['min_hard_limit']
-            max_hard_limit = self.stat.joint[j]['max_hard_limit']
-            hard_limit = hard_limit or min_hard_limit or max_hard_limit
-        self.old['override-limits'] = or_limit_list
-        self.old['hard-limits-tripped'] = bool(hard_limit)
-
-        # active G codes
-        active_gcodes = []
-        codes =''
-        for i in sorted(self.stat.gcodes[1:]):
+        if forced or wants('override-limits-changed', 'hard-limits-tripped'):
+            or_limit_list=[]
+            hard_limit = False
+            joint = stat.joint
+            for j in range(0, stat.joints):
+                or_limit_list.append(joint[j]['override_limits'])
+                min_hard_limit = joint[j]['min_hard_limit']
+                max_hard_limit = joint[j]['max_hard_limit']
+                hard_limit = hard_limit or min_hard_limit or max_hard_limit
+            old['override-limits'] = or_limit_list
+            old['hard-limits-tripped'] = bool(hard_limit)
+
+        # active G codes: the strings are only made when the codes change
+        # and somebody wants them
+        gcodes = stat.gcodes
+        if gcodes != self._gcodes:
+            self._gcodes = gcodes
+            active = set(gcodes[1:])
+            for code, key in self.GCODE_FLAGS.items():
+                old[key] = code in active
+            old.pop('g-code', None)
+        if 'g-code' not in old and (forced or wants('g-code-changed')):
+            old['g-code'] = self.format_gcodes(gcodes)
+
+        # active M codes
+        mcodes = stat.mcodes
+        if mcodes != self._mcodes:
+            self._mcodes = mcodes
+            old.pop('m-code', None)
+        if 'm-code' not in old and (forced or wants('m-code-changed')):
+            old['m-code'] = self.format_mcodes(mcodes)
+
+        if forced or wants('tool-info-changed'):
+            old['tool-info']  = stat.tool_table[0]
+
+    def format_gcodes(self, gcodes):
+        codes = ''
+        for i in sorted(gcodes[1:]):
             if i == -1: continue
             if i % 10 == 0:
-                    active_gcodes.append("G%d" % (i/10))
+                codes += "G%d " % (i/10)
             else:
-                    active_gcodes.append("G%d.%d" % (i/10, i%10))
-        for i in active_gcodes:
-            codes = codes +('%s '%i)
-        self.old['g-code'] = codes
-        # extract specific G code modes
-        itime = fpm = fpr = css = rpm = metric = False
-        radius = diameter = False
-        for num,i in enumerate(active_gcodes):
-            if i == 'G93': itime = True
-            elif i == 'G94': fpm = True
-            elif i == 'G95': fpr = True
-            elif i == 'G96': css = True
-            elif i == 'G97': rpm = True
-            elif i == 'G21': metric = True
-            elif i == 'G7': diameter  = True
-            elif i == 'G8': radius = True
-        self.old['itime'] = itime
-        self.old['fpm'] = fpm
-        self.old['fpr'] = fpr
-        self.old['css'] = css
-        self.old['rpm'] = rpm
-        self.old['metric'] = metric
-        self.old['radius'] = radius
-        self.old['diameter'] = diameter
+                codes += "G%d.%d " % (i/10, i%10)
+        return codes
 
-        # active M codes
-        active_mcodes = []
-        mcodes = ''
-        for i in sorted(self.stat.mcodes[1:]):
+    def format_mcodes(self, mcodes):
+        codes = ''
+        for i in sorted(mcodes[1:]):
             if i == -1: continue
-            active_mcodes.append("M%d"%i )
-        for i in active_mcodes:
-            mcodes = mcodes + ("%s "%i)
-            #active_mcodes.append("M%s "%i)
-        self.old['m-code'] = mcodes
-        self.old['tool-info']  = self.stat.tool_table[0]
+            codes += "M%d " % i
+        return codes
+
+    def emit_changes(self, old, fields):
+        new = self.old
+        changed = False
+        for key, signal, scale in fields:
+            if key not in new: continue
+            value = new[key]
+            if value != old.get(key):
+                changed = True
+                if scale is None:
+                    self.emit(signal, value)
+                else:
+                    self.emit(signal, value * scale)
+        return changed
 
     def update(self):
         try:
-            self.stat.poll()
+            self._status.poll()
         except:
             # some things might not need linuxcnc status but do need periodic
             self.emit('periodic')
             # Reschedule
             return True
+        if self.stat is not self._status:
+            self.stat.refreshed()
         old = dict(self.old)
         self.merge()
+        new = self.old
+        changed = False
 
         state_old = old.get('state', 0)
-        state_new = self.old['state']
+        state_new = new['state']
         if state_new != state_old:
+            changed = True
             if state_new > linuxcnc.STATE_ESTOP:
                 self.emit('state-estop-reset')
             else:
                 self.emit('state-estop')
             self.emit('state-off')
             self.emit('interp-idle')
-
-        if state_new != state_old:
             if state_old == linuxcnc.STATE_ON and state_new < linuxcnc.STATE_ON:
                 self.emit('state-off')
             self.emit(self.STATES[state_new])
@@ -349,35 +580,26 @@ class _GStat(gobject.GObject):
                 old['interp'] = 0
 
         mode_old = old.get('mode', 0)
-        mode_new = self.old['mode']
+        mode_new = new['mode']
         if mode_new != mode_old:
+            changed = True
             self.emit(self.MODES[mode_new])
 
         interp_old = old.get('interp', 0)
-        interp_new = self.old['interp']
+        interp_new = new['interp']
         if interp_new != interp_old:
+            changed = True
             if not interp_old or interp_old == linuxcnc.INTERP_IDLE:
                 self.emit('interp-run')
             self.emit(self.INTERP[interp_new])
-        # paused
-        paused_old = old.get('paused', None)
-        paused_new = self.old['paused']
-        if paused_new != paused_old:
-            self.emit('program-pause-changed',paused_new)
-        # block delete
-        block_delete_old = old.get('block-delete', None)
-        block_delete_new = self.old['block-delete']
-        if block_delete_new != block_delete_old:
-            self.emit('block-delete-changed',block_delete_new)
-        # optional_stop
-        optional_stop_old = old.get('optional-stop', None)
-        optional_stop_new = self.old['optional-stop']
-        if optional_stop_new != optional_stop_old:
-            self.emit('optional-stop-changed',optional_stop_new)
+
+        changed |= self.emit_changes(old, self.SIMPLE)
+
         # file changed
         file_old = old.get('file', None)
-        file_new = self.old['file']
+        file_new = new['file']
         if file_new != file_old:
+            changed = True
             # if interpreter is reading or waiting, the new file
             # is a remap procedure, with the following test we
             # partly avoid emitting a signal in that case, which would cause
@@ -387,7 +609,7 @@ class _GStat(gobject.GObject):
             # file name if call level != 0 in the merge() function above.
             # do avoid that a signal is emited in that case, causing
             # a reload of the preview and sourceview widgets
-            if self.stat.interp_state == linuxcnc.INTERP_IDLE:
+            if self._status.interp_state == linuxcnc.INTERP_IDLE:
                 self.emit('file-loaded', file_new)
 
         #ToDo : Find a way to avoid signal when the line changed due to
@@ -395,23 +617,12 @@ class _GStat(gobject.GObject):
         #       line in the code
         # current line
         line_old = old.get('line', None)
-        line_new = self.old['line']
+        line_new = new['line']
         if line_new != line_old:
+            changed = True
             self.emit('line-changed', line_new)
 
-        tool_old = old.get('tool-in-spindle', None)
-        tool_new = self.old['tool-in-spindle']
-        if tool_new != tool_old:
-            self.emit('tool-in-spindle-changed', tool_new)
-        tool_num_old = old.get('tool-prep-number')
-        tool_num_new = self.old['tool-prep-number']
-        if tool_num_new != tool_num_old:
-            self.emit('tool-prep-changed', tool_num_new)
-
-        motion_mode_old = old.get('motion-mode', None)
-        motion_mode_new = self.old['motion-mode']
-        if motion_mode_new != motion_mode_old:
-            self.emit('motion-mode-changed', motion_mode_new)
+        changed |= self.emit_changes(old, self.SIMPLE_TOOL)
 
         # if the homed status has changed
         # check number of homed joints against number of available joints
@@ -419,184 +630,88 @@ class _GStat(gobject.GObject):
         # else send the not-all-homed signal (with a string of unhomed joint numbers)
         # if a joint is homed send 'homed' (with a string of homed joint number)
         homed_joint_old = old.get('homed', None)
-        homed_joint_new = self.old['homed']
+        homed_joint_new = new['homed']
         if homed_joint_new != homed_joint_old:
+            changed = True
             homed_joints = 0
             unhomed_joints = ""
-            for joint in range(0, self.stat.joints):
-                if self.stat.homed[joint]:
+            for joint in range(0, self._status.joints):
+                if self._status.homed[joint]:
                     homed_joints += 1
                     self.emit('homed', joint)
                 else:
                     unhomed_joints += str(joint)
-            if homed_joints == self.stat.joints:
+            if homed_joints == self._status.joints:
                 self.emit('all-homed')
                 self._is_all_homed = True
             else:
                 self.emit('not-all-homed', unhomed_joints)
                 self._is_all_homed = False
-        # override limts
-        or_limits_old = old.get('override-limits', None)
-        or_limits_new = self.old['override-limits']
-        if or_limits_new != or_limits_old:
-            self.emit('override-limits-changed',or_limits_new)
-        # hard limits tripped
-        hard_limits_tripped_old = old.get('hard-limits-tripped', None)
-        hard_limits_tripped_new = self.old['hard-limits-tripped']
-        if hard_limits_tripped_new != hard_limits_tripped_old:
-            self.emit('hard-limits-tripped',hard_limits_tripped_new)
+
+        changed |= self.emit_changes(old, self.SIMPLE_LIMITS)
+
         # current velocity
-        self.emit('current-feed-rate',self.stat.current_vel * 60.0)
+        if self.has_listeners('current-feed-rate'):
+            self.emit('current-feed-rate',self._status.current_vel * 60.0)
         # X relative position
-        position = self.stat.actual_position[0]
-        g5x_offset = self.stat.g5x_offset[0]
-        tool_offset = self.stat.tool_offset[0]
-        g92_offset = self.stat.g92_offset[0]
-        self.emit('current-x-rel-position',position-g5x_offset-tool_offset-g92_offset)
+        if self.has_listeners('current-x-rel-position'):
+            position = self._status.actual_position[0]
+            g5x_offset = self._status.g5x_offset[0]
+            tool_offset = self._status.tool_offset[0]
+            g92_offset = self._status.g92_offset[0]
+            self.emit('current-x-rel-position',position-g5x_offset-tool_offset-g92_offset)
 
         # calculate position offsets (native units)
-        p,rel_p,dtg = self.get_position()
-        self.emit('current_position',p, rel_p, dtg, self.stat.joint_actual_position)
+        if self.has_listeners('current-position'):
+            p,rel_p,dtg = self.get_position()
+            self.emit('current_position',p, rel_p, dtg, self._status.joint_actual_position)
 
         # spindle control
         spindle_enabled_old = old.get('spindle-enabled', None)
-        spindle_enabled_new = self.old['spindle-enabled']
+        spindle_enabled_new = new['spindle-enabled']
         spindle_direction_old = old.get('spindle-direction', None)
-        spindle_direction_new = self.old['spindle-direction']
+        spindle_direction_new = new['spindle-direction']
         if spindle_enabled_new != spindle_enabled_old or spindle_direction_new != spindle_direction_old:
+            changed = True
             self.emit('spindle-control-changed', spindle_enabled_new, spindle_direction_new)
-        # requested spindle speed
-        spindle_spd_old = old.get('spindle-speed', None)
-        spindle_spd_new = self.old['spindle-speed']
-        if spindle_spd_new != spindle_spd_old:
-            self.emit('requested-spindle-speed-changed', spindle_spd_new)
-        # actual spindle speed
-        act_spindle_spd_old = old.get('actual-spindle-speed', None)
-        act_spindle_spd_new = self.old['actual-spindle-speed']
-        if act_spindle_spd_new != act_spindle_spd_old:
-            self.emit('actual-spindle-speed-changed', act_spindle_spd_new)
-        # spindle override
-        spindle_or_old = old.get('spindle-or', None)
-        spindle_or_new = self.old['spindle-or']
-        if spindle_or_new != spindle_or_old:
-            self.emit('spindle-override-changed',spindle_or_new * 100)
-        # feed override
-        feed_or_old = old.get('feed-or', None)
-        feed_or_new = self.old['feed-or']
-        if feed_or_new != feed_or_old:
-            self.emit('feed-override-changed',feed_or_new * 100)
-        # rapid override
-        rapid_or_old = old.get('rapid-or', None)
-        rapid_or_new = self.old['rapid-or']
-        if rapid_or_new != rapid_or_old:
-            self.emit('rapid-override-changed',rapid_or_new * 100)
-        # max-velocity override
-        max_velocity_or_old = old.get('max-velocity-or', None)
-        max_velocity_or_new = self.old['max-velocity-or']
-        if max_velocity_or_new != max_velocity_or_old:
-            self.emit('max-velocity-override-changed',max_velocity_or_new * 60)
-        # feed hold
-        feed_hold_old = old.get('feed-hold', None)
-        feed_hold_new = self.old['feed-hold']
-        if feed_hold_new != feed_hold_old:
-            self.emit('feed-hold-enabled-changed',feed_hold_new)
-        # mist
-        mist_old = old.get('mist', None)
-        mist_new = self.old['mist']
-        if mist_new != mist_old:
-            self.emit('mist-changed',mist_new)
-        # flood
-        flood_old = old.get('flood', None)
-        flood_new = self.old['flood']
-        if flood_new != flood_old:
-            self.emit('flood-changed',flood_new)
-        # rotation around Z
-        z_rot_old = old.get('current-z-rotation', None)
-        z_rot_new = self.old['current-z-rotation']
-        if z_rot_new != z_rot_old:
-            self.emit('current-z-rotation',z_rot_new)
-        # current tool offsets
-        tool_off_old = old.get('current-tool-offset', None)
-        tool_off_new = self.old['current-tool-offset']
-        if tool_off_new != tool_off_old:
-               self.emit('current-tool-offset',tool_off_new)
-        #############################
-        # Gcodes
-        #############################
-        # G codes
-        g_code_old = old.get('g-code', None)
-        g_code_new = self.old['g-code']
-        if g_code_new != g_code_old:
-            self.emit('g-code-changed',g_code_new)
-        # metric mode g21
-        metric_old = old.get('metric', None)
-        metric_new = self.old['metric']
-        if metric_new != metric_old:
-            self.emit('metric-mode-changed',metric_new)
-        # G5x (active user system)
-        g5x_index_old = old.get('g5x-index', None)
-        g5x_index_new = self.old['g5x-index']
-        if g5x_index_new != g5x_index_old:
-            self.emit('user-system-changed',g5x_index_new)
-        # inverse time mode g93
-        itime_old = old.get('itime', None)
-        itime_new = self.old['itime']
-        if itime_new != itime_old:
-            self.emit('itime-mode',itime_new)
-        # feed per minute mode g94
-        fpm_old = old.get('fpm', None)
-        fpm_new = self.old['fpm']
-        if fpm_new != fpm_old:
-            self.emit('fpm-mode',fpm_new)
-        # feed per revolution mode g95
-        fpr_old = old.get('fpr', None)
-        fpr_new = self.old['fpr']
-        if fpr_new != fpr_old:
-            self.emit('fpr-mode',fpr_new)
-        # css mode g96
-        css_old = old.get('css', None)
-        css_new = self.old['css']
-        if css_new != css_old:
-            self.emit('css-mode',css_new)
-        # rpm mode g97
-        rpm_old = old.get('rpm', None)
-        rpm_new = self.old['rpm']
-        if rpm_new != rpm_old:
-            self.emit('rpm-mode',rpm_new)
-        # radius mode g8
-        radius_old = old.get('radius', None)
-        radius_new = self.old['radius']
-        if radius_new != radius_old:
-            self.emit('radius-mode',radius_new)
-        # diameter mode g7
-        diam_old = old.get('diameter', None)
-        diam_new = self.old['diameter']
-        if diam_new != diam_old:
-            self.emit('diameter-mode',diam_new)
-        ####################################
-        # Mcodes
-        ####################################
-        # M codes
-        m_code_old = old.get('m-code', None)
-        m_code_new = self.old['m-code']
-        if m_code_new != m_code_old:
-            self.emit('m-code-changed',m_code_new)
-        tool_info_old = old.get('tool-info', None)
-        tool_info_new = self.old['tool-info']
-        if tool_info_new != tool_info_old:
-            self.emit('tool-info-changed', tool_info_new)
+
+        changed |= self.emit_changes(old, self.SIMPLE_SPINDLE)
+        changed |= self.emit_changes(old, self.SIMPLE_GCODE)
 
         # AND DONE... Return true to continue timeout
         self.emit('periodic')
-        return True
+        return self.adapt_interval(changed)
+
+    def adapt_interval(self, changed):
+        '''Pick the poll interval for the next update: the idle one once
+        nothing has changed for a while and the machine is not moving.
+        Returns whether the current timeout should continue.'''
+        busy = changed or not self._status.inpos or \
+                self._status.interp_state != linuxcnc.INTERP_IDLE
+        if busy:
+            self._idle_polls = 0
+            interval = self.poll_interval
+        else:
+            self._idle_polls += 1
+            if self._idle_polls < IDLE_POLLS:
+                interval = self._interval
+            else:
+                interval = self.idle_poll_interval
+        if interval == self._interval:
+            return True
+        self._interval = interval
+        self.set_timer()
+        return False
 
     def forced_update(self):
         try:
-            self.stat.poll()
+            self._status.poll()
         except:
             # Reschedule
             return True
-        self.merge()
+        if self.stat is not self._status:
+            self.stat.refreshed()
+        self.merge(True)
         state_new = self.old['state']
         if state_new > linuxcnc.STATE_ESTOP:
             self.emit('state-estop-reset')
@@ -695,37 +810,38 @@ class _GStat(gobject.GObject):
         self.emit('forced-update')
 
     # ********** Helper function ********************
-    def get_position(self):
-        p = self.stat.actual_position
-        mp = self.stat.position
-        dtg = self.stat.dtg
-
-        x = p[0] - self.stat.g5x_offset[0] - self.stat.tool_offset[0]
-        y = p[1] - self.stat.g5x_offset[1] - self.stat.tool_offset[1]
-        z = p[2] - self.stat.g5x_offset[2] - self.stat.tool_offset[2]
-        a = p[3] - self.stat.g5x_offset[3] - self.stat.tool_offset[3]
-        b = p[4] - self.stat.g5x_offset[4] - self.stat.tool_offset[4]
-        c = p[5] - self.stat.g5x_offset[5] - self.stat.tool_offset[5]
-        u = p[6] - self.stat.g5x_offset[6] - self.stat.tool_offset[6]
-        v = p[7] - self.stat.g5x_offset[7] - self.stat.tool_offset[7]
-        w = p[8] - self.stat.g5x_offset[8] - self.stat.tool_offset[8]
-
-        if self.stat.rotation_xy != 0:
-            t = math.radians(-self.stat.rotation_xy)
+    def get_position(self, stat=None):
+        stat = stat or self._status
+        p = stat.actual_position
+        mp = stat.position
+        dtg = stat.dtg
+
+        x = p[0] - stat.g5x_offset[0] - stat.tool_offset[0]
+        y = p[1] - stat.g5x_offset[1] - stat.tool_offset[1]
+        z = p[2] - stat.g5x_offset[2] - stat.tool_offset[2]
+        a = p[3] - stat.g5x_offset[3] - stat.tool_offset[3]
+        b = p[4] - stat.g5x_offset[4] - stat.tool_offset[4]
+        c = p[5] - stat.g5x_offset[5] - stat.tool_offset[5]
+        u = p[6] - stat.g5x_offset[6] - stat.tool_offset[6]
+        v = p[7] - stat.g5x_offset[7] - stat.tool_offset[7]
+        w = p[8] - stat.g5x_offset[8] - stat.tool_offset[8]
+
+        if stat.rotation_xy != 0:
+            t = math.radians(-stat.rotation_xy)
             xr = x * math.cos(t) - y * math.sin(t)
             yr = x * math.sin(t) + y * math.cos(t)
             x = xr
             y = yr
 
-        x -= self.stat.g92_offset[0]
-        y -= self.stat.g92_offset[1]
-        z -= self.stat.g92_offset[2]
-        a -= self.stat.g92_offset[3]
-        b -= self.stat.g92_offset[4]
-        c -= self.stat.g92_offset[5]
-        u -= self.stat.g92_offset[6]
-        v -= self.stat.g92_offset[7]
-        w -= self.stat.g92_offset[8]
+        x -= stat.g92_offset[0]
+        y -= stat.g92_offset[1]
+        z -= stat.g92_offset[2]
+        a -= stat.g92_offset[3]
+        b -= stat.g92_offset[4]
+        c -= stat.g92_offset[5]
+        u -= stat.g92_offset[6]
+        v -= stat.g92_offset[7]
+        w -= stat.g92_offset[8]
 
         relp = [x, y, z, a, b, c, u, v, w]
         return p,relp,dtg
@@ -331,6 +331,9 @@ class pyvcp_dial(Canvas):
             stopy=self.mid+length*self.r*math.sin((n+i)*self.d_alfa)
             self.create_line(startx,starty,stopx,stopy,width=width)
 
+    # writes its pin on every update, so vcpparse updates it every cycle
+    update_always = True
+
     def update(self,pycomp):
         self.pycomp[self.halpin] = self.out
 
@@ -573,6 +576,9 @@ class pyvcp_jogwheel(Canvas):
             stopy=self.mid+1.15*self.r*math.sin(n*self.d_alfa)
             self.create_line([startx,starty,stopx,stopy])
 
+    # writes its pin on every update, so vcpparse updates it every cycle
+    update_always = True
+
     def update(self,pycomp):
         # this is stupid, but required for updating pin
         # when first connected to a signal
@@ -620,6 +626,9 @@ class pyvcp_radiobutton(Frame):
         self.selected = initval
         pycomp[self.halpins[initval]]=1 
 
+    # writes its pins when the selection changes, so vcpparse updates it every cycle
+    update_always = True
+
 ## ArcEye - FIXED - only update the pins if changed  ##
     def update(self,pycomp):
         index=int(math.log(self.v.get(),2))
@@ -726,6 +735,9 @@ class pyvcp_multilabel(Label):
         pycomp[self.halpins[val]] = 1
         self.pin_index = val
 
+    # writes its pins, so vcpparse updates it every cycle
+    update_always = True
+
     def update(self,pycomp):
         if self.disable_pin: 
             is_disabled = pycomp[self.halpin_disable]     
@@ -941,6 +953,9 @@ class pyvcp_spinbox(Spinbox):
     def command(self):
         self.value = self.v.get()
 
+    # writes its pin on every update, so vcpparse updates it every cycle
+    update_always = True
+
     def update(self,pycomp):
         pycomp[self.halpin] = self.value
         if self.value != self.oldvalue:
@@ -1072,6 +1087,9 @@ class pyvcp_timer(Label):
         self.v.set( "00:00:00")
 
 
+    # shows the time, not just pin values, so vcpparse updates it every cycle
+    update_always = True
+
     def update(self,pycomp):    
         resetvalue = pycomp[self.halpins[0]]
         runvalue = pycomp[self.halpins[1]]
@@ -1372,6 +1390,9 @@ class pyvcp_checkbutton(Checkbutton):
         self.v.set(self.value)
         self.reset = 0
 		
+    # changepin handling depends on its own state, so vcpparse updates it every cycle
+    update_always = True
+
     def update(self,pycomp):
         # prevent race condition if connected to permanently on pin
 	if pycomp[self.changepin] and not(self.reset):
@@ -1505,6 +1526,9 @@ class pyvcp_scale(Scale):
             self.init=self.value
             pycomp[self.halparam] = self.value
 
+    # writes its pins on every update, so vcpparse updates it every cycle
+    update_always = True
+
     def update(self,pycomp):
         pycomp[self.halpin+"-f"]=self.get()
         pycomp[self.halpin+"-i"]=int(self.get())
@@ -19,12 +19,20 @@ class QPin(hal.Pin, QObject):
 
     REGISTRY = []
     UPDATE = False
+    # Pins are polled in rate groups: poll interval in ms -> hal.PinWatch
+    # of the pins with a value_changed connection that use that interval.
+    # Each group is read with one _hal.read_items() call on its own timer.
+    DEFAULT_RATE = 100
+    WATCHES = {}
+    TIMERS = {}
 
     def __init__(self, *a, **kw):
         super(QPin, self).__init__(*a, **kw)
         QObject.__init__(self, None)
         self._item_wrap(self._item)
         self._prev = None
+        self._rate = self.DEFAULT_RATE
+        self._connections = 0
         self.REGISTRY.append(self)
         self.update_start()
 
@@ -34,20 +42,87 @@ class QPin(hal.Pin, QObject):
             self.value_changed.emit(tmp)
         self._prev = tmp
 
+    # Only pins somebody listens to are polled
+    def connectNotify(self, signal):
+        if bytes(signal.name()) == b'value_changed':
+            self._connections += 1
+            self._watch()
+
+    def disconnectNotify(self, signal):
+        if bytes(signal.name()) == b'value_changed' and self._connections:
+            self._connections -= 1
+            if not self._connections:
+                self._unwatch()
+
+    def _watch(self):
+        watch = self.WATCHES.get(self._rate)
+        if watch is None:
+            watch = self.WATCHES[self._rate] = hal.PinWatch()
+        if self in watch: return
+        # a pin that was watched before only reports changes made since
+        # it is watched again
+        if self._prev is not None:
+            self._prev = self.get()
+        watch.add(self, self._prev)
+        self._start_timer(self._rate)
+
+    def _unwatch(self):
+        watch = self.WATCHES.get(self._rate)
+        if watch is not None:
+            watch.remove(self)
+
+    def set_rate(self, rate):
+        """Poll this pin every 'rate' ms, e.g. 20 for a jog button or
+        1000 for a temperature"""
+        watched = self._connections > 0
+        if watched: self._unwatch()
+        self._rate = rate
+        if watched: self._watch()
+
+    def get_rate(self):
+        return self._rate
+
+    @classmethod
+    def _start_timer(self, rate):
+        if not QPin.UPDATE:
+            return
+        timer = QPin.TIMERS.get(rate)
+        if timer is None:
+            timer = QPin.TIMERS[rate] = QTimer()
+            timer.timeout.connect(lambda: self.update_group(rate))
+        if not timer.isActive():
+            timer.start(rate)
+
+    @classmethod
+    def update_group(self, rate):
+        watch = self.WATCHES.get(rate)
+        if not self.UPDATE or not watch:
+            timer = self.TIMERS.get(rate)
+            if timer is not None: timer.stop()
+            return
+        try:
+            changed = watch.changed()
+        except Exception:
+            changed = []
+            for p in watch.pins[:]:
+                try:
+                    p.get()
+                except Exception as e:
+                    log.error("Error updating pin {}; Removing".format(p))
+                    log.exception(e)
+                    watch.remove(p)
+                    if p in self.REGISTRY:
+                        self.REGISTRY.remove(p)
+        for p, value in changed:
+            p._prev = value
+            p.value_changed.emit(value)
+
     @classmethod
     def update_all(self):
         if not self.UPDATE:
             return
-        kill = []
-        for p in self.REGISTRY:
-            try:
-                p.update()
-            except Exception as e:
-                kill.append(p)
-                log.error("Error updating pin {}; Removing".format(p))
-                log.exception(e)
-        for p in kill:
-            self.REGISTRY.remove(p)
+        for rate in self.WATCHES.keys():
+            self.update_group(rate)
         return self.UPDATE
 
     @classmethod
@@ -55,9 +130,8 @@ class QPin(hal.Pin, QObject):
         if QPin.UPDATE:
             return
         QPin.UPDATE = True
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_all)
-        self.timer.start(100)
+        for rate in QPin.WATCHES:
+            self._start_timer(rate)
 
     @classmethod
     def update_stop(self, timeout=100):
@@ -111,7 +185,7 @@ class _GStat(GladeVcpStat):
     # seg fault without it
     def set_timer(self):
         gobject.threads_init()
-        gobject.timeout_add(100, self.update)
+        gobject.timeout_add(self._interval, self.update)
 
 # used so all qtvcp widgets use the same instance of _gstat
 # this keeps them all in synch
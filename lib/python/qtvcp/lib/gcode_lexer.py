@@ -0,0 +1,93 @@
+#!/usr/bin/python
+#    G code syntax styles for the qtvcp gcode editor
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+# styles() gives the style of every byte of a run of whole lines at once:
+# one translate() for the characters outside comments, one regex pass for
+# the comments, and a per-character loop only for the few lines with a
+# (MSG,...) or (DEBUG,...) comment.  Nothing carries over from one line
+# to the next, so a line can be styled knowing nothing but its text.
+
+import re
+
+DEFAULT = 0
+COMMENT = 1
+KEY = 2
+ASSIGNMENT = 3
+VALUE = 4
+
+def _make_table():
+    table = []
+    for i in range(256):
+        c = chr(i)
+        if c in '()':
+            style = COMMENT
+        elif c in '%<>#=':
+            style = ASSIGNMENT
+        elif c in '[]':
+            style = VALUE
+        elif c.isalpha():
+            style = KEY
+        else:
+            style = DEFAULT
+        table.append(chr(style))
+    return ''.join(table)
+
+_TABLE = _make_table()
+# from an opening parenthesis to the closing one, or to the end of the
+# line including the line end
+_COMMENT = re.compile(r'\([^)\r\n]*(?:\)|\r\n?|\n)?')
+_MESSAGE = re.compile(r'msg|debug', re.I)
+_LINE_END = re.compile(r'[\r\n]')
+_MESSAGE_CHARS = 'msgdebuMSGDEBU,'
+
+def styles(text):
+    """A bytearray with the style of every byte of text, which should be
+    whole lines"""
+    text = bytes(text)
+    out = bytearray(text.translate(_TABLE))
+    comment = chr(COMMENT)
+    for m in _COMMENT.finditer(text):
+        start, end = m.span()
+        out[start:end] = comment * (end - start)
+    # lines that mention msg or debug anywhere
+    end = 0
+    for m in _MESSAGE.finditer(text):
+        if m.start() < end: continue
+        # the line starts after the last line end since the previous one
+        start = max(text.rfind('\n', end, m.start()),
+            text.rfind('\r', end, m.start()), end - 1) + 1
+        line_end = _LINE_END.search(text, m.end())
+        end = line_end and line_end.start() or len(text)
+        _style_message(text, out, start, end)
+    return out
+
+def _style_message(text, out, start, end):
+    # inside comments, the letters of 'msg' and 'debug' are highlighted
+    # up to and including the first comma
+    for m in _COMMENT.finditer(text, start, end):
+        for i in xrange(m.start() + 1, m.end()):
+            c = text[i]
+            if c == ')':
+                break
+            if c in _MESSAGE_CHARS:
+                out[i] = ASSIGNMENT
+                if c == ',':
+                    return
+
+_RUN = re.compile(r'(.)\1*', re.S)
+
+def runs(styles):
+    """(length, style) of each run of equal styles"""
+    styles = bytes(styles)
+    return [(m.end() - m.start(), ord(m.group(1)))
+        for m in _RUN.finditer(styles)]
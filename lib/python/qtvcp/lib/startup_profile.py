@@ -0,0 +1,49 @@
+#!/usr/bin/python
+#    Start up timings for qtvcp
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+# qtvcp marks the end of each start up phase with phase() and, with
+# --profile-startup, times the HAL set up of every widget with widget();
+# report() prints both, the slowest widgets first.
+
+import sys
+import time
+
+class StartupProfile:
+    def __init__(self, start=None):
+        self.start = self.last = start or time.time()
+        self.phases = []    # (name, seconds)
+        self.widgets = []   # (seconds, name, class name)
+
+    def phase(self, name):
+        """The phase 'name' ended now; it started when the last one ended"""
+        now = time.time()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def widget(self, widget, seconds):
+        self.widgets.append((seconds, str(widget.objectName()),
+            widget.__class__.__name__))
+
+    def report(self, out=None, count=20):
+        out = out or sys.stderr
+        print >> out, 'qtvcp start up profile'
+        for name, seconds in self.phases:
+            print >> out, '  {:<32} {:8.3f} s'.format(name, seconds)
+        print >> out, '  {:<32} {:8.3f} s'.format('total', self.last - self.start)
+        if self.widgets:
+            total = sum(w[0] for w in self.widgets)
+            print >> out, 'widget HAL set up: {} widgets, {:.3f} s, slowest:'.format(
+                len(self.widgets), total)
+            for seconds, name, cls in sorted(self.widgets, reverse=True)[:count]:
+                print >> out, '  {:<32} {:<24} {:8.3f} s'.format(name, cls, seconds)
+        out.flush()
@@ -0,0 +1,160 @@
+#!/usr/bin/python
+#    Compiled .ui files for qtvcp
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+# uic.loadUi parses the designer XML and builds every widget through
+# reflection each time a screen starts.  load() compiles the .ui file to
+# python with uic.compileUi the first time, keeps the module in a cache
+# directory and afterwards just imports it and runs its setupUi.
+#
+# An entry is keyed by a hash of the .ui file, its folder and the PyQt and
+# Qt versions, so an edited screen or an upgraded PyQt compiles a new one;
+# the older entries of the same screen are deleted then.
+#
+# loadUi finds relative <pixmap> and <iconset> files from the folder of the
+# .ui file, but compileUi writes the paths as they are and the compiled
+# module would look for them from the working directory.  They are made
+# absolute before compiling.
+
+import os
+import imp
+import hashlib
+import tempfile
+from xml.etree import ElementTree
+from cStringIO import StringIO
+from PyQt5 import QtCore, uic
+
+from qtvcp import logger
+LOG = logger.getLogger(__name__)
+
+# Bump when the way modules are compiled or used changes
+FORMAT = 2
+
+# elements that hold a file name
+RESOURCE_TAGS = ('pixmap', 'iconset', 'normaloff', 'normalon', 'disabledoff',
+    'disabledon', 'activeoff', 'activeon', 'selectedoff', 'selectedon')
+
+def absolute_resources(filename):
+    """The .ui file with relative resource file names made absolute,
+    as a file object for uic.compileUi"""
+    base = os.path.dirname(os.path.abspath(filename))
+    tree = ElementTree.parse(filename)
+    for tag in RESOURCE_TAGS:
+        for e in tree.iter(tag):
+            path = (e.text or '').strip()
+            # ':/...' names a file in a Qt resource
+            if path and not path.startswith(':') and not os.path.isabs(path):
+                e.text = os.path.normpath(os.path.join(base, path))
+    out = StringIO()
+    tree.write(out, encoding='utf-8')
+    out.seek(0)
+    return out
+
+def default_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "linuxcnc", "qtvcp")
+
+def key(filename):
+    h = hashlib.sha1()
+    h.update(repr((FORMAT, QtCore.PYQT_VERSION_STR, QtCore.QT_VERSION_STR,
+        os.path.dirname(os.path.abspath(filename)))))
+    f = open(filename, 'rb')
+    try:
+        h.update(f.read())
+    finally:
+        f.close()
+    return h.hexdigest()
+
+class UiCache:
+    def __init__(self, directory=None):
+        self.directory = os.path.expanduser(directory or default_directory())
+
+    def path(self, filename):
+        basename = os.path.splitext(os.path.basename(filename))[0]
+        return os.path.join(self.directory,
+            'ui_{}_{}.py'.format(basename, key(filename)[:16]))
+
+    def module(self, filename):
+        """The compiled module of filename, compiled now if there is
+        none in the cache.  Raises an exception if it can not be made."""
+        path = self.path(filename)
+        if not os.path.exists(path):
+            self.compile(filename, path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        return imp.load_source(name, path)
+
+    def compile(self, filename, path):
+        LOG.debug('Compiling {} to yellow<{}>'.format(filename, path))
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        fd, temp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            out = os.fdopen(fd, 'w')
+            try:
+                uic.compileUi(absolute_resources(filename), out)
+            finally:
+                out.close()
+            os.rename(temp, path)
+        except:
+            if os.path.exists(temp):
+                os.unlink(temp)
+            raise
+        self.forget_others(path)
+
+    def forget_others(self, path):
+        # older compilations of the same .ui file: same name but the key
+        keep = os.path.splitext(os.path.basename(path))[0]
+        prefix = keep[:-16]
+        for name in os.listdir(self.directory):
+            stem = name.split('.')[0]
+            if stem.startswith(prefix) and len(stem) == len(keep) and stem != keep:
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+def form_class(module):
+    """The Ui_ class of a compiled module"""
+    for name in dir(module):
+        form = getattr(module, name)
+        if name.startswith('Ui_') and hasattr(form, 'setupUi'):
+            return form
+    raise ValueError('{} has no Ui_ class'.format(module.__name__))
+
+def setup(module, window, form=None):
+    """Build the widgets of a compiled module into window, as
+    uic.loadUi(filename, window) would"""
+    ui = (form or form_class(module))()
+    ui.setupUi(window)
+    # loadUi makes every named object an attribute of the window
+    for name, value in vars(ui).items():
+        setattr(window, name, value)
+    return window
+
+def load(filename, window, directory=None):
+    """Build the widgets of the .ui file into window from its compiled
+    module, or with uic.loadUi if that can not be made or imported.
+    Returns True if the compiled module was used.
+
+    Only a module that could not be made falls back to uic.loadUi, as
+    window is still empty then.  Errors of its setupUi, such as the
+    AttributeError of a signal connected to a handler function that does
+    not exist, are passed on as uic.loadUi would."""
+    try:
+        module = UiCache(directory).module(filename)
+        form = form_class(module)
+    except Exception as e:
+        LOG.warning('Could not use a compiled {}, loading it instead: {}'.format(filename, e))
+        uic.loadUi(filename, window)
+        return False
+    setup(module, window, form)
+    return True
@@ -0,0 +1,406 @@
+#!/usr/bin/python
+#    Camera capture and frame processing threads for the qtvcp camview
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+
+# Frames go through two threads:
+#
+#   VideoStream     reads frames from a source at no more than 'fps' frames
+#                   per second into a FrameBuffers
+#   FrameProcessor  takes the newest frame, zooms it, scales it to the
+#                   widget size, converts it to RGB, optionally looks for
+#                   edges and draws the overlay, into a second FrameBuffers
+#
+# A FrameBuffers hands over only the newest frame: a frame that is not
+# taken before the next one is ready is dropped, so a slow consumer gets
+# fewer frames, never late ones.  Its arrays are allocated once, the
+# source reads straight into them and the GUI thread paints straight from
+# them, so no frame is copied on its way to the screen.
+#
+# Sources are a camera, a video file or a synthetic picture, which is
+# enough to try the whole pipeline without a camera.  opencv is used when
+# it is installed; without it only the synthetic source works, and zooming
+# and scaling fall back to numpy.
+
+import math
+import time
+import threading
+import numpy
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+class FrameBuffers:
+    """Three preallocated frames shared by one writer and one reader: one
+    is being written, one holds the newest finished frame and one is held
+    by the reader"""
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.buffers = []
+        self.shape = None
+        self.writing = 0
+        self.latest = None
+        self.reading = None
+        self.published = 0
+        self.dropped = 0
+        self.closed = False
+
+    def allocate(self, shape):
+        with self.cond:
+            self.shape = tuple(shape)
+            # a reader may still hold a frame of the old size; it keeps
+            # its own reference to it
+            self.buffers = [numpy.zeros(shape, numpy.uint8) for i in range(3)]
+            self.writing = 0
+            self.latest = None
+            self.reading = None
+
+    def write_buffer(self):
+        """The array to fill with the next frame, None before allocate()"""
+        if not self.buffers:
+            return None
+        return self.buffers[self.writing]
+
+    def publish(self):
+        """Make the write buffer the newest frame"""
+        with self.cond:
+            if self.latest is not None:
+                self.dropped += 1
+            self.latest = self.writing
+            self.published += 1
+            for i in range(3):
+                if i != self.latest and i != self.reading:
+                    self.writing = i
+                    break
+            self.cond.notify_all()
+
+    def take(self, timeout=None):
+        """The newest frame not taken yet, or None if there is none within
+        timeout seconds.  The array is not written to until the next take()."""
+        with self.cond:
+            if self.latest is None and timeout and not self.closed:
+                self.cond.wait(timeout)
+            if self.latest is None:
+                return None
+            self.reading = self.latest
+            self.latest = None
+            return self.buffers[self.reading]
+
+    def close(self):
+        """Wake up a waiting take()"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+class CaptureSource:
+    """A camera (given by number) or a video file, read with opencv.  A
+    file starts again at its end."""
+    def __init__(self, src=0):
+        self.capture = cv2.VideoCapture(src)
+        if not self.capture.isOpened():
+            raise IOError("cannot open video source %r" % (src,))
+        # a camera delivers frames at its own pace whether they are read or
+        # not; a file is read as fast as we ask
+        self.live = isinstance(src, int)
+
+    def grab(self):
+        return self.capture.grab()
+
+    def retrieve(self, out=None):
+        ok, frame = self.capture.retrieve(out)
+        if not ok: return None
+        return frame
+
+    def read(self, out=None):
+        ok, frame = self.capture.read(out)
+        if not ok and not self.live:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read(out)
+        if not ok: return None
+        return frame
+
+    def release(self):
+        self.capture.release()
+
+class SyntheticSource:
+    """Stands in for a camera: a light background with the dark corner of a
+    part that slowly circles around the middle of the picture, in BGR"""
+    live = False
+
+    def __init__(self, width=640, height=480):
+        self.width = width
+        self.height = height
+        self.start = time.time()
+
+    def corner(self, t=None):
+        """Where the corner of the part is at time t"""
+        if t is None: t = time.time()
+        a = (t - self.start) * .5
+        return (int(self.width * (.5 + .1 * math.cos(a))),
+                int(self.height * (.5 + .1 * math.sin(a))))
+
+    def read(self, out=None):
+        if out is None or out.shape != (self.height, self.width, 3):
+            out = numpy.empty((self.height, self.width, 3), numpy.uint8)
+        x, y = self.corner()
+        out[:] = 200
+        out[y:, x:] = 60
+        return out
+
+    def release(self):
+        pass
+
+def open_source(spec):
+    """The source for a camview 'video source' string: a camera number, the
+    path of a video file, or 'synthetic' (optionally 'synthetic:WxH')"""
+    spec = str(spec).strip()
+    if spec.startswith('synthetic'):
+        size = spec.partition(':')[2]
+        if size:
+            width, height = [int(v) for v in size.lower().split('x')]
+            return SyntheticSource(width, height)
+        return SyntheticSource()
+    if cv2 is None:
+        raise IOError("opencv is needed for video source %r" % spec)
+    if not spec or spec.isdigit():
+        return CaptureSource(int(spec or 0))
+    return CaptureSource(spec)
+
+class VideoStream:
+    """Reads frames from source into self.frames, at most fps a second"""
+    def __init__(self, source, fps=15):
+        self.source = source
+        self.fps = fps
+        self.frames = FrameBuffers()
+        self.stopped = False
+        self.failures = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._update, name="camview capture")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def _update(self):
+        source = self.source
+        due = time.time()
+        try:
+            while not self.stopped:
+                period = 1. / max(self.fps, 1)
+                now = time.time()
+                if source.live:
+                    # keep the driver's queue of frames empty, so that the
+                    # frame retrieved when one is due is a current one.
+                    # grab() waits for the camera, this does not spin.
+                    if not source.grab():
+                        self._failed(period)
+                        continue
+                    if now < due:
+                        continue
+                    frame = source.retrieve(self.frames.write_buffer())
+                else:
+                    if now < due:
+                        time.sleep(due - now)
+                        now = due
+                    frame = source.read(self.frames.write_buffer())
+                if frame is None:
+                    self._failed(period)
+                    continue
+                # after missed periods start counting again from now
+                due = max(due + period, now)
+                buf = self.frames.write_buffer()
+                if frame is not buf:
+                    # the first frame, or the frame size changed
+                    if buf is None or buf.shape != frame.shape:
+                        self.frames.allocate(frame.shape)
+                    self.frames.write_buffer()[:] = frame
+                self.frames.publish()
+        finally:
+            source.release()
+            self.frames.close()
+
+    def _failed(self, period):
+        self.failures += 1
+        time.sleep(period)
+
+    def stop(self, wait=1.):
+        self.stopped = True
+        if self.thread is not None and wait:
+            self.thread.join(wait)
+
+class Overlay:
+    """What FrameProcessor draws, set from the GUI thread.  Call changed()
+    after setting attributes so that a still picture is drawn again."""
+    def __init__(self):
+        self.size = (200, 200)      # width, height of the output
+        self.scale = 1.             # zoom
+        self.diameter = 20
+        self.rotation = 0           # of the cross hair, in degrees
+        self.gap = 5
+        self.detect = False         # look for edges
+        self.generation = 0
+
+    def changed(self):
+        self.generation += 1
+
+CIRCLE_COLOR = (255, 0, 0)
+CROSSHAIR_COLOR = (255, 255, 0)
+EDGE_COLOR = (0, 255, 0)
+
+class FrameProcessor:
+    """Turns the frames of a VideoStream into RGB pictures of the output
+    size with the overlay drawn in, in self.frames.  ready() is called
+    from this thread after each picture."""
+    def __init__(self, stream, overlay, ready=None):
+        self.stream = stream
+        self.overlay = overlay
+        self.ready = ready
+        self.frames = FrameBuffers()
+        # the newest edges found: (x, y) in output pixels and (dx, dy) in
+        # camera pixels from the middle of the picture, None if not found
+        self.edges = None
+        self.stopped = False
+        self.thread = None
+        self.process_time = 0.
+
+    def start(self):
+        self.thread = threading.Thread(target=self._update, name="camview processing")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def _update(self):
+        frame = None
+        drawn = None
+        while not self.stopped and not self.stream.frames.closed:
+            new = self.stream.frames.take(.1)
+            if new is not None:
+                frame = new
+            elif frame is None or drawn == self.overlay.generation:
+                continue
+            drawn = self.overlay.generation
+            t0 = time.time()
+            self.process(frame)
+            self.process_time = time.time() - t0
+            self.frames.publish()
+            if self.ready is not None:
+                self.ready()
+        self.frames.close()
+
+    def process(self, frame):
+        overlay = self.overlay
+        width, height = overlay.size
+        width = max(width, 1)
+        height = max(height, 1)
+        if self.frames.shape != (height, width, 3):
+            self.frames.allocate((height, width, 3))
+        out = self.frames.write_buffer()
+
+        # zoom on the middle: crop first, so only what is shown is scaled
+        fh, fw = frame.shape[:2]
+        scale = max(overlay.scale, 1.)
+        ch = max(int(fh / scale), 1)
+        cw = max(int(fw / scale), 1)
+        y0 = (fh - ch) / 2
+        x0 = (fw - cw) / 2
+        crop = frame[y0:y0+ch, x0:x0+cw]
+        scale_image(crop, out)
+
+        if overlay.detect:
+            x, y = find_edges(out[:, :, 1])
+            dx = dy = None
+            if x is not None: dx = (x - width / 2.) * cw / width
+            if y is not None: dy = (y - height / 2.) * ch / height
+            self.edges = (x, y, dx, dy)
+            if x is not None:
+                draw_line(out, x, 0, x, height - 1, EDGE_COLOR)
+            if y is not None:
+                draw_line(out, 0, y, width - 1, y, EDGE_COLOR)
+        else:
+            self.edges = None
+        draw_circle(out, width / 2., height / 2., overlay.diameter / 2.,
+            CIRCLE_COLOR)
+        draw_crosshair(out, overlay.rotation, overlay.gap, CROSSHAIR_COLOR)
+
+    def stop(self, wait=1.):
+        self.stopped = True
+        if self.thread is not None and wait:
+            self.thread.join(wait)
+
+def scale_image(src, out):
+    """Scale BGR src to the size of out and store it there as RGB"""
+    h, w = out.shape[:2]
+    if cv2 is not None:
+        # scaled into the BGR order, then swapped in place
+        cv2.resize(src, (w, h), out, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(out, cv2.COLOR_BGR2RGB, out)
+    else:
+        ys = numpy.arange(h) * src.shape[0] / h
+        xs = numpy.arange(w) * src.shape[1] / w
+        out[:] = src[ys[:, None], xs, ::-1]
+
+def draw_points(img, xs, ys, color):
+    h, w = img.shape[:2]
+    xs = numpy.round(xs).astype(int)
+    ys = numpy.round(ys).astype(int)
+    keep = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    img[ys[keep], xs[keep]] = color
+
+def draw_line(img, x0, y0, x1, y1, color):
+    n = int(max(abs(x1 - x0), abs(y1 - y0))) + 1
+    draw_points(img, numpy.linspace(x0, x1, n), numpy.linspace(y0, y1, n),
+        color)
+
+def draw_circle(img, x, y, radius, color):
+    a = numpy.linspace(0, 2 * math.pi, int(2 * math.pi * radius) + 8)
+    draw_points(img, x + radius * numpy.cos(a), y + radius * numpy.sin(a),
+        color)
+
+def draw_crosshair(img, rotation, gap, color):
+    """A cross hair through the middle of img, open by gap pixels at the
+    middle, turned clockwise by rotation degrees"""
+    h, w = img.shape[:2]
+    cx, cy = w / 2., h / 2.
+    c = math.cos(math.radians(rotation))
+    s = math.sin(math.radians(rotation))
+    for x0, y0, x1, y1 in ((-cx, 0, -gap, 0), (gap, 0, cx, 0),
+            (0, gap, 0, cy), (0, -gap, 0, -cy)):
+        draw_line(img, cx + x0*c - y0*s, cy + x0*s + y0*c,
+            cx + x1*c - y1*s, cy + x1*s + y1*c, color)
+
+def find_edges(gray, band=.25, ratio=4.):
+    """The strongest vertical and the strongest horizontal edge in the
+    middle of a single channel picture, (x, y) in pixels with sub pixel
+    resolution.  Only a band of rows (columns) around the middle is looked
+    at.  x or y is None when no edge stands out from the rest."""
+    h, w = gray.shape
+    bh = max(int(h * band / 2), 1)
+    bw = max(int(w * band / 2), 1)
+    rows = gray[h/2-bh:h/2+bh].astype(numpy.int16)
+    cols = gray[:, w/2-bw:w/2+bw].astype(numpy.int16)
+    dx = numpy.abs(numpy.diff(rows, axis=1)).sum(axis=0)
+    dy = numpy.abs(numpy.diff(cols, axis=0)).sum(axis=1)
+    return _peak(dx, ratio), _peak(dy, ratio)
+
+def _peak(profile, ratio):
+    i = int(profile.argmax())
+    if profile[i] < ratio * (numpy.median(profile) + 1):
+        return None
+    offset = 0.
+    if 0 < i < len(profile) - 1:
+        a, b, c = [float(v) for v in profile[i-1:i+2]]
+        if a - 2*b + c:
+            offset = .5 * (a - c) / (a - 2*b + c)
+    # profile[i] is the step between pixel i and pixel i + 1
+    return i + .5 + offset
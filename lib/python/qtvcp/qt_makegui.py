@@ -1,6 +1,7 @@
 import os,sys
 from PyQt5 import QtGui, QtCore, QtWidgets, uic
 import traceback
+from qtvcp.lib import ui_cache
 
 # Set up logging
 import logger
@@ -81,6 +82,8 @@ class MyWindow(QtWidgets.QMainWindow):
         self.setFocus(True)
         self.PATHS = path
         self.PREFS_ = None
+        # build the widgets from a cached compiled module of the .ui file
+        self.use_ui_cache = True
 
     # These catch events if using a plain VCP panel and there is no handler file
     def keyPressEvent(self, e):
@@ -101,7 +104,11 @@ class MyWindow(QtWidgets.QMainWindow):
 
     def instance(self):
         try:
-            instance = uic.loadUi(self.filename, self)
+            if self.use_ui_cache:
+                ui_cache.load(self.filename, self)
+            else:
+                uic.loadUi(self.filename, self)
+            instance = self
         except AttributeError as e:
             log.critical(e)
             log.critical('Did a widget signal call a missing function name in the handler file?')
@@ -110,8 +117,9 @@ class MyWindow(QtWidgets.QMainWindow):
             sys.exit(0)
 
         log.debug('QTVCP top instance: {}'.format(self))
-        for widget in instance.findChildren(QtCore.QObject):
-            log.debug('QTVCP Widget: {}'.format(widget))
+        if log.isEnabledFor(logger.DEBUG):
+            for widget in instance.findChildren(QtCore.QObject):
+                log.debug('QTVCP Widget: {}'.format(widget))
 
     def apply_styles(self, fname = None):
         if self.PATHS.IS_SCREEN:
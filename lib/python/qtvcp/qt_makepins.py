@@ -18,6 +18,7 @@
 #    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
 
 
+import time
 import gobject
 from qtvcp.widgets.simple_widgets import _HalWidgetBase
 from qtvcp.widgets.screen_options import ScreenOptions
@@ -32,7 +33,7 @@ LOG = logger.getLogger(__name__)
 #LOG.setLevel(logger.DEBUG) # One of DEBUG, INFO, WARNING, ERROR, CRITICAL
 
 class QTPanel():
-    def __init__(self,halcomp,path,window,debug):
+    def __init__(self,halcomp,path,window,debug,profile=None):
         xmlname = path.XML
         self.window = window
         window['PREFS_'] = None
@@ -61,7 +62,10 @@ class QTPanel():
             if isinstance(widget, _HalWidgetBase):
                 idname = widget.objectName()
                 LOG.debug('HAL-ified instance found: {}'.format(idname))
+                start = time.time()
                 widget.hal_init(self.hal, str(idname), widget, window, window. PATHS, window['PREFS_'])
+                if profile:
+                    profile.widget(widget, time.time() - start)
 
     # Search all hal-ifed widgets for closing clean up functions and call them
     # used for such things as preference recording current settings
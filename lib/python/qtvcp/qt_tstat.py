@@ -18,6 +18,8 @@
 import os
 import linuxcnc
 import hashlib
+import filewatch
+from rs274 import tooltable
 
 from qtvcp.core import Info
 # Set up logging
@@ -28,9 +30,6 @@ LOG = logger.getLogger(__name__)
 # Set the log level for this module
 LOG.setLevel(logger.DEBUG) # One of DEBUG, INFO, WARNING, ERROR, CRITICAL
 
-KEYWORDS = ['T', 'P', 'X', 'Y', 'Z', 'A', 'B', 'C', 'U', 'V', 'W', 'D', 'I', 'J', 'Q', ';']
-
-
 class _TStat(object):
 
     def __init__(self):
@@ -57,9 +56,12 @@ class _TStat(object):
         self.COMMENTS = 15
         self.hash_check = None 
         self.toolfile = INFO.TOOL_FILE_PATH
+        self.watcher = filewatch.shared()
+        self.toolfile_generation = None
         self.tool_info = None
         self.current_tool_num = -1
         self.model = []
+        self.table = None
         self.toolinfo = None
 
     def GET_TOOL_INFO(self, toolnum):
@@ -69,7 +71,8 @@ class _TStat(object):
 
     def GET_TOOL_FILE(self):
         self._reload()
-        return self.model
+        # callers edit the rows in place; keep the parsed model clean
+        return [list(row) for row in self.model]
 
     def SAVE_TOOLFILE(self, array):
         self._save(array)
@@ -100,85 +103,50 @@ class _TStat(object):
         if not os.path.exists(self.toolfile):
             print "Toolfile does not exist"
             return None
-        self.hash_code = self.md5sum(self.toolfile)
-        # clear the current liststore, search the tool file, and add each tool
+        # only parse the file again when it changed
+        self.watcher.watch(self.toolfile)
+        self.watcher.check()
+        generation = self.watcher.generation(self.toolfile)
+        if generation != self.toolfile_generation:
+            self.toolfile_generation = generation
+            self._parse()
+        row = self.table.tool(self.current_tool_num)
+        if row is None:
+            self.toolinfo = [0,0,'0','0','0','0','0','0','0','0','0','0','0','0','0','No Tool']
+        else:
+            self.toolinfo = list(self.model[row])
+
+    # clear the current model, search the tool file, and add each tool
+    def _parse(self):
+        self.table = tooltable.load(self.toolfile)
+        for row, word in self.table.errors:
+            LOG.error("toolfile {} line {}: bad word {}".format(self.toolfile, row+1, word))
         self.model = []
-        logfile = open(self.toolfile, "r").readlines()
-        self.toolinfo = None
-        toolinfo_flag = False
-        for rawline in logfile:
-            # strip the comments from line and add directly to array
-            # if index = -1 the delimiter ; is missing - clear comments
-            index = rawline.find(";")
-            comment =''
-            if not index == -1:
-                comment = (rawline[index+1:])
-                comment = comment.rstrip("\n")
-                line = rawline.rstrip(comment)
-            else:
-                line = rawline
-            array = [0,0,'0','0','0','0','0','0','0','0','0','0','0','0','0',comment]
-            # search beginning of each word for keyword letters
-            # if i = ';' that is the comment and we have already added it
+        for row in range(len(self.table)):
+            values = self.table.values(row)
             # offset 0 and 1 are integers the rest floats
-            # we strip leading and following spaces from the comments
-            for offset,i in enumerate(KEYWORDS):
-                if i == ';': continue
-                for word in line.split():
-                    if word.startswith(';'): break
-                    if word.startswith(i):
-                        if offset == 0:
-                            if int(word.lstrip(i)) == self.current_tool_num:
-                                toolinfo_flag = True
-                                # This array's tool num is the current tool num
-                                # remember it for later
-                                temp = array
-                        if offset in(0,1):
-                            try:
-                                array[offset]= int(word.lstrip(i))
-                            except:
-                                 LOG.error("toolfile integer access: {}".format(self.toolfile))
-                        else:
-                            try:
-                                if float(word.lstrip(i)) < 0.000001:
-                                    array[offset]= ("0")
-                                else:
-                                    array[offset]= ("%10.4f" % float(word.lstrip(i)))
-                            except:
-                                LOG.error("toolfile float access: {}".format(self.toolfile))
-                        break
-
+            array = [values[0], values[1]]
+            for v in values[2:]:
+                if v is None or v < 0.000001:
+                    array.append("0")
+                else:
+                    array.append("%10.4f" % v)
+            array.append(self.table.comment(row))
             # add array line to model array
             self.model.append(array)
-        if toolinfo_flag:
-            self.toolinfo = temp
-        else:
-            self.toolinfo = [0,0,'0','0','0','0','0','0','0','0','0','0','0','0','0','No Tool']
 
     # TODO check for linnuxcnc ON and IDLE which is the only safe time to edit/SAVE the tool file.
     def _save(self, new_model):
         if self.toolfile == None:return
-        file = open(self.toolfile, "w")
+        rows = []
         for row in new_model:
-            values = [ value for value in row ]
-            #print values
-            line = ""
-            for num,i in enumerate(values):
-                #print i
-                if num in (0,1): # tool# pocket#
-                    line = line + "%s%d "%(KEYWORDS[num], i)
-                elif num == 15: # comments
-                    test = i.strip()
-                    line = line + "%s%s "%(KEYWORDS[num],test)
-                else:
-                    test = str(i).lstrip()  # floats
-                    line = line + "%s%s "%(KEYWORDS[num], test)
-            LOG.debug("Save line: {}".format(line))
-            print >>file,line
-        # Theses lines are required to make sure the OS doesn't cache the data
-        # That would make linuxcnc and the widget to be out of synch leading to odd errors
-        file.flush()
-        os.fsync(file.fileno())
+            values = [int(row[0]), int(row[1])] + [float(v) for v in row[2:15]]
+            rows.append((values, row[15]))
+        # rows that were not edited keep their line in the file
+        if self.table is None:
+            self.table = tooltable.ToolTable()
+        self.table.replace(rows, tolerance=0.00005)
+        self.table.write(self.toolfile)
         # tell linuxcnc we changed the tool table entries
         try:
             linuxcnc.command().load_tool_table()
@@ -195,11 +163,9 @@ class _TStat(object):
         else:
             return hashlib.md5(f.read()).hexdigest()
 
-        # check the hash code on the toolfile against
-        # the saved hash code when last reloaded.
+        # check whether the toolfile changed since it was last reloaded.
     def file_current_check(self):
-        m = self.hash_code
-        m1 = self.md5sum(self.toolfile)
-        if m1 and m != m1:
+        self.watcher.check()
+        if self.watcher.generation(self.toolfile) != self.toolfile_generation:
             self._reload()
 
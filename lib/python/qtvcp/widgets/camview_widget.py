@@ -16,13 +16,14 @@
 # use open cv to do camera alignment
 
 import sys
-import thread as Thread
 
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtGui import QColor, QFont, QPainter, QPen, QImage
 
 from qtvcp.widgets.widget_baseclass import _HalWidgetBase
+from qtvcp.lib import video_stream
 from qtvcp import logger
+import hal
 
 # Instiniate the libraries with global reference
 # STATUS gives us status messages from linuxcnc
@@ -34,6 +35,9 @@ LOG = logger.getLogger(__name__)
 
 # If the library is missing don't crash the GUI
 # send an error and just make a blank widget.
+# (the synthetic video source works without it)
+# how long hiding waits for the capture to be released (seconds)
+STOP_WAIT = 1.
 LIB_GOOD = True
 try:
     import cv2
@@ -45,26 +49,53 @@ except:
 
 
 class CamView(QtWidgets.QWidget, _HalWidgetBase):
+    # emitted by the processing thread when a new picture is ready
+    frame_ready = QtCore.pyqtSignal()
+
     def __init__(self, parent=None):
         super(CamView, self).__init__(parent)
         self.video = None
-        self.grabbed = None
-        self.frame = None
-        self.diameter = 20
-        self.rotation = 0
-        self.scale = 1
-        self.gap = 5
+        self.processor = None
+        # a stream that was stopped but had not yet released its source
+        self.stopping = None
+        # what the processing thread draws over the picture
+        self.overlay = video_stream.Overlay()
+        self.source = '0'
+        self.fps = 15
         self.setWindowTitle('Cam View')
         self.setGeometry(100, 100, 200, 200)
         self.text_color = QColor(255, 255, 255)
         self.font = QFont("arial,helvetica", 40)
         self.text = ''
         self.pix = None
-        self.stopped = False
+        self.frame = None
+        self.edge_pins = None
+        self.frame_ready.connect(self.nextFrameSlot)
 
     def _hal_init(self):
-        if LIB_GOOD:
-            STATUS.connect('periodic', self.nextFrameSlot)
+        # the camview dialog has no HAL component
+        if getattr(self, 'HAL_GCOMP_', None) is None: return
+        name = self.HAL_NAME_
+        self.edge_pins = (
+            self.HAL_GCOMP_.newpin(name + '-edge-x', hal.HAL_FLOAT, hal.HAL_OUT),
+            self.HAL_GCOMP_.newpin(name + '-edge-y', hal.HAL_FLOAT, hal.HAL_OUT),
+            self.HAL_GCOMP_.newpin(name + '-edge-x-found', hal.HAL_BIT, hal.HAL_OUT),
+            self.HAL_GCOMP_.newpin(name + '-edge-y-found', hal.HAL_BIT, hal.HAL_OUT))
+
+    # the overlay settings live in self.overlay, which the processing
+    # thread reads
+    def _overlay_property(name):
+        def get(self):
+            return getattr(self.overlay, name)
+        def set(self, value):
+            setattr(self.overlay, name, value)
+            self.overlay.changed()
+        return property(get, set)
+    diameter = _overlay_property('diameter')
+    rotation = _overlay_property('rotation')
+    scale = _overlay_property('scale')
+    gap = _overlay_property('gap')
+    del _overlay_property
 
     ##################################
     # no button scroll = circle dismater
@@ -76,90 +107,106 @@ class CamView(QtWidgets.QWidget, _HalWidgetBase):
         mouse_state = QtWidgets.qApp.mouseButtons()
         size = self.size()
         w = size.width()
+        diameter, scale, rotation = self.diameter, self.scale, self.rotation
         if event.angleDelta().y() < 0:
             if mouse_state == QtCore.Qt.NoButton:
-                self.diameter -= 2
+                diameter -= 2
             if mouse_state == QtCore.Qt.LeftButton:
-                self.scale -= .1
+                scale -= .1
             if mouse_state == QtCore.Qt.RightButton:
-                self.rotation -= 2
+                rotation -= 2
         else:
             if mouse_state == QtCore.Qt.NoButton:
-                self.diameter += 2
+                diameter += 2
             if mouse_state == QtCore.Qt.LeftButton:
-                self.scale += .1
+                scale += .1
             if mouse_state == QtCore.Qt.RightButton:
-                self.rotation += 2
-        if self.diameter < 2: self.diameter = 2
-        if self.diameter > w: self.diameter = w
-        if self.rotation > 360: self.rotation = 0
-        if self.rotation < 0: self.rotation = 360
-        if self.scale < 1: self.scale = 1
-        if self.scale > 5: self.scale = 5
-
-    def nextFrameSlot(self, w):
-        if not self.video: return
-        if not self.isVisible(): return
-
-        ############################
-        # capture a freme from cam
-        ############################
-        ret, frame = self.video.read()
-        if not ret: return
-        (oh, ow) = frame.shape[:2]
-
-        #############################
-        # scale image bigger
-        #############################
-        scale = self.scale
-        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-
-        ##########################
-        # crop to the original size of the frame
-        # measure from center so we zoom on center
-        # ch = center of current height
-        # coh = center of original height
-        ##########################
-        (h, w) = frame.shape[:2]
-        ch = h/2
-        cw = w/2
-        coh = oh/2
-        cow = ow/2
-        # NOTE: its img[y: y + h, x: x + w]
-        frame = frame[ch-coh:ch+coh, cw-cow:cw+cow]
-
-        ########################################
-        # My webcam yields frames in BGR format
-        # this may need other options for other cameras
-        ########################################
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        # fit to our window frame
-        self.pix = QImage(frame, frame.shape[1], frame.shape[0], QImage.Format_RGB888)
+                rotation += 2
+        if diameter < 2: diameter = 2
+        if diameter > w: diameter = w
+        if rotation > 360: rotation = 0
+        if rotation < 0: rotation = 360
+        if scale < 1: scale = 1
+        if scale > 5: scale = 5
+        self.overlay.diameter = diameter
+        self.overlay.scale = scale
+        self.overlay.rotation = rotation
+        self.overlay.changed()
+        if not self.pix: self.update()
+
+    def resizeEvent(self, event):
+        super(CamView, self).resizeEvent(event)
+        size = self.size()
+        self.overlay.size = (size.width(), size.height())
+        self.overlay.changed()
+
+    # the processing thread has scaled the newest frame to our size and
+    # drawn the overlay in; the QImage only wraps its buffer
+    def nextFrameSlot(self):
+        if not self.processor: return
+        frame = self.processor.frames.take()
+        if frame is None: return
+        self.pix = QImage(frame, frame.shape[1], frame.shape[0],
+                          frame.strides[0], QImage.Format_RGB888)
+        # keep the array alive as long as the image uses it
+        self.frame = frame
+        self.update_edge_pins(self.processor.edges)
         # repaint the window
         self.update()
 
+    def update_edge_pins(self, edges):
+        if self.edge_pins is None or edges is None: return
+        x, y, dx, dy = edges
+        self.edge_pins[2].set(dx is not None)
+        self.edge_pins[3].set(dy is not None)
+        if dx is not None: self.edge_pins[0].set(dx)
+        if dy is not None: self.edge_pins[1].set(dy)
+
     def showEvent(self, event):
-        if LIB_GOOD:
-            try:
-                self.video = WebcamVideoStream(src=0).start()
-            except:
-                LOG.error('Video capture error: {}'.format(self.video))
+        if self.video: return
+        if not LIB_GOOD and not self.source.startswith('synthetic'): return
+        if self.stopping is not None:
+            # a camera can not be opened again before it is released
+            self.stopping.stop(STOP_WAIT)
+            if self.stopping.thread.is_alive():
+                LOG.warning('Video capture not released yet, trying again')
+                QtCore.QTimer.singleShot(int(STOP_WAIT * 1000), self.reopen)
+                return
+            self.stopping = None
+        try:
+            source = video_stream.open_source(self.source)
+        except Exception as e:
+            LOG.error('Video capture error: {}'.format(e))
+            return
+        self.video = video_stream.VideoStream(source, self.fps).start()
+        self.processor = video_stream.FrameProcessor(self.video,
+                self.overlay, self.frame_ready.emit).start()
+
+    def reopen(self):
+        if self.isVisible(): self.showEvent(None)
 
     def hideEvent(self, event):
-        if LIB_GOOD:
-            try:
-                self.video.stop()
-            except:
-                pass
+        if self.video:
+            # let both threads wind down at once, then wait for them; the
+            # capture thread releases the source when it ends
+            self.processor.stop(0)
+            self.video.stop(0)
+            self.processor.stop(STOP_WAIT)
+            self.video.stop(STOP_WAIT)
+            if self.video.thread.is_alive():
+                self.stopping = self.video
+            self.video = self.processor = None
 
     def paintEvent(self, event):
         qp = QPainter()
         qp.begin(self)
         if self.pix:
-            qp.drawImage(self.rect(), self.pix)
+            qp.drawImage(0, 0, self.pix)
+        else:
+            # the overlay is drawn in with the picture when there is one
+            self.drawCircle(event, qp)
+            self.drawCrossHair(event, qp)
         self.drawText(event, qp)
-        self.drawCircle(event, qp)
-        self.drawCrossHair(event, qp)
         qp.end()
 
     def drawText(self, event, qp):
@@ -198,51 +245,50 @@ class CamView(QtWidgets.QWidget, _HalWidgetBase):
         gp.drawLine(0, 0+self.gap, 0, h)
         gp.drawLine(0, 0-self.gap, 0, -h)
 
+    #########################################################################
+    # This is how designer can interact with our widget properties.
+    # designer will show the pyqtProperty properties in the editor
+    # it will use the get set and reset calls to do those actions
+    #########################################################################
 
-class WebcamVideoStream:
-    def __init__(self, src=0):
-        # initialize the video camera stream and read the first frame
-        # from the stream
-        self.stream = cv2.VideoCapture(src)
-        # initialize the variable used to indicate if the thread should
-        # be stopped
-        self.stopped = False
-        self.grabbed = None
-        self.frame = None
+    # camera number, video file or 'synthetic'
+    def setsource(self, data):
+        self.source = str(data)
+    def getsource(self):
+        return self.source
+    def resetsource(self):
+        self.source = '0'
+    video_source = QtCore.pyqtProperty(str, getsource, setsource, resetsource)
 
-    def start(self):
-        # start the thread to read frames from the video stream
-        Thread.start_new_thread(self._update, ())
-        return self
-
-    def _update(self):
-        # keep looping infinitely until the thread is stopped
-        while True:
-            # if the thread indicator variable is set, stop the thread
-            if self.stopped:
-                self.stream.release()
-                return
-            # otherwise, read the next frame from the stream
-            (self.grabbed, self.frame) = self.stream.read()
+    # most frames read from the camera per second
+    def setfps(self, data):
+        if data < 1: data = 1
+        if data > 60: data = 60
+        self.fps = data
+        if self.video: self.video.fps = data
+    def getfps(self):
+        return self.fps
+    def resetfps(self):
+        self.setfps(15)
+    frames_per_second = QtCore.pyqtProperty(int, getfps, setfps, resetfps)
 
-    def read(self):
-        # return the frame most recently read
-        return (self.grabbed, self.frame)
+    # look for the edges of a part near the middle of the picture
+    def setdetect(self, data):
+        self.overlay.detect = bool(data)
+        self.overlay.changed()
+    def getdetect(self):
+        return self.overlay.detect
+    def resetdetect(self):
+        self.setdetect(False)
+    edge_detection = QtCore.pyqtProperty(bool, getdetect, setdetect, resetdetect)
 
-    def stop(self):
-        # indicate that the thread should be stopped
-        self.stopped = True
 
 if __name__ == '__main__':
 
     import sys
     app = QtWidgets.QApplication(sys.argv)
     capture = CamView()
+    if len(sys.argv) > 1:
+        capture.video_source = sys.argv[1]
     capture.show()
-
-    def jump():
-        capture.nextFrameSlot(None)
-    timer = QtCore.QTimer()
-    timer.timeout.connect(jump)
-    timer.start(10)
     sys.exit(app.exec_())
@@ -487,10 +487,9 @@ class OriginOffsetDialog(QDialog, _HalWidgetBase):
 
         v = QVBoxLayout()
         h = QHBoxLayout()
-        self._o = OFFVIEW_WIDGET()
-        self._o._hal_init()
+        # the offset view is made when the dialog is first shown
+        self._o = None
         self.setLayout(v)
-        v.addWidget(self._o)
         b = QPushButton('OK')
         b.clicked.connect(lambda: self.close())
         h.addWidget(b)
@@ -530,6 +529,7 @@ class OriginOffsetDialog(QDialog, _HalWidgetBase):
 
     def load_dialog(self):
         STATUS.emit('focus-overlay-changed', True, 'Set Origin Offsets', self._color)
+        self._build_view()
         self.calculate_placement()
         self.show()
         self.exec_()
@@ -539,6 +539,13 @@ class OriginOffsetDialog(QDialog, _HalWidgetBase):
     def calculate_placement(self):
         geometry_parsing(self,'OriginOffsetDialog-geometry')
 
+    def _build_view(self):
+        if self._o is not None: return
+        self._o = OFFVIEW_WIDGET()
+        self._o._hal_init()
+        sync_offset_view(self._o)
+        self.layout().insertWidget(0, self._o)
+
     # usual boiler code
     # (used so we can use code such as self[SomeDataName]
     def __getitem__(self, item):
@@ -554,6 +561,7 @@ class OriginOffsetDialog(QDialog, _HalWidgetBase):
     def setState(self, value):
         self._state = value
         if value:
+            self._build_view()
             self.show()
         else:
             self.hide()
@@ -603,10 +611,9 @@ class ToolOffsetDialog(QDialog, _HalWidgetBase):
 
         v = QVBoxLayout()
         h = QHBoxLayout()
-        self._o = TOOLVIEW_WIDGET()
-        self._o._hal_init()
+        # the offset view is made when the dialog is first shown
+        self._o = None
         self.setLayout(v)
-        v.addWidget(self._o)
         b = QPushButton('OK')
         b.clicked.connect(lambda: self.close())
         h.addWidget(b)
@@ -646,6 +653,7 @@ class ToolOffsetDialog(QDialog, _HalWidgetBase):
 
     def load_dialog(self):
         STATUS.emit('focus-overlay-changed', True, 'Set Origin Offsets', self._color)
+        self._build_view()
         self.calculate_placement()
         self.show()
         self.exec_()
@@ -655,6 +663,13 @@ class ToolOffsetDialog(QDialog, _HalWidgetBase):
     def calculate_placement(self):
         geometry_parsing(self,'ToolOffsetDialog-geometry')
 
+    def _build_view(self):
+        if self._o is not None: return
+        self._o = TOOLVIEW_WIDGET()
+        self._o._hal_init()
+        sync_offset_view(self._o)
+        self.layout().insertWidget(0, self._o)
+
     # usual boiler code
     # (used so we can use code such as self[SomeDataName]
     def __getitem__(self, item):
@@ -670,6 +685,7 @@ class ToolOffsetDialog(QDialog, _HalWidgetBase):
     def setState(self, value):
         self._state = value
         if value:
+            self._build_view()
             self.show()
         else:
             self.hide()
@@ -710,10 +726,9 @@ class CamViewDialog(QDialog, _HalWidgetBase):
         self.b.clicked.connect(lambda: self.close())
         h.addWidget(self.b)
         l = QVBoxLayout()
-        o = CamView()
-        o._hal_init()
+        # the camera view is made when the dialog is first shown
+        self._o = None
         self.setLayout(l)
-        l.addWidget(o)
         l.addLayout(h)
 
     def _hal_init(self):
@@ -736,6 +751,7 @@ class CamViewDialog(QDialog, _HalWidgetBase):
 
     def load_dialog(self):
         STATUS.emit('focus-overlay-changed', True, 'Cam View Dialog', self._color)
+        self._build_view()
         self.calculate_placement()
         self.show()
         self.exec_()
@@ -745,6 +761,12 @@ class CamViewDialog(QDialog, _HalWidgetBase):
     def calculate_placement(self):
         geometry_parsing(self,'CamViewDialog-geometry')
 
+    def _build_view(self):
+        if self._o is not None: return
+        self._o = CamView()
+        self._o._hal_init()
+        self.layout().insertWidget(0, self._o)
+
     # **********************
     # Designer properties
     # **********************
@@ -753,6 +775,7 @@ class CamViewDialog(QDialog, _HalWidgetBase):
     def setState(self, value):
         self._state = value
         if value:
+            self._build_view()
             self.show()
         else:
             self.hide()
@@ -788,19 +811,11 @@ class MacroTabDialog(QDialog, _HalWidgetBase):
                             Qt.WindowStaysOnTopHint | Qt.WindowSystemMenuHint)
         self.setMinimumSize(00, 200)
         self.resize(600, 400)
-        # patch class to call our button methods rather then the
-        # original methods (Gotta do before instantiation)
-        MacroTab.closeChecked = self._close
-        MacroTab.runChecked = self._run
-        MacroTab.setTitle = self._setTitle
-        # ok now instantiate patched class
-        self.tab = MacroTab()
-        self.tab.setObjectName('macroTabInternal_')
+        # the macro tab reads all the macros, so it is made when the dialog
+        # is first shown
+        self.tab = None
         l = QVBoxLayout()
         self.setLayout(l)
-        l.addWidget(self.tab)
-        #we need the close button
-        self.tab.closeButton.setVisible(True)
 
     def _hal_init(self):
         x = self.geometry().x()
@@ -813,8 +828,6 @@ class MacroTabDialog(QDialog, _HalWidgetBase):
             self._geometry_string = self.PREFS_.getpref('MacroTabDialog-geometry', geo, str, 'DIALOG_OPTIONS')
         else:
             self._geometry_string = 'default'
-        # gotta call this since we instantiated this out of qtvcp's knowledge
-        self.tab._hal_init()
         self.topParent = self.QTVCP_INSTANCE_
         STATUS.connect('dialog-request', self._external_request)
 
@@ -838,8 +851,25 @@ class MacroTabDialog(QDialog, _HalWidgetBase):
     def _setTitle(self, string):
         self.setWindowTitle(string)
 
+    def _build_view(self):
+        if self.tab is not None: return
+        # patch class to call our button methods rather then the
+        # original methods (Gotta do before instantiation)
+        MacroTab.closeChecked = self._close
+        MacroTab.runChecked = self._run
+        MacroTab.setTitle = self._setTitle
+        # ok now instantiate patched class
+        self.tab = MacroTab()
+        self.tab.setObjectName('macroTabInternal_')
+        self.layout().addWidget(self.tab)
+        #we need the close button
+        self.tab.closeButton.setVisible(True)
+        # gotta call this since we instantiated this out of qtvcp's knowledge
+        self.tab._hal_init()
+
     def load_dialog(self):
         STATUS.emit('focus-overlay-changed', True, 'Lathe Macro Dialog', self._color)
+        self._build_view()
         self.tab.stack.setCurrentIndex(0)
         self.calculate_placement()
         self.show()
@@ -858,6 +888,7 @@ class MacroTabDialog(QDialog, _HalWidgetBase):
     def setState(self, value):
         self._state = value
         if value:
+            self._build_view()
             self.show()
         else:
             self.hide()
@@ -1137,6 +1168,16 @@ class CalculatorDialog(Calculator, _HalWidgetBase):
     overlay_color = pyqtProperty(QColor, getColor, setColor)
 
 
+# An offset view made when its dialog is first shown has missed the STATUS
+# messages it follows since start up
+def sync_offset_view(view):
+    view.setEnabled(STATUS.is_all_homed())
+    view.metricMode(STATUS.old.get('metric', False))
+    view.currentTool(STATUS.old.get('tool-in-spindle', 0))
+    system = STATUS.old.get('g5x-index')
+    if system is not None and hasattr(view, '_convert_system'):
+        view._convert_system(None, system)
+
 # This general function parses the geometry string and places
 # the dialog based on what it finds.
 # there are directive words allowed.
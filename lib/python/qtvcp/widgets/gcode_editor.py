@@ -43,6 +43,7 @@ except ImportError as e:
 
 from qtvcp.widgets.widget_baseclass import _HalWidgetBase
 from qtvcp.core import Status, Info, Action
+from qtvcp.lib import gcode_lexer
 from qtvcp import logger
 
 # Instantiate the libraries with global reference
@@ -65,11 +66,11 @@ class GcodeLexer(QsciLexerCustom):
     def __init__(self, parent=None):
         super(GcodeLexer, self).__init__(parent)
         self._styles = {
-            0: 'Default',
-            1: 'Comment',
-            2: 'Key',
-            3: 'Assignment',
-            4: 'Value',
+            gcode_lexer.DEFAULT: 'Default',
+            gcode_lexer.COMMENT: 'Comment',
+            gcode_lexer.KEY: 'Key',
+            gcode_lexer.ASSIGNMENT: 'Assignment',
+            gcode_lexer.VALUE: 'Value',
             }
         for key, value in self._styles.iteritems():
             setattr(self, value, key)
@@ -79,6 +80,12 @@ class GcodeLexer(QsciLexerCustom):
         font.setPointSize(12)
         font.setBold(True)
         self.setFont(font, 2)
+        # lines edited since they were last styled, (first, last), and
+        # the last line of the text that has been styled from the top
+        self._dirty = None
+        self._styled = -1
+        if parent is not None:
+            parent.SCN_MODIFIED.connect(self._modified)
 
     # Paper sets the background color of each style of text
     def setPaperBackground(self, color, style=None):
@@ -111,78 +118,70 @@ class GcodeLexer(QsciLexerCustom):
             return QColor('#00CC00')  # green
         return QsciLexerCustom.defaultColor(self, style)
 
+    # Note which lines were edited since they were last styled.  Lines
+    # are styled independently of each other, so after an edit only the
+    # edited lines need styling again; the styles of the lines after them
+    # move along with their text.
+    def _modified(self, position, mtype, text, length, lines_added, *args):
+        if not mtype & (QsciScintilla.SC_MOD_INSERTTEXT | QsciScintilla.SC_MOD_DELETETEXT):
+            return
+        editor = self.editor()
+        if editor is None:
+            return
+        first = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, position)
+        last = first
+        if mtype & QsciScintilla.SC_MOD_INSERTTEXT:
+            last = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, position + length)
+        if self._dirty is not None:
+            old_first, old_last = self._dirty
+            if old_first > first: old_first = max(first, old_first + lines_added)
+            if old_last > first: old_last = max(first, old_last + lines_added)
+            first = min(first, old_first)
+            last = max(last, old_last)
+        self._dirty = (first, last)
+        if self._styled > first:
+            self._styled = max(first, self._styled + lines_added)
+
     def styleText(self, start, end):
         editor = self.editor()
         if editor is None:
             return
 
-        # scintilla works with encoded bytes, not decoded characters.
-        # this matters if the source contains non-ascii characters and
-        # a multi-byte encoding is used (e.g. utf-8)
-        source = ''
         if end > editor.length():
             end = editor.length()
-        if end > start:
-            if sys.hexversion >= 0x02060000:
-                # faster when styling big files, but needs python 2.6
-                source = bytearray(end - start)
-                editor.SendScintilla(
-                    editor.SCI_GETTEXTRANGE, start, end, source)
-            else:
-                source = unicode(editor.text()).encode('utf-8')[start:end]
-        if not source:
+        if end <= start:
             return
 
-        # the line index will also be needed to implement folding
-        index = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, start)
-        if index > 0:
-            # the previous state may be needed for multi-line styling
-            pos = editor.SendScintilla(
-                      editor.SCI_GETLINEENDPOSITION, index - 1)
-            state = editor.SendScintilla(editor.SCI_GETSTYLEAT, pos)
-        else:
-            state = self.Default
+        first = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, start)
+        last = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, end - 1)
+        stop = end
+        if self._dirty is not None:
+            dirty_first, dirty_last = self._dirty
+            self._dirty = None
+            if first <= dirty_last < last <= self._styled:
+                # the lines after the edit are styled already
+                stop = editor.SendScintilla(editor.SCI_POSITIONFROMLINE, dirty_last + 1)
+            elif last < dirty_last:
+                self._dirty = (max(dirty_first, last + 1), dirty_last)
+        if first <= self._styled + 1:
+            self._styled = max(self._styled, last)
 
-        set_style = self.setStyling
-        self.startStyling(start, 0x1f)
+        # scintilla works with encoded bytes, not decoded characters.
+        # this matters if the source contains non-ascii characters and
+        # a multi-byte encoding is used (e.g. utf-8)
+        source = bytearray(stop - start)
+        editor.SendScintilla(editor.SCI_GETTEXTRANGE, start, stop, source)
 
-        # scintilla always asks to style whole lines
-        for line in source.splitlines(True):
-            #print line
-            length = len(line)
-            graymode = False
-            msg = ('msg' in line.lower() or 'debug' in line.lower())
-            for char in str(line):
-                #print char
-                if char == ('('):
-                    graymode = True
-                    set_style(1, self.Comment)
-                    continue
-                elif char == (')'):
-                    graymode = False
-                    set_style(1, self.Comment)
-                    continue
-                elif graymode:
-                    if (msg and char.lower() in ('m', 's', 'g', ',', 'd', 'e', 'b', 'u')):
-                        set_style(1, self.Assignment)
-                        if char == ',': msg = False
-                    else:
-                        set_style(1, self.Comment)
-                    continue
-                elif char in ('%', '<', '>', '#', '='):
-                    state = self.Assignment
-                elif char in ('[', ']'):
-                    state = self.Value
-                elif char.isalpha():
-                    state = self.Key
-                elif char.isdigit():
-                    state = self.Default
-                else:
-                    state = self.Default
-                set_style(1, state)
-
-            # folding implementation goes here
-            index += 1
+        styles = gcode_lexer.styles(source)
+        self.startStyling(start, 0x1f)
+        try:
+            editor.SendScintilla(editor.SCI_SETSTYLINGEX, len(styles), bytes(styles))
+        except (TypeError, ValueError):
+            for length, style in gcode_lexer.runs(styles):
+                self.setStyling(length, style)
+        if stop < end:
+            # mark the rest as styled without touching it
+            self.startStyling(end, 0x1f)
 
 
 ##########################################################
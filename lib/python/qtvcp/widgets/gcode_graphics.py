@@ -212,6 +212,15 @@ class  GCodeGraphics(Lcnc_3dGraphics, _HalWidgetBase):
         self.show_overlay(False)
     overlay = pyqtProperty(bool, getoverlay, setoverlay, resetoverlay)
 
+    # background loading of the preview
+    def setbackgroundload(self, state):
+        self.background_load = state
+    def getbackgroundload(self):
+        return self.background_load
+    def resetbackgroundload(self):
+        self.background_load = False
+    _background_load = pyqtProperty(bool, getbackgroundload, setbackgroundload, resetbackgroundload)
+
     def getColor(self):
         return self._color
     def setColor(self, value):
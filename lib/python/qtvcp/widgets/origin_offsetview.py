@@ -21,6 +21,8 @@ import locale
 from PyQt5.QtCore import Qt, QAbstractTableModel, QVariant
 from PyQt5.QtWidgets import QTableView, QAbstractItemView
 import linuxcnc
+import statusbroker
+import filewatch
 
 from qtvcp.widgets.widget_baseclass import _HalWidgetBase
 from qtvcp.core import Status, Action, Info
@@ -50,9 +52,12 @@ class OriginOffsetView(QTableView, _HalWidgetBase):
         self.setAlternatingRowColors(True)
 
         self.filename = INFO.PARAMETER_FILE
+        self.var_file = None
+        if self.filename:
+            self.var_file = filewatch.ParsedFile(self.filename, self.parse_var_file)
         self.axisletters = ["x", "y", "z", "a", "b", "c", "u", "v", "w"]
         self.linuxcnc = linuxcnc
-        self.status = linuxcnc.stat()
+        self.status = statusbroker.status()
         self.IS_RUNNING = False
         self.current_system = None
         self.current_tool = 0
@@ -191,10 +196,18 @@ class OriginOffsetView(QTableView, _HalWidgetBase):
         self.tablemodel.layoutChanged.emit()
         self.resizeColumnsToContents()
 
-    # We read the var file directly
-    # and pull out the info we need
+    # We read the var file directly, but only again after it changed
     # if anything goes wrong we set all the info to 0
     def read_file(self):
+        if self.var_file is None:
+            return self.parse_var_file(None)
+        offsets = self.var_file.get()
+        if offsets[0] is None:
+            return offsets
+        return [list(o) for o in offsets]
+
+    # pull out the info we need
+    def parse_var_file(self, filename):
         try:
             g54 = [0, 0, 0, 0, 0, 0, 0, 0, 0]
             g55 = [0, 0, 0, 0, 0, 0, 0, 0, 0]
@@ -205,12 +218,12 @@ class OriginOffsetView(QTableView, _HalWidgetBase):
             g59_1 = [0, 0, 0, 0, 0, 0, 0, 0, 0]
             g59_2 = [0, 0, 0, 0, 0, 0, 0, 0, 0]
             g59_3 = [0, 0, 0, 0, 0, 0, 0, 0, 0]
-            if self.filename is None:
+            if filename is None:
                 return g54, g55, g56, g57, g58, g59, g59_1, g59_2, g59_3
-            if not os.path.exists(self.filename):
-                LOG.error('File does not exist: yellow<{}>'.format(self.filename))
+            if not os.path.exists(filename):
+                LOG.error('File does not exist: yellow<{}>'.format(filename))
                 return g54, g55, g56, g57, g58, g59, g59_1, g59_2, g59_3
-            logfile = open(self.filename, "r").readlines()
+            logfile = open(filename, "r").readlines()
             for line in logfile:
                 temp = line.split()
                 param = int(temp[0])
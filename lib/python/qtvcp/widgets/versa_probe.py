@@ -35,6 +35,8 @@ ACTION = Action()
 INFO = Info()
 LOG = logger.getLogger(__name__)
 DATADIR = os.path.abspath( os.path.dirname( __file__ ) )
+# read every status period
+PROBE_INPUT = hal.ref('motion.probe-input')
 
 class VersaProbe(QtWidgets.QWidget, _HalWidgetBase):
     def __init__(self, parent=None):
@@ -421,7 +423,7 @@ class VersaProbe(QtWidgets.QWidget, _HalWidgetBase):
         STATUS.emit('update-machine-log', c, 'TIME')
 
     def check_probe(self):
-            self.led_probe_function_chk.setState(hal.get_value('motion.probe-input'))
+            self.led_probe_function_chk.setState(PROBE_INPUT.get())
 
     def probe(self, name):
         if name == 'down':
@@ -16,6 +16,7 @@
 #    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
 import sys, math
+import numpy
 
 def dist_lseg(l1, l2, p):
     "Compute the 3D distance from the line segment l1..l2 to the point p."
@@ -74,21 +75,21 @@ class Point:
 	return self.x**2 + self.y**2
 
 def cent1(x1,y1,x2,y2,x3,y3):
-    P1 = Point(x1,y1)
-    P2 = Point(x2,y2)
-    P3 = Point(x3,y3)
+    # the Point arithmetic of the circumcenter, written out: this runs for
+    # every range douglas() looks at
+    x12 = x1-x2; y12 = y1-y2
+    x23 = x2-x3; y23 = y2-y3
+    x13 = x1-x3; y13 = y1-y3
 
-    den = abs((P1-P2).cross(P2-P3))
+    den = abs(x12 * y23 - y12 * x23)
     if abs(den) < 1e-5: return sys.maxint, sys.maxint
 
-    alpha = (P2-P3).mag2() * (P1-P2).dot(P1-P3) / 2 / den / den
-    beta  = (P1-P3).mag2() * (P2-P1).dot(P2-P3) / 2 / den / den
-    gamma = (P1-P2).mag2() * (P3-P1).dot(P3-P2) / 2 / den / den
+    alpha = (x23**2 + y23**2) * (x12 * x13 + y12 * y13) / 2 / den / den
+    beta  = (x13**2 + y13**2) * ((x2-x1) * x23 + (y2-y1) * y23) / 2 / den / den
+    gamma = (x12**2 + y12**2) * ((x3-x1) * (x3-x2) + (y3-y1) * (y3-y2)) / 2 / den / den
 
-    Pc = alpha * P1 + beta * P2 + gamma * P3
-    #print >>sys.stderr, "cent1", P1, P2, P3, Pc
-    #print >>sys.stderr, "\t", alpha, beta, gamma
-    return Pc.x, Pc.y
+    return alpha * x1 + beta * x2 + gamma * x3, \
+        alpha * y1 + beta * y2 + gamma * y3
 
 def arc_center(plane, p1, p2, p3):
     x1, y1, z1 = p1
@@ -173,6 +174,85 @@ def arc_fmt(plane, c1, c2, p1):
     if plane == 18: return "I%.4f K%.4f" % (c1-x, c2-z)
     if plane == 19: return "J%.4f K%.4f" % (c1-y, c2-z)
 
+PLANE_COLUMNS = {17: [0, 1], 18: [0, 2], 19: [1, 2]}
+# ranges of fewer points than this are faster to check one point at a time
+SHORT_SPAN = 32
+
+def _farthest_short(st, a, b, plane):
+    """The point between st[a] and st[b] that is farthest from the line
+    between them, and the candidate for an arc through them, as
+    (index, distance, arc index, arc radius)"""
+    l1 = st[a]
+    l2 = st[b]
+    worst_dist = 0
+    worst = a
+    min_rad = sys.maxint
+    max_arc = -1
+    for i in xrange(a+1, b):
+        p = st[i]
+        dist = dist_lseg(l1, l2, p)
+        if dist > worst_dist:
+            worst = i
+            worst_dist = dist
+            rad = arc_rad(plane, l1, p, l2)
+            if rad < min_rad:
+                max_arc = i
+                min_rad = rad
+    return worst, worst_dist, max_arc, min_rad
+
+def _farthest(pts, uv, a, b, planar):
+    "_farthest_short() with arrays of the points and their plane coordinates"
+    worst_dist = 0
+    worst = a
+    min_rad = sys.maxint
+    max_arc = -1
+    l1 = pts[a]
+    d = pts[b] - l1
+    d2 = d.dot(d)
+    if d2 == 0:
+        return worst, worst_dist, max_arc, min_rad
+    rel = pts[a+1:b] - l1
+    t = numpy.clip(rel.dot(d) / d2, 0, 1)
+    off = rel - t[:, None] * d
+    dist = numpy.sqrt((off * off).sum(1))
+    i = dist.argmax()
+    if dist[i] > 0:
+        worst = a + 1 + i
+        worst_dist = dist[i]
+    if not planar or worst_dist == 0:
+        return worst, worst_dist, max_arc, min_rad
+
+    # like the loop above, only the points that were the farthest from
+    # the line so far are arc candidates
+    before = numpy.empty_like(dist)
+    before[0] = 0
+    before[1:] = numpy.maximum.accumulate(dist)[:-1]
+    candidates = a + 1 + numpy.flatnonzero(dist > before)
+    (x1, y1), (x3, y3) = uv[a], uv[b]
+    x2 = uv[candidates, 0]
+    y2 = uv[candidates, 1]
+    x12 = x1-x2; y12 = y1-y2
+    x23 = x2-x3; y23 = y2-y3
+    den = abs(x12 * y23 - x23 * y12)
+    ok = den >= 1e-5
+    if ok.any():
+        rad = numpy.hypot(x12[ok], y12[ok]) * numpy.hypot(x23[ok], y23[ok]) \
+            * math.hypot(x3-x1, y3-y1) / 2 / den[ok]
+        k = rad.argmin()
+        if rad[k] < min_rad:
+            max_arc = candidates[ok][k]
+            min_rad = rad[k]
+    return worst, worst_dist, max_arc, min_rad
+
+def _arc_error_short(st, a, b, plane, c1, c2, rad):
+    "How far the points st[a] to st[b] are from the circle at c1, c2"
+    worst = 0
+    for i in xrange(a, b+1):
+        u, v = get_pts(plane, st[i])
+        dist = abs(math.hypot(c1-u, c2-v) - rad)
+        if dist > worst: worst = dist
+    return worst
+
 def douglas(st, tolerance=.001, plane=None, _first=True):
     """\
 Perform Douglas-Peucker simplification on the path 'st' with the specified
@@ -185,92 +265,249 @@ If 'plane' is specified as 17, 18, or 19, it may find helical arcs in the given
 plane in addition to lines.  Note that if there is movement in the plane
 perpendicular to the arc, it will be distorted, so 'plane' should usually
 be specified only when there is only movement on 2 axes
+
+The path is split with an explicit stack of index ranges into one array
+of the points, and the distances of a long range are computed all at once, so
+long paths neither recurse deeply nor get copied at every split.
 """
     if len(st) == 1:
         yield "G1", st[0], None
         return
 
-    l1 = st[0]
-    l2 = st[-1]
-    
-    worst_dist = 0
-    worst = 0
-    min_rad = sys.maxint
-    max_arc = -1
+    pts = uv = None
+    columns = PLANE_COLUMNS.get(plane)
+    if len(st) > SHORT_SPAN:
+        pts = numpy.asarray(st, dtype=float)
+        if columns is not None:
+            uv = pts[:, columns]
+
+    # ranges still to simplify, as (start, end, first), and the moves
+    # between them, in reverse output order
+    work = [(0, len(st) - 1, _first)]
+    while work:
+        item = work.pop()
+        if isinstance(item[0], str):
+            yield item
+            continue
+        a, b, first = item
+        ps = st[a]
+        pe = st[b]
+
+        if b - a < SHORT_SPAN:
+            worst, worst_dist, max_arc, min_rad = \
+                _farthest_short(st, a, b, plane)
+        else:
+            worst, worst_dist, max_arc, min_rad = \
+                _farthest(pts, uv, a, b, columns is not None)
+
+        worst_arc_dist = sys.maxint
+        if min_rad != sys.maxint:
+            c1, c2 = arc_center(plane, ps, st[max_arc], pe)
+            if one_quadrant(plane, (c1, c2), ps, st[max_arc], pe):
+                if b - a < SHORT_SPAN:
+                    worst_arc_dist = _arc_error_short(st, a, b, plane,
+                        c1, c2, min_rad)
+                else:
+                    span = uv[a:b+1]
+                    worst_arc_dist = abs(numpy.hypot(c1 - span[:, 0],
+                        c2 - span[:, 1]) - min_rad).max()
+
+        if worst_arc_dist < tolerance and worst_arc_dist < worst_dist:
+            ccw = arc_dir(plane, (c1, c2), ps, st[max_arc], pe)
+            if plane == 18: ccw = not ccw # wtf?
+            if ccw:
+                work.append(("G3", pe, arc_fmt(plane, c1, c2, ps)))
+            else:
+                work.append(("G2", pe, arc_fmt(plane, c1, c2, ps)))
+            work.append(("G1", ps, None))
+        elif worst_dist > tolerance:
+            if first: work.append(("G1", pe, None))
+            work.append((worst, b, False))
+            work.append(("G1", st[worst], None))
+            work.append((a, worst, False))
+            if first: work.append(("G1", ps, None))
+        elif first:
+            work.append(("G1", pe, None))
+            work.append(("G1", ps, None))
+
+def plane_axis(plane):
+    "Return the index of the coordinate perpendicular to 'plane'"
+    if plane == 17: return 2
+    if plane == 18: return 1
+    if plane == 19: return 0
+
+def moves_length(moves, start):
+    "About how many characters Gcode.write_moves writes for 'moves' from 'start'"
+    length = 0
+    last = start
+    for move, p, cent in moves:
+        if cent:
+            length += len("%s X%.4f Y%.4f Z%.4f %s\n" % ((move,) + tuple(p) + (cent,)))
+        else:
+            changed = ["%.4f" % c for c, l in zip(p, last) if c != l]
+            if changed:
+                length += len(" X".join([""] + changed)) + 3
+        last = p
+    return length
 
-    ps = st[0]
-    pe = st[-1]
+class PathFitter:
+    """\
+Incrementally replace a stream of points by lines and arcs, none of which
+is more than 'tolerance' away from the points it replaces.
 
-    for i, p in enumerate(st): 
-        if p is l1 or p is l2: continue
-        dist = dist_lseg(l1, l2, p)
-        if dist > worst_dist:
-            worst = i
-            worst_dist = dist
-	    rad = arc_rad(plane, ps, p, pe)
-	    #print >>sys.stderr, "rad", rad, max_arc, min_rad
-	    if rad < min_rad:
-		max_arc = i
-		min_rad = rad
-
-    worst_arc_dist = 0
-    if min_rad != sys.maxint:
-	c1, c2 = arc_center(plane, ps, st[max_arc], pe)
-	lx, ly, lz = st[0]
-	if one_quadrant(plane, (c1, c2), ps, st[max_arc], pe):
-	    for i, (x,y,z) in enumerate(st):
-		if plane == 17: dist = abs(math.hypot(c1-x, c2-y) - min_rad)
-		elif plane == 18: dist = abs(math.hypot(c1-x, c2-z) - min_rad)
-		elif plane == 19: dist = abs(math.hypot(c1-y, c2-z) - min_rad)
-		else: dist = sys.maxint
-		#print >>sys.stderr, "wad", dist, worst_arc_dist
-		if dist > worst_arc_dist: worst_arc_dist = dist
-
-		mx = (x+lx)/2
-		my = (y+ly)/2
-		mz = (z+lz)/2
-		if plane == 17: dist = abs(math.hypot(c1-mx, c2-my) - min_rad)
-		elif plane == 18: dist = abs(math.hypot(c1-mx, c2-mz) - min_rad)
-		elif plane == 19: dist = abs(math.hypot(c1-my, c2-mz) - min_rad)
-		else: dist = sys.maxint
-		#if dist > worst_arc_dist: worst_arc_dist = dist
-
-		lx, ly, lz = x, y, z
-	else:
-	    worst_arc_dist = sys.maxint
-
-    else:
-	worst_arc_dist = sys.maxint
-
-    #if worst_arc_dist != sys.maxint:
-	#print >>sys.stderr, "douglas", len(st), "\n\t", st[0], "\n\t", st[max_arc], "\n\t", st[-1]
-	#print >>sys.stderr, "\t", worst_arc_dist, worst_dist
-	#print >>sys.stderr, "\t", c1, c2
-    if worst_arc_dist < tolerance and worst_arc_dist < worst_dist:
-	ccw = arc_dir(plane, (c1, c2), ps, st[max_arc], pe)
-	if plane == 18: ccw = not ccw # wtf?
-	yield "G1", ps, None
-	if ccw:
-	    yield "G3", st[-1], arc_fmt(plane, c1, c2, ps)
-	else:
-	    yield "G2", st[-1], arc_fmt(plane, c1, c2, ps)
-    elif worst_dist > tolerance:
-	if _first: yield "G1", st[0], None
-        for i in douglas(st[:worst+1], tolerance, plane, False):
-            yield i
-        yield "G1", st[worst], None
-        for i in douglas(st[worst:], tolerance, plane, False):
-            yield i
-	if _first: yield "G1", st[-1], None
-    else:
-	if _first: yield "G1", st[0], None
-	if _first: yield "G1", st[-1], None
+Unlike douglas(), which needs the whole path at once, points are given one
+at a time to add(), which returns the moves that are complete so far;
+finish() returns the rest.  Moves have the (gcode, point, center) form
+yielded by douglas().
+
+A line is extended for as long as all its points fit; this is checked in
+constant time per point when the path stays in 'plane'.  After that, an arc
+in 'plane' through the points is tried, up to 'max_arc_points' points and
+a quarter circle.  When neither fits, the last good move is output and a
+new one starts at its end."""
+
+    def __init__(self, tolerance=0.001, plane=None, max_arc_points=100):
+        self.tolerance = tolerance
+        self.plane = plane
+        self.max_arc_points = max_arc_points
+        self.run = []
+
+    def last(self):
+        return self.run[-1]
+
+    def add(self, p):
+        run = self.run
+        if not run:
+            run.append(p)
+            return [("G1", p, None)]
+        if p == run[-1]: return []
+        if len(run) == 1:
+            run.append(p)
+            self.start_line()
+            return []
+        if self.line_ok and self.extend_line(p):
+            run.append(p)
+            return []
+        if self.planar and len(run) < self.max_arc_points:
+            arc = self.fit_arc(run + [p])
+            if arc:
+                self.line_ok = False
+                self.arc = arc
+                run.append(p)
+                return []
+        moves = self.finish()
+        self.run = [moves[-1][1]]
+        return moves + self.add(p)
+
+    def finish(self):
+        run = self.run
+        if len(run) < 2:
+            return []
+        if self.line_ok:
+            moves = [("G1", run[-1], None)]
+        else:
+            c1, c2, ccw = self.arc
+            moves = [(ccw and "G3" or "G2", run[-1],
+                    arc_fmt(self.plane, c1, c2, run[0]))]
+            # an arc is only worth it if it is shorter than the lines
+            lines = list(douglas(run, self.tolerance))
+            if moves_length(lines, run[0]) <= moves_length(moves, run[0]):
+                moves = lines
+        self.run = []
+        return moves
+
+    def start_line(self):
+        s, p = self.run
+        self.line_ok = True
+        self.arc = None
+        ax = plane_axis(self.plane)
+        self.planar = ax is not None and s[ax] == p[ax]
+        if not self.planar: return
+
+        # The directions a line from s may take and still pass within
+        # tolerance of every point so far, as angles from the direction
+        # of the first point
+        u0, v0 = get_pts(self.plane, s)
+        u, v = get_pts(self.plane, p)
+        d = math.hypot(u-u0, v-v0)
+        self.ref = ((u-u0)/d, (v-v0)/d)
+        self.lo, self.hi = self.cone(d, 0)
+        self.reach = d
+
+    def cone(self, d, angle):
+        if d <= self.tolerance:
+            return -math.pi, math.pi
+        w = math.asin(self.tolerance / d)
+        return angle - w, angle + w
+
+    def extend_line(self, p):
+        s = self.run[0]
+        if not self.planar:
+            if len(self.run) >= self.max_arc_points: return False
+            for q in self.run[1:]:
+                if dist_lseg(s, p, q) > self.tolerance: return False
+            return True
+        ax = plane_axis(self.plane)
+        if p[ax] != s[ax]:
+            self.planar = False
+            return False
+        u0, v0 = get_pts(self.plane, s)
+        u, v = get_pts(self.plane, p)
+        du = u - u0; dv = v - v0
+        ru, rv = self.ref
+        along = du * ru + dv * rv
+        if along <= self.reach: return False
+        angle = math.atan2(ru * dv - rv * du, along)
+        if not self.lo <= angle <= self.hi: return False
+        lo, hi = self.cone(math.hypot(du, dv), angle)
+        self.lo = max(self.lo, lo)
+        self.hi = min(self.hi, hi)
+        self.reach = along
+        return True
+
+    def fit_arc(self, st):
+        pts = [get_pts(self.plane, p) for p in st]
+        (x1, y1), (x2, y2), (x3, y3) = pts[0], pts[len(pts)/2], pts[-1]
+        den = 2 * (x1 * (y2-y3) + x2 * (y3-y1) + x3 * (y1-y2))
+        if abs(den) < 1e-12: return None
+        s1 = x1*x1 + y1*y1; s2 = x2*x2 + y2*y2; s3 = x3*x3 + y3*y3
+        c1 = (s1 * (y2-y3) + s2 * (y3-y1) + s3 * (y1-y2)) / den
+        c2 = (s1 * (x3-x2) + s2 * (x1-x3) + s3 * (x2-x1)) / den
+        r = math.hypot(x1-c1, y1-c2)
+        tolerance = self.tolerance
+
+        # most candidates are rejected by a few points away from the ones
+        # the circle was drawn through
+        n = len(pts)
+        for i in (n/4, 3*n/4, n-2):
+            x, y = pts[i]
+            if abs(math.hypot(x-c1, y-c2) - r) > tolerance: return None
+
+        # all points and the middles of the segments between them are on
+        # the circle, and the points progress around it in one direction
+        # for at most a quarter turn
+        ccw = (x2-x1) * (y3-y2) - (y2-y1) * (x3-x2) > 0
+        a0 = math.atan2(y1-c2, x1-c1)
+        last = 0
+        lx, ly = x1, y1
+        for x, y in pts[1:]:
+            if abs(math.hypot(x-c1, y-c2) - r) > tolerance: return None
+            if abs(math.hypot((x+lx)/2-c1, (y+ly)/2-c2) - r) > tolerance:
+                return None
+            a = math.atan2(y-c2, x-c1) - a0
+            if not ccw: a = -a
+            a = a % (2 * math.pi)
+            if a < last or a > math.pi / 2: return None
+            last = a
+            lx, ly = x, y
+        if self.plane == 18: ccw = not ccw
+        return c1, c2, ccw
 
 class Gcode:
     "For creating rs274ngc files"
     def __init__(self, homeheight = 1.5, safetyheight = 0.04, tolerance=0.001,
             spindle_speed=1000, units="G20",
-            target=lambda s: sys.stdout.write(s + "\n")):
+            target=lambda s: sys.stdout.write(s + "\n"), max_cuts=None):
         self.lastx = self.lasty = self.lastz = self.lasta = None
         self.lastgcode = self.lastfeed = None
         self.homeheight = homeheight
@@ -278,6 +515,8 @@ class Gcode:
         self.tolerance = tolerance
         self.units = units
         self.cuts = []
+        # simplify and write out a long cut every max_cuts points
+        self.max_cuts = max_cuts
         self.write = target
         self.time = 0
         self.spindle_speed = spindle_speed
@@ -313,17 +552,21 @@ that the last 'cut' coordinate is actually in the output file, and it may
 give better performance because this means that the simplification algorithm
 will examine fewer points per run."""
         if not self.cuts: return
-        for move, (x, y, z), cent in douglas(self.cuts, self.tolerance, self.plane):
-	    if cent:
-		self.write("%s X%.4f Y%.4f Z%.4f %s" % (move, x, y, z, cent))
-		self.lastgcode = None
-		self.lastx = x
-		self.lasty = y
-		self.lastz = z
-	    else:
-		self.move_common(x, y, z, gcode="G1")
+        self.write_moves(douglas(self.cuts, self.tolerance, self.plane))
         self.cuts = []
 
+    def write_moves(self, moves):
+        "Output moves of the form yielded by douglas()"
+        for move, (x, y, z), cent in moves:
+            if cent:
+                self.write("%s X%.4f Y%.4f Z%.4f %s" % (move, x, y, z, cent))
+                self.lastgcode = None
+                self.lastx = x
+                self.lasty = y
+                self.lastz = z
+            else:
+                self.move_common(x, y, z, gcode="G1")
+
     def end(self):
 	"""End the program"""
         self.flush()
@@ -391,6 +634,11 @@ the simplification algorithm may still skip over specified points."""
         if y is None: y = lasty
         if z is None: z = lastz
         self.cuts.append([x,y,z])
+        if self.max_cuts and len(self.cuts) >= self.max_cuts:
+            # the last point is kept in the output, so the rest of the
+            # cut simply continues from it
+            self.flush()
+            self.cuts = [[x,y,z]]
 
     def home(self):
 	"Go to the 'home' height at rapid speed"
@@ -402,4 +650,35 @@ the simplification algorithm may still skip over specified points."""
         self.flush()
         self.rapid(z=self.safetyheight)
 
+class StreamingGcode(Gcode):
+    """\
+Like Gcode, but 'cut' moves are simplified with PathFitter as they are
+given and written out as soon as they are complete, instead of being held
+until the next flush.  Memory use does not depend on the length of a cut,
+and arcs are found wherever they fit rather than only when a whole cut is
+one arc."""
 
+    def __init__(self, *args, **kw):
+        Gcode.__init__(self, *args, **kw)
+        self.fitter = None
+
+    def set_plane(self, p):
+        if p != self.plane: self.flush()
+        Gcode.set_plane(self, p)
+
+    def flush(self):
+        if self.fitter is None: return
+        self.write_moves(self.fitter.finish())
+        self.fitter = None
+
+    def cut(self, x=None, y=None, z=None):
+        if self.fitter is not None:
+            lastx, lasty, lastz = self.fitter.last()
+        else:
+            lastx, lasty, lastz = self.lastx, self.lasty, self.lastz
+        if x is None: x = lastx
+        if y is None: y = lasty
+        if z is None: z = lastz
+        if self.fitter is None:
+            self.fitter = PathFitter(self.tolerance, self.plane)
+        self.write_moves(self.fitter.add((x, y, z)))
@@ -0,0 +1,266 @@
+#    This is a component of AXIS, a front-end for emc
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Run time estimate for a previewed program
+
+estimate() works on the segment lists of a GLCanon all at once with numpy.
+Each segment is given a trapezoidal velocity profile limited by its feed
+rate and by the velocity and acceleration of every axis that moves.
+Consecutive segments of the same kind that join end to start in nearly the
+same direction (such as the pieces of an arc) are blended at the lower of
+their velocities; every other junction is treated as a full stop.  This
+errs on the slow side, like the trajectory planner does with exact stop
+corners, but unlike a plain distance / feed sum it accounts for the time
+spent accelerating on short moves.
+
+All positions and limits are in the internal units of the canon (inches
+and degrees), per second.
+
+O-word loops and subroutine calls run lines more than once and out of
+line number order.  The times are therefore put in the order the program
+runs in, by the line_index of the canon, which records each range of
+segments a line adds as it runs.
+"""
+
+import numpy
+from rs274.segments import SegmentArray
+
+# consecutive segments closer to parallel than this are blended
+TANGENT_COS = .99
+EPSILON = 1e-9
+
+class MachineLimits:
+    """Per-axis velocity and acceleration limits, XYZABCUVW order"""
+    def __init__(self, max_velocity, max_acceleration,
+            max_linear_velocity=numpy.inf):
+        self.max_velocity = numpy.array(max_velocity, float)
+        self.max_acceleration = numpy.array(max_acceleration, float)
+        self.max_linear_velocity = max_linear_velocity
+
+def limits_from_ini(inifile):
+    """Read the [AXIS_n] and [TRAJ] limits of an INI file, converting
+    linear ones from machine units to inches.  Missing values are
+    unlimited."""
+    units = (inifile.find("TRAJ", "LINEAR_UNITS") or "inch").lower()
+    if units in ("mm", "metric"):
+        scale = 1 / 25.4
+    elif units in ("cm",):
+        scale = 1 / 2.54
+    else:
+        scale = 1.
+    def get(section, option, scale):
+        v = inifile.find(section, option)
+        if v is None: return numpy.inf
+        return float(v) * scale
+    vel = []; acc = []
+    for i, a in enumerate("XYZABCUVW"):
+        s = 1. if a in "ABC" else scale
+        vel.append(get("AXIS_" + a, "MAX_VELOCITY", s))
+        acc.append(get("AXIS_" + a, "MAX_ACCELERATION", s))
+    traj = inifile.find("TRAJ", "MAX_LINEAR_VELOCITY") \
+        or inifile.find("TRAJ", "MAX_VELOCITY")
+    if traj is None: traj = numpy.inf
+    else: traj = float(traj) * scale
+    return MachineLimits(vel, acc, traj)
+
+def segment_columns(seq, has_feed=True):
+    """Return (lineno, start, end, feedrate) arrays for a GLCanon segment
+    list or SegmentArray; feedrate is None when has_feed is false"""
+    n = len(seq)
+    if n == 0:
+        return (numpy.zeros(0, int), numpy.zeros((0, 9)), numpy.zeros((0, 9)),
+            numpy.zeros(0) if has_feed else None)
+    if isinstance(seq, SegmentArray):
+        # copies, since the arrays may still grow underneath a view
+        lineno = numpy.array(numpy.frombuffer(seq.lineno, numpy.intc)[:n])
+        start = numpy.array(numpy.frombuffer(seq.start)[:9*n]).reshape(n, 9)
+        end = numpy.array(numpy.frombuffer(seq.end)[:9*n]).reshape(n, 9)
+        feed = None
+        if has_feed:
+            feed = numpy.array(numpy.frombuffer(seq.feedrate)[:n])
+        return lineno, start, end, feed
+    lineno = numpy.fromiter((l[0] for l in seq), int, n)
+    start = numpy.array([l[1] for l in seq], float).reshape(n, 9)
+    end = numpy.array([l[2] for l in seq], float).reshape(n, 9)
+    feed = None
+    if has_feed:
+        feed = numpy.fromiter((l[3] for l in seq), float, n)
+    return lineno, start, end, feed
+
+def segment_times(start, end, feed, limits):
+    """Return (xyz length, time) arrays for consecutive segments"""
+    n = len(start)
+    if n == 0: return numpy.zeros(0), numpy.zeros(0)
+    d = end - start
+    lin = numpy.sqrt((d[:, :3] ** 2).sum(1))
+    ang = numpy.sqrt((d[:, 3:6] ** 2).sum(1))
+    uvw = numpy.sqrt((d[:, 6:] ** 2).sum(1))
+    # path length as the trajectory planner defines it
+    length = numpy.where(lin > EPSILON, lin, numpy.where(uvw > EPSILON, uvw, ang))
+    moving = length > EPSILON
+
+    old = numpy.seterr(divide='ignore', invalid='ignore')
+    try:
+        # fraction of the path speed each axis has to move at
+        frac = numpy.abs(d) / numpy.where(moving, length, 1)[:, None]
+        vcap = numpy.where(frac > EPSILON, limits.max_velocity / frac,
+            numpy.inf).min(1)
+        acap = numpy.where(frac > EPSILON, limits.max_acceleration / frac,
+            numpy.inf).min(1)
+        v = numpy.minimum(feed, vcap)
+        v = numpy.where(lin > EPSILON,
+            numpy.minimum(v, limits.max_linear_velocity), v)
+        v = numpy.where(v > 0, v, EPSILON)
+        a = acap
+
+        # junction velocities between segment i and i+1
+        unit = d[:, :3] / numpy.where(lin > EPSILON, lin, 1)[:, None]
+        connected = (numpy.abs(start[1:] - end[:-1]) < 1e-6).all(1)
+        tangent = (unit[1:] * unit[:-1]).sum(1) > TANGENT_COS
+        reach = numpy.sqrt(a * length)
+        vj = numpy.minimum(numpy.minimum(v[1:], v[:-1]),
+            numpy.minimum(reach[1:], reach[:-1]))
+        vj = numpy.where(connected & tangent, vj, 0)
+        ve = numpy.concatenate(([0.], vj))
+        vx = numpy.concatenate((vj, [0.]))
+
+        # trapezoid: accelerate from ve to v, cruise, decelerate to vx
+        da = (v * v - ve * ve) / (2 * a)
+        dd = (v * v - vx * vx) / (2 * a)
+        cruise = length - da - dd
+        t_trap = (v - ve) / a + (v - vx) / a + cruise / v
+        # triangle: the peak velocity is never reached
+        vp = numpy.sqrt((2 * a * length + ve * ve + vx * vx) / 2)
+        vp = numpy.maximum(vp, numpy.maximum(ve, vx))
+        t_tri = (vp - ve) / a + (vp - vx) / a
+        t = numpy.where(cruise >= 0, t_trap, t_tri)
+        t = numpy.where(moving & numpy.isfinite(t), t, 0)
+    finally:
+        numpy.seterr(**old)
+    return lin, t
+
+class Estimate:
+    """Result of estimate(): totals plus per-line times.  'lines' is the
+    sorted array of line numbers that take time and 'line_times' the
+    seconds spent on each, all runs of the line together.  'run_lines' are
+    the line numbers in the order the program runs them, once per run,
+    and 'run_starts' the time at which each run starts."""
+    def __init__(self, rapid_distance, feed_distance, rapid_time, feed_time,
+            dwell_time, lines, line_times, run_lines=None, run_times=None):
+        self.rapid_distance = rapid_distance
+        self.feed_distance = feed_distance
+        self.rapid_time = rapid_time
+        self.feed_time = feed_time
+        self.dwell_time = dwell_time
+        self.time = rapid_time + feed_time + dwell_time
+        self.lines = lines
+        self.line_times = line_times
+        if run_lines is None:
+            # no run order known: assume the lines run once, in order
+            run_lines, run_times = lines, line_times
+        self.run_lines = run_lines
+        self.run_starts = numpy.cumsum(run_times) - run_times
+
+    def line_time(self, lineno):
+        i = numpy.searchsorted(self.lines, lineno)
+        if i < len(self.lines) and self.lines[i] == lineno:
+            return float(self.line_times[i])
+        return 0.
+
+    def elapsed(self, lineno, since=0.):
+        """Estimated time spent before reaching lineno.
+
+        In a loop or subroutine the same line runs several times; this is
+        the time of its first run that starts at or after 'since'.  To
+        follow a running program, pass the previous result as 'since'.  A
+        line that does not move counts from the first run after 'since' of
+        a line at or after it."""
+        later = self.run_starts >= since - EPSILON
+        i = numpy.flatnonzero(later & (self.run_lines == lineno))
+        if not len(i):
+            i = numpy.flatnonzero(later & (self.run_lines >= lineno))
+        if not len(i): return self.time
+        return float(self.run_starts[i[0]])
+
+    def remaining(self, lineno, since=0.):
+        """Estimated time left when the program is at lineno, see
+        elapsed()"""
+        return max(0., self.time - self.elapsed(lineno, since))
+
+def run_order(canon, times, dwell_by_line):
+    """Return (line numbers, times) of every run of a line, in the order
+    the program runs them, from the line_index of canon.  'times' are the
+    segment times of traverse, feed and arcfeed.  A line's dwell time is
+    shared among the runs that dwell.  None, None without a line_index."""
+    index = getattr(canon, 'line_index', None)
+    if not index:
+        return None, None
+    runs = [(lineno, start, end) for lineno, ranges in index.items()
+        for start, end in ranges]
+    # the ranges follow each other, so they sort by where they start
+    runs.sort(key=lambda r: sum(r[1]))
+    lines = numpy.array([r[0] for r in runs], int)
+    start = numpy.array([r[1] for r in runs], int)
+    end = numpy.array([r[2] for r in runs], int)
+    t = numpy.zeros(len(runs))
+    for k, seg in enumerate(times):
+        before = numpy.concatenate(([0.], numpy.cumsum(seg)))
+        t += before[end[:, k]] - before[start[:, k]]
+    dwells = (end[:, 3] - start[:, 3]).astype(float)
+    u, inverse = numpy.unique(lines, return_inverse=True)
+    count = numpy.bincount(inverse, weights=dwells, minlength=len(u))
+    seconds = numpy.array([dwell_by_line.get(l, 0.) for l in u], float)
+    share = seconds / numpy.where(count > 0, count, 1)
+    t += share[inverse] * dwells
+    return lines, t
+
+def estimate(canon, limits, max_speed=None):
+    """Estimate the run time of the program previewed in canon.  max_speed
+    additionally caps every move, like the AXIS max velocity slider."""
+    cap = numpy.inf if max_speed is None else max_speed
+    linenos = []; times = []
+    totals = {}
+    for kind, has_feed in (('traverse', False), ('feed', True),
+            ('arcfeed', True)):
+        lineno, start, end, feed = segment_columns(getattr(canon, kind),
+            has_feed)
+        if feed is None:
+            feed = numpy.empty(len(lineno)); feed.fill(cap)
+        else:
+            feed = numpy.minimum(feed, cap)
+        dist, t = segment_times(start, end, feed, limits)
+        totals[kind] = dist.sum(), t.sum()
+        linenos.append(lineno); times.append(t)
+
+    dwell_by_line = getattr(canon, 'dwell_by_line', {})
+    linenos.append(numpy.array(dwell_by_line.keys(), int))
+    times.append(numpy.array(dwell_by_line.values(), float))
+
+    run_lines, run_times = run_order(canon, times[:3], dwell_by_line)
+
+    lineno = numpy.concatenate(linenos)
+    t = numpy.concatenate(times)
+    lines, inverse = numpy.unique(lineno, return_inverse=True)
+    line_times = numpy.bincount(inverse, weights=t, minlength=len(lines))
+
+    return Estimate(
+        float(totals['traverse'][0]),
+        float(totals['feed'][0] + totals['arcfeed'][0]),
+        float(totals['traverse'][1]),
+        float(totals['feed'][1] + totals['arcfeed'][1]),
+        float(canon.dwell_time), lines, line_times, run_lines, run_times)
+
+# vim:ts=8:sts=4:sw=4:et:
@@ -16,6 +16,8 @@
 #    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
 from rs274 import Translated, ArcsToSegmentsMixin, OpenGLTk
+from rs274.segments import SegmentArray, DwellArray
+import rs274.segments
 from minigl import *
 import math
 import glnav
@@ -25,6 +27,8 @@ import array
 import gcode
 import os
 import re
+import threading
+import sys
 
 def minmax(*args):
     return min(*args), max(*args)
@@ -78,15 +82,26 @@ limiticon = array.array('B',
 
 class GLCanon(Translated, ArcsToSegmentsMixin):
     lineno = -1
-    def __init__(self, colors, geometry, is_foam=0):
+    def __init__(self, colors, geometry, is_foam=0, columnar=False):
+        # With columnar set, the lists below are replaced by the typed
+        # arrays of rs274.segments, which yield the same tuples
+        self.columnar = columnar
         # traverse list - [line number, [start position], [end position], [tlo x, tlo y, tlo z]]
-        self.traverse = []; self.traverse_append = self.traverse.append
+        if columnar: self.traverse = SegmentArray(has_feed=False)
+        else: self.traverse = []
+        self.traverse_append = self.traverse.append
         # feed list - [line number, [start position], [end position], feedrate, [tlo x, tlo y, tlo z]]
-        self.feed = []; self.feed_append = self.feed.append
+        if columnar: self.feed = SegmentArray()
+        else: self.feed = []
+        self.feed_append = self.feed.append
         # arcfeed list - [line number, [start position], [end position], feedrate, [tlo x, tlo y, tlo z]]
-        self.arcfeed = []; self.arcfeed_append = self.arcfeed.append
+        if columnar: self.arcfeed = SegmentArray()
+        else: self.arcfeed = []
+        self.arcfeed_append = self.arcfeed.append
         # dwell list - [line number, color, pos x, pos y, pos z, plane]
-        self.dwells = []; self.dwells_append = self.dwells.append
+        if columnar: self.dwells = DwellArray()
+        else: self.dwells = []
+        self.dwells_append = self.dwells.append
         self.choice = None
         self.feedrate = 1
         self.lo = (0,) * 9
@@ -100,6 +115,7 @@ class GLCanon(Translated, ArcsToSegmentsMixin):
         self.in_arc = 0
         self.xo = self.yo = self.zo = self.ao = self.bo = self.co = self.uo = self.vo = self.wo = 0
         self.dwell_time = 0
+        self.dwell_by_line = {}
         self.suppress = 0
         self.g92_offset_x = 0.0
         self.g92_offset_y = 0.0
@@ -125,7 +141,13 @@ class GLCanon(Translated, ArcsToSegmentsMixin):
         self.foam_w = 1.5
         self.notify = 0
         self.notify_message = ""
+        self.aborted = False
         self.highlight_line = None
+        self.packed = {}
+        # line number -> list of (start lengths, end lengths) of
+        # traverse, feed, arcfeed and dwells, filled in by close_line
+        self.line_index = {}
+        self.line_marks = (0, 0, 0, 0)
 
     def comment(self, arg):
         if arg.startswith("AXIS,"):
@@ -158,14 +180,51 @@ class GLCanon(Translated, ArcsToSegmentsMixin):
 
     def message(self, message): pass
 
-    def check_abort(self): pass
+    def check_abort(self):
+        if self.aborted: raise KeyboardInterrupt
 
     def next_line(self, st):
+        self.close_line()
         self.state = st
         self.lineno = self.state.sequence_number
 
+    def close_line(self):
+        # All segments appended since the last call belong to self.lineno,
+        # so recording the list lengths once per line is enough to index
+        # them.  A line can own several ranges (loops, subroutine calls).
+        marks = (len(self.traverse), len(self.feed), len(self.arcfeed),
+            len(self.dwells))
+        if marks != self.line_marks:
+            self.line_index.setdefault(self.lineno, []).append(
+                (self.line_marks, marks))
+            self.line_marks = marks
+
+    def line_segments(self, lineno):
+        """Return the traverse, feed, arcfeed and dwell entries that
+        belong to lineno, without scanning the whole program"""
+        traverse = []; feed = []; arcfeed = []; dwells = []
+        for (t0, f0, a0, d0), (t1, f1, a1, d1) in self.line_index.get(lineno, ()):
+            traverse.extend(self.traverse[t0:t1])
+            feed.extend(self.feed[f0:f1])
+            arcfeed.extend(self.arcfeed[a0:a1])
+            dwells.extend(self.dwells[d0:d1])
+        return traverse, feed, arcfeed, dwells
+
+    def packed_lines(self, lines, geometry):
+        # The vertex buffers only depend on the loaded program and the
+        # geometry, so they are built once per load and reused every time
+        # a display list has to be recompiled.  The entry keeps the list
+        # it was made from, so its id() can not be reused by another one.
+        key = id(lines), geometry
+        entry = self.packed.get(key)
+        if entry is None or entry[0] is not lines:
+            entry = self.packed[key] = \
+                lines, linuxcnc.pack_lines(geometry, lines)
+        return entry[1]
+
     def draw_lines(self, lines, for_selection, j=0, geometry=None):
-        return linuxcnc.draw_lines(geometry or self.geometry, lines, for_selection)
+        vertices, runs = self.packed_lines(lines, geometry or self.geometry)
+        return linuxcnc.draw_packed(vertices, runs, for_selection)
 
     def colored_lines(self, color, lines, for_selection, j=0):
         if self.is_foam:
@@ -187,10 +246,14 @@ class GLCanon(Translated, ArcsToSegmentsMixin):
             self.draw_lines(lines, for_selection, j)
 
     def draw_dwells(self, dwells, alpha, for_selection, j0=0):
+        if isinstance(dwells, DwellArray): dwells = dwells[:]
         return linuxcnc.draw_dwells(self.geometry, dwells, alpha, for_selection, self.is_lathe())
 
     def calc_extents(self):
-        self.min_extents, self.max_extents, self.min_extents_notool, self.max_extents_notool = gcode.calc_extents(self.arcfeed, self.feed, self.traverse)
+        if self.columnar:
+            self.min_extents, self.max_extents, self.min_extents_notool, self.max_extents_notool = rs274.segments.calc_extents(self.arcfeed, self.feed, self.traverse)
+        else:
+            self.min_extents, self.max_extents, self.min_extents_notool, self.max_extents_notool = gcode.calc_extents(self.arcfeed, self.feed, self.traverse)
         if self.is_foam:
             min_z = min(self.foam_z, self.foam_w)
             max_z = max(self.foam_z, self.foam_w)
@@ -276,6 +339,8 @@ class GLCanon(Translated, ArcsToSegmentsMixin):
     def dwell(self, arg):
         if self.suppress > 0: return
         self.dwell_time += arg
+        self.dwell_by_line[self.lineno] = \
+            self.dwell_by_line.get(self.lineno, 0) + arg
         color = self.colors['dwell']
         self.dwells_append((self.lineno, color, self.lo[0], self.lo[1], self.lo[2], self.state.plane/10-17))
 
@@ -286,31 +351,20 @@ class GLCanon(Translated, ArcsToSegmentsMixin):
         glColor3f(*c)
         glBegin(GL_LINES)
         coords = []
-        for line in self.traverse:
-            if line[0] != lineno: continue
-            linuxcnc.line9(geometry, line[1], line[2])
-            coords.append(line[1][:3])
-            coords.append(line[2][:3])
-        for line in self.arcfeed:
-            if line[0] != lineno: continue
-            linuxcnc.line9(geometry, line[1], line[2])
-            coords.append(line[1][:3])
-            coords.append(line[2][:3])
-        for line in self.feed:
-            if line[0] != lineno: continue
+        traverse, feed, arcfeed, dwells = self.line_segments(lineno)
+        for line in traverse + arcfeed + feed:
             linuxcnc.line9(geometry, line[1], line[2])
             coords.append(line[1][:3])
             coords.append(line[2][:3])
         glEnd()
-        for line in self.dwells:
-            if line[0] != lineno: continue
+        for line in dwells:
             self.draw_dwells([(line[0], c) + line[2:]], 2, 0)
             coords.append(line[2:5])
         glLineWidth(1)
         if coords:
-            x = reduce(lambda x,y:x+y, [c[0] for c in coords]) / len(coords)
-            y = reduce(lambda x,y:x+y, [c[1] for c in coords]) / len(coords)
-            z = reduce(lambda x,y:x+y, [c[2] for c in coords]) / len(coords)
+            x = sum([p[0] for p in coords]) / len(coords)
+            y = sum([p[1] for p in coords]) / len(coords)
+            z = sum([p[2] for p in coords]) / len(coords)
         else:
             x = (self.min_extents[0] + self.max_extents[0])/2
             y = (self.min_extents[1] + self.max_extents[1])/2
@@ -336,6 +390,71 @@ class GLCanon(Translated, ArcsToSegmentsMixin):
             self.draw_dwells(self.dwells, self.colors.get('dwell_alpha', 1/3.), for_selection, len(self.traverse) + len(self.feed) + len(self.arcfeed))
             glLineWidth(1)
 
+class PreviewLoader(threading.Thread):
+    """Runs gcode.parse for GlCanonDraw.load_preview_async
+
+    The canon fills its segment lists from the worker thread.  poll(),
+    called from the GUI thread, rebuilds the program display lists now and
+    then so the plot fills in while the file loads, and finishes the load
+    once the parse is over.  cancel() makes the canon's check_abort stop
+    the parse."""
+
+    # Only redraw the partial program when it has grown by this factor,
+    # so the repeated packing stays proportional to the program size
+    growth = 1.5
+
+    def __init__(self, draw, f, canon, args):
+        threading.Thread.__init__(self, name="preview-loader")
+        self.daemon = True
+        self.draw = draw
+        self.f = f
+        self.canon = canon
+        self.args = args
+        self.result = self.seq = None
+        self.exc_info = None
+        self.shown = 0
+        self.changed = False
+        self.finished = False
+
+    def run(self):
+        try:
+            self.result, self.seq = gcode.parse(self.f, self.canon, *self.args)
+        except KeyboardInterrupt:
+            self.result, self.seq = 0, 0
+        except:
+            self.exc_info = sys.exc_info()
+            self.result, self.seq = 0, 0
+
+    def cancel(self):
+        self.canon.aborted = True
+
+    def segment_count(self):
+        c = self.canon
+        return len(c.traverse) + len(c.feed) + len(c.arcfeed) + len(c.dwells)
+
+    def poll(self):
+        """Return True once loading is complete.  'changed' tells whether
+        the preview should be redrawn."""
+        if self.finished: return True
+        if self.is_alive():
+            n = self.segment_count()
+            self.changed = n > 0 and n >= self.shown * self.growth
+            if self.changed:
+                self.shown = n
+                self.canon.calc_extents()
+                self.canon.packed.clear()
+                self.draw.stale_program()
+            return False
+        self.join()
+        self.finished = True
+        self.changed = True
+        self.canon.packed.clear()
+        self.draw.stale_program()
+        if self.exc_info:
+            raise self.exc_info[0], self.exc_info[1], self.exc_info[2]
+        self.draw.finish_preview(self.result)
+        return True
+
 def with_context(f):
     def inner(self, *args, **kw):
         self.activate()
@@ -1819,16 +1938,45 @@ class GlCanonDraw:
     def load_preview(self, f, canon, *args):
         self.set_canon(canon)
         result, seq = gcode.parse(f, canon, *args)
+        self.finish_preview(result)
+        return result, seq
+
+    def load_preview_cached(self, cache, key, f, canon, *args):
+        """Like load_preview, but use the rs274.previewcache entry 'key'
+        when there is one, and store the result otherwise"""
+        self.set_canon(canon)
+        hit = cache.load(key, canon)
+        if hit is not None:
+            if hit[0] <= gcode.MIN_ERROR:
+                self.canon.progress.nextphase(1)
+                self.stale_program()
+            return hit
+        result, seq = self.load_preview(f, canon, *args)
+        cache.store(key, canon, result, seq)
+        return result, seq
+
+    def load_preview_async(self, f, canon, *args):
+        """Like load_preview, but parse in a background thread.  The
+        caller must call poll() on the returned PreviewLoader from the GUI
+        thread until it returns True; the canon must not touch the GUI
+        from its callbacks while the loader is running."""
+        self.set_canon(canon)
+        loader = PreviewLoader(self, f, canon, args)
+        loader.start()
+        return loader
 
+    def finish_preview(self, result):
+        self.canon.close_line()
         if result <= gcode.MIN_ERROR:
             self.canon.progress.nextphase(1)
-            canon.calc_extents()
-            self.stale_dlist('program_rapids')
-            self.stale_dlist('program_norapids')
-            self.stale_dlist('select_rapids')
-            self.stale_dlist('select_norapids')
-
-        return result, seq
+            self.canon.calc_extents()
+            self.stale_program()
+
+    def stale_program(self):
+        self.stale_dlist('program_rapids')
+        self.stale_dlist('program_norapids')
+        self.stale_dlist('select_rapids')
+        self.stale_dlist('select_norapids')
 
     def from_internal_units(self, pos, unit=None):
         if unit is None:
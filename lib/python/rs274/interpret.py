@@ -15,6 +15,7 @@
 #    along with this program; if not, write to the Free Software
 #    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 import math, gcode
+import tooltable
 
 class Translated:
     g92_offset_x = g92_offset_y = g92_offset_z = 0
@@ -134,21 +135,22 @@ class PrintCanon:
 class StatMixin:
     def __init__(self, s, r):
         self.s = s
-        self.tools = list(s.tool_table)
+        self.tools = tooltable.from_stat(s.tool_table)
         self.random = r
 
     def change_tool(self, pocket):
+        tools = self.tools
         if self.random:
-            self.tools[0], self.tools[pocket] = self.tools[pocket], self.tools[0]
+            spindle = tools.stat_entry(0)
+            tools.set_stat_entry(0, tools.stat_entry(pocket))
+            tools.set_stat_entry(pocket, spindle)
         elif pocket==0:
-            self.tools[0] = -1, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0
+            tools.set_stat_entry(0, tooltable.NO_TOOL)
         else:
-            self.tools[0] = self.tools[pocket]
+            tools.set_stat_entry(0, tools.stat_entry(pocket))
 
     def get_tool(self, pocket):
-        if pocket >= 0 and pocket < len(self.tools):
-            return tuple(self.tools[pocket])
-        return -1, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0
+        return self.tools.stat_entry(pocket)
 
     def get_external_angular_units(self):
         return self.s.angular_units or 1.0
@@ -0,0 +1,213 @@
+#    This is a component of AXIS, a front-end for emc
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""On-disk cache of parsed previews
+
+An entry holds the segment lists, extents, line index and parse result of
+one GLCanon, keyed by a hash of everything that went into the parse: the
+program text, the contents of the parameter file and tool table, and the
+startup codes.  Files pulled in by the program itself (O-word subroutines
+on SUBROUTINE_PATH, remaps) are not part of the key, so a change to one of
+them is only seen once the program itself or its settings change.
+
+The cache directory is kept below a size limit by deleting the least
+recently used entries.
+"""
+
+import os
+import array
+import hashlib
+import tempfile
+import cPickle
+from rs274.segments import SegmentArray, DwellArray
+
+# Bump when the layout of an entry changes
+FORMAT = 2
+
+def default_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "linuxcnc", "preview")
+
+def from_ini(inifile):
+    """The PreviewCache set up by [DISPLAY]PREVIEW_CACHE_SIZE (megabytes)
+    and PREVIEW_CACHE_DIR, or None if the size is not set"""
+    size = float(inifile.find("DISPLAY", "PREVIEW_CACHE_SIZE") or 0)
+    if size <= 0:
+        return None
+    return PreviewCache(inifile.find("DISPLAY", "PREVIEW_CACHE_DIR"),
+        int(size * 1024 * 1024))
+
+class PreviewCache:
+    suffix = ".preview"
+
+    def __init__(self, directory=None, max_bytes=256 << 20):
+        self.directory = os.path.expanduser(directory or default_directory())
+        self.max_bytes = max_bytes
+
+    def key(self, filename, args, files=(), extra=()):
+        """Return the cache key for parsing 'filename' with the startup
+        codes 'args', given the other input files and any extra settings
+        (geometry, arc division, ...) that change the result"""
+        h = hashlib.sha1()
+        h.update(repr((FORMAT, args, extra)))
+        for f in (filename,) + tuple(files):
+            h.update("\0%d\0" % len(f or ""))
+            if f and os.path.exists(f):
+                fd = open(f, "rb")
+                try:
+                    while 1:
+                        block = fd.read(1 << 20)
+                        if not block: break
+                        h.update(block)
+                finally:
+                    fd.close()
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key, canon):
+        """Fill canon from the entry for 'key'.  Returns (result, seq), or
+        None when there is no usable entry."""
+        path = self.path(key)
+        try:
+            fd = open(path, "rb")
+        except IOError:
+            return None
+        try:
+            try:
+                meta = cPickle.load(fd)
+                if meta.get('format') != FORMAT: return None
+                columns = {}
+                for name, typecode, count in meta['columns']:
+                    a = array.array(typecode)
+                    a.fromfile(fd, count)
+                    columns[name] = a
+            except (EOFError, ValueError, KeyError, cPickle.UnpicklingError):
+                return None
+        finally:
+            fd.close()
+
+        for kind, has_feed in (('traverse', False), ('feed', True),
+                ('arcfeed', True)):
+            seg = SegmentArray(has_feed)
+            for field in ('start', 'end', 'feedrate', 'tlo', 'lineno'):
+                setattr(seg, field, columns[kind + '.' + field])
+            self.restore(canon, kind, seg)
+        dwells = DwellArray()
+        for field in ('color', 'pos', 'plane', 'lineno'):
+            setattr(dwells, field, columns['dwells.' + field])
+        self.restore(canon, 'dwells', dwells)
+
+        for attr in ('min_extents', 'max_extents', 'min_extents_notool',
+                'max_extents_notool', 'foam_z', 'foam_w', 'dwell_time',
+                'dwell_by_line', 'line_index', 'line_marks'):
+            setattr(canon, attr, meta[attr])
+
+        # mark the entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return meta['result'], meta['seq']
+
+    def restore(self, canon, kind, seq):
+        if not canon.columnar:
+            seq = list(seq)
+        setattr(canon, kind, seq)
+        setattr(canon, kind + '_append', seq.append)
+        canon.packed.clear()
+
+    def store(self, key, canon, result, seq):
+        columns = []
+        for kind, has_feed in (('traverse', False), ('feed', True),
+                ('arcfeed', True)):
+            seg = getattr(canon, kind)
+            if not isinstance(seg, SegmentArray):
+                seg = SegmentArray(has_feed)
+                seg.extend(getattr(canon, kind))
+            for field in ('start', 'end', 'feedrate', 'tlo', 'lineno'):
+                columns.append((kind + '.' + field, getattr(seg, field)))
+        dwells = canon.dwells
+        if not isinstance(dwells, DwellArray):
+            dwells = DwellArray()
+            for d in canon.dwells: dwells.append(d)
+        for field in ('color', 'pos', 'plane', 'lineno'):
+            columns.append(('dwells.' + field, getattr(dwells, field)))
+
+        meta = {
+            'format': FORMAT, 'result': result, 'seq': seq,
+            'columns': [(name, a.typecode, len(a)) for name, a in columns],
+        }
+        for attr in ('min_extents', 'max_extents', 'min_extents_notool',
+                'max_extents_notool', 'foam_z', 'foam_w', 'dwell_time',
+                'dwell_by_line', 'line_index', 'line_marks'):
+            meta[attr] = getattr(canon, attr)
+
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            f = os.fdopen(fd, "wb")
+            try:
+                cPickle.dump(meta, f, 2)
+                for name, a in columns:
+                    a.tofile(f)
+            finally:
+                f.close()
+            os.rename(tmp, self.path(key))
+        except (IOError, OSError), detail:
+            print "preview cache: could not store %s: %s" % (key, detail)
+            return
+        self.trim()
+
+    def entries(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        result = []
+        for n in names:
+            if not n.endswith(self.suffix): continue
+            p = os.path.join(self.directory, n)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            result.append((st.st_mtime, st.st_size, p))
+        return result
+
+    def trim(self):
+        """Delete least recently used entries until the cache fits in
+        max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(e[1] for e in entries)
+        while entries and total > self.max_bytes:
+            mtime, size, p = entries.pop(0)
+            try:
+                os.unlink(p)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for mtime, size, p in self.entries():
+            try:
+                os.unlink(p)
+            except OSError:
+                pass
+
+# vim:ts=8:sts=4:sw=4:et:
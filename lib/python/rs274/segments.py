@@ -0,0 +1,170 @@
+#    This is a component of AXIS, a front-end for emc
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Compact storage for preview geometry
+
+GLCanon normally keeps every segment of the preview as a tuple holding two
+9-element position lists.  For programs with millions of moves the python
+object overhead dominates, so the classes here store the same information
+in typed arrays, one column per field.  Indexing or iterating returns
+tuples shaped exactly like the ones GLCanon appends, so code that walks
+canon.traverse, canon.feed, canon.arcfeed or canon.dwells keeps working.
+"""
+
+import array
+import operator
+
+class SegmentArray(object):
+    """Column store for traverse (has_feed false) or feed/arcfeed segments
+
+    Items look like (lineno, start, end, tlo) or
+    (lineno, start, end, feedrate, tlo)."""
+
+    def __init__(self, has_feed=True):
+        self.has_feed = has_feed
+        self.lineno = array.array('i')
+        self.start = array.array('d')
+        self.end = array.array('d')
+        self.feedrate = array.array('d')
+        self.tlo = array.array('d')
+
+    def append(self, item):
+        # lineno goes last: its length is the segment count, so a reader
+        # in another thread never sees a partially appended segment
+        if self.has_feed:
+            lineno, start, end, feedrate, tlo = item
+            self.feedrate.append(feedrate)
+        else:
+            lineno, start, end, tlo = item
+        self.start.extend(start)
+        self.end.extend(end)
+        self.tlo.extend(tlo)
+        self.lineno.append(lineno)
+
+    def extend(self, items):
+        append = self.append
+        for item in items: append(item)
+
+    def __len__(self):
+        return len(self.lineno)
+
+    def __nonzero__(self):
+        return len(self.lineno) != 0
+
+    def _item(self, i):
+        s = 9*i
+        t = 3*i
+        if self.has_feed:
+            return (self.lineno[i], tuple(self.start[s:s+9]),
+                tuple(self.end[s:s+9]), self.feedrate[i],
+                list(self.tlo[t:t+3]))
+        return (self.lineno[i], tuple(self.start[s:s+9]),
+            tuple(self.end[s:s+9]), list(self.tlo[t:t+3]))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in xrange(*i.indices(len(self)))]
+        n = len(self.lineno)
+        if i < 0: i += n
+        if i < 0 or i >= n: raise IndexError, "segment index out of range"
+        return self._item(i)
+
+    def __iter__(self):
+        item = self._item
+        for i in xrange(len(self.lineno)):
+            yield item(i)
+
+    def extents(self):
+        """Return (min, max, min_notool, max_notool) like gcode.calc_extents
+        does for a single list, or None if there are no segments"""
+        n = len(self.lineno)
+        if not n: return None
+        mins = []; maxs = []; mint = []; maxt = []
+        for ax in range(3):
+            pos = self.start[ax:9*n:9]
+            pos.append(self.end[9*(n-1)+ax])
+            off = self.tlo[ax:3*n:3]
+            off.append(off[-1])
+            tool = map(operator.add, pos, off)
+            mins.append(min(pos)); maxs.append(max(pos))
+            mint.append(min(tool)); maxt.append(max(tool))
+        return mins, maxs, mint, maxt
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in
+            (self.lineno, self.start, self.end, self.feedrate, self.tlo))
+
+class DwellArray(object):
+    """Column store for dwells: items are
+    (lineno, color, x, y, z, plane)"""
+
+    def __init__(self):
+        self.lineno = array.array('i')
+        self.color = array.array('d')
+        self.pos = array.array('d')
+        self.plane = array.array('i')
+
+    def append(self, item):
+        lineno, color, x, y, z, plane = item
+        self.color.extend(color)
+        self.pos.extend((x, y, z))
+        self.plane.append(plane)
+        self.lineno.append(lineno)
+
+    def __len__(self):
+        return len(self.lineno)
+
+    def __nonzero__(self):
+        return len(self.lineno) != 0
+
+    def _item(self, i):
+        c = 3*i
+        x, y, z = self.pos[c:c+3]
+        return (self.lineno[i], tuple(self.color[c:c+3]), x, y, z,
+            self.plane[i])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in xrange(*i.indices(len(self)))]
+        n = len(self.lineno)
+        if i < 0: i += n
+        if i < 0 or i >= n: raise IndexError, "dwell index out of range"
+        return self._item(i)
+
+    def __iter__(self):
+        item = self._item
+        for i in xrange(len(self.lineno)):
+            yield item(i)
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in
+            (self.lineno, self.color, self.pos, self.plane))
+
+def calc_extents(*seqs):
+    """Equivalent of gcode.calc_extents for SegmentArray arguments"""
+    mins = [9e99] * 3; maxs = [-9e99] * 3
+    mint = [9e99] * 3; maxt = [-9e99] * 3
+    for seq in seqs:
+        e = seq.extents()
+        if e is None: continue
+        for ax in range(3):
+            mins[ax] = min(mins[ax], e[0][ax])
+            maxs[ax] = max(maxs[ax], e[1][ax])
+            mint[ax] = min(mint[ax], e[2][ax])
+            maxt[ax] = max(maxt[ax], e[3][ax])
+    return mins, maxs, mint, maxt
+
+# vim:ts=8:sts=4:sw=4:et:
@@ -0,0 +1,234 @@
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Tool table files and entries, shared by the tool editors and the canons
+
+A ToolTable holds one row per tool: tool and pocket number in one array,
+the offsets, diameter, angles and orientation in another, and a comment.
+Rows are found by tool number or by pocket through dictionaries.  Values
+that a line of the file does not give are kept as missing, so an editor
+can tell 'Z0' from no Z word at all.
+
+Every row remembers the line it was read from.  write() copies those lines
+back unchanged and only formats the rows that were edited, so saving a
+table after changing one tool leaves the rest of the file as it was.
+"""
+
+import os
+import array
+
+FIELDS = "TPXYZABCUVWDIJQ"
+COLUMN = dict((c, i) for i, c in enumerate(FIELDS))
+COLUMN.update((c.lower(), i) for i, c in enumerate(FIELDS))
+INTS = 2                    # T and P
+FLOATS = len(FIELDS) - INTS # X through Q
+MISSING = float('nan')
+
+# a linuxcnc.stat tool_table entry for 'no tool'
+NO_TOOL = (-1, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0)
+
+def parse_line(line):
+    """Split one tool table line.  Returns (values, comment, bad):
+    values has one entry per letter of FIELDS, None for a missing word;
+    bad lists the words whose number could not be read."""
+    values = [None] * len(FIELDS)
+    index = line.find(";")
+    if index == -1:
+        comment = ''
+    else:
+        comment = line[index+1:].rstrip("\r\n")
+        line = line[:index]
+    bad = []
+    for word in line.split():
+        i = COLUMN.get(word[0])
+        # the first word for each letter counts
+        if i is None or values[i] is not None: continue
+        try:
+            if i < INTS:
+                values[i] = int(word[1:])
+            else:
+                values[i] = float(word[1:])
+        except ValueError:
+            bad.append(word)
+    return values, comment, bad
+
+def format_row(values, comment=''):
+    """The file line for values as returned by parse_line (without the
+    newline).  Missing numbers are written as 0."""
+    words = []
+    for i, v in enumerate(values):
+        if v is None: v = 0
+        if i < INTS:
+            words.append("%s%d" % (FIELDS[i], v))
+        else:
+            words.append("%s%s" % (FIELDS[i], float(v)))
+    comment = comment.strip()
+    if comment:
+        words.append(";" + comment)
+    return " ".join(words)
+
+class ToolTable:
+    def __init__(self):
+        self.ints = array.array('i')
+        self.floats = array.array('d')
+        self.comments = []
+        self.lines = []     # line each row was read from, None once edited
+        self.errors = []    # (row, word) that could not be parsed
+        self.by_tool = {}
+        self.by_pocket = {}
+
+    def __len__(self):
+        return len(self.comments)
+
+    def parse(self, lines):
+        """Add a row for every non-empty line"""
+        for line in lines:
+            if not line.strip(): continue
+            values, comment, bad = parse_line(line)
+            row = len(self.comments)
+            self.append(values, comment)
+            self.lines[row] = line.rstrip("\r\n")
+            for word in bad:
+                self.errors.append((row, word))
+
+    def append(self, values, comment=''):
+        row = len(self.comments)
+        self.ints.extend([v or 0 for v in values[:INTS]])
+        self.floats.extend([MISSING if v is None else v
+            for v in values[INTS:]])
+        self.comments.append(comment)
+        self.lines.append(None)
+        self.by_tool[self.ints[row*INTS]] = row
+        self.by_pocket[self.ints[row*INTS+1]] = row
+        return row
+
+    def set(self, row, values, comment=None):
+        """Replace the values (and the comment, unless None) of a row.  The
+        row is only marked as edited when something differs."""
+        if comment is None: comment = self.comments[row]
+        if list(values) == self.values(row) and comment == self.comments[row]:
+            return
+        old_tool, old_pocket = self.ints[row*INTS:row*INTS+INTS]
+        if self.by_tool.get(old_tool) == row: del self.by_tool[old_tool]
+        if self.by_pocket.get(old_pocket) == row: del self.by_pocket[old_pocket]
+        for i, v in enumerate(values):
+            if i < INTS:
+                self.ints[row*INTS+i] = v or 0
+            else:
+                self.floats[row*FLOATS+i-INTS] = MISSING if v is None else v
+        self.comments[row] = comment
+        self.lines[row] = None
+        tool, pocket = self.ints[row*INTS:row*INTS+INTS]
+        self.by_tool[tool] = row
+        self.by_pocket[pocket] = row
+
+    def replace(self, rows, tolerance=0):
+        """Make the table hold rows, a list of (values, comment) as an
+        editor has them.  A row that matches the old row of its tool keeps
+        that row's line; numbers match when they differ by no more than
+        tolerance, a missing number matches 0."""
+        old = {}
+        for row in range(len(self.comments)):
+            old[self.ints[row*INTS]] = (self.values(row), self.comments[row],
+                self.lines[row])
+        self.__init__()
+        for values, comment in rows:
+            row = self.append(values, comment)
+            values, comment = self.values(row), self.comments[row]
+            previous = old.get(values[0])
+            if previous is None or previous[2] is None: continue
+            if comment.strip() != previous[1].strip(): continue
+            for a, b in zip(values, previous[0]):
+                if abs((a or 0) - (b or 0)) > tolerance: break
+            else:
+                self.lines[row] = previous[2]
+
+    def values(self, row):
+        """The values of a row, None where the file had no such word"""
+        result = self.ints[row*INTS:row*INTS+INTS].tolist()
+        for v in self.floats[row*FLOATS:row*FLOATS+FLOATS]:
+            result.append(None if v != v else v)
+        return result
+
+    def comment(self, row):
+        return self.comments[row]
+
+    def tool(self, number):
+        """Row of tool 'number' (the last one if it is listed twice), or
+        None"""
+        return self.by_tool.get(number)
+
+    def pocket(self, pocket):
+        return self.by_pocket.get(pocket)
+
+    def stat_entry(self, row):
+        """The row as a linuxcnc.stat tool_table entry"""
+        if row is None or row < 0 or row >= len(self.comments):
+            return NO_TOOL
+        f = [0.0 if v != v else v
+            for v in self.floats[row*FLOATS:row*FLOATS+FLOATS]]
+        return (self.ints[row*INTS],) + tuple(f[:-1]) + (int(f[-1]),)
+
+    def set_stat_entry(self, row, entry):
+        """Store a linuxcnc.stat tool_table entry in a row; the pocket is
+        the row number, as in the status tool table"""
+        if row == len(self.comments):
+            self.append([entry[0], row] + list(entry[1:]))
+        else:
+            self.set(row, [entry[0], row] + list(entry[1:]))
+
+    def write(self, path):
+        """Write the table to path.  Rows that were not edited since they
+        were read are copied unchanged."""
+        # replace the file a symlink points to, not the symlink
+        path = os.path.realpath(path)
+        tmp = "%s.tmp" % path
+        f = open(tmp, "w")
+        try:
+            for row in range(len(self.comments)):
+                line = self.lines[row]
+                if line is None:
+                    line = format_row(self.values(row), self.comments[row])
+                print >>f, line
+            # make sure linuxcnc reads what we wrote when told to reload
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            f.close()
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 07777)
+        os.rename(tmp, path)
+        for row in range(len(self.comments)):
+            if self.lines[row] is None:
+                self.lines[row] = format_row(self.values(row),
+                    self.comments[row])
+
+def load(path):
+    """Parse the tool table file at path"""
+    table = ToolTable()
+    f = open(path, "r")
+    try:
+        table.parse(f)
+    finally:
+        f.close()
+    return table
+
+def from_stat(tool_table):
+    """A ToolTable of a linuxcnc.stat tool_table, one row per pocket"""
+    table = ToolTable()
+    for pocket, entry in enumerate(tool_table):
+        table.set_stat_entry(pocket, entry)
+    return table
+
+# vim:ts=8:sts=4:sw=4:et:
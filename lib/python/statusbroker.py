@@ -0,0 +1,338 @@
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Shared status snapshots
+
+A Broker polls one linuxcnc.stat and publishes every change as a pickled
+snapshot in a small shared memory file.  stat() is a drop-in replacement
+for linuxcnc.stat that reads those snapshots, so a screen plus any number
+of panels cost one NML status read per broker cycle instead of one per
+widget timer.  When no broker is running, or it stops updating, stat()
+polls linuxcnc.stat itself and picks the broker up again once it is back.
+
+Layout of the file: a fixed header (see HEADER) followed by the pickled
+status dict and the pickled tool table.  The tool table is kept apart
+because it is large and rarely changes, so readers only unpickle it when
+its own sequence number moves.  The writer makes the main sequence number
+odd while it updates the file, readers retry when they see an odd or
+changed number.
+"""
+
+import os
+import mmap
+import time
+import struct
+import cPickle
+import warnings
+import collections
+import linuxcnc
+
+MAGIC = "LCST"
+FORMAT = 1
+# magic, format, seq, main length, tool seq, tool length, stamp, interval
+HEADER = struct.Struct("=4sIIIIIdd")
+DEFAULT_INTERVAL = .05
+DEFAULT_SIZE = 1 << 20
+# readers give up on a broker that has not polled for this many intervals
+STALE_POLLS = 20
+# and look for it again at most this often (seconds)
+RETRY_INTERVAL = 1.
+
+ToolResult = collections.namedtuple('ToolResult', ['id', 'xoffset',
+    'yoffset', 'zoffset', 'aoffset', 'boffset', 'coffset', 'uoffset',
+    'voffset', 'woffset', 'diameter', 'frontangle', 'backangle',
+    'orientation'])
+
+def default_path():
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else "/tmp"
+    return os.path.join(base, "linuxcnc-status.%d" % os.getuid())
+
+def status_fields(stat):
+    """Names of the status values of a linuxcnc.stat"""
+    fields = []
+    for name in dir(stat):
+        if name.startswith('_') or name in ('poll', 'tool_table'):
+            continue
+        if callable(getattr(stat, name, None)):
+            continue
+        fields.append(name)
+    return fields
+
+class Broker:
+    """Polls 'stat' (a linuxcnc.stat by default) and publishes it in the
+    file at 'path'"""
+    def __init__(self, path=None, interval=DEFAULT_INTERVAL, stat=None,
+            size=DEFAULT_SIZE):
+        self.path = path or default_path()
+        self.interval = interval
+        self.stat = stat or linuxcnc.stat()
+        self.fields = None
+        self.size = size
+        self.map = None
+        self.seq = self.tool_seq = 0
+        self.last = self.last_tools = None
+        self.main_data = self.tool_data = ""
+
+    def create(self, size):
+        """Make a new file and move it into place, so readers that still
+        map the old one never see it shrink"""
+        tmp = "%s.%d" % (self.path, os.getpid())
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0644)
+        try:
+            os.ftruncate(fd, size)
+            m = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        old = self.map
+        self.map = m
+        self.size = size
+        self.write_header(0)
+        os.rename(tmp, self.path)
+        if old is not None:
+            # tell readers of the old file to look again
+            old[:HEADER.size] = HEADER.pack(MAGIC, FORMAT, 0, 0, 0, 0, 0, 0)
+            old.close()
+
+    def write_header(self, stamp):
+        self.map[:HEADER.size] = HEADER.pack(MAGIC, FORMAT, self.seq,
+            len(self.main_data), self.tool_seq, len(self.tool_data),
+            stamp, self.interval)
+
+    def snapshot(self):
+        stat = self.stat
+        if self.fields is None:
+            self.fields = status_fields(stat)
+        return dict((name, getattr(stat, name)) for name in self.fields)
+
+    def update(self):
+        """Poll once and publish any change.  Returns True if something
+        changed."""
+        self.stat.poll()
+        snap = self.snapshot()
+        tools = tuple(tuple(t) for t in self.stat.tool_table)
+        changed = False
+        if snap != self.last:
+            self.last = snap
+            self.main_data = cPickle.dumps(snap, 2)
+            changed = True
+        if tools != self.last_tools:
+            self.last_tools = tools
+            self.tool_data = cPickle.dumps(tools, 2)
+            self.tool_seq += 1
+            changed = True
+        if self.map is None:
+            self.create(self.size)
+        if not changed:
+            # only the heartbeat
+            self.write_header(time.time())
+            return False
+
+        need = HEADER.size + len(self.main_data) + len(self.tool_data)
+        if need > self.size:
+            size = self.size
+            while size < need: size *= 2
+            self.create(size)
+        self.seq += 1
+        self.write_header(time.time())
+        start = HEADER.size
+        end = start + len(self.main_data)
+        self.map[start:end] = self.main_data
+        self.map[end:end+len(self.tool_data)] = self.tool_data
+        self.seq += 1
+        self.write_header(time.time())
+        return True
+
+    def run(self):
+        with warnings.catch_warnings():
+            # stat.axes is deprecated but still published
+            warnings.simplefilter("ignore", DeprecationWarning)
+            try:
+                while 1:
+                    t0 = time.time()
+                    self.update()
+                    delay = self.interval - (time.time() - t0)
+                    if delay > 0: time.sleep(delay)
+            finally:
+                self.close()
+
+    def close(self):
+        if self.map is None: return
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        self.map[:HEADER.size] = HEADER.pack(MAGIC, FORMAT, 0, 0, 0, 0, 0, 0)
+        self.map.close()
+        self.map = None
+
+class stat(object):
+    """linuxcnc.stat work-alike that reads a Broker's snapshots
+
+    poll() is cheap when nothing changed: it compares two numbers in the
+    shared header.  Status values are plain attributes, as with
+    linuxcnc.stat; tool_table entries are ToolResult tuples."""
+
+    def __init__(self, path=None):
+        self._path = path or default_path()
+        self._map = None
+        self._seq = self._tool_seq = None
+        self._fields = ()
+        self._direct = None
+        self._use_direct = False
+        self._retry = 0
+        # the poll interval the broker was started with
+        self._interval = DEFAULT_INTERVAL
+        if not (self._attach() and self._read()):
+            self._detach()
+
+    def _attach(self):
+        self._retry = time.time() + RETRY_INTERVAL
+        try:
+            fd = os.open(self._path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            try:
+                self._map = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (mmap.error, ValueError):
+                return False
+        finally:
+            os.close(fd)
+        self._seq = self._tool_seq = None
+        return True
+
+    def _detach(self):
+        """Poll linuxcnc.stat directly until the broker is back"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        for name in self._fields:
+            self.__dict__.pop(name, None)
+        self._fields = ()
+        if self._direct is None:
+            self._direct = linuxcnc.stat()
+        self._use_direct = True
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not self.__dict__.get('_use_direct'):
+            raise AttributeError(name)
+        return getattr(self._direct, name)
+
+    def _read(self):
+        """Copy the current snapshot into the instance.  Returns False if
+        the broker is gone or stale."""
+        m = self._map
+        if len(m) < HEADER.size:
+            return False
+        for attempt in range(10):
+            magic, fmt, seq, main_len, tool_seq, tool_len, stamp, interval = \
+                HEADER.unpack_from(m, 0)
+            if magic != MAGIC or fmt != FORMAT or stamp == 0:
+                return False
+            if time.time() - stamp > max(interval * STALE_POLLS, 1.):
+                return False
+            self._interval = interval
+            if seq == self._seq:
+                return True
+            if seq & 1:
+                continue
+            start = HEADER.size
+            main = m[start:start+main_len]
+            tools = None
+            if tool_seq != self._tool_seq:
+                tools = m[start+main_len:start+main_len+tool_len]
+            if HEADER.unpack_from(m, 0)[2] != seq:
+                continue
+            try:
+                snap = cPickle.loads(main)
+                if tools is not None:
+                    snap['tool_table'] = tuple(ToolResult(*t)
+                        for t in cPickle.loads(tools))
+            except Exception:
+                continue
+            self.__dict__.update(snap)
+            self._fields = snap.keys() + ['tool_table']
+            self._seq = seq
+            if tools is not None:
+                self._tool_seq = tool_seq
+            self._use_direct = False
+            return True
+        # the broker kept writing; keep what we have
+        return self._seq is not None
+
+    def poll(self):
+        if self._map is not None:
+            if self._read():
+                return
+            # the broker may have moved to a new file
+            self._map.close()
+            self._map = None
+            self._retry = 0
+        if time.time() > self._retry and self._attach() and self._read():
+            return
+        self._detach()
+        self._direct.poll()
+
+class CommandStat(object):
+    """Status for a GUI that both reads the status on a timer and polls
+    right after sending a command to see its effect.
+
+    The timer calls update(), which polls 'snapshot' (a stat() or a
+    linuxcnc.stat).  poll() always asks linuxcnc itself, as a broker
+    snapshot can be up to one broker interval older than the command.
+    Reads give whichever of the two was polled last, until the broker has
+    polled again since poll()."""
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+        if isinstance(snapshot, linuxcnc.stat):
+            self._direct = snapshot
+        else:
+            self._direct = linuxcnc.stat()
+        self._source = snapshot
+        self._polled = 0
+
+    def poll(self):
+        self._direct.poll()
+        self._source = self._direct
+        self._polled = time.time()
+
+    def update(self):
+        self._snapshot.poll()
+        self.refreshed()
+
+    def refreshed(self):
+        """The snapshot was polled; read it again once it is newer than
+        the last poll()"""
+        interval = getattr(self._snapshot, '_interval', DEFAULT_INTERVAL)
+        if time.time() - self._polled > interval:
+            self._source = self._snapshot
+
+    def __getattr__(self, name):
+        return getattr(self._source, name)
+
+def status():
+    """Status object for a GUI or panel: a broker client when the session
+    runs a broker (the linuxcnc script exports its file as
+    LINUXCNC_STATUS_BROKER), a plain linuxcnc.stat otherwise"""
+    path = os.environ.get("LINUXCNC_STATUS_BROKER")
+    if path:
+        return stat(path)
+    return linuxcnc.stat()
+
+def command_status():
+    """CommandStat of status(): update() on the timer, poll() after
+    sending a command"""
+    return CommandStat(status())
+
+# vim:ts=8:sts=4:sw=4:et:
@@ -34,6 +34,10 @@ import traceback
 __all__=["read_file","nodeiterator",
         "widget_creator","paramiterator","updater","create_vcp"]
 
+# default time between widget updates (ms); a widget can set its own
+# with a 'refresh' attribute or tag
+UPDATE_INTERVAL = 100
+
 
 
 
@@ -80,6 +84,7 @@ def nodeiterator(node,widgetparent):
 
 
 widgets=[];
+refresh={};
 def widget_creator(parent,widget_name,params):
     """
        creates a pyVCP widget
@@ -96,6 +101,7 @@ def widget_creator(parent,widget_name,params):
     else:
 	container = parent
     positional_params = (container, pycomp)
+    rate = params.pop("refresh", UPDATE_INTERVAL)
     
     try:
 	widget = constructor(*positional_params, **params)
@@ -113,6 +119,7 @@ def widget_creator(parent,widget_name,params):
     # add the widget to a global list widgets
     # to enable calling update() later
     widgets.append(widget)
+    refresh[widget] = int(rate)
 
     return widget
 
@@ -147,12 +154,108 @@ def paramiterator(node):
 
 
 
+class _PinRecorder:
+    """Passed to a widget's update() in place of the component, to note
+    which pins it reads"""
+    def __init__(self, comp):
+        self.comp = comp
+        self.names = set()
+
+    def __getitem__(self, name):
+        self.names.add(name)
+        return self.comp[name]
+
+    def __setitem__(self, name, value):
+        self.comp[name] = value
+
+    def __getattr__(self, name):
+        return getattr(self.comp, name)
+
+class _UpdateGroup:
+    """The widgets that update at one rate
+
+    A widget is updated once to find out which pins it reads; after that
+    only when one of them changed.  All pins of the group are read with one
+    hal.read_items() call per cycle.  Widgets that write pins or show the
+    time (update_always) are updated every cycle as before."""
+    def __init__(self, comp, interval, order):
+        self.comp = comp
+        self.interval = interval
+        self.order = order  # widget -> creation index
+        self.always = []
+        self.new = []
+        self.readers = {}   # pin name -> widgets that read it
+        self.names = []
+        self.items = []
+        self.values = ()
+
+    def add(self, widget):
+        if getattr(widget, "update_always", False):
+            self.always.append(widget)
+        else:
+            self.new.append(widget)
+
+    def watch(self, widget, names):
+        for name in names:
+            if name not in self.readers:
+                try:
+                    item = self.comp.getitem(name)
+                except (AttributeError, RuntimeError, TypeError):
+                    # not something read_items() can read
+                    self.always.append(widget)
+                    return
+                self.readers[name] = []
+                self.names.append(name)
+                self.items.append(item)
+                self.values = self.values + (None,)
+            if widget not in self.readers[name]:
+                self.readers[name].append(widget)
+
+    def update_widget(self, widget):
+        recorder = _PinRecorder(self.comp)
+        widget.update(recorder)
+        self.watch(widget, recorder.names)
+
+    def update(self):
+        for widget in self.always:
+            widget.update(self.comp)
+        new, self.new = self.new, []
+        for widget in new:
+            self.update_widget(widget)
+        if not self.items:
+            return
+        values = hal.read_items(self.items)
+        if values == self.values:
+            return
+        changed = set()
+        for name, value, old in zip(self.names, values, self.values):
+            if value != old:
+                changed.update(self.readers[name])
+        changed.difference_update(new)
+        self.values = values
+        changed = sorted(changed, key=self.order.get)
+        for widget in changed:
+            # a widget may read other pins depending on the ones it read
+            # before, so keep recording
+            self.update_widget(widget)
+
+    def run(self):
+        self.update()
+        pyvcp0.after(self.interval, self.run)
+
 def updater():
-     """ calls pyvcp_widgets.update() on each widget repeatedly every 100 ms """
+     """ starts updating the widgets, every 'refresh' ms (UPDATE_INTERVAL
+         by default) but only when a pin they read has changed """
      global widgets, pycomp
+     groups = {}
+     order = dict((a, i) for i, a in enumerate(widgets))
      for a in widgets:
-          a.update(pycomp)
-     pyvcp0.after(100,updater)
+          rate = refresh.get(a, UPDATE_INTERVAL)
+          if rate not in groups:
+               groups[rate] = _UpdateGroup(pycomp, rate, order)
+          groups[rate].add(a)
+     for rate in sorted(groups):
+          groups[rate].run()
 
 
 
@@ -1542,6 +1542,7 @@ static PyTypeObject Error_Type = {
 };
 
 #include <GL/gl.h>
+#include <vector>
 
 static void rotate_z(double pt[3], double a) {
     double theta = a * M_PI / 180;
@@ -1808,6 +1809,133 @@ static PyObject *pydraw_dwells(PyObject *s, PyObject *o) {
     return Py_None;
 }
 
+static void pack_vertex9(std::vector<float> &v, const double pt[9], const char *geometry) {
+    double p[3];
+    vertex9(pt, p, geometry);
+    v.push_back(p[0]);
+    v.push_back(p[1]);
+    v.push_back(p[2]);
+}
+
+// Same subdivision of rotary moves as line9: the vertices after p1
+static void pack_line9(std::vector<float> &v, const double p1[9], const double p2[9], const char *geometry) {
+    if(p1[3] != p2[3] || p1[4] != p2[4] || p1[5] != p2[5]) {
+        double dc = max3(
+            fabs(p2[3] - p1[3]),
+            fabs(p2[4] - p1[4]),
+            fabs(p2[5] - p1[5]));
+        int st = (int)ceil(max(10, dc/10));
+        for(int i=1; i<=st; i++) {
+            double t = i * 1.0 / st;
+            double u = 1.0 - t;
+            double pt[9];
+            for(int j=0; j<9; j++) { pt[j] = t * p2[j] + u * p1[j]; }
+            pack_vertex9(v, pt, geometry);
+        }
+    } else {
+        pack_vertex9(v, p2, geometry);
+    }
+}
+
+static PyObject *pypack_lines(PyObject *s, PyObject *o) {
+    PyObject *lines, *it, *item;
+    std::vector<float> vertices;
+    std::vector<int> runs;
+    double p1[9], p2[9], pl[9];
+    char *geometry;
+    int n, nl = 0, first = 1;
+
+    if(!PyArg_ParseTuple(o, "sO:pack_lines", &geometry, &lines))
+        return NULL;
+
+    it = PyObject_GetIter(lines);
+    if(!it) return NULL;
+
+    while((item = PyIter_Next(it))) {
+        PyObject *dummy1, *dummy2, *dummy3;
+        int r = PyArg_ParseTuple(item, "i(ddddddddd)(ddddddddd)|OOO", &n,
+                    p1+0, p1+1, p1+2,
+                    p1+3, p1+4, p1+5,
+                    p1+6, p1+7, p1+8,
+                    p2+0, p2+1, p2+2,
+                    p2+3, p2+4, p2+5,
+                    p2+6, p2+7, p2+8,
+                    &dummy1, &dummy2, &dummy3);
+        Py_DECREF(item);
+        if(!r) {
+            Py_DECREF(it);
+            return NULL;
+        }
+        // The vertices are line strips, as draw_lines draws them.  runs
+        // holds (line number, first vertex, vertex count) triples; a run
+        // that only starts a new line number begins at the last vertex of
+        // the run before, so draw_packed can join them into one strip.
+        if(first || memcmp(p1, pl, sizeof(p1))) {
+            runs.push_back(n);
+            runs.push_back(vertices.size() / 3);
+            runs.push_back(1);
+            pack_vertex9(vertices, p1, geometry);
+        } else if(n != nl) {
+            runs.push_back(n);
+            runs.push_back(vertices.size() / 3 - 1);
+            runs.push_back(1);
+        }
+        size_t before = vertices.size();
+        pack_line9(vertices, p1, p2, geometry);
+        runs.back() += (vertices.size() - before) / 3;
+        memcpy(pl, p2, sizeof(p1));
+        nl = n;
+        first = 0;
+    }
+    Py_DECREF(it);
+    if(PyErr_Occurred()) return NULL;
+
+    return Py_BuildValue("s#s#",
+        vertices.empty() ? "" : (char*)&vertices[0],
+        (int)(vertices.size() * sizeof(float)),
+        runs.empty() ? "" : (char*)&runs[0],
+        (int)(runs.size() * sizeof(int)));
+}
+
+static PyObject *pydraw_packed(PyObject *s, PyObject *o) {
+    const char *vertices, *runs;
+    int vsize, rsize, for_selection = 0;
+
+    if(!PyArg_ParseTuple(o, "s#s#|i:draw_packed",
+                &vertices, &vsize, &runs, &rsize, &for_selection))
+        return NULL;
+
+    int nvert = vsize / (3 * sizeof(float));
+    if(!nvert) Py_RETURN_NONE;
+
+    glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT);
+    glVertexPointer(3, GL_FLOAT, 0, vertices);
+    glEnableClientState(GL_VERTEX_ARRAY);
+    const int *r = (const int *)runs;
+    int nruns = rsize / (3 * sizeof(int));
+    if(for_selection) {
+        for(int i=0; i<nruns; i++, r += 3) {
+            glLoadName(r[0]);
+            glDrawArrays(GL_LINE_STRIP, r[1], r[2]);
+        }
+    } else {
+        // one strip per connected path, so a stipple pattern runs on
+        // across the segments of the path as with draw_lines
+        int start = 0, end = 0;
+        for(int i=0; i<nruns; i++, r += 3) {
+            if(i && r[1] != end - 1) {
+                glDrawArrays(GL_LINE_STRIP, start, end - start);
+                start = r[1];
+            }
+            end = r[1] + r[2];
+        }
+        if(nruns) glDrawArrays(GL_LINE_STRIP, start, end - start);
+    }
+    glPopClientAttrib();
+
+    Py_RETURN_NONE;
+}
+
 struct color {
     unsigned char r, g, b, a;
     bool operator==(const color &o) const {
@@ -2175,6 +2303,8 @@ static PyMethodDef emc_methods[] = {
 #define METH(name, doc) { #name, (PyCFunction) py##name, METH_VARARGS, doc }
 METH(draw_lines, "Draw a bunch of lines in the 'rs274.glcanon' format"),
 METH(draw_dwells, "Draw a bunch of dwell positions in the 'rs274.glcanon' format"),
+METH(pack_lines, "Convert lines in the 'rs274.glcanon' format to packed line strip vertex and line-number run buffers"),
+METH(draw_packed, "Draw the vertex buffers made by pack_lines with array calls"),
 METH(line9, "Draw a single line in the 'rs274.glcanon' format; assumes glBegin(GL_LINES)"),
 METH(vertex9, "Get the 3d location for a 9d point"),
     {NULL}
@@ -60,6 +60,9 @@ sys.setdlopenflags(old_flags)
 from rs274.OpenGLTk import *
 from rs274.interpret import StatMixin
 from rs274.glcanon import GLCanon, GlCanonDraw
+import rs274.previewcache
+import rs274.cycletime
+import statusbroker
 from hershey import Hershey
 from propertywindow import properties
 import rs274.options
@@ -699,7 +702,7 @@ class LivePlotter:
         if not os.path.exists(linuxcnc.nmlfile):
             return False
         try:
-            self.stat = linuxcnc.stat()
+            self.stat = statusbroker.status()
         except linuxcnc.error:
             return False
         self.last_task_mode = self.stat.task_mode
@@ -1026,13 +1029,17 @@ class Progress:
 
 class AxisCanon(GLCanon, StatMixin):
     def __init__(self, widget, text, linecount, progress, arcdivision):
-        GLCanon.__init__(self, widget.colors, geometry, foam)
+        GLCanon.__init__(self, widget.colors, geometry, foam,
+            columnar_preview)
         StatMixin.__init__(self, s, random_toolchanger)
         self.text = text
         self.linecount = linecount
         self.progress = progress
         self.aborted = False
         self.arcdivision = arcdivision
+        # When set, the canon runs in the preview loader thread and must
+        # leave all Tk calls to the main thread
+        self.background = False
 
     def change_tool(self, pocket):
         GLCanon.change_tool(self, pocket)
@@ -1044,12 +1051,17 @@ class AxisCanon(GLCanon, StatMixin):
         self.aborted = True
 
     def check_abort(self):
-        root_window.update()
+        if not self.background:
+            root_window.update()
         if self.aborted: raise KeyboardInterrupt
 
     def next_line(self, st):
         GLCanon.next_line(self, st)
+        if self.background: return
         self.progress.update(self.lineno)
+        self.show_notify()
+
+    def show_notify(self):
         if self.notify:
             notifications.add("info",self.notify_message)
             self.notify = 0
@@ -1116,8 +1128,40 @@ def cancel_open(event=None):
     if o.canon is not None:
         o.canon.aborted = True
 
+def load_preview_background(f, canon, progress, initcodes, interpname,
+        cache_key=None):
+    global preview_loader
+    if cache_key and os.path.exists(preview_cache.path(cache_key)):
+        return o.load_preview_cached(preview_cache, cache_key, f, canon,
+            initcodes, interpname)
+    canon.background = True
+    # Let the operator keep using the rest of the window while loading
+    root_window.tk.call("grab", "release", ".info.progress")
+    preview_loader = loader = o.load_preview_async(f, canon, initcodes, interpname)
+    try:
+        while not loader.poll():
+            progress.update(canon.lineno)
+            canon.show_notify()
+            if loader.changed:
+                o.tkRedraw()
+            root_window.update()
+            time.sleep(.02)
+    finally:
+        if loader.is_alive():
+            loader.cancel()
+            loader.join()
+        preview_loader = None
+    canon.show_notify()
+    if cache_key and not canon.aborted:
+        preview_cache.store(cache_key, canon, loader.result, loader.seq)
+    return loader.result, loader.seq
+
+preview_loader = None
 loaded_file = None
 def open_file_guts(f, filtered=False, addrecent=True):
+    if preview_loader is not None:
+        notifications.add("info", _("Still loading the previous program"))
+        return
     s.poll()
     save_task_mode = s.task_mode
     ensure_mode(linuxcnc.MODE_MANUAL)
@@ -1218,7 +1262,19 @@ def open_file_guts(f, filtered=False, addrecent=True):
                 if m == -1: continue
                 initcodes.append("M%d" % m)
         try:
-            result, seq = o.load_preview(f, canon, initcodes, interpname)
+            cache_key = None
+            if preview_cache is not None:
+                cache_key = preview_cache.key(f, (initcodes, interpname),
+                    (temp_parameter,), (geometry, foam, arcdivision,
+                        random_toolchanger, repr(s.tool_table)))
+            if background_preview:
+                result, seq = load_preview_background(f, canon, progress,
+                    initcodes, interpname, cache_key)
+            elif cache_key:
+                result, seq = o.load_preview_cached(preview_cache, cache_key,
+                    f, canon, initcodes, interpname)
+            else:
+                result, seq = o.load_preview(f, canon, initcodes, interpname)
         except KeyboardInterrupt:
             result, seq = 0, 0
         # According to the documentation, MIN_ERROR is the largest value that is
@@ -1502,6 +1558,8 @@ class DummyCanon:
         self.number = p
 
 def parse_gcode_expression(e):
+    if preview_loader is not None:
+        return 0, _("Cannot evaluate while a program is loading")
     f = os.path.devnull
     canon = DummyCanon()
 
@@ -1970,18 +2028,12 @@ class TclCommands(nf.TclCommands):
                 units = _("in")
                 fmt = "%.4f"
 
-            mf = vars.max_speed.get()
-            #print o.canon.traverse[0]
+            mf = to_internal_linear_unit(vars.max_speed.get())
+            est = rs274.cycletime.estimate(o.canon, machine_limits, mf)
+            g0 = est.rapid_distance
+            g1 = est.feed_distance
+            gt = est.time
 
-            g0 = sum(dist(l[1][:3], l[2][:3]) for l in o.canon.traverse)
-            g1 = (sum(dist(l[1][:3], l[2][:3]) for l in o.canon.feed) +
-                sum(dist(l[1][:3], l[2][:3]) for l in o.canon.arcfeed))
-            gt = (sum(dist(l[1][:3], l[2][:3])/min(mf, l[3]) for l in o.canon.feed) +
-                sum(dist(l[1][:3], l[2][:3])/min(mf, l[3])  for l in o.canon.arcfeed) +
-                sum(dist(l[1][:3], l[2][:3])/mf  for l in o.canon.traverse) +
-                o.canon.dwell_time
-                )
- 
             props['g0'] = "%f %s".replace("%f", fmt) % (from_internal_linear_unit(g0, conv), units)
             props['g1'] = "%f %s".replace("%f", fmt) % (from_internal_linear_unit(g1, conv), units)
             if gt > 120:
@@ -3598,6 +3650,10 @@ root_window.call(widgets.jogincr._w, "select", 0)
 vcp = inifile.find("DISPLAY", "PYVCP")
 
 arcdivision = int(inifile.find("DISPLAY", "ARCDIVISION") or 64)
+columnar_preview = bool(int(inifile.find("DISPLAY", "COLUMNAR_PREVIEW") or 0))
+background_preview = bool(int(inifile.find("DISPLAY", "BACKGROUND_PREVIEW") or 0))
+preview_cache = rs274.previewcache.from_ini(inifile)
+machine_limits = rs274.cycletime.limits_from_ini(inifile)
 
 del sys.argv[1:3]
 
@@ -31,7 +31,7 @@ except ImportError:
 import numpy.core
 plus_inf = numpy.core.Inf
 
-from rs274.author import Gcode
+from rs274.author import Gcode, StreamingGcode
 import rs274.options
 
 from math import *
@@ -76,6 +76,59 @@ def make_tool_shape(f, wdia, resp):
     n = n - n.min()
     return n
 
+def tool_dilate(image, tool, report=None):
+    """\
+For every position of the tool over the image, the lowest height at which
+the tool touches the image: out[y,x] = max(image[y+a,x+b] - tool[a,b]).
+
+The result has the shape of the positions where the tool fits entirely
+inside the image.  Instead of visiting every output pixel, this loops over
+the pixels of the tool and handles the whole image with each."""
+    w, h = image.shape
+    tw, th = tool.shape
+    ow = w - tw + 1
+    oh = h - th + 1
+    out = numpy.empty((ow, oh), dtype=numpy.float32)
+    out.fill(-plus_inf)
+    tmp = numpy.empty((ow, oh), dtype=numpy.float32)
+    for a in range(tw):
+        if report: report(a, tw)
+        for b in range(th):
+            t = tool[a, b]
+            if t == plus_inf: continue
+            numpy.subtract(image[a:a+ow, b:b+oh], t, tmp)
+            numpy.maximum(out, tmp, out)
+    return out
+
+def _dilate_tile(args):
+    return tool_dilate(*args)
+
+def tool_dilate_tiled(image, tool, processes):
+    """\
+tool_dilate, with the output split into bands of rows that are computed by
+'processes' worker processes (0 means one per CPU)"""
+    import multiprocessing
+    if processes <= 0:
+        processes = multiprocessing.cpu_count()
+    w, h = image.shape
+    tw, th = tool.shape
+    ow = w - tw + 1
+    if processes < 2 or ow < 2 * processes:
+        return tool_dilate(image, tool, progress)
+    nbands = processes * 4
+    bounds = [ow * k / nbands for k in range(nbands + 1)]
+    tiles = [(image[a:b+tw-1], tool) for a, b in zip(bounds, bounds[1:])
+                if b > a]
+    pool = multiprocessing.Pool(processes)
+    try:
+        bands = []
+        for band in pool.imap(_dilate_tile, tiles):
+            bands.append(band)
+            progress(len(bands), len(tiles))
+    finally:
+        pool.terminate()
+    return numpy.concatenate(bands)
+
 def amax(seq):
     res = 0
     for i in seq:
@@ -210,7 +263,7 @@ class Converter:
             image, units, tool_shape, pixelsize, pixelstep, safetyheight, \
             tolerance, feed, convert_rows, convert_cols, cols_first_flag,
             entry_cut, spindle_speed, roughing_offset, roughing_delta,
-            roughing_feed):
+            roughing_feed, processes=1, fit_arcs=False, output=None):
         self.image = image
         self.units = units
         self.tool = tool_shape
@@ -227,8 +280,9 @@ class Converter:
         self.roughing_offset = roughing_offset
         self.roughing_delta = roughing_delta
         self.roughing_feed = roughing_feed
-
-        self.cache = {}
+        self.processes = processes
+        self.fit_arcs = fit_arcs
+        self.output = output or sys.stdout
 
         w, h = self.w, self.h = image.shape
         ts = self.ts = tool_shape.shape[0]
@@ -238,10 +292,21 @@ class Converter:
 
         self.tool_shape = tool_shape * self.pixelsize * ts / 2;
     
+    def dilate(self, image, tool):
+        if self.processes != 1:
+            return tool_dilate_tiled(image, tool, self.processes)
+        return tool_dilate(image, tool, progress)
+
     def one_pass(self):
         g = self.g
         g.set_feed(self.feed)
 
+        # the heights of the tool are float32 like the image, but the
+        # pass depth, the offset and the slopes are applied in float64
+        z = numpy.maximum(self.zmap.astype(numpy.float64), self.rd) + self.ro
+        self.z = numpy.minimum(z, 0)
+        self.dz_dy, self.dz_dx = numpy.gradient(self.z, self.pixelsize)
+
         if self.convert_cols and self.cols_first_flag:
             self.g.set_plane(19)
             self.mill_cols(self.convert_cols, True)
@@ -260,10 +325,14 @@ class Converter:
         g.safety()
 
     def convert(self):
-        self.g = g = Gcode(safetyheight=self.safetyheight,
+        if self.fit_arcs: writer = StreamingGcode
+        else: writer = Gcode
+        write = self.output.write
+        self.g = g = writer(safetyheight=self.safetyheight,
                            tolerance=self.tolerance,
                            spindle_speed=self.spindle_speed,
-                           units=self.units)
+                           units=self.units,
+                           target=lambda s: write(s + "\n"))
         g.begin()
         g.continuous(self.tolerance)
         g.safety()
@@ -277,11 +346,8 @@ class Converter:
             h1 = h + th
             nim1 = numpy.zeros((w1, h1), dtype=numpy.float32) + base_image.min()
             nim1[tw/2:tw/2+w, th/2:th/2+h] = base_image
-            self.image = numpy.zeros((w,h), dtype=numpy.float32)
-            for j in range(0, w):
-                progress(j,w)
-                for i in range(0, h):
-                    self.image[j,i] = (nim1[j:j+tw,i:i+th] - rough).max()
+            self.image = self.dilate(nim1, rough)[:w, :h]
+            self.zmap = self.dilate(self.image, self.tool)
             self.feed = self.roughing_feed
             r = -self.roughing_delta
             m = self.image.min()
@@ -294,7 +360,7 @@ class Converter:
                 self.rd = m
                 self.one_pass()
             self.image = base_image
-            self.cache.clear()
+        self.zmap = self.dilate(self.image, self.tool)
         self.feed = self.base_feed
         self.ro = 0
         self.rd = self.image.min()
@@ -302,24 +368,13 @@ class Converter:
         g.end()
 
     def get_z(self, x, y):
-        try:
-            return min(0, max(self.rd, self.cache[x,y]) + self.ro)
-        except KeyError:
-            m1 = self.image[y:y+self.ts, x:x+self.ts]
-            self.cache[x,y] = d = (m1 - self.tool).max()
-            return min(0, max(self.rd, d) + self.ro)
-        
+        return self.z[y, x]
+
     def get_dz_dy(self, x, y):
-        y1 = max(0, y-1)
-        y2 = min(self.image.shape[0]-1, y+1)
-        dy = self.pixelsize * (y2-y1)
-        return (self.get_z(x, y2) - self.get_z(x, y1)) / dy
-        
+        return self.dz_dy[y, x]
+
     def get_dz_dx(self, x, y):
-        x1 = max(0, x-1)
-        x2 = min(self.image.shape[1]-1, x+1)
-        dx = self.pixelsize * (x2-x1)
-        return (self.get_z(x2, y) - self.get_z(x1, y)) / dx
+        return self.dz_dx[y, x]
 
     def mill_rows(self, convert_scan, primary):
         w1 = self.w1; h1 = self.h1;
@@ -331,11 +386,13 @@ class Converter:
         for j in jrange:
             progress(jrange.index(j), len(jrange))
             y = (w1-j) * pixelsize
+            z = self.z[j, :h1].tolist()
+            dz_dx = self.dz_dx[j, :h1].tolist()
+            dz_dy = self.dz_dy[j, :h1].tolist()
             scan = []
             for i in irange:
                 x = i * pixelsize
-                milldata = (i, (x, y, self.get_z(i, j)),
-                    self.get_dz_dx(i, j), self.get_dz_dy(i, j))
+                milldata = (i, (x, y, z[i]), dz_dx[i], dz_dy[i])
                 scan.append(milldata)
             for flag, points in convert_scan(primary, scan):
                 if flag:
@@ -355,11 +412,13 @@ class Converter:
         for j in jrange:
             progress(jrange.index(j), len(jrange))
             x = j * pixelsize
+            z = self.z[:w1, j].tolist()
+            dz_dx = self.dz_dx[:w1, j].tolist()
+            dz_dy = self.dz_dy[:w1, j].tolist()
             scan = []
             for i in irange:
                 y = (w1-i) * pixelsize
-                milldata = (i, (x, y, self.get_z(j, i)),
-                    self.get_dz_dy(j, i), self.get_dz_dx(j, i))
+                milldata = (i, (x, y, z[i]), dz_dy[i], dz_dx[i])
                 scan.append(milldata)
             for flag, points in convert_scan(primary, scan):
                 if flag:
@@ -630,6 +689,8 @@ def ui(im, nim, im_name):
         ("contact_angle", floatentry),
         ("roughing_offset", floatentry),
         ("roughing_depth", floatentry),
+        ("fit_arcs", checkbutton),
+        ("processes", intentry),
     ]
 
     defaults = dict(
@@ -653,6 +714,8 @@ def ui(im, nim, im_name):
         spindle_speed = 1000,
         roughing_offset = .1,
         roughing_depth = .25,
+        fit_arcs = False,
+        processes = 1,
     )
 
     texts = dict(
@@ -676,6 +739,8 @@ def ui(im, nim, im_name):
         spindle_speed=_("Spindle Speed (RPM)"),
         roughing_offset=_("Roughing offset (units, 0=no roughing)"),
         roughing_depth=_("Roughing depth per pass (units)"),
+        fit_arcs=_("Fit Arcs"),
+        processes=_("Worker processes (0=one per CPU)"),
     )
 
     try:
@@ -749,6 +814,10 @@ def ui(im, nim, im_name):
     return defaults
 
 def main():
+    if len(sys.argv) > 2:
+        output = open(sys.argv[2], "w", 1 << 20)
+    else:
+        output = sys.stdout
     if len(sys.argv) > 1:
         im_name = sys.argv[1]
     else:
@@ -827,7 +896,10 @@ def main():
     convert(nim, units, tool, pixel_size, step,
         options['safety_height'], options['tolerance'], options['feed_rate'],
         convert_rows, convert_cols, columns_first, ArcEntryCut(options['plunge_feed_rate'], .125),
-        spindle_speed, options['roughing_offset'], options['roughing_depth'], options['feed_rate'])
+        spindle_speed, options['roughing_offset'], options['roughing_depth'], options['feed_rate'],
+        options['processes'], options['fit_arcs'], output)
+    if output is not sys.stdout:
+        output.close()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python2
+#    Publish the LinuxCNC status for all GUIs and panels of a session
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""Usage: status-broker [-ini inifile] [-i interval_ms] [-f file]
+
+Polls linuxcnc.stat every [DISPLAY]STATUS_BROKER_INTERVAL ms (default 50)
+and publishes it for statusbroker.stat() readers until LinuxCNC exits or
+the broker gets SIGTERM."""
+
+import sys, getopt, signal, time
+import linuxcnc
+import statusbroker
+
+def usage(code):
+    print >>sys.stderr, __doc__
+    sys.exit(code)
+
+def main():
+    interval = None
+    if len(sys.argv) > 2 and sys.argv[1] == '-ini':
+        ini = linuxcnc.ini(sys.argv[2])
+        linuxcnc.nmlfile = ini.find("EMC", "NML_FILE") or linuxcnc.nmlfile
+        v = ini.find("DISPLAY", "STATUS_BROKER_INTERVAL")
+        if v: interval = float(v) / 1000
+        del sys.argv[1:3]
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "i:f:h")
+    except getopt.GetoptError, detail:
+        print >>sys.stderr, detail
+        usage(1)
+    path = None
+    for o, a in opts:
+        if o == '-i':
+            interval = float(a) / 1000
+        elif o == '-f':
+            path = a
+        elif o == '-h':
+            usage(0)
+
+    # the task may still be starting
+    for i in range(50):
+        try:
+            s = linuxcnc.stat()
+            break
+        except linuxcnc.error:
+            time.sleep(.1)
+    else:
+        print >>sys.stderr, "status-broker: LinuxCNC is not running"
+        sys.exit(1)
+
+    broker = statusbroker.Broker(path, interval or statusbroker.DEFAULT_INTERVAL, s)
+    def stop(signum, frame):
+        raise SystemExit
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        broker.run()
+    except (KeyboardInterrupt, linuxcnc.error):
+        pass
+
+if __name__ == '__main__':
+    main()
+
+# vim:sw=4:sts=4:et
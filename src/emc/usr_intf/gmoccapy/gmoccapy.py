@@ -37,6 +37,7 @@ import atexit              # needed to register child's to be closed on closing
 import subprocess          # to launch onboard and other processes
 import tempfile            # needed only if the user click new in edit mode to open a new empty file
 import linuxcnc            # to get our own error system
+import statusbroker        # shared status polling
 import gobject             # needed to add the timer for periodic
 import locale              # for setting the language of the GUI
 import gettext             # to extract the strings to be translated
@@ -158,7 +159,9 @@ class gmoccapy(object):
         # needed components to comunicate with hal and linuxcnc
         self.halcomp = hal.component("gmoccapy")
         self.command = linuxcnc.command()
-        self.stat = linuxcnc.stat()
+        # _periodic reads the shared status with update(), the button
+        # handlers poll() linuxcnc itself after sending a command
+        self.stat = statusbroker.command_status()
 
         self.error_channel = linuxcnc.error_channel()
         # initial poll, so all is up to date
@@ -1555,7 +1558,7 @@ class gmoccapy(object):
         # we put the poll comand in a try, so if the linuxcnc pid is killed
         # from an external command, we also quit the GUI
         try:
-            self.stat.poll()
+            self.stat.update()
         except:
             raise SystemExit, "gmoccapy can not poll linuxcnc status any more"
 
@@ -47,6 +47,7 @@ import pango
 
 import rs274.glcanon
 import rs274.interpret
+import rs274.previewcache
 import linuxcnc
 import gcode
 
@@ -154,6 +155,9 @@ class Gremlin(gtk.gtkgl.widget.DrawingArea, glnav.GlNavBase,
         self.show_offsets = False
         self.use_default_controls = True
         self.mouse_btn_mode = 0
+        self.background_load = False
+        self.loader = None
+        self.preview_cache = rs274.previewcache.from_ini(inifile)
 
         self.a_axis_wrapped = inifile.find("AXIS_A", "WRAPPED_ROTARY")
         self.b_axis_wrapped = inifile.find("AXIS_B", "WRAPPED_ROTARY")
@@ -253,6 +257,15 @@ class Gremlin(gtk.gtkgl.widget.DrawingArea, glnav.GlNavBase,
         elif not filename and not s.file:
             return
 
+        if self.loader is not None:
+            # only one preview can be interpreted at a time.  The old one
+            # is dropped without finishing it, which would draw outside
+            # the GL context; its timer stops as it is no longer current.
+            old, self.loader = self.loader, None
+            old.cancel()
+            old.join()
+            shutil.rmtree(old.tempdir)
+
         td = tempfile.mkdtemp()
         self._current_file = filename
         try:
@@ -266,14 +279,52 @@ class Gremlin(gtk.gtkgl.widget.DrawingArea, glnav.GlNavBase,
 
             unitcode = "G%d" % (20 + (s.linear_units == 1))
             initcode = self.inifile.find("RS274NGC", "RS274NGC_STARTUP_CODE") or ""
-            result, seq = self.load_preview(filename, canon, unitcode, initcode)
+            cache = self.preview_cache
+            cache_key = None
+            if cache is not None:
+                cache_key = cache.key(filename, (unitcode, initcode),
+                    (temp_parameter,), (self.geometry, self.lathe_option,
+                        random, repr(s.tool_table)))
+            # a cached preview is read at once, even with background_load
+            cached = cache_key and os.path.exists(cache.path(cache_key))
+            if self.background_load and not cached:
+                self.loader = self.load_preview_async(filename, canon, unitcode, initcode)
+                self.loader.tempdir = td
+                self.loader.cache_key = cache_key
+                td = None
+                gobject.timeout_add(100, self.poll_loader, self.loader)
+                return
+            if cache_key:
+                result, seq = self.load_preview_cached(cache, cache_key,
+                    filename, canon, unitcode, initcode)
+            else:
+                result, seq = self.load_preview(filename, canon, unitcode, initcode)
             if result > gcode.MIN_ERROR:
                 self.report_gcode_error(result, seq, filename)
 
         finally:
-            shutil.rmtree(td)
+            if td: shutil.rmtree(td)
+
+        self.set_current_view()
 
+    def _poll_loader(self, loader):
+        if loader is not self.loader: return False
+        try:
+            done = loader.poll()
+        finally:
+            if loader.finished:
+                self.loader = None
+                shutil.rmtree(loader.tempdir)
+        if loader.changed: self.queue_draw()
+        if not done: return True
+        if loader.cache_key and not loader.canon.aborted:
+            self.preview_cache.store(loader.cache_key, loader.canon,
+                loader.result, loader.seq)
+        if loader.result > gcode.MIN_ERROR:
+            self.report_gcode_error(loader.result, loader.seq, loader.f)
         self.set_current_view()
+        return False
+    poll_loader = rs274.glcanon.with_context(_poll_loader)
 
     def get_program_alpha(self): return self.program_alpha
     def get_num_joints(self): return self.num_joints
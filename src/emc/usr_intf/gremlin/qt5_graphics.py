@@ -30,6 +30,8 @@ import pango
 import glnav
 from rs274 import glcanon
 from rs274 import interpret
+from rs274 import cycletime
+from rs274 import previewcache
 import linuxcnc
 import gcode
 
@@ -186,6 +188,13 @@ class Lcnc_3dGraphics(QGLWidget,  glcanon.GlCanonDraw, glnav.GlNavBase):
         self.use_default_controls = True
         self.mouse_btn_mode = 0
         self.use_gradient_background = False
+        self.background_load = False
+        self.loader = None
+        self.preview_cache = previewcache.from_ini(self.inifile)
+        self.loader_timer = QTimer()
+        self.loader_timer.timeout.connect(self.poll_loader)
+        self.machine_limits = cycletime.limits_from_ini(self.inifile)
+        self.estimate = None
 
         self.a_axis_wrapped = self.inifile.find("AXIS_A", "WRAPPED_ROTARY")
         self.b_axis_wrapped = self.inifile.find("AXIS_B", "WRAPPED_ROTARY")
@@ -233,6 +242,16 @@ class Lcnc_3dGraphics(QGLWidget,  glcanon.GlCanonDraw, glnav.GlNavBase):
         elif not filename and not s.file:
             return
 
+        if self.loader is not None:
+            # only one preview can be interpreted at a time.  The old one
+            # is dropped without finishing it, which would draw outside
+            # the GL context.
+            old, self.loader = self.loader, None
+            self.loader_timer.stop()
+            old.cancel()
+            old.join()
+            shutil.rmtree(old.tempdir)
+
         td = tempfile.mkdtemp()
         self._current_file = filename
         try:
@@ -245,21 +264,63 @@ class Lcnc_3dGraphics(QGLWidget,  glcanon.GlCanonDraw, glnav.GlNavBase):
             canon.parameter_file = temp_parameter
             unitcode = "G%d" % (20 + (s.linear_units == 1))
             initcode = self.inifile.find("RS274NGC", "RS274NGC_STARTUP_CODE") or ""
-            result, seq = self.load_preview(filename, canon, unitcode, initcode)
+            cache = self.preview_cache
+            cache_key = None
+            if cache is not None:
+                cache_key = cache.key(filename, (unitcode, initcode),
+                    (temp_parameter,), (self.geometry, self.lathe_option,
+                        random, repr(s.tool_table)))
+            # a cached preview is read at once, even with background_load
+            cached = cache_key and os.path.exists(cache.path(cache_key))
+            if self.background_load and not cached:
+                self.loader = self.load_preview_async(filename, canon, unitcode, initcode)
+                self.loader.tempdir = td
+                self.loader.cache_key = cache_key
+                td = None
+                self.loader_timer.start(100)
+                return
+            if cache_key:
+                result, seq = self.load_preview_cached(cache, cache_key,
+                    filename, canon, unitcode, initcode)
+            else:
+                result, seq = self.load_preview(filename, canon, unitcode, initcode)
             if result > gcode.MIN_ERROR:
                 self.report_gcode_error(result, seq, filename)
             self.calculate_gcode_properties(canon)
         except:
             self.gcode_properties = None
         finally:
-            shutil.rmtree(td)
+            if td: shutil.rmtree(td)
 
 
         self.set_current_view()
 
+    def poll_loader(self):
+        loader = self.loader
+        if loader is None:
+            self.loader_timer.stop()
+            return
+        try:
+            done = loader.poll()
+        finally:
+            if loader.finished:
+                self.loader = None
+                self.loader_timer.stop()
+                shutil.rmtree(loader.tempdir)
+        if loader.changed: self.update()
+        if not done: return
+        if loader.cache_key and not loader.canon.aborted:
+            self.preview_cache.store(loader.cache_key, loader.canon,
+                loader.result, loader.seq)
+        if loader.result > gcode.MIN_ERROR:
+            self.report_gcode_error(loader.result, loader.seq, loader.f)
+        try:
+            self.calculate_gcode_properties(loader.canon)
+        except:
+            self.gcode_properties = None
+        self.set_current_view()
+
     def calculate_gcode_properties(self, canon):
-        def dist((x,y,z),(p,q,r)):
-            return ((x-p)**2 + (y-q)**2 + (z-r)**2) ** .5
         def from_internal_units(pos, unit=None):
             if unit is None:
                 unit = self.stat.linear_units
@@ -307,18 +368,12 @@ class Lcnc_3dGraphics(QGLWidget,  glcanon.GlCanonDraw, glnav.GlNavBase):
                 units = _("in")
                 fmt = "%.4f"
 
-            mf = max_speed
-            #print canon.traverse[0]
-
-            g0 = sum(dist(l[1][:3], l[2][:3]) for l in canon.traverse)
-            g1 = (sum(dist(l[1][:3], l[2][:3]) for l in canon.feed) +
-                sum(dist(l[1][:3], l[2][:3]) for l in canon.arcfeed))
-            gt = (sum(dist(l[1][:3], l[2][:3])/min(mf, l[3]) for l in canon.feed) +
-                sum(dist(l[1][:3], l[2][:3])/min(mf, l[3])  for l in canon.arcfeed) +
-                sum(dist(l[1][:3], l[2][:3])/mf  for l in canon.traverse) +
-                canon.dwell_time
-                )
- 
+            mf = max_speed / ((self.stat.linear_units or 1) * 25.4)
+            self.estimate = cycletime.estimate(canon, self.machine_limits, mf)
+            g0 = self.estimate.rapid_distance
+            g1 = self.estimate.feed_distance
+            gt = self.estimate.time
+
             props['G0'] = "%f %s".replace("%f", fmt) % (from_internal_linear_unit(g0, conv), units)
             props['gG1'] = "%f %s".replace("%f", fmt) % (from_internal_linear_unit(g1, conv), units)
             if gt > 120:
@@ -10,7 +10,9 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
-import math
+import numpy
+import statusbroker
+import dro_service
 
 
 class emc_control:
@@ -297,7 +299,10 @@ class emc_status:
             self.machine_units_mm=0
             self.unit_convert=[1]*9
             self.actual = 1
-            self.emcstat = emc.stat()
+            # the timer reads the shared status with update(),
+            # get_current_tool() polls linuxcnc itself as it can follow
+            # a command
+            self.emcstat = statusbroker.command_status()
             self.emcerror = emc.error_channel()
 
         def get_feedrate(self):
@@ -323,7 +328,7 @@ class emc_status:
         # angular axes are always 1 - They are not converted.
         def convert_units_list(self,v):
                 c = self.unit_convert
-                return map(lambda x,y: x*y, v, c)
+                return (numpy.asarray(v, float) * c[:len(v)]).tolist()
 
         # This converts the given data units if the current display mode (self.mm)
         # is not the same as the machine's basic units.
@@ -348,7 +353,8 @@ class emc_status:
                 return self.emcstat.tool_in_spindle
 
         def get_current_system(self):
-                self.emcstat.poll()
+                # read on the timer, just after periodic()
+                self.emcstat.update()
                 g = self.emcstat.gcodes
                 for i in g:
                         if i >= 540 and i <= 590:
@@ -358,44 +364,16 @@ class emc_status:
                 return 1
 
         def periodic(self):
-            self.emcstat.poll()
+            self.emcstat.update()
             am = self.emcstat.axis_mask
             lathe = not (self.emcstat.axis_mask & 2)
-            dtg = self.emcstat.dtg
 
-            if self.actual:
-                p = self.emcstat.actual_position
-            else:
-                p = self.emcstat.position
-
-            x = p[0] - self.emcstat.g5x_offset[0] - self.emcstat.tool_offset[0]
-            y = p[1] - self.emcstat.g5x_offset[1] - self.emcstat.tool_offset[1]
-            z = p[2] - self.emcstat.g5x_offset[2] - self.emcstat.tool_offset[2]
-            a = p[3] - self.emcstat.g5x_offset[3] - self.emcstat.tool_offset[3]
-            b = p[4] - self.emcstat.g5x_offset[4] - self.emcstat.tool_offset[4]
-            c = p[5] - self.emcstat.g5x_offset[5] - self.emcstat.tool_offset[5]
-            u = p[6] - self.emcstat.g5x_offset[6] - self.emcstat.tool_offset[6]
-            v = p[7] - self.emcstat.g5x_offset[7] - self.emcstat.tool_offset[7]
-            w = p[8] - self.emcstat.g5x_offset[8] - self.emcstat.tool_offset[8]
-
-            if self.emcstat.rotation_xy != 0:
-                t = math.radians(-self.emcstat.rotation_xy)
-                xr = x * math.cos(t) - y * math.sin(t)
-                yr = x * math.sin(t) + y * math.cos(t)
-                x = xr
-                y = yr
-
-            x -= self.emcstat.g92_offset[0] 
-            y -= self.emcstat.g92_offset[1] 
-            z -= self.emcstat.g92_offset[2] 
-            a -= self.emcstat.g92_offset[3] 
-            b -= self.emcstat.g92_offset[4] 
-            c -= self.emcstat.g92_offset[5] 
-            u -= self.emcstat.g92_offset[6] 
-            v -= self.emcstat.g92_offset[7] 
-            w -= self.emcstat.g92_offset[8] 
-
-            relp = [x, y, z, a, b, c, u, v, w]
+            # all nine axes in one pass, shared with the gladevcp DRO's
+            p, relp, dtg = dro_service.positions(self.emcstat)
+            row = not self.actual and 1 or 0
+            p = p[row].tolist()
+            relp = relp[row].tolist()
+            dtg = dtg.tolist()
 
             if self.mm != self.machine_units_mm:
                 p = self.convert_units_list(p)
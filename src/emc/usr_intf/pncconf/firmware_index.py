@@ -0,0 +1,428 @@
+#!/usr/bin/env python
+#
+#    This is PNCconf, a graphical configuration editor for LinuxCNC
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#    This reads the Mesa firmware XML files.
+#    The parsed firmware data is kept in an index file, keyed by the
+#    modification time and size of each XML file, so only new or changed
+#    files are parsed; those are parsed in worker processes.
+#
+import os
+import sys
+import traceback
+import cPickle as pickle
+import multiprocessing
+import xml.etree.ElementTree
+
+# bump when the parsed data changes
+INDEX_VERSION = 1
+# fewer files than this are not worth starting worker processes for
+PARALLEL_MIN = 4
+
+def dbg(message, mtype='all'):
+    pass
+
+class FIRMWARE:
+    def __init__(self,app):
+        # access to:
+        global _PD
+        _PD = app._p    # private data
+        global dbg
+        dbg = app.dbg
+        self.a = app    # The parent, pncconf
+        self.index_path = _PD.FIRMINDEX
+        self.index = None
+
+    # the parsed data holds the translated pin type names, so an index
+    # made in another language is no good
+    def signature(self):
+        names = [getattr(_PD, n) for n in sorted(dir(_PD)) if n.startswith('pintype_')]
+        return INDEX_VERSION, repr(names)
+
+    def load_index(self):
+        if self.index is not None: return
+        self.index = {}
+        try:
+            f = open(self.index_path, 'rb')
+            try:
+                signature, index = pickle.load(f)
+            finally:
+                f.close()
+        except (IOError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            return
+        except:
+            print '**** PNCconf: bad firmware index %s: %s' % (self.index_path, sys.exc_info()[1])
+            return
+        if signature == self.signature():
+            self.index = index
+
+    def save_index(self):
+        temp = self.index_path + '.%d' % os.getpid()
+        try:
+            f = open(temp, 'wb')
+            try:
+                pickle.dump((self.signature(), self.index), f, pickle.HIGHEST_PROTOCOL)
+            finally:
+                f.close()
+            os.rename(temp, self.index_path)
+        except (IOError, OSError), e:
+            print '**** PNCconf: could not save firmware index %s: %s' % (self.index_path, e)
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
+
+    def firmware_files(self, boardtitle):
+        """(firmname, path, key) of the firmware XML files of a board"""
+        files = []
+        folder = os.path.join(_PD.FIRMDIR, boardtitle)
+        if boardtitle in _PD.MESABLACKLIST: return files
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return files
+        for name in names:
+            if name in _PD.MESABLACKLIST:continue
+            if not ".xml" in name:continue
+            path = os.path.join(folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isdir(path):continue
+            dbg('%s'% name)
+            files.append((name.rstrip(".xml"), path, (st.st_mtime, st.st_size)))
+        return files
+
+    def search(self, boardtitle, progress=None):
+        """The firmware data of all the firmware XML files of a board.
+        Files not in the index are parsed, and progress(fraction) is
+        called as they are done."""
+        self.load_index()
+        files = self.firmware_files(boardtitle)
+        dbg("\nXML list:%s"%[f[0] for f in files],mtype="firmname")
+        todo = [(boardtitle, firmname, path) for firmname, path, key in files
+                if self.index.get(path, (None,))[0] != key]
+        if todo:
+            keys = dict([(path, key) for firmname, path, key in files])
+            for n, (path, firmdata) in enumerate(self.parse_all(todo)):
+                self.index[path] = (keys[path], firmdata)
+                if progress: progress((n + 1) * 1.0 / len(todo))
+            self.save_index()
+        result = []
+        for firmname, path, key in files:
+            firmdata = self.index[path][1]
+            # an XML file that lacks the board information
+            if firmdata is None: continue
+            result.append(firmdata)
+        return result
+
+    def parse_all(self, todo):
+        """(path, firmdata) of each (boardtitle, firmname, path) of todo,
+        in the order they are done"""
+        if len(todo) >= PARALLEL_MIN:
+            try:
+                pool = multiprocessing.Pool()
+            except OSError:
+                pool = None
+            if pool is not None:
+                try:
+                    for path, firmdata, error in pool.imap_unordered(_parse, todo):
+                        if error is not None:
+                            # once more here, to report it as it always was
+                            boardtitle, firmname = [t[:2] for t in todo if t[2] == path][0]
+                            firmdata = parse_xml(None, boardtitle, firmname, path)
+                        yield path, firmdata
+                finally:
+                    pool.terminate()
+                return
+        for boardtitle, firmname, path in todo:
+            # XMLs don't tell us the driver type so set to None (parse will guess)
+            yield path, parse_xml(None, boardtitle, firmname, path)
+
+# runs in the worker processes
+def _parse(args):
+    boardtitle, firmname, path = args
+    try:
+        # XMLs don't tell us the driver type so set to None (parse will guess)
+        return path, parse_xml(None, boardtitle, firmname, path), None
+    except:
+        return path, None, traceback.format_exc()
+
+def parse_xml(driver, boardtitle, firmname, xml_path):
+    def search(elementlist):
+        for i in elementlist:
+            temp = root.find(i)
+            if temp is not None:
+                return temp.text
+        return temp
+
+    root = xml.etree.ElementTree.parse(xml_path)
+    watchdog = encoder = resolver = pwmgen = led = muxedqcount = 0
+    stepgen = tppwmgen = sserialports = sserialchannels = 0
+    numencoderpins = numpwmpins = 3; numstepperpins = 2; numttpwmpins = 0; numresolverpins = 10
+
+    text = search(('boardname','BOARDNAME'))
+    if text == None:
+        print 'Missing info: boardname'
+        return
+    boardname = text.lower()
+    #dbg("\nBoard and firmwarename:  %s %s\n"%( boardname, firmname), "firmraw")
+
+    text  = search(("IOPORTS","ioports")) ; #print numcnctrs
+    if text == None:
+        print 'Missing info: ioports'
+        return
+    numcnctrs = int(text)
+    text = search(("PORTWIDTH","portwidth"))
+    if text == None:
+        print 'Missing info: portwidth'
+        return
+    portwidth = int(text)
+    maxgpio  = numcnctrs * portwidth ; #print maxgpio
+    placeholders = 24-portwidth
+    text = search(("CLOCKLOW","clocklow")) ; #print lowfreq
+    if text == None:
+        print 'Missing info: clocklow'
+        return
+    lowfreq = int(text)/1000000
+    text = search(("CLOCKHIGH","clockhigh")); #print hifreq
+    if text == None:
+        print 'Missing info: clockhigh'
+        return
+    hifreq = int(text)/1000000
+    modules = root.findall(".//modules")[0]
+    if driver == None:
+        if "7i43" in boardname:
+            driver = "hm2_7i43"
+        elif "7i90" in boardname:
+            driver = "hm2_7i90"
+        elif '7i76e' in boardname or '7i92' in boardname or '7i80' in boardname:
+            driver = 'hm2_eth'
+        else:
+            driver = 'hm2_pci'
+    for i,j in enumerate(modules):
+        k = modules[i].find("tagname").text
+        print k
+        if k in ("Watchdog","WatchDog","WATCHDOG"): 
+            l = modules[i].find("numinstances").text;#print l,k
+            watchdog = int(l)
+        elif k in ("Encoder","QCOUNT"): 
+            l = modules[i].find("numinstances").text;#print l,k
+            encoder = int(l)
+        elif k in ("ResolverMod","RESOLVERMOD"):
+            l = modules[i].find("numinstances").text;#print l,k
+            resolver = int(l)
+        elif k in ("PWMGen","PWMGEN","PWM"):
+            l = modules[i].find("numinstances").text;#print l,k
+            pwmgen = int(l)
+        elif k == "LED": 
+            l = modules[i].find("numinstances").text;#print l,k
+            led = int(l)
+        elif k in ("MuxedQCount","MUXEDQCOUNT"): 
+            l = modules[i].find("numinstances").text;#print l,k
+            muxedqcount = int(l)
+        elif k in ("StepGen","STEPGEN"): 
+            l = modules[i].find("numinstances").text;#print l,k
+            stepgen = int(l)
+        elif k in ("TPPWM","TPPWM"): 
+            l = modules[i].find("numinstances").text;#print l,k
+            tppwmgen = int(l)
+        elif k in ("SSerial","SSERIAL"):
+            l = modules[i].find("numinstances").text;#print l,k
+            sserialports = int(l)
+        elif k in ("None","NONE"): 
+            l = modules[i].find("numinstances").text;#print l,k
+        elif k in ("IOPort","AddrX","MuxedQCountSel"):
+            continue
+        else:
+            print "**** WARNING: Pncconf parsing firmware: tagname (%s) not reconized"% k
+
+    discov_sserial = []
+    ssname = root.findall("SSERIALDEVICES/SSERIALFUNCTION")
+    for i in (ssname):
+        port = i.find("PORT").text
+        dev = i.find("DEVICE").text
+        chan = i.find("CHANNEL").text
+        discov_sserial.append((int(port),int(chan),dev))
+    print 'discovered sserial:', discov_sserial
+
+    pins = root.findall(".//pins")[0]
+    temppinlist = []
+    tempconlist = []
+    pinconvertenc = {"PHASE A":_PD.ENCA,"PHASE B":_PD.ENCB,"INDEX":_PD.ENCI,"INDEXMASK":_PD.ENCM,
+        "QUAD-A":_PD.ENCA,"QUAD-B":_PD.ENCB,"QUAD-IDX":_PD.ENCI,
+        "MUXED PHASE A":_PD.MXE0,"MUXED PHASE B":_PD.MXE1,"MUXED INDEX":_PD.MXEI,
+        "MUXED INDEX MASK":_PD.MXEM,"MUXED ENCODER SELECT 0":_PD.MXES,"MUXED ENCODER SELEC":_PD.MXES,
+        "MUXQ-A":_PD.MXE0,"MUXQ-B":_PD.MXE1,"MUXQ-IDX":_PD.MXEI,"MUXSEL0":_PD.MXES}
+    pinconvertresolver = {"RESOLVER POWER ENABLE":_PD.RESU,"RESOLVER SPIDI 0":_PD.RES0,
+         "RESOLVER SPIDI 1":_PD.RES1,"RESOLVER ADC CHANNEL 2":_PD.RES2,"RESOLVER ADC CHANNEL 1":_PD.RES3,
+         "RESOLVER ADC CHANNEL 0":_PD.RES4,"RESOLVER SPI CLK":_PD.RES5,"RESOLVER SPI CHIP SELECT":_PD.RESU,
+         "RESOLVER PDMM":_PD.RESU,"RESOLVER PDMP":_PD.RESU}
+    pinconvertstep = {"STEP":_PD.STEPA,"DIR":_PD.STEPB,"STEP/TABLE1":_PD.STEPA,"DIR/TABLE2":_PD.STEPB}
+        #"StepTable 2":STEPC,"StepTable 3":STEPD,"StepTable 4":STEPE,"StepTable 5":STEPF
+    pinconvertppwm = {"PWM/UP":_PD.PWMP,"DIR/DOWN":_PD.PWMD,"ENABLE":_PD.PWME,
+            "PWM":_PD.PWMP,"DIR":_PD.PWMD,"/ENABLE":_PD.PWME}
+    pinconverttppwm = {"PWM A":_PD.TPPWMA,"PWM B":_PD.TPPWMB,"PWM C":_PD.TPPWMC,
+        "PWM /A":_PD.TPPWMAN,"PWM /B":_PD.TPPWMBN,"PWM /C":_PD.TPPWMCN,
+        "FAULT":_PD.TPPWMF,"ENABLE":_PD.TPPWME}
+    pinconvertsserial = {"RXDATA1":_PD.RXDATA0,"TXDATA1":_PD.TXDATA0,"TXE1":_PD.TXEN0,"TXEN1":_PD.TXEN0,
+                        "RXDATA2":_PD.RXDATA1,"TXDATA2":_PD.TXDATA1,"TXE2":_PD.TXEN1,"TXEN2":_PD.TXEN1,
+                        "RXDATA3":_PD.RXDATA2,"TXDATA3":_PD.TXDATA2,"TXE3":_PD.TXEN2,"TXEN3":_PD.TXEN2,
+                        "RXDATA4":_PD.RXDATA3,"TXDATA4":_PD.TXDATA3,"TXE4":_PD.TXEN3,"TXEN4":_PD.TXEN3,
+                        "RXDATA5":_PD.RXDATA4,"TXDATA5":_PD.TXDATA4,"TXE5":_PD.TXEN4,"TXEN4":_PD.TXEN4,
+                        "RXDATA6":_PD.RXDATA5,"TXDATA6":_PD.TXDATA5,"TXE6":_PD.TXEN5,"TXEN6":_PD.TXEN5,
+                        "RXDATA7":_PD.RXDATA6,"TXDATA7":_PD.TXDATA6,"TXE7":_PD.TXEN6,"TXEN7":_PD.TXEN6,
+                        "RXDATA8":_PD.RXDATA7,"TXDATA8":_PD.TXDATA7,"TXE8":_PD.TXEN7,"TXEN8":_PD.TXEN7}
+    pinconvertnone = {"NOT USED":_PD.GPIOI}
+
+    count = 0
+    for i,j in enumerate(pins):
+        instance_num = 9999
+        is_gpio = False
+        temppinunit = []
+        temp = pins[i].find("connector").text
+        tempcon = int(temp.strip("P"))
+        tempfunc = pins[i].find("secondaryfunctionname").text
+        tempfunc = tempfunc.upper() # normalise capitalization: Peters XMLs are different from linuxcncs
+
+        if "(IN)" in tempfunc:
+            tempfunc = tempfunc.rstrip(" (IN)")
+        elif "(OUT" in tempfunc:
+            tempfunc = tempfunc.rstrip(" (OUT)")
+        convertedname = "Not Converted"
+        # this converts the XML file componennt names to pncconf's names
+
+        try:
+            secmodname = pins[i].find("secondarymodulename")
+            modulename = secmodname.text.upper()
+            dbg("secondary modulename:  %s, %s."%( tempfunc,modulename), "firmraw")
+            if modulename in ("ENCODER","QCOUNT","MUXEDQCOUNT","MUXEDQCOUNTSEL"):
+                convertedname = pinconvertenc[tempfunc]
+            elif modulename in ("ResolverMod","RESOLVERMOD"):
+                convertedname = pinconvertresolver[tempfunc]
+            elif modulename in ("PWMGen","PWMGEN","PWM"):
+                convertedname = pinconvertppwm[tempfunc]
+            elif modulename in ("StepGen","STEPGEN"):
+                convertedname = pinconvertstep[tempfunc]
+            elif modulename in ("TPPWM","TPPWM"):
+                convertedname = pinconverttppwm[tempfunc]
+            elif modulename in ("SSerial","SSERIAL"):
+                temp = pins[i].find("foundsserialdevice")
+                if temp is not None:
+                    founddevice = temp.text.upper()
+                else:
+                    founddevice = None
+                print tempfunc,founddevice
+                # this auto selects the sserial 7i76 mode 0 card for sserial 0 and 2
+                # as the 5i25/7i76 uses some of the sserial channels for it's pins.
+                if boardname in ("5i25","7i92"):
+                    if "7i77_7i76" in firmname:
+                        if tempfunc == "TXDATA1": convertedname = _PD.SS7I77M0
+                        elif tempfunc == "TXDATA2": convertedname = _PD.SS7I77M1
+                        elif tempfunc == "TXDATA4": convertedname = _PD.SS7I76M3
+                        else: convertedname = pinconvertsserial[tempfunc]
+                        #print "XML ",firmname, tempfunc,convertedname
+                    elif "7i76x2" in firmname or "7i76x1" in firmname:
+                        if tempfunc == "TXDATA1": convertedname = _PD.SS7I76M0
+                        elif tempfunc == "TXDATA3": convertedname = _PD.SS7I76M2
+                        else: convertedname = pinconvertsserial[tempfunc]
+                        #print "XML ",firmname, tempfunc,convertedname
+                    elif "7i77x2" in firmname or "7i77x1" in firmname:
+                        if tempfunc == "TXDATA1": convertedname = _PD.SS7I77M0
+                        elif tempfunc == "TXDATA2": convertedname = _PD.SS7I77M1
+                        elif tempfunc == "TXDATA4": convertedname = _PD.SS7I77M3
+                        elif tempfunc == "TXDATA5": convertedname = _PD.SS7I77M4
+                        else: convertedname = pinconvertsserial[tempfunc]
+                        #print "XML ",firmname, tempfunc,convertedname
+                    elif founddevice == "7I77-0": convertedname = _PD.SS7I77M0
+                    elif founddevice == "7I77-1": convertedname = _PD.SS7I77M1
+                    elif founddevice == "7I77-3": convertedname = _PD.SS7I77M3
+                    elif founddevice == "7I77-4": convertedname = _PD.SS7I77M4
+                    elif founddevice == "7I76-0": convertedname = _PD.SS7I76M0
+                    elif founddevice == "7I76-2": convertedname = _PD.SS7I76M2
+                    elif founddevice == "7I76-3": convertedname = _PD.SS7I76M3
+                    else: convertedname = pinconvertsserial[tempfunc]
+                else:
+                    convertedname = pinconvertsserial[tempfunc]
+            elif modulename in ("None","NONE"):
+                is_gpio = True
+                #convertedname = pinconvertnone[tempfunc]
+            else: is_gpio = True
+        except:
+            is_gpio = True
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            formatted_lines = traceback.format_exc().splitlines()
+            print
+            print "****pncconf verbose XML parse debugging:",formatted_lines[0]
+            traceback.print_tb(exc_traceback, limit=1, file=sys.stdout)
+            print formatted_lines[-1]
+
+        if is_gpio:
+            # must be GPIO pins if there is no secondary mudule name
+            # or if pinconvert fails eg. StepTable instance default to GPIO 
+            temppinunit.append(_PD.GPIOI)
+            temppinunit.append(0) # 0 signals to pncconf that GPIO can changed to be input or output
+        else:
+            instance_num = int(pins[i].find("secondaryinstance").text)
+            # this is a workaround for the 7i77_7i776 firmware. it uses a mux encoder for the 7i76 but only uses half of it
+            # this is because of a limitation of hostmot2 - it can't have mux encoders and regular encoders
+            # so in pncconf we look for this and change it to a regular encoder.
+            if boardname == "5i25" and firmname == "7i77_7i76":
+                if modulename in ("MuxedQCount","MUXEDQCOUNT") and  instance_num == 3:
+                    instance_num = 6
+                    encoder =-1
+                    if convertedname == _PD.MXE0: convertedname = _PD.ENCA
+                    elif convertedname == _PD.MXE1: convertedname = _PD.ENCB
+                    elif convertedname == _PD.MXEI: convertedname = _PD.ENCI
+            temppinunit.append(convertedname)
+            if tempfunc in("MUXED ENCODER SELECT 0","MUXEDQCOUNTSEL") and  instance_num == 6:
+                instance_num = 3
+            temppinunit.append(instance_num)
+            tempmod = pins[i].find("secondarymodulename").text
+            tempfunc = tempfunc.upper()# normalize capitalization
+            #dbg("secondary modulename, function:  %s, %s."%( tempmod,tempfunc), "firmraw")
+            if tempmod in("Encoder","MuxedQCount") and tempfunc in ("MUXED INDEX MASK (IN)","INDEXMASK (IN)"):
+                numencoderpins = 4
+            if tempmod in("SSerial","SSERIAL") and tempfunc in ("TXDATA1","TXDATA2","TXDATA3",
+                    "TXDATA4","TXDATA5","TXDATA6","TXDATA7","TXDATA8"):
+                sserialchannels +=1
+        #dbg("temp: %s, converted name: %s. num %d"%( tempfunc,convertedname,instance_num), "firmraw")
+        if not tempcon in tempconlist:
+            tempconlist.append(tempcon)
+        temppinlist.append(temppinunit)
+        # add NONE place holders for boards with less then 24 pins per connector.
+        if not placeholders == 0 and i == (portwidth + count-1):
+            #print "loop %d"% i
+            count =+ portwidth
+            #print "count %d" % count
+            for k in range(0,placeholders):
+                #print "%d fill here with %d parts"% (k,placeholders)
+                temppinlist.append((_PD.NUSED,0))
+    if not sserialchannels == 0:
+        sserialchannels +=1
+    temp = [boardtitle,boardname,firmname,boardtitle,driver,encoder + muxedqcount,
+            numencoderpins,resolver,numresolverpins,pwmgen,numpwmpins,
+            tppwmgen,numttpwmpins,stepgen,numstepperpins,
+            sserialports,sserialchannels,discov_sserial,0,0,0,0,0,0,0,watchdog,maxgpio,
+            lowfreq,hifreq,tempconlist]
+    for i in temppinlist:
+        temp.append(i)
+    if "5i25" in boardname :
+        dbg("5i25 firmware:\n%s\n"%( temp), mtype="5i25")
+    print 'firm added:\n',temp
+    return temp
@@ -55,6 +55,7 @@ from pncconf import build_INI
 from pncconf import build_HAL
 from pncconf import tests
 from pncconf import private_data
+from pncconf import firmware_index
 import cairo
 import hal
 #import mesatest
@@ -1420,6 +1421,8 @@ class App:
            _DEBUGSTRING = [dbgstate]
         self.recursive_block = False
         self.firmware_block = False
+        # mesa boards whose connector tabs are not set up yet (see set_mesa_options)
+        self._mesa_pending = {}
         # Private data holds the array of pages to load, signals, and messages
         _PD = self._p = private_data.Private_Data(self,BIN,BASE)
         self.d = Data(self._p)
@@ -1461,6 +1464,7 @@ class App:
         self.p = pages.Pages(self)
         self.INI = build_INI.INI(self)
         self.HAL = build_HAL.HAL(self)
+        self.FIRMWARE = firmware_index.FIRMWARE(self)
         self.builder.set_translation_domain(domain) # for locale translations
         self.builder.connect_signals( self.p ) # register callbacks from Pages class
         wiz_pic = gtk.gdk.pixbuf_new_from_file(self._p.WIZARD)
@@ -2073,298 +2077,24 @@ PNCconf will use internal firmware data"%self._p.FIRMDIR),True)
 
     def mesa_firmware_search(self,boardtitle,*args):
         #TODO if no firm packages set up for internal data?
-        #TODO don't do this if the firmware is already loaded
-        self.pbar.set_text("Loading external firmware")
-        self.pbar.set_fraction(0)
-        self.window.show()
-        while gtk.events_pending():
-            gtk.main_iteration()
-        firmlist = []
-        for root, dirs, files in os.walk(self._p.FIRMDIR):
-            folder = root.lstrip(self._p.FIRMDIR)
-            #dbg('Firmware folder:%s'% folder)
-            if folder in self._p.MESABLACKLIST:continue
-            if not folder == boardtitle:continue
-            for n,name in enumerate(files):
-                if name in self._p.MESABLACKLIST:continue
-                if ".xml" in name:
-                    dbg('%s'% name)
-                    temp = name.rstrip(".xml")
-                    firmlist.append(temp)
-        dbg("\nXML list:%s"%firmlist,mtype="firmname")
-        for n,currentfirm in enumerate(firmlist):
-            self.pbar.set_fraction(n*1.0/len(firmlist))
+        # firmware already in the index is there at once, the progress
+        # bar only shows while new or changed XML files are parsed
+        shown = []
+        def progress(fraction):
+            if not shown:
+                self.pbar.set_text("Loading external firmware")
+                self.window.show()
+                shown.append(True)
+            self.pbar.set_fraction(fraction)
             while gtk.events_pending():
                 gtk.main_iteration()
-            # XMLs don't tell us the driver type so set to None (parse will guess)
-            firmdata = self.parse_xml(None,boardtitle, currentfirm,os.path.join(
-                                self._p.FIRMDIR,boardtitle,currentfirm+".xml"))
+        for firmdata in self.FIRMWARE.search(boardtitle, progress):
             self._p.MESA_FIRMWAREDATA.append(firmdata)
-        self.window.hide()
+        if shown:
+            self.window.hide()
 
     def parse_xml(self, driver, boardtitle, firmname, xml_path):
-            def search(elementlist):
-                for i in elementlist:
-                    temp = root.find(i)
-                    if temp is not None:
-                        return temp.text
-                return temp
-
-            root = xml.etree.ElementTree.parse(xml_path)
-            watchdog = encoder = resolver = pwmgen = led = muxedqcount = 0
-            stepgen = tppwmgen = sserialports = sserialchannels = 0
-            numencoderpins = numpwmpins = 3; numstepperpins = 2; numttpwmpins = 0; numresolverpins = 10
-
-            text = search(('boardname','BOARDNAME'))
-            if text == None:
-                print 'Missing info: boardname'
-                return
-            boardname = text.lower()
-            #dbg("\nBoard and firmwarename:  %s %s\n"%( boardname, firmname), "firmraw")
-
-            text  = search(("IOPORTS","ioports")) ; #print numcnctrs
-            if text == None:
-                print 'Missing info: ioports'
-                return
-            numcnctrs = int(text)
-            text = search(("PORTWIDTH","portwidth"))
-            if text == None:
-                print 'Missing info: portwidth'
-                return
-            portwidth = int(text)
-            maxgpio  = numcnctrs * portwidth ; #print maxgpio
-            placeholders = 24-portwidth
-            text = search(("CLOCKLOW","clocklow")) ; #print lowfreq
-            if text == None:
-                print 'Missing info: clocklow'
-                return
-            lowfreq = int(text)/1000000
-            text = search(("CLOCKHIGH","clockhigh")); #print hifreq
-            if text == None:
-                print 'Missing info: clockhigh'
-                return
-            hifreq = int(text)/1000000
-            modules = root.findall(".//modules")[0]
-            if driver == None:
-                if "7i43" in boardname:
-                    driver = "hm2_7i43"
-                elif "7i90" in boardname:
-                    driver = "hm2_7i90"
-                elif '7i76e' in boardname or '7i92' in boardname or '7i80' in boardname:
-                    driver = 'hm2_eth'
-                else:
-                    driver = 'hm2_pci'
-            for i,j in enumerate(modules):
-                k = modules[i].find("tagname").text
-                print k
-                if k in ("Watchdog","WatchDog","WATCHDOG"): 
-                    l = modules[i].find("numinstances").text;#print l,k
-                    watchdog = int(l)
-                elif k in ("Encoder","QCOUNT"): 
-                    l = modules[i].find("numinstances").text;#print l,k
-                    encoder = int(l)
-                elif k in ("ResolverMod","RESOLVERMOD"):
-                    l = modules[i].find("numinstances").text;#print l,k
-                    resolver = int(l)
-                elif k in ("PWMGen","PWMGEN","PWM"):
-                    l = modules[i].find("numinstances").text;#print l,k
-                    pwmgen = int(l)
-                elif k == "LED": 
-                    l = modules[i].find("numinstances").text;#print l,k
-                    led = int(l)
-                elif k in ("MuxedQCount","MUXEDQCOUNT"): 
-                    l = modules[i].find("numinstances").text;#print l,k
-                    muxedqcount = int(l)
-                elif k in ("StepGen","STEPGEN"): 
-                    l = modules[i].find("numinstances").text;#print l,k
-                    stepgen = int(l)
-                elif k in ("TPPWM","TPPWM"): 
-                    l = modules[i].find("numinstances").text;#print l,k
-                    tppwmgen = int(l)
-                elif k in ("SSerial","SSERIAL"):
-                    l = modules[i].find("numinstances").text;#print l,k
-                    sserialports = int(l)
-                elif k in ("None","NONE"): 
-                    l = modules[i].find("numinstances").text;#print l,k
-                elif k in ("IOPort","AddrX","MuxedQCountSel"):
-                    continue
-                else:
-                    print "**** WARNING: Pncconf parsing firmware: tagname (%s) not reconized"% k
-
-            discov_sserial = []
-            ssname = root.findall("SSERIALDEVICES/SSERIALFUNCTION")
-            for i in (ssname):
-                port = i.find("PORT").text
-                dev = i.find("DEVICE").text
-                chan = i.find("CHANNEL").text
-                discov_sserial.append((int(port),int(chan),dev))
-            print 'discovered sserial:', discov_sserial
-
-            pins = root.findall(".//pins")[0]
-            temppinlist = []
-            tempconlist = []
-            pinconvertenc = {"PHASE A":_PD.ENCA,"PHASE B":_PD.ENCB,"INDEX":_PD.ENCI,"INDEXMASK":_PD.ENCM,
-                "QUAD-A":_PD.ENCA,"QUAD-B":_PD.ENCB,"QUAD-IDX":_PD.ENCI,
-                "MUXED PHASE A":_PD.MXE0,"MUXED PHASE B":_PD.MXE1,"MUXED INDEX":_PD.MXEI,
-                "MUXED INDEX MASK":_PD.MXEM,"MUXED ENCODER SELECT 0":_PD.MXES,"MUXED ENCODER SELEC":_PD.MXES,
-                "MUXQ-A":_PD.MXE0,"MUXQ-B":_PD.MXE1,"MUXQ-IDX":_PD.MXEI,"MUXSEL0":_PD.MXES}
-            pinconvertresolver = {"RESOLVER POWER ENABLE":_PD.RESU,"RESOLVER SPIDI 0":_PD.RES0,
-                 "RESOLVER SPIDI 1":_PD.RES1,"RESOLVER ADC CHANNEL 2":_PD.RES2,"RESOLVER ADC CHANNEL 1":_PD.RES3,
-                 "RESOLVER ADC CHANNEL 0":_PD.RES4,"RESOLVER SPI CLK":_PD.RES5,"RESOLVER SPI CHIP SELECT":_PD.RESU,
-                 "RESOLVER PDMM":_PD.RESU,"RESOLVER PDMP":_PD.RESU}
-            pinconvertstep = {"STEP":_PD.STEPA,"DIR":_PD.STEPB,"STEP/TABLE1":_PD.STEPA,"DIR/TABLE2":_PD.STEPB}
-                #"StepTable 2":STEPC,"StepTable 3":STEPD,"StepTable 4":STEPE,"StepTable 5":STEPF
-            pinconvertppwm = {"PWM/UP":_PD.PWMP,"DIR/DOWN":_PD.PWMD,"ENABLE":_PD.PWME,
-                    "PWM":_PD.PWMP,"DIR":_PD.PWMD,"/ENABLE":_PD.PWME}
-            pinconverttppwm = {"PWM A":_PD.TPPWMA,"PWM B":_PD.TPPWMB,"PWM C":_PD.TPPWMC,
-                "PWM /A":_PD.TPPWMAN,"PWM /B":_PD.TPPWMBN,"PWM /C":_PD.TPPWMCN,
-                "FAULT":_PD.TPPWMF,"ENABLE":_PD.TPPWME}
-            pinconvertsserial = {"RXDATA1":_PD.RXDATA0,"TXDATA1":_PD.TXDATA0,"TXE1":_PD.TXEN0,"TXEN1":_PD.TXEN0,
-                                "RXDATA2":_PD.RXDATA1,"TXDATA2":_PD.TXDATA1,"TXE2":_PD.TXEN1,"TXEN2":_PD.TXEN1,
-                                "RXDATA3":_PD.RXDATA2,"TXDATA3":_PD.TXDATA2,"TXE3":_PD.TXEN2,"TXEN3":_PD.TXEN2,
-                                "RXDATA4":_PD.RXDATA3,"TXDATA4":_PD.TXDATA3,"TXE4":_PD.TXEN3,"TXEN4":_PD.TXEN3,
-                                "RXDATA5":_PD.RXDATA4,"TXDATA5":_PD.TXDATA4,"TXE5":_PD.TXEN4,"TXEN4":_PD.TXEN4,
-                                "RXDATA6":_PD.RXDATA5,"TXDATA6":_PD.TXDATA5,"TXE6":_PD.TXEN5,"TXEN6":_PD.TXEN5,
-                                "RXDATA7":_PD.RXDATA6,"TXDATA7":_PD.TXDATA6,"TXE7":_PD.TXEN6,"TXEN7":_PD.TXEN6,
-                                "RXDATA8":_PD.RXDATA7,"TXDATA8":_PD.TXDATA7,"TXE8":_PD.TXEN7,"TXEN8":_PD.TXEN7}
-            pinconvertnone = {"NOT USED":_PD.GPIOI}
-
-            count = 0
-            for i,j in enumerate(pins):
-                instance_num = 9999
-                is_gpio = False
-                temppinunit = []
-                temp = pins[i].find("connector").text
-                tempcon = int(temp.strip("P"))
-                tempfunc = pins[i].find("secondaryfunctionname").text
-                tempfunc = tempfunc.upper() # normalise capitalization: Peters XMLs are different from linuxcncs
-
-                if "(IN)" in tempfunc:
-                    tempfunc = tempfunc.rstrip(" (IN)")
-                elif "(OUT" in tempfunc:
-                    tempfunc = tempfunc.rstrip(" (OUT)")
-                convertedname = "Not Converted"
-                # this converts the XML file componennt names to pncconf's names
-
-                try:
-                    secmodname = pins[i].find("secondarymodulename")
-                    modulename = secmodname.text.upper()
-                    dbg("secondary modulename:  %s, %s."%( tempfunc,modulename), "firmraw")
-                    if modulename in ("ENCODER","QCOUNT","MUXEDQCOUNT","MUXEDQCOUNTSEL"):
-                        convertedname = pinconvertenc[tempfunc]
-                    elif modulename in ("ResolverMod","RESOLVERMOD"):
-                        convertedname = pinconvertresolver[tempfunc]
-                    elif modulename in ("PWMGen","PWMGEN","PWM"):
-                        convertedname = pinconvertppwm[tempfunc]
-                    elif modulename in ("StepGen","STEPGEN"):
-                        convertedname = pinconvertstep[tempfunc]
-                    elif modulename in ("TPPWM","TPPWM"):
-                        convertedname = pinconverttppwm[tempfunc]
-                    elif modulename in ("SSerial","SSERIAL"):
-                        temp = pins[i].find("foundsserialdevice")
-                        if temp is not None:
-                            founddevice = temp.text.upper()
-                        else:
-                            founddevice = None
-                        print tempfunc,founddevice
-                        # this auto selects the sserial 7i76 mode 0 card for sserial 0 and 2
-                        # as the 5i25/7i76 uses some of the sserial channels for it's pins.
-                        if boardname in ("5i25","7i92"):
-                            if "7i77_7i76" in firmname:
-                                if tempfunc == "TXDATA1": convertedname = _PD.SS7I77M0
-                                elif tempfunc == "TXDATA2": convertedname = _PD.SS7I77M1
-                                elif tempfunc == "TXDATA4": convertedname = _PD.SS7I76M3
-                                else: convertedname = pinconvertsserial[tempfunc]
-                                #print "XML ",firmname, tempfunc,convertedname
-                            elif "7i76x2" in firmname or "7i76x1" in firmname:
-                                if tempfunc == "TXDATA1": convertedname = _PD.SS7I76M0
-                                elif tempfunc == "TXDATA3": convertedname = _PD.SS7I76M2
-                                else: convertedname = pinconvertsserial[tempfunc]
-                                #print "XML ",firmname, tempfunc,convertedname
-                            elif "7i77x2" in firmname or "7i77x1" in firmname:
-                                if tempfunc == "TXDATA1": convertedname = _PD.SS7I77M0
-                                elif tempfunc == "TXDATA2": convertedname = _PD.SS7I77M1
-                                elif tempfunc == "TXDATA4": convertedname = _PD.SS7I77M3
-                                elif tempfunc == "TXDATA5": convertedname = _PD.SS7I77M4
-                                else: convertedname = pinconvertsserial[tempfunc]
-                                #print "XML ",firmname, tempfunc,convertedname
-                            elif founddevice == "7I77-0": convertedname = _PD.SS7I77M0
-                            elif founddevice == "7I77-1": convertedname = _PD.SS7I77M1
-                            elif founddevice == "7I77-3": convertedname = _PD.SS7I77M3
-                            elif founddevice == "7I77-4": convertedname = _PD.SS7I77M4
-                            elif founddevice == "7I76-0": convertedname = _PD.SS7I76M0
-                            elif founddevice == "7I76-2": convertedname = _PD.SS7I76M2
-                            elif founddevice == "7I76-3": convertedname = _PD.SS7I76M3
-                            else: convertedname = pinconvertsserial[tempfunc]
-                        else:
-                            convertedname = pinconvertsserial[tempfunc]
-                    elif modulename in ("None","NONE"):
-                        is_gpio = True
-                        #convertedname = pinconvertnone[tempfunc]
-                    else: is_gpio = True
-                except:
-                    is_gpio = True
-                    exc_type, exc_value, exc_traceback = sys.exc_info()
-                    formatted_lines = traceback.format_exc().splitlines()
-                    print
-                    print "****pncconf verbose XML parse debugging:",formatted_lines[0]
-                    traceback.print_tb(exc_traceback, limit=1, file=sys.stdout)
-                    print formatted_lines[-1]
-
-                if is_gpio:
-                    # must be GPIO pins if there is no secondary mudule name
-                    # or if pinconvert fails eg. StepTable instance default to GPIO 
-                    temppinunit.append(_PD.GPIOI)
-                    temppinunit.append(0) # 0 signals to pncconf that GPIO can changed to be input or output
-                else:
-                    instance_num = int(pins[i].find("secondaryinstance").text)
-                    # this is a workaround for the 7i77_7i776 firmware. it uses a mux encoder for the 7i76 but only uses half of it
-                    # this is because of a limitation of hostmot2 - it can't have mux encoders and regular encoders
-                    # so in pncconf we look for this and change it to a regular encoder.
-                    if boardname == "5i25" and firmname == "7i77_7i76":
-                        if modulename in ("MuxedQCount","MUXEDQCOUNT") and  instance_num == 3:
-                            instance_num = 6
-                            encoder =-1
-                            if convertedname == _PD.MXE0: convertedname = _PD.ENCA
-                            elif convertedname == _PD.MXE1: convertedname = _PD.ENCB
-                            elif convertedname == _PD.MXEI: convertedname = _PD.ENCI
-                    temppinunit.append(convertedname)
-                    if tempfunc in("MUXED ENCODER SELECT 0","MUXEDQCOUNTSEL") and  instance_num == 6:
-                        instance_num = 3
-                    temppinunit.append(instance_num)
-                    tempmod = pins[i].find("secondarymodulename").text
-                    tempfunc = tempfunc.upper()# normalize capitalization
-                    #dbg("secondary modulename, function:  %s, %s."%( tempmod,tempfunc), "firmraw")
-                    if tempmod in("Encoder","MuxedQCount") and tempfunc in ("MUXED INDEX MASK (IN)","INDEXMASK (IN)"):
-                        numencoderpins = 4
-                    if tempmod in("SSerial","SSERIAL") and tempfunc in ("TXDATA1","TXDATA2","TXDATA3",
-                            "TXDATA4","TXDATA5","TXDATA6","TXDATA7","TXDATA8"):
-                        sserialchannels +=1
-                #dbg("temp: %s, converted name: %s. num %d"%( tempfunc,convertedname,instance_num), "firmraw")
-                if not tempcon in tempconlist:
-                    tempconlist.append(tempcon)
-                temppinlist.append(temppinunit)
-                # add NONE place holders for boards with less then 24 pins per connector.
-                if not placeholders == 0 and i == (portwidth + count-1):
-                    #print "loop %d"% i
-                    count =+ portwidth
-                    #print "count %d" % count
-                    for k in range(0,placeholders):
-                        #print "%d fill here with %d parts"% (k,placeholders)
-                        temppinlist.append((_PD.NUSED,0))
-            if not sserialchannels == 0:
-                sserialchannels +=1
-            temp = [boardtitle,boardname,firmname,boardtitle,driver,encoder + muxedqcount,
-                    numencoderpins,resolver,numresolverpins,pwmgen,numpwmpins,
-                    tppwmgen,numttpwmpins,stepgen,numstepperpins,
-                    sserialports,sserialchannels,discov_sserial,0,0,0,0,0,0,0,watchdog,maxgpio,
-                    lowfreq,hifreq,tempconlist]
-            for i in temppinlist:
-                temp.append(i)
-            if "5i25" in boardname :
-                dbg("5i25 firmware:\n%s\n"%( temp), mtype="5i25")
-            print 'firm added:\n',temp
-            return temp
+        return firmware_index.parse_xml(driver, boardtitle, firmname, xml_path)
 
     def discover_mesacards(self):
         name = self.query_dialog('Discovery Search','Specify device name')
@@ -2837,6 +2567,9 @@ Clicking 'existing custom program' will aviod this warning. "),False):
         # if we are working in here we don't want signal calls because of changes made in here
         # GTK supports signal blocking but then you can't assign signal block name references in GLADE -slaps head
         if self._p.prepare_block or self.recursive_block: return
+        # the other boards' connector pins are checked below
+        for boardnum in self._mesa_pending.keys():
+            self.realize_mesa_connectors(boardnum)
         if 'mesa' in pinname:
             ptype = '%stype'%pinname
             if not self.widgets[ptype].get_active_text() == _PD.pintype_gpio[0]: return
@@ -3024,6 +2757,7 @@ Clicking 'existing custom program' will aviod this warning. "),False):
         cb = "mesa%d_firmware"% (boardnum)
         i = "_mesa%dsignalhandler_firmware_change"% (boardnum)
         self.d[i] = int(self.widgets[cb].connect("changed", self.on_mesa_firmware_changed,boardnum))
+        self.widgets["mesa%d_notebook"% boardnum].connect("switch-page", self.on_mesa_notebook_switch_page,boardnum)
         for connector in (1,2,3,4,5,6,7,8,9):
             for pin in range(0,24):
                 cb = "mesa%dc%ipin%i"% (boardnum,connector,pin)
@@ -3253,6 +2987,7 @@ Clicking 'existing custom program' will aviod this warning. "),False):
     # it does this by searching the current firmware array and finding what the
     # other related pins numbers are then changing them to the appropriate signalname.    
     def mesa_data_transfer(self,boardnum):
+        self.realize_mesa_connectors(boardnum)
         for concount,connector in enumerate(self.d["mesa%d_currentfirmwaredata"% boardnum][_PD._NUMOFCNCTRS]) :
             for pin in range(0,24):
                 p = 'mesa%dc%dpin%d' % (boardnum,connector,pin)
@@ -3509,11 +3244,6 @@ Clicking 'existing custom program' will aviod this warning. "),False):
     def set_mesa_options(self,boardnum,title,firmware,numofpwmgens,numoftppwmgens,numofstepgens,numofencoders,numofsserialports,numofsserialchannels):
         _PD.prepare_block = True
         self.p.set_buttons_sensitive(0,0)
-        self.pbar.set_text("Setting up Mesa tabs")
-        self.pbar.set_fraction(0)
-        self.window.show()
-        while gtk.events_pending():
-            gtk.main_iteration()
         for search, item in enumerate(self._p.MESA_FIRMWAREDATA):
             d = self._p.MESA_FIRMWAREDATA[search]
             if not d[_PD._BOARDTITLE] == title:continue
@@ -3554,11 +3284,56 @@ Clicking 'existing custom program' will aviod this warning. "),False):
             except:
                 pass
 
-        for concount,connector in enumerate(self.d["mesa%d_currentfirmwaredata"% boardnum][_PD._NUMOFCNCTRS]) :
+        # The pin comboboxes of the connector tabs are only set up when one of the tabs is
+        # first shown (see realize_mesa_connectors) - that is most of the time of this method.
+        # If the board was set up again before that, the comboboxes still need a full rebuild.
+        configured = self.d["_mesa%d_configured"% boardnum]
+        if boardnum in self._mesa_pending:
+            configured = configured and self._mesa_pending[boardnum][1]
+        self._mesa_pending[boardnum] = ((numofpwmgens,numoftppwmgens,numofstepgens,numofencoders,
+                                        numofsserialports,numofsserialchannels),configured)
+
+        self.d["mesa%d_numof_stepgens"% boardnum] = numofstepgens
+        self.d["mesa%d_numof_pwmgens"% boardnum] = numofpwmgens
+        self.d["mesa%d_numof_encodergens"% boardnum] = numofencoders
+        self.d["mesa%d_numof_sserialports"% boardnum] = numofsserialports
+        self.d["mesa%d_numof_sserialchannels"% boardnum] = numofsserialchannels     
+        self.widgets["mesa%d_numof_stepgens"% boardnum].set_value(numofstepgens)
+        self.widgets["mesa%d_numof_encodergens"% boardnum].set_value(numofencoders)      
+        self.widgets["mesa%d_numof_pwmgens"% boardnum].set_value(numofpwmgens)
+        self.in_mesa_prepare = False   
+        self.d["_mesa%d_configured"% boardnum] = True
+        self.p.set_buttons_sensitive(1,1)
+        _PD.prepare_block = False
+        # already looking at a connector tab?
+        if self.widgets["mesa%d_notebook"% boardnum].get_current_page() > 0:
+            self.realize_mesa_connectors(boardnum)
+
+    # This sets up the pin comboboxes of all the connector tabs of a board, first according to
+    # the firmware, then to the loaded data, with the arguments set_mesa_options left.
+    # It is called when a connector or smart serial tab is shown and before anything reads the
+    # comboboxes. All connectors are done together as changing one pin can change related pins
+    # on other connectors.
+    def realize_mesa_connectors(self,boardnum):
+        if not boardnum in self._mesa_pending: return
+        numbers,configured = self._mesa_pending.pop(boardnum)
+        numofpwmgens,numoftppwmgens,numofstepgens,numofencoders,numofsserialports,numofsserialchannels = numbers
+        prepare_block = _PD.prepare_block
+        _PD.prepare_block = True
+        self.p.set_buttons_sensitive(0,0)
+        self.pbar.set_text("Setting up Mesa tabs")
+        self.pbar.set_fraction(0)
+        self.window.show()
+        while gtk.events_pending():
+            gtk.main_iteration()
+        # firmware_to_widgets rebuilds every combobox of a board that is not configured yet
+        self.d["_mesa%d_configured"% boardnum] = configured
+        connectors = self.d["mesa%d_currentfirmwaredata"% boardnum][_PD._NUMOFCNCTRS]
+        for concount,connector in enumerate(connectors) :
+            self.pbar.set_fraction((concount+1.0)/len(connectors))
+            while gtk.events_pending():
+                gtk.main_iteration()
             for pin in range (0,24):
-                self.pbar.set_fraction((pin+1)/24.0)
-                while gtk.events_pending():
-                    gtk.main_iteration()
                 firmptype,compnum = self.d["mesa%d_currentfirmwaredata"% boardnum][_PD._STARTOFDATA+pin+(concount*24)]       
                 p = 'mesa%dc%dpin%d' % (boardnum, connector, pin)
                 ptype = 'mesa%dc%dpin%dtype' % (boardnum, connector , pin)
@@ -3576,19 +3351,9 @@ Clicking 'existing custom program' will aviod this warning. "),False):
                 self.widgets[p].child.handler_block(self.d[actblocksignal])
                 self.firmware_to_widgets(boardnum,firmptype,p,ptype,pinv,complabel,compnum,concount,pin,numofencoders,
                                         numofpwmgens,numoftppwmgens,numofstepgens,None,numofsserialports,numofsserialchannels,False)
-
-        self.d["mesa%d_numof_stepgens"% boardnum] = numofstepgens
-        self.d["mesa%d_numof_pwmgens"% boardnum] = numofpwmgens
-        self.d["mesa%d_numof_encodergens"% boardnum] = numofencoders
-        self.d["mesa%d_numof_sserialports"% boardnum] = numofsserialports
-        self.d["mesa%d_numof_sserialchannels"% boardnum] = numofsserialchannels     
-        self.widgets["mesa%d_numof_stepgens"% boardnum].set_value(numofstepgens)
-        self.widgets["mesa%d_numof_encodergens"% boardnum].set_value(numofencoders)      
-        self.widgets["mesa%d_numof_pwmgens"% boardnum].set_value(numofpwmgens)
-        self.in_mesa_prepare = False   
         self.d["_mesa%d_configured"% boardnum] = True
         # unblock all the widget signals again
-        for concount,connector in enumerate(self.d["mesa%d_currentfirmwaredata"% boardnum][_PD._NUMOFCNCTRS]) :
+        for concount,connector in enumerate(connectors) :
             for pin in range (0,24):
                 p = 'mesa%dc%dpin%d' % (boardnum, connector, pin)
                 ptype = 'mesa%dc%dpin%dtype' % (boardnum, connector , pin)
@@ -3601,7 +3366,12 @@ Clicking 'existing custom program' will aviod this warning. "),False):
         self.mesa_mainboard_data_to_widgets(boardnum)
         self.window.hide()
         self.p.set_buttons_sensitive(1,1)
-        _PD.prepare_block = False
+        _PD.prepare_block = prepare_block
+
+    def on_mesa_notebook_switch_page(self, notebook, page, pagenum, boardnum):
+        # page 0 holds the board options, the others the connectors and smart serial channels
+        if pagenum > 0:
+            self.realize_mesa_connectors(boardnum)
 
     def set_sserial_options(self,boardnum,port,channel):
         numofsserialports = self.d["mesa%d_numof_sserialports"% boardnum]
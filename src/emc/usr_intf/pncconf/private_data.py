@@ -97,6 +97,8 @@ class Private_Data:
         if not os.path.exists(self.HELPDIR):
             self.HELPDIR = os.path.join(BASE, "src", "emc", "usr_intf", "pncconf", "pncconf-help")
         self.FIRMDIR = "/lib/firmware/hm2/"
+        # parsed firmware XML files
+        self.FIRMINDEX = os.path.expanduser("~/.pncconf-firmware-index")
         self.THEMEDIR = "/usr/share/themes"
         self.MESABLACKLIST = ["5i22","7i43","4i65","4i68","SVST8_3P.xml"]
 
@@ -1,6 +1,9 @@
 #!/usr/bin/python
 import os
 import sys
+import time
+# the imports are the first phase of --profile-startup
+START_TIME = time.time()
 import shutil
 import traceback
 import hal
@@ -9,6 +12,7 @@ from optparse import Option, OptionParser
 from PyQt5 import QtWidgets, QtCore
 from qtvcp.core import Status, Info
 from qtvcp.lib import xembed
+from qtvcp.lib.startup_profile import StartupProfile
 
 # Set up the base logger
 #   We have do do this before importing other modules because on import
@@ -48,6 +52,10 @@ use -g WIDTHxHEIGHT for just setting size or -g +XOFFSET+YOFFSET for just positi
           , Option( '-u', dest='usermod', default="", help='file path of user defined handler file')
           , Option( '-U', dest='useropts', action='append', metavar='USEROPT', default=[]
                   , help='pass USEROPTs to Python modules')
+          , Option( '--profile-startup', action='store_true', dest='profile', default=False
+                  , help="print how long each phase of the start up and the HAL set up of each widget took")
+          , Option( '--no-ui-cache', action='store_false', dest='ui_cache', default=True
+                  , help="build the widgets with uic.loadUi rather than from a cached compiled UI file")
           ]
 
 # BASE is the absolute path to linuxcnc base
@@ -173,6 +181,8 @@ class Paths():
 class QTVCP: 
     def __init__(self):
         sys.excepthook = self.excepthook
+        self.profile = StartupProfile(START_TIME)
+        self.profile.phase('imports')
         INIPATH = None
         usage = "usage: %prog [options] myfile.ui"
         parser = OptionParser(usage=usage)
@@ -197,6 +207,7 @@ class QTVCP:
         # the Notify library is loaded because it uses DBusQtMainLoop
         # DBusQtMainLoop must be initialized after to work properly
         from qtvcp import qt_makepins, qt_makegui
+        self.profile.phase('Qt application')
 
         # ToDo: pass specific log levels as an argument, or use an INI setting
         if not opts.debug:
@@ -305,6 +316,8 @@ Pressing cancel will close linuxcnc.""" % target)
 
         # initialize the window
         window = qt_makegui.MyWindow(self.halcomp, PATH)
+        window.use_ui_cache = opts.ui_cache
+        self.profile.phase('paths, INI and HAL component')
  
         # load optional user handler file
         if opts.usermod:
@@ -317,20 +330,26 @@ Pressing cancel will close linuxcnc.""" % target)
             log.debug('Adding the key events filter')
             myFilter = qt_makegui.MyEventFilter(window)
             self.app.installEventFilter(myFilter)
+            self.profile.phase('handler file')
 
         # actually build the widgets
         window.instance()
+        self.profile.phase('build widgets')
 
         # make QT widget HAL pins
-        self.panel = qt_makepins.QTPanel(self.halcomp, PATH, window, opts.debug)
+        self.panel = qt_makepins.QTPanel(self.halcomp, PATH, window, opts.debug,
+                                        opts.profile and self.profile or None)
+        self.profile.phase('widget HAL set up')
 
         # call handler file's initialized function
         if opts.usermod:
             if "initialized__" in dir(window.handler_instance):
                 log.debug('''Calling the handler file's initialized__ function''')
                 window.handler_instance.initialized__()
+                self.profile.phase('handler initialized__')
         # All Widgets should be added now - synch them to linuxcnc
         STATUS.forced_update()
+        self.profile.phase('status update')
 
         # User components are set up so report that we are ready
         log.debug('Set HAL ready')
@@ -403,8 +422,13 @@ Pressing cancel will close linuxcnc.""" % target)
         else:
             self.panel.set_preference_geometry()
         window.show()
+        self.profile.phase('styles and show window')
         if INIPATH:
             self.postgui()
+            self.profile.phase('postgui HAL file')
+        if opts.profile:
+            # after the first round of events, which paints the window
+            QtCore.QTimer.singleShot(0, self.report_profile)
 
         # catch control c and terminate signals
         signal.signal(signal.SIGTERM, self.shutdown)
@@ -416,6 +440,10 @@ Pressing cancel will close linuxcnc.""" % target)
         # now shut it all down
         self.shutdown()
 
+    def report_profile(self):
+        self.profile.phase('first events')
+        self.profile.report()
+
     # finds the postgui file name and INI file path
     def postgui(self):
         postgui_halfile = INFO.POSTGUI_HALFILE_PATH
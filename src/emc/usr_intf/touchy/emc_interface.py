@@ -11,6 +11,7 @@
 # GNU General Public License for more details.
 
 import math
+import statusbroker
 
 from __main__ import set_active, set_text
 
@@ -254,7 +255,9 @@ class emc_status:
                 self.machine_units_mm=0
                 self.unit_convert=[1]*9
                 self.actual = 0
-                self.emcstat = emc.stat()
+                # periodic() reads the shared status, the other reads
+                # poll linuxcnc itself as they can follow a command
+                self.emcstat = statusbroker.command_status()
                 self.emcerror = emc.error_channel()
 
         def dro_inch(self, b):
@@ -291,7 +294,7 @@ class emc_status:
                 return 1
 
         def periodic(self):
-                self.emcstat.poll()
+                self.emcstat.update()
                 am = self.emcstat.axis_mask
                 lathe = not (self.emcstat.axis_mask & 2)
                 dtg = self.emcstat.dtg
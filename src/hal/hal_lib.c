@@ -3289,6 +3289,7 @@ static void free_pin_struct(hal_pin_t * pin)
     unlink_pin(pin);
     /* clear contents of struct */
     if ( pin->oldname != 0 ) free_oldname_struct(SHMPTR(pin->oldname));
+    pin->oldname = 0;
     pin->data_ptr_addr = 0;
     pin->owner_ptr = 0;
     pin->type = 0;
@@ -3329,6 +3330,7 @@ static void free_param_struct(hal_param_t * p)
 {
     /* clear contents of struct */
     if ( p->oldname != 0 ) free_oldname_struct(SHMPTR(p->oldname));
+    p->oldname = 0;
     p->data_ptr = 0;
     p->owner_ptr = 0;
     p->type = 0;
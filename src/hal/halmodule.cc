@@ -909,13 +909,154 @@ static int set_common(hal_type_t type, void *d_ptr, char *value) {
     return retval;
 }
 
+/*######################################*/
+/* Pins, params and signals by name     */
+
+/* Where a name was found the last time.  Freed pin, param and signal
+   structs have their name cleared and are only reused for the same kind
+   of object, so the struct still being there under the same name means
+   the lookup would find it again; this keeps a reference good across
+   the unloading and reloading of a component. */
+enum { REF_NONE, REF_PARAM, REF_PIN, REF_SIG };
+
+struct halref {
+    int kind;
+    int offset;
+    halref() : kind(REF_NONE), offset(0) {}
+};
+
+typedef std::map<std::string, halref> refmap;
+
+/* the lookups of get_value, get_values and set_p */
+static refmap name_refs;
+
+static bool ref_name_is(const char *name, const char *objname, int oldname) {
+    if(strcmp(objname, name) == 0) return true;
+    /* the oldname of a freed struct is gone, even if hal_lib did not
+       clear the offset to it */
+    return objname[0] != '\0' && oldname != 0
+        && strcmp(((hal_oldname_t *)SHMPTR(oldname))->name, name) == 0;
+}
+
+/* point ref at the param, pin or signal called name, looking it up only
+   if it has changed; the mutex must be held */
+static bool ref_resolve(const char *name, halref *ref) {
+    switch(ref->kind) {
+    case REF_PARAM: {
+        hal_param_t *param = (hal_param_t *)SHMPTR(ref->offset);
+        if(ref_name_is(name, param->name, param->oldname)) return true;
+        break; }
+    case REF_PIN: {
+        hal_pin_t *pin = (hal_pin_t *)SHMPTR(ref->offset);
+        if(ref_name_is(name, pin->name, pin->oldname)) return true;
+        break; }
+    case REF_SIG: {
+        hal_sig_t *sig = (hal_sig_t *)SHMPTR(ref->offset);
+        if(strcmp(sig->name, name) == 0) return true;
+        break; }
+    }
+
+    hal_param_t *param = halpr_find_param_by_name(name);
+    if(param) {
+        ref->kind = REF_PARAM;
+        ref->offset = SHMOFF(param);
+        return true;
+    }
+    hal_pin_t *pin = halpr_find_pin_by_name(name);
+    if(pin) {
+        ref->kind = REF_PIN;
+        ref->offset = SHMOFF(pin);
+        return true;
+    }
+    hal_sig_t *sig = halpr_find_sig_by_name(name);
+    if(sig) {
+        ref->kind = REF_SIG;
+        ref->offset = SHMOFF(sig);
+        return true;
+    }
+    ref->kind = REF_NONE;
+    return false;
+}
+
+/* the value of a resolved ref; the mutex must be held */
+static PyObject *ref_value(halref *ref) {
+    hal_type_t type;
+    void *d_ptr;
+    switch(ref->kind) {
+    case REF_PARAM: {
+        hal_param_t *param = (hal_param_t *)SHMPTR(ref->offset);
+        type = param->type;
+        d_ptr = SHMPTR(param->data_ptr);
+        break; }
+    case REF_PIN: {
+        hal_pin_t *pin = (hal_pin_t *)SHMPTR(ref->offset);
+        type = pin->type;
+        if (pin->signal != 0) {
+            hal_sig_t *sig = (hal_sig_t*)SHMPTR(pin->signal);
+            d_ptr = SHMPTR(sig->data_ptr);
+        } else {
+            d_ptr = &(pin->dummysig);
+        }
+        break; }
+    case REF_SIG: {
+        hal_sig_t *sig = (hal_sig_t *)SHMPTR(ref->offset);
+        type = sig->type;
+        d_ptr = SHMPTR(sig->data_ptr);
+        break; }
+    default:
+        Py_RETURN_NONE;
+    }
+    /* convert to python value */
+    switch(type) {
+        case HAL_BIT: return PyBool_FromLong((long)*(hal_bit_t *)d_ptr);
+        case HAL_U32: return Py_BuildValue("l",  (unsigned long)*(hal_u32_t *)d_ptr);
+        case HAL_S32: return Py_BuildValue("l",  (long)*(hal_s32_t *)d_ptr);
+        case HAL_FLOAT: return Py_BuildValue("f",  (double)*(hal_float_t *)d_ptr);
+        case HAL_TYPE_UNSPECIFIED: /* fallthrough */ ;
+        case HAL_TYPE_UNINITIALIZED: /* fallthrough */ ;
+    }
+    Py_RETURN_NONE;
+}
+
+/* where a resolved ref can be written, or NULL with the reason in *err;
+   the mutex must be held */
+static void *ref_writable(halref *ref, hal_type_t *type, const char **err) {
+    switch(ref->kind) {
+    case REF_PARAM: {
+        hal_param_t *param = (hal_param_t *)SHMPTR(ref->offset);
+        /* is it read only? */
+        if (param->dir == HAL_RO) {
+            *err = "param not writable";
+            return NULL;
+        }
+        *type = param->type;
+        return SHMPTR(param->data_ptr); }
+    case REF_PIN: {
+        hal_pin_t *pin = (hal_pin_t *)SHMPTR(ref->offset);
+        if(pin->dir == HAL_OUT) {
+            *err = "pin not writable";
+            return NULL;
+        }
+        if(pin->signal != 0) {
+            *err = "pin connected to signal";
+            return NULL;
+        }
+        *type = pin->type;
+        return (void*)&pin->dummysig; }
+    case REF_SIG:
+        *err = "signal not writable";
+        return NULL;
+    }
+    *err = "pin not found";
+    return NULL;
+}
+
 PyObject *set_p(PyObject *self, PyObject *args) {
     char *name,*value;
     int retval;
-    hal_param_t *param;
-    hal_pin_t *pin;
     hal_type_t type;
     void *d_ptr;
+    const char *err;
     
     if(!PyArg_ParseTuple(args, "ss", &name,&value)) return NULL;
     if(!SHMPTR(0)) {
@@ -926,47 +1067,13 @@ PyObject *set_p(PyObject *self, PyObject *args) {
     //printf("INFO HALMODULE -- settting pin / param - name:%s value:%s\n",name,value);
     // get mutex before accessing shared data 
     rtapi_mutex_get(&(hal_data->mutex));
-    // search param list for name 
-    param = halpr_find_param_by_name(name);
-    if (param == 0) {
-        pin = halpr_find_pin_by_name(name);
-        if(pin == 0) {
-            rtapi_mutex_give(&(hal_data->mutex));
-            
-            PyErr_Format(PyExc_RuntimeError,
-		        "pin not found");
-	        return NULL;
-        } else {
-            // found it 
-            type = pin->type;
-            if(pin->dir == HAL_OUT) {
-                rtapi_mutex_give(&(hal_data->mutex));
-                
-                PyErr_Format(PyExc_RuntimeError,
-		            "pin not writable");
-	            return NULL;
-            }
-            if(pin->signal != 0) {
-                rtapi_mutex_give(&(hal_data->mutex));
-                
-                PyErr_Format(PyExc_RuntimeError,
-		            "pin connected to signal");
-	            return NULL;
-            }
-            d_ptr = (void*)&pin->dummysig;
-        }
-    } else {
-        // found it 
-        type = param->type;
-        /* is it read only? */
-        if (param->dir == HAL_RO) {
-            rtapi_mutex_give(&(hal_data->mutex));
-            
-            PyErr_Format(PyExc_RuntimeError,
-		        "param not writable");
-	        return NULL;
-        }
-        d_ptr = SHMPTR(param->data_ptr);
+    halref *ref = &name_refs[name];
+    ref_resolve(name, ref);
+    d_ptr = ref_writable(ref, &type, &err);
+    if(!d_ptr) {
+        rtapi_mutex_give(&(hal_data->mutex));
+        PyErr_Format(PyExc_RuntimeError, "%s", err);
+        return NULL;
     }
     retval = set_common(type, d_ptr, value);
     rtapi_mutex_give(&(hal_data->mutex));   
@@ -978,11 +1085,6 @@ PyObject *set_p(PyObject *self, PyObject *args) {
 /* Get a Pin, Param or signal value     */
 PyObject *get_value(PyObject *self, PyObject *args) {
     char *name;
-    hal_param_t *param;
-    hal_pin_t *pin;
-    hal_sig_t *sig;
-    hal_type_t type;
-    void *d_ptr;
 
     if(!PyArg_ParseTuple(args, "s", &name)) return NULL;
     if(!SHMPTR(0)) {
@@ -992,68 +1094,346 @@ PyObject *get_value(PyObject *self, PyObject *args) {
     }
     /* get mutex before accessing shared data */
     rtapi_mutex_get(&(hal_data->mutex));
-    /* search param list for name */
-    param = halpr_find_param_by_name(name);
-    if (param) {
-        /* found it */
-        type = param->type;
-        d_ptr = SHMPTR(param->data_ptr);
+    halref *ref = &name_refs[name];
+    if(!ref_resolve(name, ref)) {
+        /* error if here */
         rtapi_mutex_give(&(hal_data->mutex));
-        /* convert to python value */
-        switch(type) {
-            case HAL_BIT: return PyBool_FromLong((long)*(hal_bit_t *)d_ptr);
-            case HAL_U32: return Py_BuildValue("l",  (unsigned long)*(hal_u32_t *)d_ptr);
-            case HAL_S32: return Py_BuildValue("l",  (long)*(hal_s32_t *)d_ptr);
-            case HAL_FLOAT: return Py_BuildValue("f",  (double)*(hal_float_t *)d_ptr);
-            case HAL_TYPE_UNSPECIFIED: /* fallthrough */ ;
-            case HAL_TYPE_UNINITIALIZED: /* fallthrough */ ;
-        }
+        PyErr_Format(PyExc_RuntimeError,
+        "Can't set value: pin / param %s not found", name);
+        return NULL;
     }
-    /* not found, search pin list for name */
-    pin = halpr_find_pin_by_name(name);
-    if(pin) {
-        /* found it */
-        type = pin->type;
-        if (pin->signal != 0) {
-            sig = (hal_sig_t*)SHMPTR(pin->signal);
-            d_ptr = SHMPTR(sig->data_ptr);
-        } else {
-            sig = 0;
-            d_ptr = &(pin->dummysig);
+    PyObject *r = ref_value(ref);
+    rtapi_mutex_give(&(hal_data->mutex));
+    return r;
+}
+
+struct refobj {
+    PyObject_HEAD
+    PyObject *name;
+    halref ref;
+    hal_type_t type;    /* of the object the last set() wrote */
+};
+
+/*######################################*/
+/* hal.ref: a name looked up once       */
+
+static int pyref_init(PyObject *_self, PyObject *args, PyObject *kw) {
+    refobj *self = (refobj *)_self;
+    char *name;
+    if(!PyArg_ParseTuple(args, "s:hal.ref", &name)) return -1;
+    if(strlen(name) > HAL_NAME_LEN) {
+        PyErr_Format(PyExc_ValueError, "name '%s' is too long", name);
+        return -1;
+    }
+    Py_XDECREF(self->name);
+    self->name = PyString_FromString(name);
+    if(!self->name) return -1;
+    self->ref = halref();
+    self->type = HAL_TYPE_UNSPECIFIED;
+    return 0;
+}
+
+static void pyref_delete(PyObject *_self) {
+    refobj *self = (refobj *)_self;
+    Py_XDECREF(self->name);
+    PyObject_Del(self);
+}
+
+static PyObject *pyref_repr(PyObject *_self) {
+    refobj *self = (refobj *)_self;
+    return PyString_FromFormat("<hal ref %s>",
+        self->name ? PyString_AS_STRING(self->name) : "");
+}
+
+static bool ref_check(refobj *self) {
+    if(!self->name) {
+        PyErr_SetString(PyExc_RuntimeError, "hal.ref not initialized");
+        return false;
+    }
+    if(!SHMPTR(0)) {
+	PyErr_Format(PyExc_RuntimeError,
+		"Cannot call before creating component");
+	return false;
+    }
+    return true;
+}
+
+static PyObject *pyref_get(PyObject *_self, PyObject *unused) {
+    refobj *self = (refobj *)_self;
+    if(!ref_check(self)) return NULL;
+    const char *name = PyString_AS_STRING(self->name);
+    rtapi_mutex_get(&(hal_data->mutex));
+    if(!ref_resolve(name, &self->ref)) {
+        rtapi_mutex_give(&(hal_data->mutex));
+        PyErr_Format(PyExc_RuntimeError,
+            "pin / param / signal %s not found", name);
+        return NULL;
+    }
+    PyObject *r = ref_value(&self->ref);
+    rtapi_mutex_give(&(hal_data->mutex));
+    return r;
+}
+
+/* convert a python value for a HAL object of the given type */
+static bool ref_convert(PyObject *value, hal_type_t type, hal_data_u *v) {
+    switch(type) {
+    case HAL_BIT: {
+        int b = PyObject_IsTrue(value);
+        if(b < 0) return false;
+        v->b = b;
+        return true; }
+    case HAL_FLOAT: {
+        double f = PyFloat_AsDouble(value);
+        if(f == -1 && PyErr_Occurred()) return false;
+        v->f = f;
+        return true; }
+    case HAL_S32: {
+        long l = PyInt_AsLong(value);
+        if(l == -1 && PyErr_Occurred()) return false;
+        if(l < INT32_MIN || l > INT32_MAX) break;
+        v->s = l;
+        return true; }
+    case HAL_U32: {
+        long l = PyInt_AsLong(value);
+        if(l == -1 && PyErr_Occurred()) return false;
+        if(l < 0 || l > (long)UINT32_MAX) break;
+        v->u = l;
+        return true; }
+    default: break;
+    }
+    PyErr_SetString(PyExc_ValueError, "value out of range");
+    return false;
+}
+
+static PyObject *pyref_set(PyObject *_self, PyObject *args) {
+    refobj *self = (refobj *)_self;
+    PyObject *value;
+    if(!PyArg_ParseTuple(args, "O:hal.ref.set", &value)) return NULL;
+    if(!ref_check(self)) return NULL;
+
+    const char *name = PyString_AS_STRING(self->name);
+    bool is_string = PyString_Check(value);
+    hal_data_u v;
+    hal_type_t type = HAL_TYPE_UNSPECIFIED;
+    const char *err;
+    int retval = 0;
+    /* python values are converted without the mutex, as the type the
+       object had the last time; if it has another type now, convert
+       again */
+    while(1) {
+        if(!is_string && self->type != HAL_TYPE_UNSPECIFIED
+                && !ref_convert(value, self->type, &v)) {
+            if(PyErr_ExceptionMatches(PyExc_ValueError)
+                    || PyErr_ExceptionMatches(PyExc_OverflowError)) {
+                PyErr_Clear();
+                PyErr_Format(PyExc_ValueError, "invalid value for %s", name);
+            }
+            return NULL;
+        }
+        rtapi_mutex_get(&(hal_data->mutex));
+        ref_resolve(name, &self->ref);
+        void *d_ptr = ref_writable(&self->ref, &type, &err);
+        if(!d_ptr) {
+            rtapi_mutex_give(&(hal_data->mutex));
+            PyErr_Format(PyExc_RuntimeError, "%s: %s", name, err);
+            return NULL;
+        }
+        if(is_string) {
+            retval = set_common(type, d_ptr, PyString_AS_STRING(value));
+        } else if(type == self->type) {
+            switch(type) {
+            case HAL_BIT: *(hal_bit_t *)d_ptr = v.b; break;
+            case HAL_FLOAT: *(hal_float_t *)d_ptr = v.f; break;
+            case HAL_S32: *(hal_s32_t *)d_ptr = v.s; break;
+            case HAL_U32: *(hal_u32_t *)d_ptr = v.u; break;
+            default: retval = -EINVAL;
+            }
         }
         rtapi_mutex_give(&(hal_data->mutex));
-        /* convert to python value */
-        switch(type) {
-            case HAL_BIT: return PyBool_FromLong((long)*(hal_bit_t *)d_ptr);
-            case HAL_U32: return Py_BuildValue("l",  (unsigned long)*(hal_u32_t *)d_ptr);
-            case HAL_S32: return Py_BuildValue("l",  (long)*(hal_s32_t *)d_ptr);
-            case HAL_FLOAT: return Py_BuildValue("f",  (double)*(hal_float_t *)d_ptr);
-            case HAL_TYPE_UNSPECIFIED: /* fallthrough */ ;
-            case HAL_TYPE_UNINITIALIZED: /* fallthrough */ ;
+        if(is_string || type == self->type) break;
+        self->type = type;
+    }
+    if(retval) {
+        PyErr_Format(PyExc_ValueError, "invalid value for %s", name);
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyObject *pyref_exists(PyObject *_self, void *unused) {
+    refobj *self = (refobj *)_self;
+    if(!ref_check(self)) return NULL;
+    rtapi_mutex_get(&(hal_data->mutex));
+    bool found = ref_resolve(PyString_AS_STRING(self->name), &self->ref);
+    rtapi_mutex_give(&(hal_data->mutex));
+    return PyBool_FromLong(found);
+}
+
+static PyObject *pyref_name(PyObject *_self, void *unused) {
+    refobj *self = (refobj *)_self;
+    PyObject *r = self->name ? self->name : Py_None;
+    Py_INCREF(r);
+    return r;
+}
+
+static PyMethodDef ref_methods[] = {
+    {"get", pyref_get, METH_NOARGS,
+	".get(): Gets the pin, param or signal value"},
+    {"set", pyref_set, METH_VARARGS,
+	".set(value): Sets the pin or param value from a number or a string"},
+    {NULL},
+};
+
+#pragma GCC diagnostic ignored "-Wwrite-strings"
+static PyGetSetDef ref_getset[] = {
+    {"name", pyref_name, NULL, NULL, NULL},
+    {"exists", pyref_exists, NULL, NULL, NULL},
+    {}
+};
+#pragma GCC diagnostic warning "-Wwrite-strings"
+
+static
+PyTypeObject ref_type = {
+    PyObject_HEAD_INIT(NULL)
+    0,                         /*ob_size*/
+    "hal.ref",                 /*tp_name*/
+    sizeof(refobj),            /*tp_basicsize*/
+    0,                         /*tp_itemsize*/
+    pyref_delete,              /*tp_dealloc*/
+    0,                         /*tp_print*/
+    0,                         /*tp_getattr*/
+    0,                         /*tp_setattr*/
+    0,                         /*tp_compare*/
+    pyref_repr,                /*tp_repr*/
+    0,                         /*tp_as_number*/
+    0,                         /*tp_as_sequence*/
+    0,                         /*tp_as_mapping*/
+    0,                         /*tp_hash */
+    0,                         /*tp_call*/
+    0,                         /*tp_str*/
+    0,                         /*tp_getattro*/
+    0,                         /*tp_setattro*/
+    0,                         /*tp_as_buffer*/
+    Py_TPFLAGS_DEFAULT,        /*tp_flags*/
+    "HAL pin, param or signal by name, looked up once",  /*tp_doc*/
+    0,                         /*tp_traverse*/
+    0,                         /*tp_clear*/
+    0,                         /*tp_richcompare*/
+    0,                         /*tp_weaklistoffset*/
+    0,                         /*tp_iter*/
+    0,                         /*tp_iternext*/
+    ref_methods,               /*tp_methods*/
+    0,                         /*tp_members*/
+    ref_getset,                /*tp_getset*/
+    0,                         /*tp_base*/
+    0,                         /*tp_dict*/
+    0,                         /*tp_descr_get*/
+    0,                         /*tp_descr_set*/
+    0,                         /*tp_dictoffset*/
+    pyref_init,                /*tp_init*/
+    0,                         /*tp_alloc*/
+    PyType_GenericNew,         /*tp_new*/
+    0,                         /*tp_free*/
+    0,                         /*tp_is_gc*/
+};
+
+/*######################################*/
+/* Get many values in one call          */
+PyObject *get_values(PyObject *self, PyObject *args) {
+    PyObject *names;
+
+    if(!PyArg_ParseTuple(args, "O:hal.get_values", &names)) return NULL;
+    PyObject *seq = PySequence_Fast(names, "get_values: expected a sequence");
+    if(!seq) return NULL;
+    Py_ssize_t n = PySequence_Fast_GET_SIZE(seq);
+    for(Py_ssize_t i=0; i<n; i++) {
+        PyObject *o = PySequence_Fast_GET_ITEM(seq, i);
+        if(!PyString_Check(o) && !PyObject_TypeCheck(o, &ref_type)) {
+            Py_DECREF(seq);
+            PyErr_Format(PyExc_TypeError,
+                "get_values: expected names or hal.ref, not %s",
+                Py_TYPE(o)->tp_name);
+            return NULL;
         }
     }
-    sig = halpr_find_sig_by_name(name);
-    if (sig != 0) {
-        /* found it */
-        type = sig->type;
-        d_ptr = SHMPTR(sig->data_ptr);
-        rtapi_mutex_give(&(hal_data->mutex));
-        /* convert to python value */
-        switch(type) {
-            case HAL_BIT: return PyBool_FromLong((long)*(hal_bit_t *)d_ptr);
-            case HAL_U32: return Py_BuildValue("l",  (unsigned long)*(hal_u32_t *)d_ptr);
-            case HAL_S32: return Py_BuildValue("l",  (long)*(hal_s32_t *)d_ptr);
-            case HAL_FLOAT: return Py_BuildValue("f",  (double)*(hal_float_t *)d_ptr);
-            case HAL_TYPE_UNSPECIFIED: /* fallthrough */ ;
-            case HAL_TYPE_UNINITIALIZED: /* fallthrough */ ;
+    if(!SHMPTR(0)) {
+        Py_DECREF(seq);
+	PyErr_Format(PyExc_RuntimeError,
+		"Cannot call before creating component");
+	return NULL;
+    }
+    PyObject *result = PyTuple_New(n);
+    if(!result) { Py_DECREF(seq); return NULL; }
+
+    /* all of them under one hold of the mutex */
+    rtapi_mutex_get(&(hal_data->mutex));
+    for(Py_ssize_t i=0; i<n; i++) {
+        PyObject *o = PySequence_Fast_GET_ITEM(seq, i);
+        const char *name;
+        halref *ref;
+        if(PyString_Check(o)) {
+            name = PyString_AS_STRING(o);
+            ref = &name_refs[name];
+        } else {
+            name = PyString_AS_STRING(((refobj *)o)->name);
+            ref = &((refobj *)o)->ref;
         }
+        PyObject *v;
+        if(!ref_resolve(name, ref)) {
+            PyErr_Format(PyExc_RuntimeError,
+                "pin / param / signal %s not found", name);
+            v = NULL;
+        } else {
+            v = ref_value(ref);
+        }
+        if(!v) {
+            rtapi_mutex_give(&(hal_data->mutex));
+            Py_DECREF(result);
+            Py_DECREF(seq);
+            return NULL;
+        }
+        PyTuple_SET_ITEM(result, i, v);
     }
-    /* error if here */
     rtapi_mutex_give(&(hal_data->mutex));
-    PyErr_Format(PyExc_RuntimeError,
-    "Can't set value: pin / param %s not found", name);
-	return NULL;
+    Py_DECREF(seq);
+    return result;
+}
 
+/*######################################*/
+/* Read many pins or params in one call */
+PyObject *read_items(PyObject *self, PyObject *args) {
+    PyObject *items;
+
+    if(!PyArg_ParseTuple(args, "O:hal.read_items", &items)) return NULL;
+    PyObject *seq = PySequence_Fast(items, "read_items: expected a sequence");
+    if(!seq) return NULL;
+
+    Py_ssize_t n = PySequence_Fast_GET_SIZE(seq);
+    PyObject *result = PyTuple_New(n);
+    if(!result) { Py_DECREF(seq); return NULL; }
+    for(Py_ssize_t i=0; i<n; i++) {
+        PyObject *o = PySequence_Fast_GET_ITEM(seq, i);
+        PyObject *wrapped = NULL;
+        if(!PyObject_TypeCheck(o, &halpin_type)) {
+            /* hal.Pin and hal.Param keep the item in '_item' */
+            wrapped = PyObject_GetAttrString(o, "_item");
+            if(!wrapped || !PyObject_TypeCheck(wrapped, &halpin_type)) {
+                PyErr_Clear();
+                Py_XDECREF(wrapped);
+                PyErr_Format(PyExc_TypeError,
+                    "read_items: item %d is not a hal.item", (int)i);
+                Py_DECREF(result); Py_DECREF(seq);
+                return NULL;
+            }
+            o = wrapped;
+        }
+        PyObject *v = pyhal_read_common(&((pyhalitem*)o)->pin);
+        Py_XDECREF(wrapped);
+        if(!v) { Py_DECREF(result); Py_DECREF(seq); return NULL; }
+        PyTuple_SET_ITEM(result, i, v);
+    }
+    Py_DECREF(seq);
+    return result;
 }
 
 
@@ -1328,9 +1708,114 @@ PyObject *stream_write(PyObject *_self, PyObject *args) {
     Py_RETURN_NONE;
 }
 
+/* read_many, read_into and write_many move samples as records: one
+   hal_stream_data per element, followed by one holding the sample number
+   (see hal.stream_dtype() for the numpy description of a record) */
+static Py_ssize_t stream_record_size(streamobj *self) {
+    return (PyString_Size(self->pyelt) + 1) * sizeof(hal_stream_data);
+}
+
+/* read up to count samples into buf, stopping early when the stream is
+   empty; returns the number of samples read */
+static Py_ssize_t stream_read_records(streamobj *self, char *buf, Py_ssize_t count) {
+    int n = PyString_Size(self->pyelt);
+    Py_ssize_t size = stream_record_size(self);
+    Py_ssize_t i;
+    hal_stream_data rec[n+1];
+    unsigned sampleno = self->sampleno;
+
+    Py_BEGIN_ALLOW_THREADS
+    for(i=0; i<count && hal_stream_readable(&self->stream); i++) {
+        if(hal_stream_read(&self->stream, rec, &sampleno) < 0) break;
+        memset(&rec[n], 0, sizeof(rec[n]));
+        rec[n].u = sampleno;
+        memcpy(buf + i * size, rec, size);
+    }
+    Py_END_ALLOW_THREADS
+    self->sampleno = sampleno;
+    return i;
+}
+
+PyObject *stream_read_many(PyObject *_self, PyObject *args) {
+    streamobj *self = (streamobj *)_self;
+    Py_ssize_t count;
+    if(!PyArg_ParseTuple(args, "n:hal.stream.read_many", &count))
+        return NULL;
+    if(count < 0) count = 0;
+    Py_ssize_t depth = hal_stream_depth(&self->stream);
+    if(count > depth) count = depth;
+
+    Py_ssize_t size = stream_record_size(self);
+    PyObject *r = PyByteArray_FromStringAndSize(NULL, count * size);
+    if(!r) return NULL;
+    Py_ssize_t got = stream_read_records(self, PyByteArray_AS_STRING(r), count);
+    if(got != count && PyByteArray_Resize(r, got * size) < 0) {
+        Py_DECREF(r);
+        return NULL;
+    }
+    return r;
+}
+
+PyObject *stream_read_into(PyObject *_self, PyObject *args) {
+    streamobj *self = (streamobj *)_self;
+    PyObject *obj;
+    Py_ssize_t count = -1;
+    if(!PyArg_ParseTuple(args, "O|n:hal.stream.read_into", &obj, &count))
+        return NULL;
+
+    Py_buffer view;
+    if(PyObject_GetBuffer(obj, &view, PyBUF_WRITABLE) < 0)
+        return NULL;
+    Py_ssize_t room = view.len / stream_record_size(self);
+    if(count < 0 || count > room) count = room;
+    Py_ssize_t got = stream_read_records(self, (char *)view.buf, count);
+    PyBuffer_Release(&view);
+    return PyInt_FromSsize_t(got);
+}
+
+PyObject *stream_write_many(PyObject *_self, PyObject *args) {
+    streamobj *self = (streamobj *)_self;
+    PyObject *obj;
+    if(!PyArg_ParseTuple(args, "O:hal.stream.write_many", &obj))
+        return NULL;
+
+    Py_buffer view;
+    if(PyObject_GetBuffer(obj, &view, PyBUF_SIMPLE) < 0)
+        return NULL;
+    Py_ssize_t size = stream_record_size(self);
+    if(view.len % size) {
+        PyBuffer_Release(&view);
+        PyErr_Format(PyExc_ValueError,
+            "hal.stream.write_many: buffer is not a whole number of %d byte records",
+            (int)size);
+        return NULL;
+    }
+
+    int n = PyString_Size(self->pyelt);
+    Py_ssize_t count = view.len / size, i;
+    hal_stream_data rec[n+1];
+    char *buf = (char *)view.buf;
+    Py_BEGIN_ALLOW_THREADS
+    /* stop when the stream is full rather than count overruns; the
+       caller writes the rest later */
+    for(i=0; i<count && hal_stream_writable(&self->stream); i++) {
+        memcpy(rec, buf + i * size, size);
+        if(hal_stream_write(&self->stream, rec) < 0) break;
+    }
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&view);
+    return PyInt_FromSsize_t(i);
+}
+
 static PyMethodDef stream_methods[] = {
     {"read", stream_read, METH_NOARGS},
     {"write", stream_write, METH_VARARGS},
+    {"read_many", stream_read_many, METH_VARARGS,
+        ".read_many(n): Read up to n samples as a bytearray of records"},
+    {"read_into", stream_read_into, METH_VARARGS,
+        ".read_into(buffer[, n]): Read up to n samples as records into a writable buffer, return the number read"},
+    {"write_many", stream_write_many, METH_VARARGS,
+        ".write_many(buffer): Write the records in a buffer until the stream is full, return the number written"},
     {}
 };
 
@@ -1345,6 +1830,11 @@ PyObject *stream_getter(PyObject *_self, void *vfp) {
     return to_python(result);
 }
 
+PyObject *stream_get_record_size(PyObject *_self, void *unused) {
+    streamobj *self = reinterpret_cast<streamobj*>(_self);
+    return PyInt_FromSsize_t(stream_record_size(self));
+}
+
 PyObject *stream_element_types(PyObject *_self, void *unused) {
     streamobj *self = reinterpret_cast<streamobj*>(_self);
     if(!self->pyelt) {
@@ -1367,6 +1857,7 @@ static PyGetSetDef stream_getset[] = {
     {"writable", stream_getter<bool>, NULL, NULL, VFC(hal_stream_writable)},
     {"depth", stream_getter<int>, NULL, NULL, VFC(hal_stream_depth)},
     {"element_types", stream_element_types, NULL, NULL, NULL},
+    {"record_size", stream_get_record_size, NULL, NULL, NULL},
     {"maxdepth", stream_getter<int>, NULL, NULL, VFC(hal_stream_maxdepth)},
     {"num_underruns", stream_getter<int>, NULL, NULL, VFC(hal_stream_num_underruns)},
     {"num_overruns", stream_getter<int>, NULL, NULL, VFC(hal_stream_num_overruns)},
@@ -1456,6 +1947,10 @@ PyMethodDef module_methods[] = {
 	"set pin value"},
     {"get_value", get_value, METH_VARARGS,
 	".get_value('name'}: Gets the pin, param or signal value"},
+    {"get_values", get_values, METH_VARARGS,
+	".get_values(names): Return a tuple of the values of a sequence of pin, param or signal names or hal.ref objects"},
+    {"read_items", read_items, METH_VARARGS,
+	".read_items(items): Return a tuple of the values of a sequence of pins or params"},
     {NULL},
 };
 
@@ -1497,10 +1992,12 @@ void init_hal(void) {
     PyType_Ready(&shm_type);
     PyType_Ready(&halpin_type);
     PyType_Ready(&stream_type);
+    PyType_Ready(&ref_type);
     PyModule_AddObject(m, "component", (PyObject*)&halobject_type);
     PyModule_AddObject(m, "shm", (PyObject*)&shm_type);
     PyModule_AddObject(m, "item", (PyObject*)&halpin_type);
     PyModule_AddObject(m, "stream", (PyObject*)&stream_type);
+    PyModule_AddObject(m, "ref", (PyObject*)&ref_type);
 
     PyModule_AddIntConstant(m, "MSG_NONE", RTAPI_MSG_NONE);
     PyModule_AddIntConstant(m, "MSG_ERR", RTAPI_MSG_ERR);
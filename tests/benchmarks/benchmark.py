@@ -0,0 +1,41 @@
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+What the benchmark scripts share: the option parser, which shows the
+docstring of the script with --help, the timing of a call and the
+reading of comma separated number lists.
+"""
+
+import time
+from optparse import OptionParser, IndentedHelpFormatter
+
+class _Formatter(IndentedHelpFormatter):
+    # keep the paragraphs of the docstring as they are
+    def format_description(self, description):
+        return description.strip() + "\n\n"
+
+def parser(doc):
+    """The option parser of a script whose docstring is doc"""
+    return OptionParser(usage="%prog [options]", description=doc,
+        formatter=_Formatter())
+
+def timed(f, *args):
+    """(seconds, result) of calling f(*args)"""
+    t0 = time.time()
+    result = f(*args)
+    return time.time() - t0, result
+
+def numbers(text, type=int):
+    """The numbers of a comma separated option like '1000,10000'"""
+    return [type(n) for n in text.split(",") if n.strip()]
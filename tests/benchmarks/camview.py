@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Run the qtvcp camview capture and processing threads without a screen.
+
+The old capture thread read frames as fast as the source gave them; that
+is shown first, with the synthetic source (or --source).  Then the frame
+limited pipeline runs for a few seconds at each rate with a consumer that
+takes --consume milliseconds per picture, like a busy GUI thread, and the
+frames read, dropped (before and after processing) and shown and the processing time are printed.  With
+--detect, the edges found are compared with the corner of the synthetic
+part.
+"""
+
+import time
+import threading
+from qtvcp.lib import video_stream
+import benchmark
+
+def unthrottled(source, seconds):
+    "The replaced capture loop"
+    state = {'reads': 0, 'stop': False}
+    def update():
+        while not state['stop']:
+            source.read()
+            state['reads'] += 1
+    t = threading.Thread(target=update)
+    t.start()
+    time.sleep(seconds)
+    state['stop'] = True
+    t.join()
+    return state['reads']
+
+def run(source, fps, size, consume, detect, seconds):
+    overlay = video_stream.Overlay()
+    overlay.size = size
+    overlay.detect = detect
+    shown = []
+    errors = []
+    event = threading.Event()
+    stream = video_stream.VideoStream(source, fps).start()
+    processor = video_stream.FrameProcessor(stream, overlay, event.set).start()
+    end = time.time() + seconds
+    while time.time() < end:
+        if not event.wait(.1): continue
+        event.clear()
+        frame = processor.frames.take()
+        if frame is None: continue
+        shown.append(processor.process_time)
+        edges = processor.edges
+        if detect and edges and hasattr(source, 'corner'):
+            # the corner has moved on a little since the frame was read
+            cx, cy = source.corner()
+            x, y, dx, dy = edges
+            if dx is not None and dy is not None:
+                errors.append(max(abs(dx - (cx - source.width / 2.)),
+                                  abs(dy - (cy - source.height / 2.))))
+        time.sleep(consume / 1000.)
+    processor.stop()
+    stream.stop()
+    return stream.frames, processor.frames, shown, errors
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-s", "--source", default="synthetic:1280x720",
+        help="camera number, video file or synthetic:WxH")
+    parser.add_option("-r", "--rates", default="5,15,30",
+        help="comma separated frame rates")
+    parser.add_option("-c", "--consume", type="float", default=50,
+        help="milliseconds the consumer takes per picture")
+    parser.add_option("-w", "--size", default="640x480",
+        help="size of the widget")
+    parser.add_option("-d", "--detect", action="store_true")
+    parser.add_option("-t", "--seconds", type="float", default=3)
+    options, args = parser.parse_args()
+    size = tuple([int(v) for v in options.size.split('x')])
+
+    source = video_stream.open_source(options.source)
+    reads = unthrottled(source, options.seconds)
+    print "unthrottled capture  %6.1f frames/s read" % (reads / options.seconds)
+    for fps in benchmark.numbers(options.rates):
+        source = video_stream.open_source(options.source)
+        frames, pictures, shown, errors = run(source, fps, size, options.consume,
+            options.detect, options.seconds)
+        print "fps %3d  read %6.1f/s  dropped %4d + %4d  shown %6.1f/s" \
+            "  processing %5.1f ms" % (fps,
+            frames.published / options.seconds, frames.dropped,
+            pictures.dropped, len(shown) / options.seconds,
+            1000 * sum(shown) / max(len(shown), 1)),
+        if errors:
+            print " edge error max %.1f px" % max(errors),
+        print
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Time rs274.author.douglas() against the recursive version it replaced, on
+the kinds of cuts that are written through Gcode.cut():
+
+  scanline  image-to-gcode rows: a long XZ profile with fine texture
+  outline   a foam cutter style closed 2D outline in G17, made of long
+            arcs and straight runs, given as many closely spaced points
+  noise     points without any structure, the worst case for both
+
+The moves of both versions are compared, and the time of a Gcode writer
+with max_cuts set (simplifying every few thousand points as they come) is
+shown as 'chunked'.
+"""
+
+import sys
+import math
+import random
+from rs274 import author
+from rs274.author import dist_lseg, arc_rad, arc_center, one_quadrant, \
+    arc_dir, arc_fmt
+import benchmark
+
+def recursive_douglas(st, tolerance=.001, plane=None, _first=True):
+    "The replaced implementation, for comparison"
+    if len(st) == 1:
+        yield "G1", st[0], None
+        return
+    l1 = st[0]
+    l2 = st[-1]
+    worst_dist = 0
+    worst = 0
+    min_rad = sys.maxint
+    max_arc = -1
+    ps = st[0]
+    pe = st[-1]
+    for i, p in enumerate(st):
+        if p is l1 or p is l2: continue
+        dist = dist_lseg(l1, l2, p)
+        if dist > worst_dist:
+            worst = i
+            worst_dist = dist
+            rad = arc_rad(plane, ps, p, pe)
+            if rad < min_rad:
+                max_arc = i
+                min_rad = rad
+    worst_arc_dist = sys.maxint
+    if min_rad != sys.maxint:
+        c1, c2 = arc_center(plane, ps, st[max_arc], pe)
+        if one_quadrant(plane, (c1, c2), ps, st[max_arc], pe):
+            worst_arc_dist = 0
+            for (x, y, z) in st:
+                if plane == 17: dist = abs(math.hypot(c1-x, c2-y) - min_rad)
+                elif plane == 18: dist = abs(math.hypot(c1-x, c2-z) - min_rad)
+                elif plane == 19: dist = abs(math.hypot(c1-y, c2-z) - min_rad)
+                if dist > worst_arc_dist: worst_arc_dist = dist
+    if worst_arc_dist < tolerance and worst_arc_dist < worst_dist:
+        ccw = arc_dir(plane, (c1, c2), ps, st[max_arc], pe)
+        if plane == 18: ccw = not ccw
+        yield "G1", ps, None
+        if ccw:
+            yield "G3", st[-1], arc_fmt(plane, c1, c2, ps)
+        else:
+            yield "G2", st[-1], arc_fmt(plane, c1, c2, ps)
+    elif worst_dist > tolerance:
+        if _first: yield "G1", st[0], None
+        for i in recursive_douglas(st[:worst+1], tolerance, plane, False):
+            yield i
+        yield "G1", st[worst], None
+        for i in recursive_douglas(st[worst:], tolerance, plane, False):
+            yield i
+        if _first: yield "G1", st[-1], None
+    else:
+        if _first: yield "G1", st[0], None
+        if _first: yield "G1", st[-1], None
+
+def scanline(n):
+    return 18, [[i * .006, 0., .5 * math.sin(i * .004)
+        + .001 * math.sin(i * 1.3)] for i in range(n)]
+
+def outline(n):
+    # a slot: two half circles joined by straight sides
+    pts = []
+    quarter = n / 4
+    for i in range(quarter):
+        a = math.pi * i / quarter
+        pts.append([2 + math.cos(a - math.pi / 2), math.sin(a - math.pi / 2), 0.])
+    for i in range(quarter):
+        pts.append([2 - 4. * i / quarter, 1., 0.])
+    for i in range(quarter):
+        a = math.pi * i / quarter
+        pts.append([-2 + math.cos(a + math.pi / 2), math.sin(a + math.pi / 2), 0.])
+    for i in range(quarter):
+        pts.append([-2 + 4. * i / quarter, -1., 0.])
+    return 17, pts
+
+def noise(n):
+    random.seed(1)
+    return 17, [[random.random(), random.random(), 0.] for i in range(n)]
+
+workloads = [('scanline', scanline), ('outline', outline), ('noise', noise)]
+
+def chunked(st, plane, tolerance, max_cuts):
+    lines = []
+    g = author.Gcode(tolerance=tolerance, target=lines.append,
+        max_cuts=max_cuts)
+    g.set_plane(plane)
+    for x, y, z in st:
+        g.cut(x, y, z)
+    g.flush()
+    return lines
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-p", "--points", default="1000,10000,40000",
+        help="comma separated path lengths")
+    parser.add_option("-t", "--tolerance", type="float", default=.001)
+    parser.add_option("-c", "--max-cuts", type="int", default=5000)
+    options, args = parser.parse_args()
+
+    for name, make in workloads:
+        for n in benchmark.numbers(options.points):
+            if name == 'noise' and n > 10000: continue
+            plane, st = make(n)
+            old, old_moves = benchmark.timed(lambda:
+                list(recursive_douglas(st, options.tolerance, plane)))
+            new, new_moves = benchmark.timed(lambda:
+                list(author.douglas(st, options.tolerance, plane)))
+            part, lines = benchmark.timed(lambda:
+                chunked(st, plane, options.tolerance, options.max_cuts))
+            print "%-8s %6d points  %6d moves%s  recursive %7.3fs" \
+                "  iterative %7.3fs  chunked %7.3fs" % (name, n,
+                len(new_moves), old_moves == new_moves and " " or "!",
+                old, new, part)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Time the styling of a large G code program by the qtvcp gcode editor's
+lexer: the old one character at a time loop (one setStyling() call per
+character) against qtvcp.lib.gcode_lexer.styles(), which styles the whole
+text at once and is handed to scintilla in one SCI_SETSTYLINGEX call.
+
+No editor is needed: the old loop's setStyling() calls are collected in a
+list, and both results are compared.  Use --file to style a real program
+instead of the generated one.
+"""
+
+import random
+from qtvcp.lib import gcode_lexer
+import benchmark
+
+DEFAULT, COMMENT, KEY, ASSIGNMENT, VALUE = range(5)
+
+def old_styles(source):
+    "The replaced GcodeLexer.styleText() loop"
+    out = bytearray()
+    def set_style(n, style):
+        out.append(style)
+    for line in source.splitlines(True):
+        graymode = False
+        msg = ('msg' in line.lower() or 'debug' in line.lower())
+        for char in str(line):
+            if char == ('('):
+                graymode = True
+                set_style(1, COMMENT)
+                continue
+            elif char == (')'):
+                graymode = False
+                set_style(1, COMMENT)
+                continue
+            elif graymode:
+                if (msg and char.lower() in ('m', 's', 'g', ',', 'd', 'e', 'b', 'u')):
+                    set_style(1, ASSIGNMENT)
+                    if char == ',': msg = False
+                else:
+                    set_style(1, COMMENT)
+                continue
+            elif char in ('%', '<', '>', '#', '='):
+                state = ASSIGNMENT
+            elif char in ('[', ']'):
+                state = VALUE
+            elif char.isalpha():
+                state = KEY
+            else:
+                state = DEFAULT
+            set_style(1, state)
+    return out
+
+def program(lines):
+    random.seed(1)
+    out = ["%", "(generated test program)", "G20 G90 G64 P0.001",
+        "#<depth> = -0.125", "o100 sub", "(MSG, starting the cut)"]
+    while len(out) < lines - 2:
+        r = random.random()
+        if r < .9:
+            out.append("G1 X%.4f Y%.4f Z[#<depth>*%.3f] F%d" % (
+                random.uniform(-5, 5), random.uniform(-5, 5),
+                random.random(), random.randint(10, 60)))
+        elif r < .97:
+            out.append("G2 X%.4f Y%.4f I%.4f J0 (arc %d)" % (
+                random.uniform(-5, 5), random.uniform(-5, 5),
+                random.uniform(-1, 1), len(out)))
+        else:
+            out.append("(DEBUG, line #1 = [#1]) o100 call [%d]" % len(out))
+    out += ["M2", "%"]
+    return "\n".join(out) + "\n"
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-n", "--lines", type="int", default=1000000)
+    parser.add_option("-f", "--file", help="style this file instead")
+    options, args = parser.parse_args()
+
+    if options.file:
+        text = open(options.file, "rb").read()
+    else:
+        text = program(options.lines)
+    lines = text.count("\n")
+
+    t_new, new = benchmark.timed(gcode_lexer.styles, text)
+    runs = len(gcode_lexer.runs(new))
+
+    t_old, old = benchmark.timed(old_styles, bytearray(text))
+
+    print "%d lines, %d bytes" % (lines, len(text))
+    print "per character  %7.2fs  %9d setStyling calls" % (t_old, len(old))
+    print "whole text     %7.2fs  %9d runs, 1 SCI_SETSTYLINGEX call" % (
+        t_new, runs)
+    print "styles %s" % (old == new and "match" or "DIFFER")
+
+if __name__ == '__main__':
+    main()
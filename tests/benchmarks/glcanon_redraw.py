@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Time how long it takes to (re)compile the program display lists of the
+preview, comparing the immediate-mode linuxcnc.draw_lines with the packed
+vertex buffers of linuxcnc.pack_lines / linuxcnc.draw_packed.
+
+Needs an X display, since it opens a small Togl window for the GL context.
+"""
+
+import Tkinter
+import linuxcnc
+from minigl import *
+from rs274.OpenGLTk import RawOpengl
+from glcanon_storage import surface_moves
+import benchmark
+
+def make_lines(nsegs):
+    lines = []
+    lo = (0,) * 9
+    for i, (kind, (x, y, z)) in enumerate(surface_moves(nsegs)):
+        l = (x, y, z, 0, 0, 0, 0, 0, 0)
+        lines.append((i, lo, l, 10.0, [0, 0, 0]))
+        lo = l
+    return lines
+
+def compile_list(dl, fn):
+    glNewList(dl, GL_COMPILE)
+    fn()
+    glEndList()
+    glFlush()
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-n", "--segments", type="int", default=500000,
+        help="approximate number of segments to generate")
+    parser.add_option("-r", "--repeat", type="int", default=3,
+        help="number of recompiles to time")
+    parser.add_option("-g", "--geometry", default="XYZ",
+        help="geometry string passed to the drawing functions")
+    options, args = parser.parse_args()
+
+    root = Tkinter.Tk()
+    w = RawOpengl(root, width=64, height=64, double=1, depth=1)
+    w.redraw = lambda: None
+    w.pack()
+    root.update()
+    w.tk.call(w._w, 'makecurrent')
+
+    lines = make_lines(options.segments)
+    geometry = options.geometry
+    dl = glGenLists(1)
+
+    for i in range(options.repeat):
+        t, _ = benchmark.timed(compile_list, dl,
+            lambda: linuxcnc.draw_lines(geometry, lines, 0))
+        print "draw_lines          %8d segs  %7.3fs" % (len(lines), t)
+
+    t, (vertices, runs) = benchmark.timed(linuxcnc.pack_lines, geometry, lines)
+    print "pack_lines (once)   %8d segs  %7.3fs" % (len(lines), t)
+    for i in range(options.repeat):
+        t, _ = benchmark.timed(compile_list, dl,
+            lambda: linuxcnc.draw_packed(vertices, runs, 0))
+        print "draw_packed         %8d segs  %7.3fs" % (len(lines), t)
+
+    for i in range(options.repeat):
+        t, _ = benchmark.timed(compile_list, dl,
+            lambda: linuxcnc.draw_lines(geometry, lines, 1))
+        print "draw_lines  select  %8d segs  %7.3fs" % (len(lines), t)
+    for i in range(options.repeat):
+        t, _ = benchmark.timed(compile_list, dl,
+            lambda: linuxcnc.draw_packed(vertices, runs, 1))
+        print "draw_packed select  %8d segs  %7.3fs" % (len(lines), t)
+
+    glDeleteLists(dl, 1)
+    root.destroy()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Compare the memory use and load time of the list-of-tuples preview storage
+in GLCanon against the typed arrays of rs274.segments.
+
+The moves are those of a 3D surfacing program: a raster of short feeds
+over a wavy surface with a traverse back at the end of each row, which is
+the shape of program that makes the preview expensive.  Each storage
+backend runs in a separate process so the peak RSS can be compared.
+"""
+
+import math
+import os
+import resource
+import subprocess
+import sys
+from optparse import SUPPRESS_HELP
+import benchmark
+
+def surface_moves(nsegs):
+    """Yield ('traverse'|'feed', xyz) for a raster surfacing program of
+    about nsegs moves"""
+    cols = 1000
+    rows = max(1, nsegs // cols)
+    for r in range(rows):
+        y = r * .01
+        yield 'traverse', (0, y, .1)
+        for c in range(cols):
+            x = c * .01
+            yield 'feed', (x, y, -.1 + .05 * math.sin(x) * math.cos(y))
+        yield 'traverse', (x, y, .1)
+
+def load(store, nsegs):
+    if store == 'arrays':
+        from rs274.segments import SegmentArray
+        traverse = SegmentArray(has_feed=False)
+        feed = SegmentArray()
+    else:
+        traverse = []
+        feed = []
+    # This mirrors GLCanon.straight_traverse and GLCanon.straight_feed
+    traverse_append = traverse.append
+    feed_append = feed.append
+    lo = [0.0] * 9
+    to = [0.0, 0.0, 0.0]
+    lineno = 0
+    for kind, (x, y, z) in surface_moves(nsegs):
+        lineno += 1
+        l = [x, y, z, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        if kind == 'traverse':
+            traverse_append((lineno, lo, l, to))
+        else:
+            feed_append((lineno, lo, l, 10.0, to))
+        lo = l
+    return traverse, feed
+
+def child(store, nsegs):
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t_load, (traverse, feed) = benchmark.timed(load, store, nsegs)
+    rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t_iter, n = benchmark.timed(lambda: sum(1 for l in feed))
+    print "%-8s %9d segs  load %7.2fs  iterate %7.2fs  peak rss +%8.1f MiB" % (
+        store, len(traverse) + len(feed), t_load, t_iter,
+        (rss1 - rss0) / 1024.)
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-n", "--segments", type="int", default=500000,
+        help="approximate number of segments to generate")
+    parser.add_option("--child", help=SUPPRESS_HELP)
+    options, args = parser.parse_args()
+    if options.child:
+        child(options.child, options.segments)
+        return
+    for store in ('lists', 'arrays'):
+        subprocess.check_call([sys.executable, os.path.abspath(__file__),
+            "--segments", str(options.segments), "--child", store])
+
+if __name__ == '__main__':
+    main()
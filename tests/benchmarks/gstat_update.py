@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Measure the CPU time of one hal_glib GStat update() poll.
+
+The status comes from a scripted stand-in for linuxcnc.stat, so the
+numbers do not depend on what the machine is doing: 'idle' polls change
+nothing, 'moving' polls change the position and current line, and
+'modal' polls also change the active G and M codes.  Each is timed with
+a typical set of connected signals (a DRO, state and mode labels) and
+with every GStat signal connected.
+
+GStat still creates a linuxcnc.command() and reads HAL pins, so run this
+with a (simulated) LinuxCNC running.
+"""
+
+import linuxcnc
+import hal_glib
+import benchmark
+
+TYPICAL = ['current-position', 'state-estop', 'state-on', 'state-off',
+    'mode-manual', 'mode-auto', 'mode-mdi', 'interp-idle', 'interp-run',
+    'line-changed', 'feed-override-changed', 'homed', 'all-homed']
+
+class FakeStat:
+    def __init__(self, njoints=3, ntools=100):
+        self.task_state = linuxcnc.STATE_ON
+        self.task_mode = linuxcnc.MODE_AUTO
+        self.interp_state = linuxcnc.INTERP_IDLE
+        self.call_level = 0
+        self.file = "/tmp/program.ngc"
+        self.paused = False
+        self.motion_line = 0
+        self.homed = (1,) * njoints + (0,) * (9 - njoints)
+        self.tool_in_spindle = 1
+        self.motion_mode = linuxcnc.TRAJ_MODE_COORD
+        self.spindle = ({'override': 1.0, 'enabled': 1, 'direction': 1,
+            'speed': 1000.0},) * 8
+        self.feedrate = self.rapidrate = 1.0
+        self.max_velocity = 10.0
+        self.feed_hold_enabled = True
+        self.g5x_index = 1
+        self.block_delete = self.optional_stop = False
+        self.flood = self.mist = False
+        self.rotation_xy = 0.0
+        self.tool_offset = self.g5x_offset = self.g92_offset = (0.0,) * 9
+        self.joints = njoints
+        self.joint = ({'override_limits': 0, 'min_hard_limit': 0,
+            'max_hard_limit': 0},) * 16
+        self.gcodes = (0, 800, 0, 170, 400, 200, 900, 940, 540, 490, 990,
+            640, -1, 970, 911, 80, -1)
+        self.mcodes = (0, -1, 5, -1, 9, -1, 48, -1, 53, 0)
+        self.tool_table = tuple((i, 0., 0., 0., 0.) for i in range(ntools))
+        self.current_vel = 0.0
+        self.actual_position = self.position = self.dtg = (0.0,) * 9
+        self.joint_actual_position = (0.0,) * 9
+        self.inpos = True
+        self.step = 0
+        self.script = None
+
+    def poll(self):
+        self.step += 1
+        if self.script in ('moving', 'modal'):
+            self.actual_position = (self.step * .001,) + (0.0,) * 8
+            self.motion_line = self.step // 10
+            self.current_vel = 1.0
+            self.inpos = False
+        if self.script == 'modal':
+            g = list(self.gcodes)
+            g[5] = 200 + 10 * (self.step % 2)
+            self.gcodes = tuple(g)
+
+def updates(gstat, n):
+    for i in xrange(n):
+        gstat.update()
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-n", "--polls", type="int", default=20000,
+        help="number of update() calls to time")
+    options, args = parser.parse_args()
+
+    stat = FakeStat()
+    gstat = hal_glib._GStat(stat)
+    handler = lambda *args: None
+    for listeners in ('typical', 'all'):
+        if listeners == 'typical':
+            names = TYPICAL
+        else:
+            names = hal_glib._GStat.__gsignals__.keys()
+        ids = [gstat.connect(n, handler) for n in names]
+        for script in ('idle', 'moving', 'modal'):
+            stat.script = script
+            gstat.update()
+            t, _ = benchmark.timed(updates, gstat, options.polls)
+            print "%-8s %-7s %8.1f us/update" % (
+                listeners, script, t / options.polls * 1e6)
+        for i in ids:
+            gstat.disconnect(i)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Measure the CPU time of one hal_glib GPin poll as the pin count grows.
+
+'per-pin' is the old way of polling: every pin calls update(), which reads
+it and compares it with the previous value.  'batched' is one
+GPin.update_group() call, which reads the watched pins with a single
+_hal.read_items() call.  'listened' is the fraction of pins that have a
+'value-changed' handler; the others are not polled at all.  On every poll
+1% of the pins change.
+
+This creates a HAL component, so run it under halrun:
+    halrun -f /dev/null; python tests/benchmarks/hal_pin_watch.py; halrun -U
+"""
+
+import hal
+import hal_glib
+import benchmark
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-n", "--polls", type="int", default=200,
+        help="number of polls to time")
+    parser.add_option("-p", "--pins", default="100,1000,5000",
+        help="comma separated pin counts")
+    options, args = parser.parse_args()
+
+    counts = benchmark.numbers(options.pins)
+    comp = hal_glib.GComponent(hal.component("pinwatch-bench"))
+    pins = [comp.newpin("p.%d" % i, hal.HAL_FLOAT, hal.HAL_OUT)
+        for i in range(max(counts))]
+    comp.comp.ready()
+    handler = lambda *args: None
+    rate = hal_glib.GPin.DEFAULT_RATE
+    step = [0]
+
+    def poke(subset):
+        step[0] += 1
+        for p in subset[step[0] % 100::100]:
+            p._item.set(step[0])
+
+    def per_pin(subset):
+        for i in xrange(options.polls):
+            poke(subset)
+            for p in subset:
+                p.update()
+
+    def batched(subset):
+        for i in xrange(options.polls):
+            poke(subset)
+            hal_glib.GPin.update_group(rate)
+
+    for n in counts:
+        subset = pins[:n]
+        for fraction in (1., .1):
+            listened = subset[:int(n * fraction)]
+            ids = [(p, p.connect('value-changed', handler)) for p in listened]
+
+            old, _ = benchmark.timed(per_pin, subset)
+            old /= options.polls
+
+            hal_glib.GPin.update_group(rate)
+            new, _ = benchmark.timed(batched, subset)
+            new /= options.polls
+
+            print "%6d pins  %3d%% listened  per-pin %8.1f us  batched %8.1f us" % (
+                n, fraction * 100, old * 1e6, new * 1e6)
+            for p, i in ids:
+                p.disconnect(i)
+    comp.exit()
+
+if __name__ == '__main__':
+    main()
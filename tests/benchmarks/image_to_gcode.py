@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Compare the size of the gcode image-to-gcode writes, and the time it takes,
+with the line-only Gcode writer and with the arc fitting StreamingGcode.
+
+The reference images are generated rather than read from disk: a dome
+(smooth curves, where arcs help most), a stepped pyramid (flat faces and
+sharp edges) and a noisy wave (texture that fits neither lines nor arcs
+well).
+"""
+
+import imp
+import os
+import tempfile
+import numpy
+import benchmark
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, "..", "..", "src", "emc", "usr_intf", "axis",
+    "scripts", "image-to-gcode.py")
+
+def dome(n):
+    y, x = numpy.mgrid[-1:1:n*1j, -1:1:n*1j]
+    return numpy.sqrt(numpy.clip(1 - x*x - y*y, 0, 1))
+
+def pyramid(n):
+    y, x = numpy.mgrid[-1:1:n*1j, -1:1:n*1j]
+    return numpy.floor((1 - numpy.maximum(abs(x), abs(y))) * 8) / 8
+
+def wave(n):
+    y, x = numpy.mgrid[0:1:n*1j, 0:1:n*1j]
+    numpy.random.seed(1)
+    z = .5 + .25 * numpy.sin(20 * x) * numpy.cos(13 * y)
+    return z + numpy.random.uniform(-.01, .01, z.shape)
+
+images = [('dome', dome), ('pyramid', pyramid), ('wave', wave)]
+
+def run(i2g, image, fit_arcs, options):
+    tool = i2g.make_tool_shape(i2g.ball_tool, options.tool_diameter,
+        options.pixel_size)
+    nim = (image.astype(numpy.float32) - 1) * options.depth
+    fd, name = tempfile.mkstemp(suffix=".ngc")
+    output = os.fdopen(fd, "w", 1 << 20)
+    def convert():
+        i2g.convert(nim, "G20", tool, options.pixel_size, options.step,
+            .012, options.tolerance, 12,
+            i2g.Convert_Scan_Alternating(), None, False,
+            i2g.ArcEntryCut(12, .125), 1000, 0, 0, 12,
+            1, fit_arcs, output)
+        output.close()
+    try:
+        t, _ = benchmark.timed(convert)
+        size = os.path.getsize(name)
+        lines = sum(1 for l in open(name))
+    finally:
+        os.unlink(name)
+    return t, size, lines
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-n", "--pixels", type="int", default=400,
+        help="width and height of the reference images")
+    parser.add_option("-p", "--pixel-size", type="float", default=.006)
+    parser.add_option("-d", "--depth", type="float", default=.25)
+    parser.add_option("-t", "--tolerance", type="float", default=.001)
+    parser.add_option("-s", "--step", type="int", default=4,
+        help="stepover in pixels")
+    parser.add_option("--tool-diameter", type="float", default=1/16.)
+    options, args = parser.parse_args()
+
+    i2g = imp.load_source("image_to_gcode", SCRIPT)
+    for name, make in images:
+        image = make(options.pixels)
+        for label, fit_arcs in (('lines', False), ('arcs', True)):
+            t, size, lines = run(i2g, image, fit_arcs, options)
+            print "%-8s %-6s %7.2fs  %10d bytes  %8d lines" % (
+                name, label, t, size, lines)
+
+if __name__ == '__main__':
+    main()
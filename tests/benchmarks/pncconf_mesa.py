@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Measure how long pncconf takes to bring up its Mesa configuration page.
+
+pncconf used to fill in the pin comboboxes of every connector tab when the
+Mesa page was set up; now that is left until a connector tab is first
+shown.  This times the start up of pncconf, loading the mesa0 page, the
+page set up (as done by the 'Accept component changes' button) and the
+first switch to a connector tab.  The old page set up took about as long
+as the last two together.
+
+It needs gtk and a display, and runs bin/pncconf of a run-in-place tree
+(after sourcing scripts/rip-environment).
+"""
+
+import os
+import sys
+import imp
+import gtk
+import benchmark
+
+def load_pncconf():
+    path = os.path.join(os.environ['EMC2_HOME'], 'bin', 'pncconf')
+    # pncconf finds its data from where it was started
+    sys.argv[0] = path
+    module = imp.load_source('pncconf_app', path)
+    sys.excepthook = sys.__excepthook__
+    return module
+
+def pump():
+    while gtk.events_pending():
+        gtk.main_iteration()
+
+def timed(what, f, *args):
+    def call():
+        result = f(*args)
+        pump()
+        return result
+    t, result = benchmark.timed(call)
+    print "%-28s %8.3f s" % (what, t)
+    return result
+
+def load_mesa_page(app, boardnum):
+    name = 'mesa%d' % boardnum
+    for page in app._p.available_page:
+        if page[0] == name: break
+    if not page[2]:
+        app.builder.add_from_file(os.path.join(app._p.DATADIR, '%s.glade' % name))
+        app.p['%s_init' % name]()
+        page[2] = True
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("--board", default="5i25-Internal Data",
+        help="board title to set up [%default]")
+    parser.add_option("--repeat", type="int", default=3,
+        help="page set ups to time [%default]")
+    options, args = parser.parse_args()
+
+    pncconf = timed("import", load_pncconf)
+    app = timed("start up", pncconf.App, '')
+    app.fill_combobox_models()
+    timed("load mesa0 page", load_mesa_page, app, 0)
+
+    w = app.widgets
+    model = w.mesa0_boardtitle.get_model()
+    for i, row in enumerate(model):
+        if row[0] == options.board:
+            w.mesa0_boardtitle.set_active(i)
+            break
+    else:
+        parser.error("no board %r" % options.board)
+    if w.mesa0_firmware.get_active() < 0:
+        w.mesa0_firmware.set_active(0)
+    pump()
+
+    for i in range(options.repeat):
+        w.mesa0_notebook.set_current_page(0)
+        pump()
+        # a new page set up rebuilds every combobox, as the first one does
+        app.d._mesa0_configured = False
+        timed("page set up", app.on_mesa_component_value_changed, None, 0)
+        timed("first connector tab", w.mesa0_notebook.set_current_page, 1)
+
+if __name__ == '__main__':
+    main()
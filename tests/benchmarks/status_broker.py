@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+Measure the total CPU time spent polling the LinuxCNC status by N panels.
+
+Each simulated panel is a process that polls every --interval ms and reads
+the values a typical DRO and status panel shows.  In 'direct' mode every
+panel polls its own linuxcnc.stat; in 'broker' mode a statusbroker.Broker
+process polls once per --interval and the panels read its snapshots with
+statusbroker.stat.  The CPU time of all processes (including the broker)
+is added up.
+
+Run this with a (simulated) LinuxCNC running; jog or run a program while
+it measures to see the cost of changing status.
+"""
+
+import os
+import time
+import signal
+import resource
+import tempfile
+import multiprocessing
+import linuxcnc
+import statusbroker
+import benchmark
+
+FIELDS = ['task_state', 'task_mode', 'interp_state', 'motion_line',
+    'actual_position', 'g5x_offset', 'tool_offset', 'feedrate', 'spindle',
+    'homed', 'gcodes', 'mcodes', 'tool_in_spindle']
+
+def panel(make_stat, interval, seconds):
+    s = make_stat()
+    end = time.time() + seconds
+    while time.time() < end:
+        s.poll()
+        for f in FIELDS:
+            getattr(s, f)
+        time.sleep(interval)
+
+def broker(path, interval):
+    b = statusbroker.Broker(path, interval)
+    def stop(signum, frame):
+        raise SystemExit
+    signal.signal(signal.SIGTERM, stop)
+    b.run()
+
+def children_cpu():
+    r = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return r.ru_utime + r.ru_stime
+
+def measure(mode, panels, interval, seconds, path):
+    before = children_cpu()
+    server = None
+    if mode == 'broker':
+        server = multiprocessing.Process(target=broker, args=(path, interval))
+        server.start()
+        while not os.path.exists(path):
+            time.sleep(.01)
+        make_stat = lambda: statusbroker.stat(path)
+    else:
+        make_stat = linuxcnc.stat
+    procs = [multiprocessing.Process(target=panel,
+            args=(make_stat, interval, seconds))
+        for i in range(panels)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    if server is not None:
+        server.terminate()
+        server.join()
+    return children_cpu() - before
+
+def main():
+    parser = benchmark.parser(__doc__)
+    parser.add_option("-p", "--panels", default="1,4,16",
+        help="comma separated panel counts")
+    parser.add_option("-i", "--interval", type="float", default=50.,
+        help="poll interval in ms")
+    parser.add_option("-s", "--seconds", type="float", default=10)
+    options, args = parser.parse_args()
+
+    interval = options.interval / 1000.
+    path = os.path.join(tempfile.gettempdir(),
+        "status-broker-bench.%d" % os.getpid())
+    for n in benchmark.numbers(options.panels):
+        for mode in ('direct', 'broker'):
+            cpu = measure(mode, n, interval, options.seconds, path)
+            print "%4d panels  %-6s  %6.2f%% of one CPU" % (
+                n, mode, 100 * cpu / options.seconds)
+
+if __name__ == '__main__':
+    main()
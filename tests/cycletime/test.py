@@ -0,0 +1,57 @@
+from rs274 import cycletime
+
+def pos(*p):
+    return tuple(map(float, p)) + (0.,) * (9 - len(p))
+
+class Canon:
+    """The segment lists and line_index of a GLCanon, filled in the order
+    the lines run"""
+    def __init__(self):
+        self.traverse = []; self.feed = []; self.arcfeed = []; self.dwells = []
+        self.line_index = {}
+        self.dwell_time = 0
+        self.dwell_by_line = {}
+        self.marks = (0, 0, 0, 0)
+
+    def close_line(self, lineno):
+        marks = (len(self.traverse), len(self.feed), len(self.arcfeed),
+            len(self.dwells))
+        self.line_index.setdefault(lineno, []).append((self.marks, marks))
+        self.marks = marks
+
+    def rapid(self, lineno, length):
+        self.traverse.append((lineno, pos(), pos(length), [0., 0., 0.]))
+        self.close_line(lineno)
+
+    def feed_move(self, lineno, length):
+        self.feed.append((lineno, pos(), pos(length), 1., [0., 0., 0.]))
+        self.close_line(lineno)
+
+    def dwell(self, lineno, seconds):
+        self.dwells.append((lineno, (1., 1., 1.), 0., 0., 0., 0))
+        self.dwell_time += seconds
+        self.dwell_by_line[lineno] = self.dwell_by_line.get(lineno, 0) + seconds
+        self.close_line(lineno)
+
+# o100 sub (lines 2-3) called three times from line 10, then a G4 P2
+# repeated twice by a loop on line 12 and a last move on line 13
+c = Canon()
+c.rapid(1, 1.)
+for i in range(3):
+    c.feed_move(2, 1.)
+    c.feed_move(3, 2.)
+for i in range(2):
+    c.dwell(12, 2.)
+c.feed_move(13, 1.)
+
+limits = cycletime.MachineLimits([1.] * 9, [1e9] * 9)
+e = cycletime.estimate(c, limits)
+print "total %.2f" % e.time
+print "runs", " ".join(str(l) for l in e.run_lines)
+print "line 2 %.2f" % e.elapsed(2)
+print "line 2 again %.2f" % e.elapsed(2, e.elapsed(3))
+print "line 3 third %.2f" % e.elapsed(3, 6.5)
+print "line 12 %.2f line 13 %.2f" % (e.elapsed(12), e.elapsed(13))
+print "line 11 %.2f" % e.elapsed(11)
+print "remaining at 13 %.2f" % e.remaining(13)
+print "line 12 total %.2f" % e.line_time(12)
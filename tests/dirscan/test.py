@@ -0,0 +1,80 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import dirscan
+import filewatch
+
+def touch(path, text=""):
+    f = open(path, "w")
+    f.write(text)
+    f.close()
+
+def names(entries):
+    return sorted((name, is_dir) for name, is_dir, info in entries)
+
+d = tempfile.mkdtemp()
+try:
+    os.mkdir(os.path.join(d, "sub"))
+    touch(os.path.join(d, "a.ngc"), "\n(first line)\nG0 X1\n\nG1 Y2\nM2\n")
+    touch(os.path.join(d, ".hidden"))
+    os.symlink("missing", os.path.join(d, "dangling"))
+
+    entries = dirscan.scan(d, True)
+    print "scan", names(entries)
+    info = [e[2] for e in entries if e[0] == "a.ngc"][0]
+    print "preview", repr(info[2]), info[0]
+
+    for use_inotify in (True, False):
+        watcher = filewatch.FileWatcher(use_inotify)
+        listings = dirscan.Listings(watcher, size=2)
+        def listing(path):
+            entries = listings.get(path)
+            if entries is None:
+                generation = listings.generation(path)
+                entries = dirscan.scan(path)
+                listings.put(path, generation, False, entries)
+                return "scanned", names(entries)
+            return "kept", names(entries)
+
+        print "inotify" if use_inotify else "polled"
+        print " ", listing(d)
+        print " ", listing(d)
+        # without inotify the mtime of the directory has to change
+        time.sleep(1.1)
+        touch(os.path.join(d, "b.ngc"))
+        print " ", listing(d)
+        print " ", listing(d)
+        time.sleep(1.1)
+        os.unlink(os.path.join(d, "b.ngc"))
+        print " ", listing(d)
+        # a listing with details is not made from one without
+        print "  details", listings.get(d, True)
+
+        # the oldest directory is dropped and no longer watched
+        others = [tempfile.mkdtemp(dir=d) for i in range(2)]
+        for other in others:
+            listing(other)
+        print "  kept", sorted(listings.listings) == sorted(others), \
+            os.path.abspath(d) in watcher.generations
+        if use_inotify:
+            print "  watches", sorted(watcher.dirs) == sorted(others)
+        for other in others:
+            os.rmdir(other)
+        watcher.close()
+
+    # every scanner calls back, however many there are
+    done = []
+    finished = threading.Event()
+    def callback(path, entries):
+        done.append((path, names(entries)))
+        if len(done) == 2: finished.set()
+    one, two = dirscan.Scanner(), dirscan.Scanner()
+    one.scan(d, False, callback)
+    two.scan(os.path.join(d, "sub"), False, callback)
+    finished.wait(10)
+    print "scanners", sorted(done) == sorted([(d, names(dirscan.scan(d))),
+        (os.path.join(d, "sub"), [])])
+finally:
+    shutil.rmtree(d)
@@ -0,0 +1,56 @@
+import dro_service
+
+class Status:
+    """The status fields the DRO positions are computed from"""
+    def __init__(self, **kw):
+        self.actual_position = (1., 2., 3., 45., 0., 0., 0., 0., 0.)
+        self.position = (1.5, 2., 3., 45., 0., 0., 0., 0., 0.)
+        self.g5x_offset = (.5, .5, 1., 0., 0., 0., 0., 0., 0.)
+        self.tool_offset = (0., 0., .25, 0., 0., 0., 0., 0., 0.)
+        self.g92_offset = (0., 1., 0., 0., 0., 0., 0., 0., 0.)
+        self.dtg = (.25, 0., -1., 0., 0., 0., 0., 0., 0.)
+        self.rotation_xy = 0.
+        self.__dict__.update(kw)
+        self.polls = 0
+
+    def poll(self):
+        self.polls += 1
+
+def rounded(a):
+    return [round(v, 6) for v in a.tolist()]
+
+pos, rel, dtg = dro_service.positions(Status())
+print "abs", rounded(pos[0]), rounded(pos[1])
+print "rel", rounded(rel[0]), rounded(rel[1])
+print "dtg", rounded(dtg)
+pos, rel, dtg = dro_service.positions(Status(rotation_xy=90.))
+print "rotated rel", rounded(rel[0])
+pos, rel, dtg = dro_service.positions(Status(), [2.] * 9)
+print "from hal", rounded(pos[0]), rounded(pos[1])
+
+# linear axes are converted, A (an angle) is not
+print "to mm", rounded(dro_service.convert(pos[0], True, dro_service.INCH))
+print "to inch", rounded(dro_service.convert(pos[0], False, dro_service.MM))
+print "same", rounded(dro_service.convert(pos[0], True, dro_service.MM))
+
+status = Status()
+service = dro_service.DroService(status)
+seen = []
+service.update()
+print "valid", service.valid
+a = service.texts("%.3f", metric=False, machine_units=dro_service.INCH)
+b = service.texts("%.3f", metric=False, machine_units=dro_service.INCH)
+print "texts", a[0][:4], a[1][:4], a[2][:4], a is b
+print "commanded", service.texts("%.1f", actual=False)[0][:2]
+print "diameter", service.texts("%.2f", diameter=True)[1][:1]
+service.subscribe(seen.append)
+service._periodic()
+print "clients", len(seen), seen[0] is service, status.polls
+print "new texts", service.texts("%.3f", metric=False,
+    machine_units=dro_service.INCH) is not a
+service.unsubscribe(seen.append)
+print "timer", service.timer
+
+broken = dro_service.DroService(object())
+broken.update()
+print "no status", broken.valid
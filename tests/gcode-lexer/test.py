@@ -0,0 +1,29 @@
+from qtvcp.lib import gcode_lexer
+
+# one letter per style, in the order of the style numbers
+NAMES = "-ckav"
+
+def show(text):
+    styles = gcode_lexer.styles(text)
+    print repr(text)
+    print repr("".join(NAMES[s] for s in styles))
+
+for text in [
+    "G1 X1.5 Y[#1+2]\n",
+    "#<depth> = -0.25 (cut depth)\n",
+    "(no end\nG0 Z1\n",
+    "%\r\nM2\r\n",
+    "G4 P1 (MSG, pause here) X1\n",
+    "(debug,#1) (msg again,) (Msg no comma\n",
+    "o100 sub (message text, later)\n",
+    "",
+]:
+    show(text)
+
+# styling lines one at a time gives the same as styling them together
+text = "G1 X1 (MSG,a\n(c)G2\r\n(DEBUG,b) Y2\rM30\n"
+lines = text.splitlines(True)
+print "per line", "".join(str(gcode_lexer.styles(l)) for l in lines) \
+    == str(gcode_lexer.styles(text))
+print "runs", gcode_lexer.runs(gcode_lexer.styles("G1 (x)\n"))
+print "no runs", gcode_lexer.runs("")
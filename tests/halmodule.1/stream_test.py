@@ -32,5 +32,38 @@ for i in range(9):
     assert reader.sampleno == i+1
 assert reader.read() is None
 assert reader.num_underruns == 1
+del reader
+
+# the same through the bulk interface: records of 8 bytes per element
+# plus 8 for the sample number
+import struct
+record = "<d?7xi4xI4xI4x"
+writer = hal.stream(c, hal.streamer_base + 1, 10, "fbsu")
+assert writer.record_size == struct.calcsize(record) == 40
+data = "".join(struct.pack(record, i, i % 2, -i, i, 0) for i in range(12))
+try:
+    writer.write_many(data[:-1])
+except ValueError:
+    pass
+else:
+    assert False, "failed to get exception on partial record"
+assert writer.write_many(data) == 9
+assert writer.write_many(data) == 0
+assert writer.num_overruns == 0
+del writer
+
+reader = hal.stream(c, hal.streamer_base + 1, "fbsu")
+buf = bytearray(4 * reader.record_size)
+assert reader.read_into(buf, 3) == 3
+rest = reader.read_many(100)
+assert len(rest) == 6 * reader.record_size
+assert reader.read_many(100) == bytearray()
+assert reader.read_into(buf) == 0
+assert reader.num_underruns == 0
+records = [struct.unpack_from(record, buf, i * 40) for i in range(3)]
+records += [struct.unpack_from(record, rest, i * 40) for i in range(6)]
+for i, r in enumerate(records):
+    assert r == (i, bool(i % 2), -i, i, i + 1), r
+assert reader.sampleno == 9
 
 print "pass"
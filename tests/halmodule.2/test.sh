@@ -0,0 +1,62 @@
+#!/bin/sh
+realtime start
+python <<EOF
+import hal
+# keeps the process attached to HAL while x is unloaded
+keep = hal.component("keep")
+h = hal.component("x")
+try:
+    h.newpin("s", hal.HAL_S32, hal.HAL_IN)
+    h.newpin("f", hal.HAL_FLOAT, hal.HAL_OUT)
+    h.newpin("g", hal.HAL_FLOAT, hal.HAL_IN)
+    h.newparam("param", hal.HAL_BIT, hal.HAL_RW)
+    h.ready()
+    hal.new_sig("sig", hal.HAL_FLOAT)
+
+    s = hal.ref("x.s")
+    f = hal.ref("x.f")
+    param = hal.ref("x.param")
+    sig = hal.ref("sig")
+    missing = hal.ref("x.missing")
+    print "exists", s.exists, param.exists, sig.exists, missing.exists
+
+    s.set(5)
+    param.set("1")
+    h["f"] = 2.5
+    print "get", s.get(), f.get(), param.get(), sig.get()
+    print "get_values", hal.get_values([s, "x.f", param, "sig"])
+    print "get_value", hal.get_value("x.s"), hal.get_value("x.param")
+
+    for r, v in ((s, 2 ** 31), (s, "one"), (f, 1), (missing, 1)):
+        try:
+            r.set(v)
+            print "set", r.name, v, r.get()
+        except (ValueError, RuntimeError):
+            print "set", r.name, v, "fail"
+    g = hal.ref("x.g")
+    for v in (float("inf"), float("nan"), 1e20, 3):
+        g.set(v)
+        print "set", g.name, v, g.get()
+    try:
+        sig.set(1)
+    except RuntimeError, e:
+        print "set sig", e
+    try:
+        hal.get_values([s, missing])
+    except RuntimeError:
+        print "get_values missing fail"
+finally:
+    h.exit()
+
+print "unloaded", s.exists
+h = hal.component("x")
+try:
+    h.newpin("s", hal.HAL_S32, hal.HAL_IN)
+    h.ready()
+    s.set(7)
+    print "reloaded", s.exists, s.get(), hal.get_value("x.s")
+finally:
+    h.exit()
+    keep.exit()
+EOF
+realtime stop
@@ -0,0 +1,39 @@
+import gcode
+from rs274.segments import SegmentArray, DwellArray, calc_extents
+
+def pos(*p):
+    return tuple(map(float, p)) + (0.,) * (9 - len(p))
+
+traverse = [
+    (1, pos(0, 0, 1), pos(1, 2, 1), [0., 0., 0.]),
+    (2, pos(1, 2, 1), pos(-3, 2, .5), [0., 0., .25]),
+]
+feed = [
+    (3, pos(-3, 2, .5), pos(-3, 4, -1, 90), 12.5, [0., 0., .25]),
+    (3, pos(-3, 4, -1, 90), pos(5, 4, -1), 20., [.1, 0., .25]),
+    (4, pos(5, 4, -1), pos(5, -6, -2), 20., [.1, 0., .25]),
+]
+
+t = SegmentArray(False)
+t.extend(traverse)
+f = SegmentArray()
+f.extend(feed)
+empty = SegmentArray()
+
+print "len", len(t), len(f), len(empty), bool(t), bool(empty)
+print "items", list(t) == traverse, list(f) == feed
+print "index", f[0] == feed[0], f[-1] == feed[-1], f[1:] == feed[1:]
+try:
+    f[3]
+except IndexError, e:
+    print "IndexError", e
+print "extents", empty.extents(), calc_extents(t, f, empty) == \
+    gcode.calc_extents(traverse, feed, [])
+print calc_extents(t, f)
+print "nbytes", t.nbytes(), f.nbytes()
+
+dwells = [(5, (1., .5, .5), 1., 2., 3., 17), (6, (0., 1., 0.), -1., 0., 0., 18)]
+d = DwellArray()
+for dwell in dwells:
+    d.append(dwell)
+print "dwells", len(d), list(d) == dwells, d[-1] == dwells[-1], d[:1] == dwells[:1]
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+from rs274 import tooltable
+
+LINES = [
+    "T1 P1 Z0.511 D0.125 ;1/8 end mill\n",
+    "\n",
+    "T2   P2 Z0.1 X-0.5   ;  probe\n",
+    "T3 P5 Zbad D0.25\n",
+    "t4 p4 z1.5 q2 ;lower case\n",
+]
+
+def show(table):
+    for row in range(len(table)):
+        print row, table.values(row), repr(table.comment(row))
+
+def read(path):
+    f = open(path)
+    try:
+        return f.read()
+    finally:
+        f.close()
+
+d = tempfile.mkdtemp()
+try:
+    path = os.path.join(d, "tool.tbl")
+    f = open(path, "w")
+    f.writelines(LINES)
+    f.close()
+
+    table = tooltable.load(path)
+    print "rows", len(table)
+    show(table)
+    print "errors", table.errors
+    print "tool 2", table.tool(2), "pocket 5", table.pocket(5), \
+        "tool 9", table.tool(9)
+    print "stat", table.stat_entry(table.tool(4))
+    print "no tool", table.stat_entry(None)
+
+    # unchanged, the file is written back as it was (less the empty line)
+    table.write(path)
+    print "round trip", read(path) == "".join(l for l in LINES if l.strip())
+
+    # setting the same values does not count as an edit
+    table.set(0, table.values(0))
+    # only the edited tool is formatted again
+    values = table.values(1)
+    values[tooltable.COLUMN['Z']] = 0.2
+    table.set(1, values)
+    print "tool 2 now", table.tool(2), table.values(1)
+    table.write(path)
+    print read(path),
+
+    # an editor gives back all rows; rows that did not change keep their
+    # lines, a missing number matches 0
+    rows = [(table.values(row), table.comment(row))
+        for row in range(len(table))]
+    rows[0][0][tooltable.COLUMN['X']] = 0.0
+    rows[3] = ([4, 4, None, None, 1.25] + [None] * 10, "lower case")
+    rows.append(([7, 7] + [None] * 13, "new"))
+    table.replace(rows, 1e-9)
+    table.write(path)
+    print read(path),
+
+    reread = tooltable.load(path)
+    print "reread", [reread.stat_entry(row) == table.stat_entry(row)
+        for row in range(len(table))]
+
+    stat = [(1, 0.0, 0.0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.125, 0.0, 0.0, 0),
+            (5, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.25, 0.0, 0.0, 3)]
+    from_stat = tooltable.from_stat(stat)
+    print "from_stat", [from_stat.stat_entry(row) == tuple(e)
+        for row, e in enumerate(stat)], from_stat.pocket(1)
+finally:
+    shutil.rmtree(d)
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from PyQt5 import QtGui, QtWidgets
+from qtvcp.lib import ui_cache
+
+UI = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>Form</class>
+ <widget class="QWidget" name="Form">
+  <widget class="QPushButton" name="button">
+   <property name="text">
+    <string>%s</string>
+   </property>
+  </widget>
+ </widget>
+ <resources/>
+ <connections>%s</connections>
+</ui>
+"""
+
+MISSING_SLOT = """
+  <connection>
+   <sender>button</sender>
+   <signal>clicked()</signal>
+   <receiver>Form</receiver>
+   <slot>missing_handler()</slot>
+  </connection>
+"""
+
+PIXMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>Form</class>
+ <widget class="QWidget" name="Form">
+  <widget class="QLabel" name="label">
+   <property name="pixmap">
+    <pixmap>images/dot.png</pixmap>
+   </property>
+  </widget>
+ </widget>
+ <resources/>
+ <connections/>
+</ui>
+"""
+
+def write(path, text):
+    f = open(path, "w")
+    f.write(text)
+    f.close()
+
+def entries(directory):
+    # a compiled module and its .pyc are one entry
+    return len(set(name.split('.')[0] for name in os.listdir(directory)))
+
+def load(ui, cache):
+    window = QtWidgets.QWidget()
+    used = ui_cache.load(ui, window, cache)
+    return used, str(window.button.text())
+
+app = QtWidgets.QApplication([])
+d = tempfile.mkdtemp()
+try:
+    ui = os.path.join(d, "screen.ui")
+    cache = os.path.join(d, "cache")
+    write(ui, UI % ("Go", ""))
+    print "first", load(ui, cache), entries(cache)
+    compiled = ui_cache.UiCache(cache).path(ui)
+    stamp = os.stat(compiled).st_mtime
+    print "again", load(ui, cache), entries(cache), \
+        os.stat(compiled).st_mtime == stamp
+
+    write(ui, UI % ("Stop", ""))
+    print "edited", load(ui, cache), entries(cache), \
+        ui_cache.UiCache(cache).path(ui) != compiled
+
+    compiled = ui_cache.UiCache(cache).path(ui)
+    for name in os.listdir(cache):
+        os.unlink(os.path.join(cache, name))
+    write(compiled, "this is not python\n")
+    print "broken", load(ui, cache)
+
+    write(ui, UI % ("Go", MISSING_SLOT))
+    try:
+        load(ui, cache)
+        print "missing handler loaded"
+    except AttributeError:
+        print "missing handler AttributeError"
+
+    # relative pixmaps are found from the folder of the .ui file
+    os.mkdir(os.path.join(d, "images"))
+    image = QtGui.QPixmap(4, 4)
+    image.fill()
+    image.save(os.path.join(d, "images", "dot.png"))
+    ui = os.path.join(d, "pixmap.ui")
+    write(ui, PIXMAP)
+    window = QtWidgets.QWidget()
+    cwd = os.getcwd()
+    os.chdir(os.path.join(d, "cache"))
+    try:
+        used = ui_cache.load(ui, window, cache)
+    finally:
+        os.chdir(cwd)
+    print "pixmap", used, not window.label.pixmap().isNull()
+finally:
+    shutil.rmtree(d)
@@ -0,0 +1,2 @@
+#!/bin/sh
+QT_QPA_PLATFORM=offscreen python test.py